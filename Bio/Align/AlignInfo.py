@@ -15,6 +15,15 @@ from __future__ import print_function
 import math
 import sys
 
+try:
+    import numpy
+except ImportError:
+    # The letters will be counted in pure Python instead
+    numpy = None
+
+from Bio._py3k import zip
+from Bio._utils import _BLOCK_ELEMENTS, _count_columns
+
 from Bio import Alphabet
 from Bio.Alphabet import IUPAC
 from Bio.Seq import Seq
@@ -33,6 +42,13 @@ class SummaryInfo(object):
     This class should be used to caclculate information summarizing the
     results of an alignment. This may either be straight consensus info
     or more complicated things.
+
+    The letters in each column of the alignment are counted all at once
+    (using NumPy if it is installed), and the consensus sequences, position
+    specific score matrix, information content and replacement dictionary
+    are calculated from these counts. Sequences are weighted by the 'weight'
+    entry of their annotations (default 1.0), or for an ArrayAlignment by
+    its weights attribute.
     """
 
     def __init__(self, alignment):
@@ -70,46 +86,8 @@ class SummaryInfo(object):
 
         """
         # Iddo Friedberg, 1-JUL-2004: changed ambiguous default to "X"
-        consensus = ''
-
-        # find the length of the consensus we are creating
-        con_len = self.alignment.get_alignment_length()
-
-        # go through each seq item
-        for n in range(con_len):
-            # keep track of the counts of the different atoms we get
-            atom_dict = {}
-            num_atoms = 0
-
-            for record in self.alignment:
-                # make sure we haven't run past the end of any sequences
-                # if they are of different lengths
-                if n < len(record.seq):
-                    if record.seq[n] != '-' and record.seq[n] != '.':
-                        if record.seq[n] not in atom_dict:
-                            atom_dict[record.seq[n]] = 1
-                        else:
-                            atom_dict[record.seq[n]] += 1
-
-                        num_atoms = num_atoms + 1
-
-            max_atoms = []
-            max_size = 0
-
-            for atom in atom_dict:
-                if atom_dict[atom] > max_size:
-                    max_atoms = [atom]
-                    max_size = atom_dict[atom]
-                elif atom_dict[atom] == max_size:
-                    max_atoms.append(atom)
-
-            if require_multiple and num_atoms == 1:
-                consensus += ambiguous
-            elif (len(max_atoms) == 1) and ((float(max_size) /
-                                             float(num_atoms)) >= threshold):
-                consensus += max_atoms[0]
-            else:
-                consensus += ambiguous
+        consensus = self._consensus("-.", threshold, ambiguous,
+                                    require_multiple)
 
         # we need to guess a consensus alphabet if one isn't specified
         if consensus_alpha is None:
@@ -131,52 +109,39 @@ class SummaryInfo(object):
 
         """
         # Iddo Friedberg, 1-JUL-2004: changed ambiguous default to "X"
-        consensus = ''
-
-        # find the length of the consensus we are creating
-        con_len = self.alignment.get_alignment_length()
+        consensus = self._consensus("", threshold, ambiguous,
+                                    require_multiple)
 
-        # go through each seq item
-        for n in range(con_len):
-            # keep track of the counts of the different atoms we get
-            atom_dict = {}
-            num_atoms = 0
-
-            for record in self.alignment:
-                # make sure we haven't run past the end of any sequences
-                # if they are of different lengths
-                if n < len(record.seq):
-                    if record.seq[n] not in atom_dict:
-                        atom_dict[record.seq[n]] = 1
-                    else:
-                        atom_dict[record.seq[n]] += 1
+        # we need to guess a consensus alphabet if one isn't specified
+        if consensus_alpha is None:
+            # TODO - Should we make this into a Gapped alphabet?
+            consensus_alpha = self._guess_consensus_alphabet(ambiguous)
 
-                    num_atoms += 1
+        return Seq(consensus, consensus_alpha)
 
-            max_atoms = []
-            max_size = 0
+    def _consensus(self, to_ignore, threshold, ambiguous, require_multiple):
+        """Build a consensus string from the column counts (PRIVATE).
 
-            for atom in atom_dict:
-                if atom_dict[atom] > max_size:
-                    max_atoms = [atom]
-                    max_size = atom_dict[atom]
-                elif atom_dict[atom] == max_size:
-                    max_atoms.append(atom)
+        The letters in to_ignore (gap characters) are not counted. Ties for
+        the most common letter give the ambiguous character.
+        """
+        consensus = []
+        for atom_dict in self._get_column_counts():
+            # keep track of the counts of the different atoms we get
+            counts = [(count, atom) for atom, count in atom_dict.items()
+                      if atom not in to_ignore]
+            num_atoms = sum(count for count, atom in counts)
+            max_size = max(counts)[0] if counts else 0
+            max_atoms = [atom for count, atom in counts if count == max_size]
 
             if require_multiple and num_atoms == 1:
-                consensus += ambiguous
+                consensus.append(ambiguous)
             elif (len(max_atoms) == 1) and ((float(max_size) /
                                              float(num_atoms)) >= threshold):
-                consensus += max_atoms[0]
+                consensus.append(max_atoms[0])
             else:
-                consensus += ambiguous
-
-        # we need to guess a consensus alphabet if one isn't specified
-        if consensus_alpha is None:
-            # TODO - Should we make this into a Gapped alphabet?
-            consensus_alpha = self._guess_consensus_alphabet(ambiguous)
-
-        return Seq(consensus, consensus_alpha)
+                consensus.append(ambiguous)
+        return "".join(consensus)
 
     def _guess_consensus_alphabet(self, ambiguous):
         """Pick an (ungapped) alphabet for an alignment consesus sequence.
@@ -259,65 +224,154 @@ class SummaryInfo(object):
         # get a starting dictionary based on the alphabet of the alignment
         rep_dict, skip_items = self._get_base_replacements(skip_chars)
 
-        # iterate through each record
-        for rec_num1 in range(len(self.alignment)):
-            # iterate through each record from one beyond the current record
-            # to the end of the list of records
-            for rec_num2 in range(rec_num1 + 1, len(self.alignment)):
-                # for each pair of records, compare the sequences and add
-                # the pertinent info to the dictionary
-                rep_dict = self._pair_replacement(
-                    self.alignment[rec_num1].seq,
-                    self.alignment[rec_num2].seq,
-                    self.alignment[rec_num1].annotations.get('weight', 1.0),
-                    self.alignment[rec_num2].annotations.get('weight', 1.0),
-                    rep_dict, skip_items)
+        codes = self._get_codes()
+        if codes is None:
+            return self._pair_replacements(rep_dict, skip_items)
+        return self._array_replacements(codes, rep_dict, skip_items)
+
+    def _pair_replacements(self, rep_dict, skip_items):
+        """Fill in the replacement dictionary pair by pair (PRIVATE).
 
+        Used without NumPy, the replacements of each pair of sequences are
+        added column by column.
+        """
+        weights = self._get_weights()
+        seqs = [str(record.seq) for record in self.alignment]
+        for rec_num1, (seq1, weight1) in enumerate(zip(seqs, weights)):
+            for seq2, weight2 in zip(seqs[rec_num1 + 1:],
+                                     weights[rec_num1 + 1:]):
+                # sequences shorter than the alignment have no replacements
+                # past their end
+                for residue1, residue2 in zip(seq1, seq2):
+                    if residue1 in skip_items or residue2 in skip_items:
+                        continue
+                    try:
+                        rep_dict[(residue1, residue2)] += weight1 * weight2
+                    # if we get a key error, then we've got a problem with
+                    # alphabets
+                    except KeyError:
+                        raise ValueError("Residues %s, %s not found in "
+                                         "alphabet %s"
+                                         % (residue1, residue2,
+                                            self.alignment._alphabet))
         return rep_dict
 
-    def _pair_replacement(self, seq1, seq2, weight1, weight2,
-                          start_dict, ignore_chars):
-        """Compare two sequences and generate info on the replacements seen.
+    def _array_replacements(self, codes, rep_dict, skip_items):
+        """Fill in the replacement dictionary using NumPy (PRIVATE).
 
-        Arguments:
-         - seq1, seq2 - The two sequences to compare.
-         - weight1, weight2 - The relative weights of seq1 and seq2.
-         - start_dict - The dictionary containing the starting replacement
-           info that we will modify.
-         - ignore_chars - A list of characters to ignore when calculating
-           replacements (ie. '-').
+        With whole number weights (such as the default weight of one), the
+        sums are exact in any order. The sequences are then turned into
+        weighted one-hot arrays, so that the replacements in a block of
+        columns are the product of the running totals of the earlier
+        sequences with the later sequences. Otherwise, the replacements are
+        added pair by pair in the same order as without NumPy.
+        """
+        letters = sorted(set(residue1 for residue1, residue2 in rep_dict))
+        size = len(letters)
+        # letters of the dictionary, then skipped, then unknown residues
+        lookup = numpy.empty(256, dtype=numpy.intp)
+        lookup[:] = size + 1
+        lookup[0] = size
+        for char in skip_items:
+            if len(char) == 1 and ord(char) < 256:
+                lookup[ord(char)] = size
+        for index, letter in enumerate(letters):
+            lookup[ord(letter)] = index
+        self._check_replacements(codes, lookup, size)
+        rows, length = codes.shape
+        weights = numpy.asarray(self._get_weights(), dtype=float)
+        if (weights == numpy.floor(weights)).all() and \
+                numpy.abs(weights).sum() ** 2 * length < 2 ** 53:
+            totals, found = self._block_replacements(codes, lookup, size,
+                                                     weights)
+        else:
+            totals, found = self._ordered_replacements(codes, lookup, size,
+                                                       weights)
+        for index1, index2 in zip(*numpy.nonzero(found)):
+            rep_dict[(letters[index1], letters[index2])] = \
+                float(totals[index1, index2])
+        return rep_dict
 
-        Returns:
-         - A replacment dictionary which is modified from initial_dict with
-           the information from the sequence comparison.
+    def _block_replacements(self, codes, lookup, size, weights):
+        """Sum the replacements a block of columns at a time (PRIVATE).
 
+        Returns the array of summed weights, and an array telling which
+        replacements were seen.
         """
-        # loop through each residue in the sequences
-        for residue_num in range(len(seq1)):
-            residue1 = seq1[residue_num]
-            try:
-                residue2 = seq2[residue_num]
-            # if seq2 is shorter, then we just stop looking at replacements
-            # and return the information
-            except IndexError:
-                return start_dict
-
-            # if the two residues are characters we want to count
-            if (residue1 not in ignore_chars) and (residue2 not in ignore_chars):
-                try:
-                    # add info about the replacement to the dictionary,
-                    # modified by the sequence weights
-                    start_dict[(residue1, residue2)] += weight1 * weight2
-
-                # if we get a key error, then we've got a problem with
-                # alphabets
-                except KeyError:
+        rows, length = codes.shape
+        positive = bool((weights > 0).all())
+        one_hot = numpy.eye(size + 2)[:, :size]
+        totals = numpy.zeros((size, size))
+        found = numpy.zeros((size, size), dtype=bool)
+        block = max(1, _BLOCK_ELEMENTS // max(rows * (size + 2), 1))
+        for start in range(0, length, block):
+            part = lookup[codes[:, start:start + block]]
+            present = one_hot[part]
+            weighted = present * weights[:, None, None]
+            before = numpy.cumsum(weighted, axis=0)
+            before[1:] = before[:-1].copy()
+            before[0] = 0
+            totals += numpy.tensordot(before, weighted, ([0, 1], [0, 1]))
+            if not positive:
+                before = numpy.cumsum(present, axis=0)
+                before[1:] = before[:-1].copy()
+                before[0] = 0
+                found |= numpy.tensordot(before, present,
+                                         ([0, 1], [0, 1])) > 0
+        if positive:
+            found = totals > 0
+        return totals, found
+
+    def _ordered_replacements(self, codes, lookup, size, weights):
+        """Sum the replacements pair by pair and column by column (PRIVATE).
+
+        Returns the array of summed weights, and an array telling which
+        replacements were seen.
+        """
+        totals = numpy.zeros(size * size)
+        found = numpy.zeros(size * size, dtype=bool)
+        for rec_num1 in range(len(codes)):
+            part1 = lookup[codes[rec_num1]]
+            for rec_num2 in range(rec_num1 + 1, len(codes)):
+                part2 = lookup[codes[rec_num2]]
+                used = (part1 < size) & (part2 < size)
+                counts = numpy.bincount(part1[used] * size + part2[used],
+                                        minlength=size * size)
+                seen = numpy.flatnonzero(counts)
+                if not len(seen):
+                    continue
+                found[seen] = True
+                # add the weight once for each time a replacement is seen,
+                # using cumsum to add them one at a time (padding with zero)
+                counts = counts[seen]
+                steps = numpy.zeros((len(seen), counts.max() + 1))
+                steps[:, 0] = totals[seen]
+                steps[:, 1:][numpy.arange(counts.max()) < counts[:, None]] = \
+                    weights[rec_num1] * weights[rec_num2]
+                totals[seen] = numpy.cumsum(steps, axis=1)[:, -1]
+        return totals.reshape(size, size), found.reshape(size, size)
+
+    def _check_replacements(self, codes, lookup, size):
+        """Check for replacements with residues not in the alphabet (PRIVATE).
+
+        Raises a ValueError for the first such pair of residues.
+        """
+        found = numpy.bincount(codes.ravel(), minlength=256)
+        if not found[lookup == size + 1].any():
+            return
+        for rec_num1 in range(len(codes)):
+            part1 = lookup[codes[rec_num1]]
+            for rec_num2 in range(rec_num1 + 1, len(codes)):
+                part2 = lookup[codes[rec_num2]]
+                bad = ((part1 != size) & (part2 != size) &
+                       ((part1 > size) | (part2 > size)))
+                if bad.any():
+                    column = numpy.flatnonzero(bad)[0]
                     raise ValueError("Residues %s, %s not found in alphabet %s"
-                                     % (residue1, residue2,
+                                     % (chr(codes[rec_num1, column]),
+                                        chr(codes[rec_num2, column]),
                                         self.alignment._alphabet))
 
-        return start_dict
-
     def _get_all_letters(self):
         """Return a string containing the expected letters in the alignment."""
         all_letters = self.alignment._alphabet.letters
@@ -416,19 +470,12 @@ class SummaryInfo(object):
             left_seq = self.dumb_consensus()
 
         pssm_info = []
-        # now start looping through all of the sequences and getting info
+        column_counts = self._get_column_counts(weighted=True)
+        # now start looping through all of the columns and getting info
         for residue_num in range(len(left_seq)):
             score_dict = self._get_base_letters(all_letters)
-            for record in self.alignment:
-                try:
-                    this_residue = record.seq[residue_num]
-                # if we hit an index error we've run out of sequence and
-                # should not add new residues
-                except IndexError:
-                    this_residue = None
-
-                if this_residue and this_residue not in chars_to_ignore:
-                    weight = record.annotations.get('weight', 1.0)
+            for this_residue, weight in column_counts[residue_num].items():
+                if this_residue not in chars_to_ignore:
                     try:
                         score_dict[this_residue] += weight
                     # if we get a KeyError then we have an alphabet problem
@@ -442,6 +489,102 @@ class SummaryInfo(object):
 
         return PSSM(pssm_info)
 
+    def _get_weights(self):
+        """Return the weight of each sequence in the alignment (PRIVATE)."""
+        if hasattr(self.alignment, "array"):
+            # An ArrayAlignment
+            if self.alignment.weights is None:
+                return [1.0] * len(self.alignment)
+            return list(self.alignment.weights)
+        return [record.annotations.get('weight', 1.0)
+                for record in self.alignment]
+
+    def _get_codes(self):
+        """Return the alignment as a NumPy array of letter codes (PRIVATE).
+
+        Sequences shorter than the alignment are padded with zeros. Returns
+        None if NumPy is not installed, or the sequences are not ASCII.
+        """
+        if numpy is None:
+            return None
+        if hasattr(self.alignment, "array"):
+            # An ArrayAlignment
+            return self.alignment.array
+        seqs = [str(record.seq) for record in self.alignment]
+        codes = numpy.zeros((len(seqs), self.alignment.get_alignment_length()),
+                            dtype=numpy.uint8)
+        try:
+            for row, seq in zip(codes, seqs):
+                row[:len(seq)] = numpy.frombuffer(seq.encode("ascii"),
+                                                  dtype=numpy.uint8)
+        except UnicodeError:
+            return None
+        return codes
+
+    def _get_column_counts(self, weighted=False):
+        """Count the letters in each column of the alignment (PRIVATE).
+
+        Returns a list with a dictionary for each column, mapping each letter
+        in that column to the number of sequences with that letter there, or
+        if weighted is True to the sum of the weights of these sequences.
+        Sequences shorter than the alignment are not counted past their end.
+        """
+        weights = self._get_weights()
+        codes = self._get_codes()
+        if codes is None:
+            column_counts = [{} for n in
+                             range(self.alignment.get_alignment_length())]
+            for record, weight in zip(self.alignment, weights):
+                if not weighted:
+                    weight = 1
+                for counts, letter in zip(column_counts, str(record.seq)):
+                    counts[letter] = counts.get(letter, 0) + weight
+            return column_counts
+        column_counts = []
+        blocks = _count_columns(codes, 256)
+        if weighted:
+            # Each count is summed in the order of the sequences
+            weights = numpy.asarray(weights, dtype=float)
+            blocks = zip(blocks, _count_columns(codes, 256, weights=weights))
+        else:
+            blocks = ((numbers, numbers) for numbers in blocks)
+        for numbers, sums in blocks:
+            for column in range(len(numbers)):
+                # Code zero is the padding of shorter sequences
+                found = numpy.flatnonzero(numbers[column, 1:]) + 1
+                column_counts.append(
+                    dict(zip([chr(code) for code in found],
+                             sums[column, found].tolist())))
+        return column_counts
+
+    def _get_column_totals(self, to_ignore):
+        """Sum the weights of the sequences in each column (PRIVATE).
+
+        Letters in to_ignore are not counted, nor are sequences shorter than
+        the alignment past their end. The weights are added in the order of
+        the sequences.
+        """
+        weights = self._get_weights()
+        codes = self._get_codes()
+        if codes is None:
+            column_totals = [0] * self.alignment.get_alignment_length()
+            for record, weight in zip(self.alignment, weights):
+                for column, letter in enumerate(str(record.seq)):
+                    if letter not in to_ignore:
+                        column_totals[column] += weight
+            return column_totals
+        # Code zero is the padding of shorter sequences
+        ignored = numpy.zeros(256, dtype=bool)
+        ignored[0] = True
+        for char in to_ignore:
+            if len(char) == 1 and ord(char) < 256:
+                ignored[ord(char)] = True
+        column_totals = numpy.zeros(codes.shape[1])
+        for row, weight in zip(codes, weights):
+            # adding zero leaves the total unchanged
+            column_totals += numpy.where(ignored[row], 0.0, weight)
+        return column_totals.tolist()
+
     def _get_base_letters(self, letters):
         """Create a zeroed dictionary with all of the specified letters (PRIVATE)."""
         base_info = {}
@@ -523,9 +666,11 @@ class SummaryInfo(object):
             all_letters = all_letters.replace(char, '')
 
         info_content = {}
+        column_counts = self._get_column_counts(weighted=True)
+        column_totals = self._get_column_totals(chars_to_ignore)
         for residue_num in range(start, end):
-            freq_dict = self._get_letter_freqs(residue_num,
-                                               self.alignment,
+            freq_dict = self._get_letter_freqs(column_counts[residue_num],
+                                               column_totals[residue_num],
                                                all_letters,
                                                chars_to_ignore,
                                                pseudo_count,
@@ -546,14 +691,15 @@ class SummaryInfo(object):
             self.ic_vector.append(info_content[i + start])
         return total_info
 
-    def _get_letter_freqs(self, residue_num, all_records, letters, to_ignore,
+    def _get_letter_freqs(self, column_counts, total_count, letters, to_ignore,
                           pseudo_count=0, e_freq_table=None, random_expected=None):
         """Determine the frequency of specific letters in the alignment.
 
         Arguments:
-         - residue_num - The number of the column we are getting frequencies
-           from.
-         - all_records - All of the SeqRecords in the alignment.
+         - column_counts - The (weighted) counts of the letters in the column
+           we are getting frequencies from.
+         - total_count - The (weighted) number of letters in the column,
+           not counting the letters to ignore.
          - letters - The letters we are interested in getting the frequency
            for.
          - to_ignore - Letters we are specifically supposed to ignore.
@@ -571,26 +717,21 @@ class SummaryInfo(object):
         """
         freq_info = self._get_base_letters(letters)
 
-        total_count = 0
-
         gap_char = self._get_gap_char()
 
         if pseudo_count < 0:
             raise ValueError("Positive value required for "
                              "pseudo_count, %s provided" % (pseudo_count))
 
-        # collect the count info into the dictionary for all the records
-        for record in all_records:
+        # collect the count info into the dictionary for the column
+        for residue, weight in column_counts.items():
             try:
-                if record.seq[residue_num] not in to_ignore:
-                    weight = record.annotations.get('weight', 1.0)
-                    freq_info[record.seq[residue_num]] += weight
-                    total_count += weight
+                if residue not in to_ignore:
+                    freq_info[residue] += weight
             # getting a key error means we've got a problem with the alphabet
             except KeyError:
                 raise ValueError("Residue %s not found in alphabet %s"
-                                 % (record.seq[residue_num],
-                                    self.alignment._alphabet))
+                                 % (residue, self.alignment._alphabet))
 
         if e_freq_table:
             if not isinstance(e_freq_table, FreqTable.FreqTable):
@@ -0,0 +1,415 @@
+# This file is part of the Biopython distribution and governed by your
+# choice of the "Biopython License Agreement" or the "BSD 3-Clause License".
+# Please see the LICENSE file that should have been included as part of this
+# package.
+
+"""Multiple sequence alignment stored as a two dimensional NumPy array.
+
+A MultipleSeqAlignment is a list of SeqRecord objects, so taking a column
+means visiting every record. An ArrayAlignment instead keeps the letters in
+one (rows x columns) NumPy array of bytes, which makes columns (and any other
+slice of the alignment) cheap to take, and allows counting the letters of all
+columns at once. Only the identifier, name and description of each row are
+kept, plus an optional weight per sequence used when counting.
+
+    >>> from Bio import AlignIO
+    >>> from Bio.Align.ArrayAlignment import ArrayAlignment
+    >>> align = AlignIO.read("Clustalw/opuntia.aln", "clustal", array=True)
+    >>> print(align)
+    SingleLetterAlphabet() alignment with 7 rows and 156 columns
+    TATACATTAAAGAAGGGGGATGCGGATAAATGGAAAGGCGAAAG...AGA gi|6273285|gb|AF191659.1|AF191
+    TATACATTAAAGAAGGGGGATGCGGATAAATGGAAAGGCGAAAG...AGA gi|6273284|gb|AF191658.1|AF191
+    TATACATTAAAGAAGGGGGATGCGGATAAATGGAAAGGCGAAAG...AGA gi|6273287|gb|AF191661.1|AF191
+    TATACATAAAAGAAGGGGGATGCGGATAAATGGAAAGGCGAAAG...AGA gi|6273286|gb|AF191660.1|AF191
+    TATACATTAAAGGAGGGGGATGCGGATAAATGGAAAGGCGAAAG...AGA gi|6273290|gb|AF191664.1|AF191
+    TATACATTAAAGGAGGGGGATGCGGATAAATGGAAAGGCGAAAG...AGA gi|6273289|gb|AF191663.1|AF191
+    TATACATTAAAGGAGGGGGATGCGGATAAATGGAAAGGCGAAAG...AGA gi|6273291|gb|AF191665.1|AF191
+
+Indexing works as for a MultipleSeqAlignment, giving SeqRecord objects for
+rows, strings for columns, and ArrayAlignment objects for anything else:
+
+    >>> align[:, 7]
+    'TTTATTT'
+    >>> print(align[2:4, :10])
+    SingleLetterAlphabet() alignment with 2 rows and 10 columns
+    TATACATTAA gi|6273287|gb|AF191661.1|AF191
+    TATACATAAA gi|6273286|gb|AF191660.1|AF191
+
+The letters themselves are in the ``array`` attribute, where a column is
+just a view of the array:
+
+    >>> align.array[:, 7]
+    array([84, 84, 84, 65, 84, 84, 84], dtype=uint8)
+    >>> align.letters
+    '-ACGT'
+    >>> align.column_counts()[7].tolist()
+    [0, 1, 0, 0, 6]
+
+To use the rest of Biopython's alignment code, convert it back to a
+MultipleSeqAlignment:
+
+    >>> print(align.to_alignment()[:2, :10])
+    SingleLetterAlphabet() alignment with 2 rows and 10 columns
+    TATACATTAA gi|6273285|gb|AF191659.1|AF191
+    TATACATTAA gi|6273284|gb|AF191658.1|AF191
+
+"""
+
+try:
+    import numpy
+except ImportError:
+    from Bio import MissingPythonDependencyError
+    raise MissingPythonDependencyError(
+        "Install NumPy if you want to use Bio.Align.ArrayAlignment.")
+
+from Bio._py3k import basestring
+from Bio._utils import _count_columns
+
+from Bio import Alphabet
+from Bio.Align import MultipleSeqAlignment
+from Bio.Seq import Seq
+from Bio.SeqRecord import SeqRecord, _RestrictedDict
+
+
+def _as_bytes(sequences):
+    """Turn a list of equal length strings into a 2D array of bytes (PRIVATE)."""
+    sequences = [str(sequence) for sequence in sequences]
+    if not sequences:
+        return numpy.zeros((0, 0), dtype=numpy.uint8)
+    length = len(sequences[0])
+    for sequence in sequences:
+        if len(sequence) != length:
+            raise ValueError("Sequences must all be the same length")
+    data = "".join(sequences).encode("ascii")
+    return numpy.frombuffer(data, dtype=numpy.uint8).reshape(
+        len(sequences), length).copy()
+
+
+def _as_string(codes):
+    """Turn a 1D array of bytes into a string (PRIVATE)."""
+    return codes.tobytes().decode("ascii")
+
+
+def _fasta_alignment(titles, data, length, alphabet):
+    """Make an ArrayAlignment from FASTA titles and sequences (PRIVATE)."""
+    ids = []
+    for title in titles:
+        try:
+            ids.append(title.split(None, 1)[0])
+        except IndexError:
+            ids.append("")
+    array = numpy.frombuffer(data, dtype=numpy.uint8)
+    return ArrayAlignment(array.reshape(len(titles), length), ids, alphabet,
+                          names=ids, descriptions=titles)
+
+
+def FastaArrayIterator(handle, seq_count=None, alphabet=None):
+    """Iterate over FASTA alignments as ArrayAlignment objects.
+
+    This reads the letters straight into the array, without creating a
+    SeqRecord per sequence. The id, name and description of the rows are as
+    for the FASTA parser of Bio.SeqIO. Used by Bio.AlignIO for array=True.
+
+    Arguments:
+     - handle - input file handle.
+     - seq_count - optional number of sequences per alignment (default all
+                   sequences in the file form one alignment).
+     - alphabet - optional alphabet (default single_letter_alphabet).
+    """
+    from Bio.SeqIO.FastaIO import SimpleFastaParser
+    titles = []
+    data = bytearray()
+    length = None
+    for title, sequence in SimpleFastaParser(handle):
+        if length is None:
+            length = len(sequence)
+        elif len(sequence) != length:
+            raise ValueError("Sequences must all be the same length")
+        titles.append(title)
+        data.extend(sequence.encode("ascii"))
+        if len(titles) == seq_count:
+            yield _fasta_alignment(titles, data, length, alphabet)
+            titles = []
+            data = bytearray()
+            length = None
+    if titles:
+        if seq_count:
+            raise ValueError("Check seq_count argument, not enough sequences?")
+        yield _fasta_alignment(titles, data, length, alphabet)
+
+
+class ArrayAlignment(object):
+    """Multiple sequence alignment backed by a 2D NumPy array of bytes.
+
+    Arguments:
+     - sequences - A 2D NumPy array of letters as bytes (dtype uint8 or
+                   "S1", one row per sequence), or a list of strings (or
+                   Seq objects) which are all the same length.
+     - ids - List of the identifiers of the rows (default "<unknown id>").
+     - alphabet - The alphabet for the whole alignment (default
+                  single_letter_alphabet).
+     - weights - Optional weight of each sequence, used when counting letters
+                 (default None, every sequence counts once).
+     - names - List of the names of the rows (default "<unknown name>").
+     - descriptions - List of the descriptions of the rows (default
+                      "<unknown description>").
+     - annotations - Information about the whole alignment (dictionary).
+     - column_annotations - Per column annotation (restricted dictionary).
+
+    >>> from Bio.Align.ArrayAlignment import ArrayAlignment
+    >>> align = ArrayAlignment(["AAAACGT", "AAA-CGT", "AAAAGGT"],
+    ...                        ["Alpha", "Beta", "Gamma"],
+    ...                        weights=[0.5, 1, 1])
+    >>> print(align)
+    SingleLetterAlphabet() alignment with 3 rows and 7 columns
+    AAAACGT Alpha
+    AAA-CGT Beta
+    AAAAGGT Gamma
+    >>> align.column_counts("ACGT")[3].tolist()
+    [1.5, 0.0, 0.0, 0.0]
+
+    Slicing rows or columns gives a new ArrayAlignment sharing the array of
+    letters (like slicing a NumPy array, this is a view, not a copy).
+    """
+
+    def __init__(self, sequences, ids=None, alphabet=None, weights=None,
+                 names=None, descriptions=None, annotations=None,
+                 column_annotations=None):
+        """Initialize the class."""
+        if isinstance(sequences, numpy.ndarray):
+            if sequences.ndim != 2:
+                raise ValueError("Need a two dimensional array of letters")
+            if sequences.dtype != numpy.uint8:
+                sequences = sequences.view(numpy.uint8)
+            self.array = sequences
+        else:
+            self.array = _as_bytes(sequences)
+        count = len(self.array)
+        if ids is None:
+            ids = ["<unknown id>"] * count
+        if names is None:
+            names = ["<unknown name>"] * count
+        if descriptions is None:
+            descriptions = ["<unknown description>"] * count
+        self.ids = list(ids)
+        self.names = list(names)
+        self.descriptions = list(descriptions)
+        if not count == len(self.ids) == len(self.names) == \
+                len(self.descriptions):
+            raise ValueError("Need one id, name and description per sequence")
+        if weights is not None:
+            weights = numpy.asarray(weights, dtype=float)
+            if weights.shape != (count,):
+                raise ValueError("Need one weight per sequence")
+        self.weights = weights
+        if alphabet is None:
+            alphabet = Alphabet.single_letter_alphabet
+        elif not isinstance(alphabet, (Alphabet.Alphabet,
+                                       Alphabet.AlphabetEncoder)):
+            raise ValueError("Invalid alphabet argument")
+        self._alphabet = alphabet
+        if annotations is None:
+            annotations = {}
+        elif not isinstance(annotations, dict):
+            raise TypeError("annotations argument should be a dict")
+        self.annotations = annotations
+        self._per_col_annotations = _RestrictedDict(
+            length=self.get_alignment_length())
+        if column_annotations:
+            self._per_col_annotations.update(column_annotations)
+
+    @classmethod
+    def from_alignment(cls, alignment, weights=None):
+        """Create an ArrayAlignment from a MultipleSeqAlignment.
+
+        Only the sequence, id, name and description of each record are kept
+        (not any features, or per record or per letter annotations).
+        """
+        records = list(alignment)
+        return cls([record.seq for record in records],
+                   [record.id for record in records],
+                   alignment._alphabet, weights,
+                   [record.name for record in records],
+                   [record.description for record in records],
+                   dict(alignment.annotations),
+                   dict(alignment.column_annotations))
+
+    def to_alignment(self):
+        """Return a MultipleSeqAlignment with the same rows."""
+        return MultipleSeqAlignment(list(self), self._alphabet,
+                                    dict(self.annotations),
+                                    dict(self.column_annotations))
+
+    def _get_per_column_annotations(self):
+        return self._per_col_annotations
+
+    def _set_per_column_annotations(self, value):
+        if not isinstance(value, dict):
+            raise TypeError("The per-column-annotations should be a "
+                            "(restricted) dictionary.")
+        self._per_col_annotations = _RestrictedDict(
+            length=self.get_alignment_length())
+        self._per_col_annotations.update(value)
+
+    column_annotations = property(
+        fget=_get_per_column_annotations,
+        fset=_set_per_column_annotations,
+        doc="""Dictionary of per-letter-annotation for the sequence.""")
+
+    def __len__(self):
+        """Return the number of sequences in the alignment."""
+        return len(self.array)
+
+    def get_alignment_length(self):
+        """Return the number of columns in the alignment."""
+        return self.array.shape[1]
+
+    def _record(self, index):
+        """Return a row of the alignment as a SeqRecord (PRIVATE)."""
+        return SeqRecord(Seq(_as_string(self.array[index]), self._alphabet),
+                         id=self.ids[index], name=self.names[index],
+                         description=self.descriptions[index])
+
+    def __iter__(self):
+        """Iterate over alignment rows as SeqRecord objects."""
+        for index in range(len(self)):
+            yield self._record(index)
+
+    def _rows(self, index, array):
+        """Return a new alignment of some rows of this one (PRIVATE)."""
+        if isinstance(index, slice):
+            rows = range(len(self))[index]
+        else:
+            rows = numpy.arange(len(self))[index]
+        new = self.__class__(
+            array, [self.ids[i] for i in rows], self._alphabet,
+            None if self.weights is None else self.weights[index],
+            [self.names[i] for i in rows],
+            [self.descriptions[i] for i in rows])
+        return new
+
+    def __getitem__(self, index):
+        """Access part of the alignment.
+
+        As for a MultipleSeqAlignment, align[r] and align[r, c] (with r an
+        integer and c a slice) give a row as a SeqRecord, align[r, c] (with
+        c an integer) gives a string (a single letter, or a column), and
+        anything else gives a new ArrayAlignment. Lists or arrays of indices
+        (and boolean masks) can be used to select rows or columns as for a
+        NumPy array.
+        """
+        if isinstance(index, (int, numpy.integer)):
+            return self._record(index)
+        if not isinstance(index, tuple):
+            index = (index, slice(None))
+        elif len(index) != 2:
+            raise TypeError("Invalid index type.")
+        row_index, col_index = index
+        if isinstance(row_index, (int, numpy.integer)):
+            if isinstance(col_index, (int, numpy.integer)):
+                return chr(self.array[row_index, col_index])
+            return self._record(row_index)[col_index]
+        if isinstance(col_index, (int, numpy.integer)):
+            return _as_string(self.array[row_index, col_index])
+        if isinstance(row_index, slice) or isinstance(col_index, slice):
+            # A view on the same array
+            array = self.array[row_index, col_index]
+        else:
+            array = self.array[numpy.ix_(numpy.arange(len(self))[row_index],
+                                         numpy.arange(self.array.shape[1])
+                                         [col_index])]
+        new = self._rows(row_index, array)
+        if self.column_annotations and len(new) == len(self):
+            # All rows kept (although could have been reversed)
+            if not isinstance(col_index, slice):
+                selected = numpy.arange(self.array.shape[1])[col_index]
+            for key, value in self.column_annotations.items():
+                if isinstance(col_index, slice):
+                    new.column_annotations[key] = value[col_index]
+                elif isinstance(value, basestring):
+                    new.column_annotations[key] = "".join(value[i]
+                                                          for i in selected)
+                else:
+                    new.column_annotations[key] = [value[i] for i in selected]
+        return new
+
+    def _str_line(self, index, length=50):
+        """Return a truncated string representation of a row (PRIVATE)."""
+        row = self.array[index]
+        if len(row) <= length:
+            return "%s %s" % (_as_string(row), self.ids[index])
+        return "%s...%s %s" % (_as_string(row[:length - 6]),
+                               _as_string(row[-3:]), self.ids[index])
+
+    def __str__(self):
+        """Return a multi-line string summary of the alignment.
+
+        This is the same as for a MultipleSeqAlignment.
+        """
+        rows = len(self)
+        lines = ["%s alignment with %i rows and %i columns"
+                 % (str(self._alphabet), rows, self.get_alignment_length())]
+        if rows <= 20:
+            lines.extend(self._str_line(i) for i in range(rows))
+        else:
+            lines.extend(self._str_line(i) for i in range(18))
+            lines.append("...")
+            lines.append(self._str_line(rows - 1))
+        return "\n".join(lines)
+
+    def __repr__(self):
+        """Return a short description of the alignment for debugging."""
+        return "<%s instance (%i records of length %i, %s) at %x>" % \
+            (self.__class__, len(self), self.get_alignment_length(),
+             repr(self._alphabet), id(self))
+
+    def format(self, format):
+        """Return the alignment as a string in the specified file format.
+
+        See the format method of MultipleSeqAlignment.
+        """
+        return self.to_alignment().format(format)
+
+    def __format__(self, format_spec):
+        """Return the alignment as a string in the specified file format."""
+        return self.to_alignment().__format__(format_spec)
+
+    @property
+    def letters(self):
+        """String of the different letters in the alignment, in order."""
+        counts = numpy.bincount(self.array.ravel(), minlength=256)
+        return _as_string(numpy.flatnonzero(counts).astype(numpy.uint8))
+
+    def column_counts(self, letters=None):
+        """Count the letters in each column of the alignment.
+
+        Arguments:
+         - letters - String of the letters to count (default all letters
+                     in the alignment, see the letters property). Other
+                     letters are ignored.
+
+        Returns a NumPy array with a row for each column of the alignment and
+        a column for each letter, holding the number of sequences with that
+        letter in that column. If the alignment has weights, these are the
+        sums of the weights of the sequences instead.
+        """
+        if letters is None:
+            letters = self.letters
+        codes = numpy.frombuffer(letters.encode("ascii"), dtype=numpy.uint8)
+        size = len(codes) + 1
+        # Letters not asked for are counted in the extra, last, column
+        lookup = numpy.empty(256, dtype=numpy.intp)
+        lookup.fill(len(codes))
+        lookup[codes[::-1]] = numpy.arange(len(codes))[::-1]
+        columns = self.array.shape[1]
+        if self.weights is None:
+            counts = numpy.zeros((columns, len(codes)), dtype=numpy.intp)
+        else:
+            counts = numpy.zeros((columns, len(codes)))
+        start = 0
+        for block_counts in _count_columns(self.array, size, lookup,
+                                           self.weights):
+            width = len(block_counts)
+            counts[start:start + width] = block_counts[:, :-1]
+            start += width
+        return counts
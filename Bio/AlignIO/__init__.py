@@ -300,7 +300,7 @@ def _force_alphabet(alignment_iterator, alphabet):
         yield align
 
 
-def parse(handle, format, seq_count=None, alphabet=None):
+def parse(handle, format, seq_count=None, alphabet=None, array=False):
     """Iterate over an alignment file as MultipleSeqAlignment objects.
 
     Arguments:
@@ -312,6 +312,9 @@ def parse(handle, format, seq_count=None, alphabet=None):
        (e.g. fasta, phylip, clustal)
      - seq_count - Optional integer, number of sequences expected in each
        alignment.  Recommended for fasta format files.
+     - array     - Optional boolean, return Bio.Align.ArrayAlignment objects
+       (which need NumPy) instead of MultipleSeqAlignment objects. FASTA
+       files are then read straight into the arrays.
 
     If you have the file name in a string 'filename', use:
 
@@ -351,6 +354,11 @@ def parse(handle, format, seq_count=None, alphabet=None):
 
     with as_handle(handle, 'rU') as fp:
         # Map the file format to a sequence iterator:
+        if array and format == "fasta":
+            from Bio.Align.ArrayAlignment import FastaArrayIterator
+            for a in FastaArrayIterator(fp, seq_count, alphabet):
+                yield a
+            return
         if format in _FormatToIterator:
             iterator_generator = _FormatToIterator[format]
             if alphabet is None:
@@ -372,12 +380,16 @@ def parse(handle, format, seq_count=None, alphabet=None):
         else:
             raise ValueError("Unknown format '%s'" % format)
 
+        if array:
+            from Bio.Align.ArrayAlignment import ArrayAlignment
+            i = (ArrayAlignment.from_alignment(a) for a in i)
+
         # This imposes some overhead... wait until we drop Python 2.4 to fix it
         for a in i:
             yield a
 
 
-def read(handle, format, seq_count=None, alphabet=None):
+def read(handle, format, seq_count=None, alphabet=None, array=False):
     """Turn an alignment file into a single MultipleSeqAlignment object.
 
     Arguments:
@@ -389,6 +401,8 @@ def read(handle, format, seq_count=None, alphabet=None):
        (e.g. fasta, phylip, clustal)
      - seq_count - Optional integer, number of sequences expected in each
        alignment.  Recommended for fasta format files.
+     - array     - Optional boolean, return a Bio.Align.ArrayAlignment
+       object (which needs NumPy) instead of a MultipleSeqAlignment.
 
     If the handle contains no alignments, or more than one alignment,
     an exception is raised.  For example, using a PFAM/Stockholm file
@@ -424,7 +438,7 @@ def read(handle, format, seq_count=None, alphabet=None):
     You must use the Bio.AlignIO.parse() function if you want to read multiple
     records from the handle.
     """
-    iterator = parse(handle, format, seq_count, alphabet)
+    iterator = parse(handle, format, seq_count, alphabet, array)
     try:
         first = next(iterator)
     except StopIteration:
@@ -9,8 +9,16 @@ This module contains classes which implement Dynamic Programming
 algorithms that can be used generally.
 """
 
+try:
+    import numpy
+except ImportError:
+    # The pure Python implementations of the algorithms are used instead
+    numpy = None
+
 from Bio._py3k import range
 
+from Bio.Seq import Seq
+
 
 class AbstractDPAlgorithms(object):
     """An abstract class to calculate forward and backward probabilities.
@@ -184,6 +192,195 @@ class ScaledDPAlgorithms(AbstractDPAlgorithms):
         AbstractDPAlgorithms.__init__(self, markov_model, sequence)
 
         self._s_values = {}
+        self._emissions = None
+
+    def forward_algorithm(self):
+        """Calculate sequence probability using the forward algorithm.
+
+        This implements the forward algorithm, as described on p57-58 of
+        Durbin et al, with the forward variables rescaled at each position.
+
+        Returns:
+         - A dictionary containing the forward variables. This has keys of the
+           form (state letter, position in the training sequence), and values
+           containing the calculated forward variable.
+         - The calculated probability of the sequence.
+
+        If NumPy is installed, the forward variables of all states at each
+        position are calculated at once using NumPy arrays.
+        """
+        if numpy is None:
+            return AbstractDPAlgorithms.forward_algorithm(self)
+        state_letters = self._seq.states.alphabet.letters
+        forward, scales = self._forward_arrays()
+        self._s_values = dict(enumerate(scales.tolist()))
+
+        # f_{0}(0) = 1 and f_{k}(0) = 0, for k > 0
+        forward_var = {(state_letters[0], -1): 1}
+        for k in range(1, len(state_letters)):
+            forward_var[(state_letters[k], -1)] = 0
+        # the states we can't reach (as they have no transitions) have no
+        # forward variables
+        reachable = [state for state in state_letters
+                     if self._mm.transitions_from(state)]
+        columns = [state_letters.index(state) for state in reachable]
+        for i, values in enumerate(forward[:, columns].tolist()):
+            forward_var.update(zip(zip(reachable, [i] * len(reachable)),
+                                   values))
+
+        return forward_var, self._sequence_prob(forward)
+
+    def backward_algorithm(self):
+        """Calculate sequence probability using the backward algorithm.
+
+        This implements the backward algorithm, as described on p58-59 of
+        Durbin et al, with the backward variables rescaled by the scaling
+        values of the forward algorithm (which is run first if needed).
+
+        Returns:
+         - A dictionary containing the backwards variables. This has keys
+           of the form (state letter, position in the training sequence),
+           and values containing the calculated backward variable.
+
+        If NumPy is installed, the backward variables of all states at each
+        position are calculated at once using NumPy arrays.
+        """
+        if numpy is None:
+            return AbstractDPAlgorithms.backward_algorithm(self)
+        state_letters = self._seq.states.alphabet.letters
+        last_pos = len(self._seq.emissions) - 1
+        if len(self._s_values) <= last_pos:
+            self._s_values = dict(enumerate(self._forward_arrays()[1].tolist()))
+        backward = self._backward_arrays()
+
+        # b_{k}(L) = a_{k0} for all k
+        backward_var = {}
+        for state in state_letters:
+            backward_var[(state, last_pos)] = \
+                self._mm.transition_prob[(state, state_letters[0])]
+        reachable = [state for state in state_letters
+                     if self._mm.transitions_from(state)]
+        columns = [state_letters.index(state) for state in reachable]
+        for i, values in enumerate(backward[:-1, columns].tolist()):
+            backward_var.update(zip(zip(reachable, [i] * len(reachable)),
+                                    values))
+
+        return backward_var
+
+    def _transition_array(self, backward=False):
+        """Return the transition probabilities used in the recursions (PRIVATE).
+
+        The array has a row for each state k and a column for each state l,
+        with a_{kl} for the states l in transitions_from(k) (in the backward
+        recursion), or for the states k in transitions_from(l) (in the
+        forward recursion), and zero otherwise.
+        """
+        state_letters = self._seq.states.alphabet.letters
+        trans = numpy.zeros((len(state_letters), len(state_letters)))
+        for index, state in enumerate(state_letters):
+            for other_state in self._mm.transitions_from(state):
+                other_index = state_letters.index(other_state)
+                if backward:
+                    trans[index, other_index] = \
+                        self._mm.transition_prob[(state, other_state)]
+                else:
+                    trans[other_index, index] = \
+                        self._mm.transition_prob[(other_state, state)]
+        return trans
+
+    def _emission_array(self):
+        """Return the emission probabilities at each sequence position (PRIVATE).
+
+        The array has a row for each position in the training sequence, and
+        a column for each state.
+        """
+        if self._emissions is not None:
+            return self._emissions
+        state_letters = self._seq.states.alphabet.letters
+        emissions = self._seq.emissions
+        if isinstance(emissions, Seq):
+            # much faster to iterate over than the Seq object
+            emissions = str(emissions)
+        letters = {}
+        codes = [letters.setdefault(letter, len(letters))
+                 for letter in emissions]
+        emission = numpy.array([[self._mm.emission_prob[(state, letter)]
+                                 for state in state_letters]
+                                for letter in sorted(letters,
+                                                     key=letters.get)])
+        self._emissions = emission.reshape(len(letters),
+                                           len(state_letters))[codes]
+        return self._emissions
+
+    def _forward_arrays(self):
+        """Calculate the forward variables and scaling values (PRIVATE).
+
+        Returns an array of the scaled forward variables, with a row for each
+        position in the training sequence and a column for each state, and
+        an array of the scaling values at each position.
+        """
+        state_letters = self._seq.states.alphabet.letters
+        trans = self._transition_array()
+        emission = self._emission_array()
+        forward = numpy.empty(emission.shape)
+        scales = numpy.empty(len(emission))
+        # f_{0}(0) = 1 and f_{k}(0) = 0, for k > 0
+        values = numpy.zeros(len(state_letters))
+        values[0] = 1.0
+        for i in range(len(emission)):
+            # e_{l}(x_{i}) * sum_{k} f_{k}(i - 1) * a_{kl}
+            values = values.dot(trans) * emission[i]
+            # choose s so that the sum of the scaled f values is one
+            s_value = values.sum()
+            if not s_value:
+                raise ZeroDivisionError("Scaling value at position %i is "
+                                        "zero" % i)
+            values /= s_value
+            forward[i] = values
+            scales[i] = s_value
+        return forward, scales
+
+    def _sequence_prob(self, forward):
+        """Calculate the probability of the sequence (PRIVATE).
+
+        This is the termination step of the forward algorithm, using the
+        array of forward variables returned by _forward_arrays.
+        """
+        state_letters = self._seq.states.alphabet.letters
+        if len(forward):
+            last_forward = forward[-1].tolist()
+        else:
+            # f_{0}(0) = 1 and f_{k}(0) = 0, for k > 0
+            last_forward = [1] + [0] * (len(state_letters) - 1)
+        seq_prob = 0
+        for state_item, forward_value in zip(state_letters, last_forward):
+            # f_{k}(L) * a_{k0}
+            seq_prob += forward_value * \
+                self._mm.transition_prob[(state_item, state_letters[0])]
+        return seq_prob
+
+    def _backward_arrays(self):
+        """Calculate the backward variables (PRIVATE).
+
+        Uses the scaling values of the forward algorithm. Returns an array of
+        the scaled backward variables, with a row for each position in the
+        training sequence and a column for each state.
+        """
+        state_letters = self._seq.states.alphabet.letters
+        trans = self._transition_array(backward=True)
+        emission = self._emission_array()
+        backward = numpy.empty(emission.shape)
+        # b_{k}(L) = a_{k0} for all k
+        values = numpy.array([self._mm.transition_prob[(state,
+                                                        state_letters[0])]
+                              for state in state_letters], float)
+        if len(emission):
+            backward[-1] = values
+        for i in range(len(emission) - 2, -1, -1):
+            # e_{k}(x_{i + 1}) * sum_{l} a_{kl} * b_{l}(i + 1)
+            values = trans.dot(values) * emission[i + 1] / self._s_values[i]
+            backward[i] = values
+        return backward
 
     def _calculate_s_value(self, seq_pos, previous_vars):
         """Calculate the next scaling variable for a sequence position.
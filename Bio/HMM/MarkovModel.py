@@ -12,9 +12,15 @@ import random
 # TODO - Take advantage of defaultdict once Python 2.4 is dead?
 # from collections import defaultdict
 
+try:
+    import numpy
+except ImportError:
+    # The pure Python implementations of the algorithms are used instead
+    numpy = None
+
 from Bio._py3k import range
 
-from Bio.Seq import MutableSeq
+from Bio.Seq import Seq, MutableSeq
 
 
 def _gen_random_array(n):
@@ -546,7 +552,12 @@ class HiddenMarkovModel(object):
          - state_alphabet -- The alphabet of the possible state sequences
            that can be generated.
 
+        If NumPy is installed, the recursion is calculated for all states at
+        once using NumPy arrays (see viterbi_batch), with the same results.
         """
+        if numpy is not None:
+            return self.viterbi_batch([sequence], state_alphabet)[0]
+
         # calculate logarithms of the initial, transition, and emission probs
         log_initial = self._log_transform(self.initial_prob)
         log_trans = self._log_transform(self.transition_prob)
@@ -637,6 +648,201 @@ class HiddenMarkovModel(object):
 
         return traceback_seq.toseq(), state_path_prob
 
+    def viterbi_batch(self, sequences, state_alphabet):
+        """Calculate the most probable state paths of many sequences at once.
+
+        Arguments:
+         - sequences -- A list of Seq objects with the emission sequences
+           that we want to decode.
+         - state_alphabet -- The alphabet of the possible state sequences
+           that can be generated.
+
+        Returns a list with a (state path, log probability) tuple for each
+        sequence, as returned by the viterbi method. The Viterbi recursion
+        is calculated for all sequences and states together using NumPy
+        arrays, so decoding many short sequences at once is much faster than
+        decoding them one by one. Without NumPy, the sequences are decoded
+        one by one.
+        """
+        if numpy is None:
+            return [self.viterbi(sequence, state_alphabet)
+                    for sequence in sequences]
+        state_letters = state_alphabet.letters
+        log_initial, log_trans, ranks = self._log_state_arrays(state_letters)
+        log_emission, codes = self._log_emission_arrays(state_letters,
+                                                        sequences)
+        lengths = numpy.array([len(sequence_codes) for sequence_codes in codes],
+                              int)
+        if not len(codes):
+            return []
+        if not lengths.min():
+            raise ValueError("Cannot decode an empty sequence")
+        # the emissions of all sequences at each position, padded with the
+        # first emission letter after the end of the shorter sequences
+        emissions = numpy.zeros((lengths.max(), len(codes)), int)
+        for index, sequence_codes in enumerate(codes):
+            emissions[:len(sequence_codes), index] = sequence_codes
+        n_states = len(state_letters)
+        # the most likely previous state of each state at each position
+        pointers = numpy.zeros(emissions.shape + (n_states,),
+                               numpy.min_scalar_type(n_states))
+        # v_{k}(0), for all sequences
+        viterbi_probs = log_emission[:, emissions[0]].T + log_initial
+        for i in range(1, len(emissions)):
+            # v_{k}(i - 1) + a_{kl}, with k along the second axis
+            state_probs = viterbi_probs[:, :, None] + log_trans
+            max_probs = state_probs.max(axis=1)
+            if ranks is None:
+                pointers[i] = state_probs.argmax(axis=1)
+            else:
+                # take the first best previous state in the order of
+                # transitions_to, like the pure Python implementation
+                pointers[i] = numpy.where(state_probs == max_probs[:, None],
+                                          ranks, n_states).argmin(axis=1)
+            probs = log_emission[:, emissions[i]].T + max_probs
+            if lengths.min() > i:
+                viterbi_probs = probs
+            else:
+                # sequences which already ended keep their final values
+                viterbi_probs = numpy.where((lengths > i)[:, None], probs,
+                                            viterbi_probs)
+        results = []
+        for index, length in enumerate(lengths):
+            # --- termination: the last of the states with the highest
+            # probability at the end of the sequence
+            state_path_prob = viterbi_probs[index].max()
+            state = n_states - 1 - \
+                int(viterbi_probs[index][::-1].argmax())
+            # --- traceback
+            path = [state]
+            sequence_pointers = pointers[:, index]
+            for i in range(length - 1, 0, -1):
+                state = sequence_pointers[i, state]
+                path.append(state)
+            path.reverse()
+            state_path = Seq("".join(state_letters[state] for state in path),
+                             state_alphabet)
+            results.append((state_path, float(state_path_prob)))
+        return results
+
+    def posterior_decoding(self, sequence, state_alphabet):
+        """Calculate the most probable state at each position of a sequence.
+
+        Arguments:
+         - sequence -- A Seq object with the emission sequence that we
+           want to decode.
+         - state_alphabet -- The alphabet of the possible states.
+
+        This uses the forward and backward algorithms (with the initial
+        probabilities of the model, as in the viterbi method) to calculate
+        the posterior probability of each state at each position of the
+        sequence, given the whole sequence. The forward and backward
+        variables are calculated with NumPy arrays and rescaled at each
+        position to avoid underflow (see Durbin et al. p78).
+
+        Returns:
+         - A Seq object with the most probable state at each position.
+         - A NumPy array of the posterior probabilities, with a row for each
+           position in the sequence and a column for each state.
+         - The log probability of the sequence.
+
+        Requires NumPy.
+        """
+        if numpy is None:
+            from Bio import MissingPythonDependencyError
+            raise MissingPythonDependencyError(
+                "Install NumPy if you want to use posterior_decoding.")
+        state_letters = state_alphabet.letters
+        states = dict((letter, index)
+                      for index, letter in enumerate(state_letters))
+        initial = numpy.zeros(len(state_letters))
+        for state, index in states.items():
+            initial[index] = self.initial_prob[state]
+        trans = numpy.zeros((len(state_letters), len(state_letters)))
+        for (from_state, to_state), prob in self.transition_prob.items():
+            if from_state in states and to_state in states:
+                trans[states[from_state], states[to_state]] = prob
+        letters = {}
+        codes = [letters.setdefault(letter, len(letters))
+                 for letter in sequence]
+        if not codes:
+            raise ValueError("Cannot decode an empty sequence")
+        emission = numpy.array([[self.emission_prob[(state, letter)]
+                                 for letter in sorted(letters,
+                                                      key=letters.get)]
+                                for state in state_letters])
+        # emission probabilities of each state at each position
+        emission = emission[:, codes].T
+        # --- forward, with f_{k}(i) scaled to sum to one at each position
+        forward = numpy.empty(emission.shape)
+        scales = numpy.empty(len(emission))
+        values = initial * emission[0]
+        for i in range(len(emission)):
+            if i:
+                values = forward[i - 1].dot(trans) * emission[i]
+            scales[i] = values.sum()
+            if not scales[i] > 0:
+                raise ValueError("The sequence cannot be emitted by the model")
+            forward[i] = values / scales[i]
+        # --- backward, scaled by the same values
+        backward = numpy.empty(emission.shape)
+        backward[-1] = 1.0
+        for i in range(len(emission) - 2, -1, -1):
+            backward[i] = trans.dot(emission[i + 1] * backward[i + 1]) / \
+                scales[i + 1]
+        posterior = forward * backward
+        path = posterior.argmax(axis=1)
+        state_path = Seq("".join(state_letters[state] for state in path),
+                         state_alphabet)
+        return state_path, posterior, float(numpy.log(scales).sum())
+
+    def _log_state_arrays(self, state_letters):
+        """Return the log initial and transition probabilities as arrays (PRIVATE).
+
+        The transitions which are not allowed have a log probability of minus
+        infinity. Also returns the rank of each allowed source state in the
+        transitions_to list of each destination state, for picking the same
+        best previous state as the pure Python Viterbi implementation on a
+        tie (None if these are in the order of the states).
+        """
+        log_initial = self._log_transform(self.initial_prob)
+        log_trans = self._log_transform(self.transition_prob)
+        n_states = len(state_letters)
+        states = dict((letter, index)
+                      for index, letter in enumerate(state_letters))
+        initial = numpy.array([log_initial[state] for state in state_letters])
+        trans = numpy.empty((n_states, n_states))
+        trans[:] = -numpy.inf
+        ranks = numpy.empty((n_states, n_states), int)
+        ranks[:] = n_states
+        for to_index, to_state in enumerate(state_letters):
+            for rank, from_state in enumerate(self.transitions_to(to_state)):
+                from_index = states[from_state]
+                trans[from_index, to_index] = log_trans[(from_state,
+                                                         to_state)]
+                ranks[from_index, to_index] = rank
+        if (ranks == numpy.arange(n_states)[:, None]).all():
+            ranks = None
+        return initial, trans, ranks
+
+    def _log_emission_arrays(self, state_letters, sequences):
+        """Return the log emission probabilities and encoded sequences (PRIVATE).
+
+        The emission letters are numbered in order of their first occurrence
+        in the sequences. Returns an array of the log emission probabilities
+        with a row for each state and a column for each emission letter, and
+        a list of the emission letter numbers of each sequence.
+        """
+        log_emission = self._log_transform(self.emission_prob)
+        letters = {}
+        codes = [[letters.setdefault(letter, len(letters))
+                  for letter in sequence] for sequence in sequences]
+        ordered = sorted(letters, key=letters.get)
+        emission = numpy.array([[log_emission[(state, letter)]
+                                 for letter in ordered]
+                                for state in state_letters])
+        return emission.reshape(len(state_letters), len(ordered)), codes
+
     def _log_transform(self, probability):
         """Return log transform of the given probability dictionary.
 
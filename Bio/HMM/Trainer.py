@@ -19,6 +19,15 @@ This aims to estimate two parameters:
 """
 # standard modules
 import math
+import time
+
+try:
+    import numpy
+except ImportError:
+    # The pure Python implementations of the algorithms are used instead
+    numpy = None
+
+from Bio.Seq import Seq
 
 # local stuff
 from .DynamicProgramming import ScaledDPAlgorithms
@@ -144,6 +153,35 @@ class AbstractTrainer(object):
         return ml_estimation
 
 
+_pool_training_seqs = None
+_pool_dp_method = None
+
+
+def _init_pool(training_seqs, dp_method):
+    """Share the training sequences with a worker process (PRIVATE)."""
+    global _pool_training_seqs, _pool_dp_method
+    _pool_training_seqs = training_seqs
+    _pool_dp_method = dp_method
+
+
+def _pool_expected_counts(task):
+    """Calculate the expected counts of some training sequences (PRIVATE).
+
+    Called in a worker process, with the trainer (including the current
+    model) and the range of training sequences to use.
+    """
+    trainer, start, end = task
+    transition_counts = dict.fromkeys(
+        trainer._markov_model.get_blank_transitions(), 0)
+    emission_counts = dict.fromkeys(
+        trainer._markov_model.get_blank_emissions(), 0)
+    probabilities = trainer._expected_counts(_pool_training_seqs[start:end],
+                                             _pool_dp_method,
+                                             transition_counts,
+                                             emission_counts)
+    return transition_counts, emission_counts, probabilities
+
+
 class BaumWelchTrainer(AbstractTrainer):
     """Trainer that uses the Baum-Welch algorithm to estimate parameters.
 
@@ -172,7 +210,7 @@ class BaumWelchTrainer(AbstractTrainer):
         AbstractTrainer.__init__(self, markov_model)
 
     def train(self, training_seqs, stopping_criteria,
-              dp_method=ScaledDPAlgorithms):
+              dp_method=ScaledDPAlgorithms, processes=None):
         """Estimate the parameters using training sequences.
 
         The algorithm for this is taken from Durbin et al. p64, so this
@@ -187,65 +225,171 @@ class BaumWelchTrainer(AbstractTrainer):
          - dp_method -- A class instance specifying the dynamic programming
            implementation we should use to calculate the forward and
            backward variables. By default, we use the scaling method.
-
+         - processes -- Number of worker processes to spread the training
+           sequences over using the multiprocessing module (default None,
+           calculate the expected counts in this process).
+
+        While training, the log likelihood of the training sequences and
+        the time in seconds taken by each iteration so far are kept in the
+        log_likelihoods and iteration_times lists of the trainer, so that
+        the stopping_criteria function can report (or use) them.
+
+        With the default scaling method and NumPy installed, the expected
+        counts of each training sequence are calculated at once using NumPy
+        arrays rather than with the update_transitions and update_emissions
+        methods.
         """
         prev_log_likelihood = None
         num_iterations = 1
+        self.log_likelihoods = []
+        self.iteration_times = []
+
+        if processes is None or processes < 2:
+            pool = None
+        else:
+            import multiprocessing
+            training_seqs = list(training_seqs)
+            pool = multiprocessing.Pool(processes, _init_pool,
+                                        (training_seqs, dp_method))
+            # a few tasks per process, to even out their running times
+            chunksize = -(-len(training_seqs) // (4 * processes)) or 1
+        try:
+            while True:
+                start_time = time.time()
+                transition_count = self._markov_model.get_blank_transitions()
+                emission_count = self._markov_model.get_blank_emissions()
+
+                if pool is None:
+                    # remember all of the sequence probabilities
+                    all_probabilities = self._expected_counts(
+                        training_seqs, dp_method, transition_count,
+                        emission_count)
+                else:
+                    tasks = [(self, start, start + chunksize) for start in
+                             range(0, len(training_seqs), chunksize)]
+                    all_probabilities = []
+                    for transitions, emissions, probabilities in \
+                            pool.map(_pool_expected_counts, tasks):
+                        for key, count in transitions.items():
+                            transition_count[key] += count
+                        for key, count in emissions.items():
+                            emission_count[key] += count
+                        all_probabilities.extend(probabilities)
+
+                # update the markov model with the new probabilities
+                ml_transitions, ml_emissions = \
+                    self.estimate_params(transition_count, emission_count)
+                self._markov_model.transition_prob = ml_transitions
+                self._markov_model.emission_prob = ml_emissions
+
+                cur_log_likelihood = self.log_likelihood(all_probabilities)
+                self.log_likelihoods.append(cur_log_likelihood)
+                self.iteration_times.append(time.time() - start_time)
+
+                # if we have previously calculated the log likelihood (ie.
+                # not the first round), see if we can finish
+                if prev_log_likelihood is not None:
+                    # XXX log likelihoods are negatives -- am I calculating
+                    # the change properly, or should I use the negatives...
+                    # I'm not sure at all if this is right.
+                    log_likelihood_change = abs(abs(cur_log_likelihood) -
+                                                abs(prev_log_likelihood))
+
+                    # check whether we have completed enough iterations to
+                    # have a good estimation
+                    if stopping_criteria(log_likelihood_change,
+                                         num_iterations):
+                        break
+
+                # set up for another round of iterations
+                prev_log_likelihood = cur_log_likelihood
+                num_iterations += 1
+        finally:
+            if pool is not None:
+                pool.close()
+                pool.join()
 
-        while True:
-            transition_count = self._markov_model.get_blank_transitions()
-            emission_count = self._markov_model.get_blank_emissions()
-
-            # remember all of the sequence probabilities
-            all_probabilities = []
+        return self._markov_model
 
-            for training_seq in training_seqs:
-                # calculate the forward and backward variables
-                DP = dp_method(self._markov_model, training_seq)
-                forward_var, seq_prob = DP.forward_algorithm()
-                backward_var = DP.backward_algorithm()
+    def _expected_counts(self, training_seqs, dp_method, transition_counts,
+                         emission_counts):
+        """Add the expected counts of the training sequences (PRIVATE).
 
+        The expected transition and emission counts are added to the given
+        dictionaries, and a list of the probabilities of the training
+        sequences is returned.
+        """
+        all_probabilities = []
+        for training_seq in training_seqs:
+            # calculate the forward and backward variables
+            DP = dp_method(self._markov_model, training_seq)
+            if numpy is not None and dp_method is ScaledDPAlgorithms:
+                seq_prob = self._add_expected_counts(DP, transition_counts,
+                                                     emission_counts)
                 all_probabilities.append(seq_prob)
-
-                # update the counts for transitions and emissions
-                transition_count = self.update_transitions(transition_count,
-                                                           training_seq,
-                                                           forward_var,
-                                                           backward_var,
-                                                           seq_prob)
-                emission_count = self.update_emissions(emission_count,
-                                                       training_seq,
-                                                       forward_var,
-                                                       backward_var,
-                                                       seq_prob)
-
-            # update the markov model with the new probabilities
-            ml_transitions, ml_emissions = \
-                self.estimate_params(transition_count, emission_count)
-            self._markov_model.transition_prob = ml_transitions
-            self._markov_model.emission_prob = ml_emissions
-
-            cur_log_likelihood = self.log_likelihood(all_probabilities)
-
-            # if we have previously calculated the log likelihood (ie.
-            # not the first round), see if we can finish
-            if prev_log_likelihood is not None:
-                # XXX log likelihoods are negatives -- am I calculating
-                # the change properly, or should I use the negatives...
-                # I'm not sure at all if this is right.
-                log_likelihood_change = abs(abs(cur_log_likelihood) -
-                                            abs(prev_log_likelihood))
-
-                # check whether we have completed enough iterations to have
-                # a good estimation
-                if stopping_criteria(log_likelihood_change, num_iterations):
-                    break
-
-            # set up for another round of iterations
-            prev_log_likelihood = cur_log_likelihood
-            num_iterations += 1
-
-        return self._markov_model
+                continue
+            forward_var, seq_prob = DP.forward_algorithm()
+            backward_var = DP.backward_algorithm()
+
+            all_probabilities.append(seq_prob)
+
+            # update the counts for transitions and emissions
+            transition_counts = self.update_transitions(transition_counts,
+                                                        training_seq,
+                                                        forward_var,
+                                                        backward_var,
+                                                        seq_prob)
+            emission_counts = self.update_emissions(emission_counts,
+                                                    training_seq,
+                                                    forward_var,
+                                                    backward_var,
+                                                    seq_prob)
+        return all_probabilities
+
+    def _add_expected_counts(self, DP, transition_counts, emission_counts):
+        """Add the expected counts of a training sequence using NumPy (PRIVATE).
+
+        Uses the forward and backward variables calculated as arrays by a
+        ScaledDPAlgorithms object, and calculates the same counts as the
+        update_transitions and update_emissions methods. Returns the
+        probability of the training sequence.
+        """
+        training_seq = DP._seq
+        state_letters = training_seq.states.alphabet.letters
+        forward, scales = DP._forward_arrays()
+        DP._s_values = dict(enumerate(scales.tolist()))
+        backward = DP._backward_arrays()
+        seq_prob = DP._sequence_prob(forward)
+
+        # A_{kl}, for the transitions from k to the states l in
+        # transitions_from(k) (formula 3.20 in Durbin et al.)
+        trans = DP._transition_array(backward=True)
+        emission = DP._emission_array()
+        counts = forward[:-1].T.dot(emission[1:] * backward[1:]) * trans
+        counts = (counts / float(seq_prob)).tolist()
+        for from_index, from_state in enumerate(state_letters):
+            for to_state in self._markov_model.transitions_from(from_state):
+                to_index = state_letters.index(to_state)
+                transition_counts[(from_state, to_state)] += \
+                    counts[from_index][to_index]
+
+        # E_{k}(b), summing f_{k}(i) b_{k}(i) over the positions with
+        # emission letter b (formula 3.21 in Durbin et al.)
+        values = forward * backward / float(seq_prob)
+        emission_letters = training_seq.emissions.alphabet.letters
+        letter_index = dict((b, j) for j, b in enumerate(emission_letters))
+        emissions = training_seq.emissions
+        if isinstance(emissions, Seq):
+            # much faster to iterate over than the Seq object
+            emissions = str(emissions)
+        codes = numpy.array([letter_index.get(letter, -1)
+                             for letter in emissions], int)
+        for j, b in enumerate(emission_letters):
+            counts = values[codes == j].sum(axis=0).tolist()
+            for k, count in zip(state_letters, counts):
+                emission_counts[(k, b)] += count
+
+        return seq_prob
 
     def update_transitions(self, transition_counts, training_seq,
                            forward_vars, backward_vars, training_seq_prob):
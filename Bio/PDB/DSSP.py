@@ -54,6 +54,14 @@ you may need to provide the name of your DSSP executable:
 
 >>> dssp = DSSP(model, '1mot.pdb', dssp='mkdssp')
 
+If no input file is given, the secondary structure and backbone hydrogen
+bonds are assigned in-process from the backbone atoms of the model, using
+the same hydrogen bond energy model and helix/strand rules as the DSSP
+program. No external executable or temporary file is needed, but the
+solvent accessibility is not calculated (the relative ASA is 'NA'):
+
+>>> dssp = DSSP(model)
+
 DSSP data is accessed by a tuple - (chain id, residue id):
 
 >>> a_key = list(dssp.keys())[2]
@@ -93,10 +101,13 @@ from Bio._py3k import StringIO
 import subprocess
 import warnings
 
+import numpy
+
 from Bio.PDB.AbstractPropertyMap import AbstractResiduePropertyMap
 from Bio.PDB.PDBExceptions import PDBException
 from Bio.PDB.PDBParser import PDBParser
-from Bio.PDB.Polypeptide import three_to_one
+from Bio.PDB.Polypeptide import three_to_one, is_aa
+from Bio.PDB.Vector import calc_dihedrals
 
 # Match C in DSSP
 _dssp_cys = re.compile('[a-z]')
@@ -296,6 +307,345 @@ def _make_dssp_dict(handle):
     return dssp, keys
 
 
+# Constants of the Kabsch & Sander hydrogen bond energy model, as used by
+# the DSSP program itself.
+_COUPLING_CONSTANT = -27.888  # -332 * 0.42 * 0.2 kcal/mol
+_MIN_HBOND_ENERGY = -9.9
+_MAX_HBOND_ENERGY = -0.5
+_MIN_DISTANCE = 0.5
+_MAX_CA_DISTANCE = 9.0
+_MAX_PEPTIDE_BOND_LENGTH = 2.5
+
+
+def _dssp_backbone(model):
+    """Collect the backbone of a model for in-process DSSP (PRIVATE).
+
+    Returns the list of (chain id, residue) pairs used, the N, CA, C and O
+    coordinate arrays, the segment number of each residue (a new segment
+    starts at each chain and each chain break), and the DSSP numbering,
+    which like the DSSP program reserves a number for each break.
+    """
+    residues = []
+    coords = []
+    for chain in model:
+        for res in chain:
+            if not is_aa(res):
+                continue
+            try:
+                coords.append([res[name].get_coord()
+                               for name in ("N", "CA", "C", "O")])
+            except KeyError:
+                # Incomplete backbone, DSSP ignores these residues
+                continue
+            residues.append((chain.id, res))
+    if not residues:
+        raise PDBException("No residues with a complete backbone found")
+    coords = numpy.array(coords, dtype=float)
+    n, ca, c, o = (coords[:, k] for k in range(4))
+    chains = numpy.array([chain_id for chain_id, res in residues])
+    peptide = numpy.linalg.norm(c[:-1] - n[1:], axis=1)
+    breaks = numpy.zeros(len(residues), dtype=bool)
+    breaks[0] = True
+    breaks[1:] = (chains[1:] != chains[:-1]) | \
+        (peptide > _MAX_PEPTIDE_BOND_LENGTH)
+    segments = numpy.cumsum(breaks)
+    # Each break (except the very first) takes up a DSSP number
+    numbers = numpy.arange(1, len(residues) + 1) + segments - 1
+    return residues, n, ca, c, o, segments, numbers
+
+
+def _dssp_hbond_energies(n, ca, c, o, donors, block=256):
+    """Backbone hydrogen bond energies between nearby residues (PRIVATE).
+
+    Returns three arrays (donor index, acceptor index, energy) listing
+    every donor N-H / acceptor C=O pair whose C-alpha atoms are closer
+    than 9 Angstrom and whose electrostatic energy is negative. The pairs
+    are computed in blocks of donors to bound memory use.
+    """
+    # DSSP places the amide hydrogen 1 Angstrom from N, parallel to the
+    # O=C bond of the preceding residue.
+    h = n.copy()
+    co = c[:-1] - o[:-1]
+    co /= numpy.linalg.norm(co, axis=1)[:, None]
+    h[1:] += co
+    count = len(n)
+    all_d = []
+    all_a = []
+    all_e = []
+    for start in range(0, count, block):
+        end = min(start + block, count)
+        dist = numpy.linalg.norm(ca[start:end, None, :] - ca[None, :, :],
+                                 axis=2)
+        d, a = numpy.nonzero(dist < _MAX_CA_DISTANCE)
+        d += start
+        # No bond to itself or to the preceding residue's carbonyl,
+        # and only residues with an amide hydrogen can donate
+        keep = (d != a) & (a != d - 1) & donors[d]
+        d = d[keep]
+        a = a[keep]
+        r_on = numpy.linalg.norm(o[a] - n[d], axis=1)
+        r_ch = numpy.linalg.norm(c[a] - h[d], axis=1)
+        r_oh = numpy.linalg.norm(o[a] - h[d], axis=1)
+        r_cn = numpy.linalg.norm(c[a] - n[d], axis=1)
+        with numpy.errstate(divide="ignore"):
+            e = _COUPLING_CONSTANT * (1.0 / r_oh - 1.0 / r_ch +
+                                      1.0 / r_cn - 1.0 / r_on)
+        too_close = (numpy.minimum(numpy.minimum(r_on, r_ch),
+                                   numpy.minimum(r_oh, r_cn)) <
+                     _MIN_DISTANCE)
+        e[too_close] = _MIN_HBOND_ENERGY
+        e = numpy.maximum(numpy.round(e * 1000) / 1000, _MIN_HBOND_ENERGY)
+        keep = e < 0
+        all_d.append(d[keep])
+        all_a.append(a[keep])
+        all_e.append(e[keep])
+    return (numpy.concatenate(all_d), numpy.concatenate(all_a),
+            numpy.concatenate(all_e))
+
+
+def _two_best(owner, partner, energy, count):
+    """Two lowest energy partners of each residue (PRIVATE).
+
+    Returns two (count, 2) arrays, with partner -1 and energy 0.0 where
+    a residue has fewer than two bonds.
+    """
+    best = -numpy.ones((count, 2), dtype=int)
+    best_energy = numpy.zeros((count, 2))
+    order = numpy.lexsort((energy, owner))
+    owner = owner[order]
+    partner = partner[order]
+    energy = energy[order]
+    first = numpy.ones(len(owner), dtype=bool)
+    first[1:] = owner[1:] != owner[:-1]
+    starts = numpy.nonzero(first)[0]
+    best[owner[starts], 0] = partner[starts]
+    best_energy[owner[starts], 0] = energy[starts]
+    second = starts + 1
+    second = second[second < len(owner)]
+    second = second[owner[second] == owner[second - 1]]
+    best[owner[second], 1] = partner[second]
+    best_energy[owner[second], 1] = energy[second]
+    return best, best_energy
+
+
+def _dssp_ladders(bonded, segments, count):
+    """Beta bridges merged into ladders, as in the DSSP program (PRIVATE).
+
+    Argument bonded is a set of (donor, acceptor) pairs. Returns a list
+    of [type, i_list, j_list] ladders, where type is 'p' (parallel) or
+    'a' (antiparallel).
+    """
+    def test_bond(donor, acceptor):
+        return (donor, acceptor) in bonded
+
+    def no_break(i, j):
+        return 0 <= i and j < count and segments[i] == segments[j]
+
+    # Every bridge involves a hydrogen bond, so only residue pairs near
+    # an existing bond need to be tested.
+    candidates = set()
+    for donor, acceptor in bonded:
+        for i, j in ((donor - 1, acceptor), (acceptor + 1, donor),
+                     (acceptor, donor - 1), (donor, acceptor + 1),
+                     (donor - 1, acceptor + 1), (acceptor + 1, donor - 1),
+                     (acceptor, donor), (donor, acceptor)):
+            if i > j:
+                i, j = j, i
+            if j - i >= 3:
+                candidates.add((i, j))
+
+    ladders = []
+    for i, j in sorted(candidates):
+        if not (no_break(i - 1, i + 1) and no_break(j - 1, j + 1)):
+            continue
+        a, b, c, d, e, f = i - 1, i, i + 1, j - 1, j, j + 1
+        if (test_bond(c, e) and test_bond(e, a)) or \
+                (test_bond(f, b) and test_bond(b, d)):
+            kind = "p"
+        elif (test_bond(c, d) and test_bond(f, a)) or \
+                (test_bond(e, b) and test_bond(b, e)):
+            kind = "a"
+        else:
+            continue
+        for ladder in ladders:
+            if ladder[0] != kind or i != ladder[1][-1] + 1:
+                continue
+            if kind == "p" and ladder[2][-1] + 1 == j:
+                ladder[1].append(i)
+                ladder[2].append(j)
+                break
+            if kind == "a" and ladder[2][0] - 1 == j:
+                ladder[1].append(i)
+                ladder[2].insert(0, j)
+                break
+        else:
+            ladders.append([kind, [i], [j]])
+
+    # Link ladders separated by a beta bulge
+    x = 0
+    while x < len(ladders):
+        y = x + 1
+        while y < len(ladders):
+            kind, i_x, j_x = ladders[x]
+            i_y, j_y = ladders[y][1:]
+            ibi, iei, jbi, jei = i_x[0], i_x[-1], j_x[0], j_x[-1]
+            ibj, iej, jbj, jej = i_y[0], i_y[-1], j_y[0], j_y[-1]
+            if ladders[y][0] != kind or \
+                    not no_break(min(ibi, ibj), max(iei, iej)) or \
+                    not no_break(min(jbi, jbj), max(jei, jej)) or \
+                    ibj - iei >= 6 or (iei >= ibj and ibi <= iej):
+                y += 1
+                continue
+            if kind == "p":
+                bulge = (jbj - jei < 6 and ibj - iei < 3) or jbj - jei < 3
+            else:
+                bulge = (jbi - jej < 6 and ibj - iei < 3) or jbi - jej < 3
+            if bulge:
+                i_x.extend(i_y)
+                if kind == "p":
+                    j_x.extend(j_y)
+                else:
+                    j_x[:0] = j_y
+                del ladders[y]
+            else:
+                y += 1
+        x += 1
+    return ladders
+
+
+def dssp_dict_from_model(model):
+    """Create a DSSP dictionary from a model, without the DSSP program.
+
+    The backbone hydrogen bonds are calculated with the electrostatic
+    energy model of Kabsch and Sander (1983), vectorized with NumPy, and
+    used to assign the DSSP secondary structure codes (H, B, E, G, I, T,
+    S and -) with the same rules and priorities as the DSSP program.
+    Residues without a complete N, CA, C, O backbone are skipped.
+
+    Parameters
+    ----------
+    model : Model
+        the model to analyse
+
+    Returns
+    -------
+    (out_dict, keys) : tuple
+        a dictionary that maps (chainid, resid) to the same tuple as
+        make_dssp_dict, with the accessibility set to None.
+
+    """
+    residues, n, ca, c, o, segments, numbers = _dssp_backbone(model)
+    count = len(residues)
+    starts = numpy.ones(count, dtype=bool)
+    starts[1:] = segments[1:] != segments[:-1]
+    proline = numpy.array([res.get_resname() == "PRO"
+                           for chain_id, res in residues])
+    donors = ~starts & ~proline
+
+    d, a, e = _dssp_hbond_energies(n, ca, c, o, donors)
+    acceptors, acceptor_energy = _two_best(d, a, e, count)
+    donated, donor_energy = _two_best(a, d, e, count)
+
+    bonded = set()
+    for k in range(2):
+        strong = numpy.nonzero((acceptor_energy[:, k] < _MAX_HBOND_ENERGY) &
+                               (acceptors[:, k] >= 0))[0]
+        bonded.update(zip(strong.tolist(), acceptors[strong, k].tolist()))
+
+    ss = numpy.array(["-"] * count)
+
+    # Beta bridges and ladders
+    for kind, i_list, j_list in _dssp_ladders(bonded, segments, count):
+        code = "E" if len(i_list) > 1 else "B"
+        for first, last in ((i_list[0], i_list[-1]),
+                            (j_list[0], j_list[-1])):
+            region = ss[first:last + 1]
+            region[region != "E"] = code
+
+    # n-turns: the carbonyl of i is bonded to the amide of i + n
+    index = numpy.arange(count)
+    turns = {}
+    for stride in (3, 4, 5):
+        turn = numpy.zeros(count, dtype=bool)
+        partner = index + stride
+        ok = partner < count
+        ok[ok] = segments[index[ok]] == segments[partner[ok]]
+        for k in range(2):
+            turn[ok] |= ((acceptors[partner[ok], k] == index[ok]) &
+                         (acceptor_energy[partner[ok], k] < _MAX_HBOND_ENERGY))
+        turns[stride] = turn
+
+    # Minimal helices are two consecutive n-turns
+    helix_starts = {}
+    for stride in (3, 4, 5):
+        helix = numpy.zeros(count, dtype=bool)
+        helix[1:] = turns[stride][1:] & turns[stride][:-1]
+        helix_starts[stride] = numpy.nonzero(helix)[0]
+    for i in helix_starts[4]:
+        ss[i:i + 4] = "H"
+    for stride, code in ((3, "G"), (5, "I")):
+        for i in helix_starts[stride]:
+            region = ss[i:i + stride]
+            if numpy.all((region == "-") | (region == code)):
+                region[:] = code
+
+    # Turns cover the residues inside an n-turn
+    in_turn = numpy.zeros(count, dtype=bool)
+    for stride in (3, 4, 5):
+        for k in range(1, stride):
+            in_turn[k:] |= turns[stride][:-k]
+    ss[(ss == "-") & in_turn] = "T"
+
+    # Bends have a C-alpha chain direction change above 70 degrees
+    bend = numpy.zeros(count, dtype=bool)
+    if count > 4:
+        middle = index[2:-2]
+        ok = segments[middle - 2] == segments[middle + 2]
+        v1 = ca[middle] - ca[middle - 2]
+        v2 = ca[middle + 2] - ca[middle]
+        cos = numpy.sum(v1 * v2, axis=1) / (numpy.linalg.norm(v1, axis=1) *
+                                            numpy.linalg.norm(v2, axis=1))
+        kappa = numpy.degrees(numpy.arccos(numpy.clip(cos, -1.0, 1.0)))
+        bend[middle] = ok & (kappa > 70.0)
+    ss[(ss == "-") & bend] = "S"
+
+    # Backbone dihedrals, 360.0 where undefined as in the DSSP output
+    phi = numpy.full(count, 360.0)
+    psi = numpy.full(count, 360.0)
+    if count > 1:
+        linked = segments[1:] == segments[:-1]
+        phi[1:][linked] = numpy.degrees(
+            calc_dihedrals(c[:-1], n[1:], ca[1:], c[1:]))[linked]
+        psi[:-1][linked] = numpy.degrees(
+            calc_dihedrals(n[:-1], ca[:-1], c[:-1], n[1:]))[linked]
+    phi = numpy.round(phi, 1)
+    psi = numpy.round(psi, 1)
+
+    def relative(partners, energies, i, k):
+        if partners[i, k] < 0:
+            return 0, 0.0
+        return (int(numbers[partners[i, k]] - numbers[i]),
+                round(float(energies[i, k]), 1))
+
+    out_dict = {}
+    keys = []
+    for i, (chain_id, res) in enumerate(residues):
+        try:
+            aa = three_to_one(res.get_resname())
+        except KeyError:
+            aa = "X"
+        NH_O_1 = relative(acceptors, acceptor_energy, i, 0)
+        O_NH_1 = relative(donated, donor_energy, i, 0)
+        NH_O_2 = relative(acceptors, acceptor_energy, i, 1)
+        O_NH_2 = relative(donated, donor_energy, i, 1)
+        res_id = (" ", res.id[1], res.id[2])
+        key = (chain_id, res_id)
+        out_dict[key] = (aa, str(ss[i]), None, float(phi[i]), float(psi[i]),
+                         int(numbers[i])) + NH_O_1 + O_NH_1 + NH_O_2 + O_NH_2
+        keys.append(key)
+    return out_dict, keys
+
+
 class DSSP(AbstractResiduePropertyMap):
     """Run DSSP and parse secondary structure and accessibility.
 
@@ -321,7 +671,8 @@ class DSSP(AbstractResiduePropertyMap):
 
     """
 
-    def __init__(self, model, in_file, dssp="dssp", acc_array="Sander", file_type='PDB'):
+    def __init__(self, model, in_file=None, dssp="dssp", acc_array="Sander",
+                 file_type='PDB'):
         """Create a DSSP object.
 
         Parameters
@@ -329,7 +680,9 @@ class DSSP(AbstractResiduePropertyMap):
         model : Model
             The first model of the structure
         in_file : string
-            Either a PDB file or a DSSP file.
+            Either a PDB file or a DSSP file. If None (default), the
+            secondary structure is assigned in-process from the model
+            using dssp_dict_from_model, and the accessibility is 'NA'.
         dssp : string
             The dssp executable (ie. the argument to os.system)
         acc_array : string
@@ -345,8 +698,10 @@ class DSSP(AbstractResiduePropertyMap):
         # create DSSP dictionary
         file_type = file_type.upper()
         assert(file_type in ['PDB', 'DSSP'])
+        if in_file is None:
+            dssp_dict, dssp_keys = dssp_dict_from_model(model)
         # If the input file is a PDB file run DSSP and parse output:
-        if file_type == 'PDB':
+        elif file_type == 'PDB':
             # Newer versions of DSSP program call the binary 'mkdssp', so
             # calling 'dssp' will not work in some operating systems
             # (Debian distribution of DSSP includes a symlink for 'dssp' argument)
@@ -461,8 +816,8 @@ class DSSP(AbstractResiduePropertyMap):
             resname = res.get_resname()
             try:
                 rel_acc = acc / self.residue_max_acc[resname]
-            except KeyError:
-                # Invalid value for resname
+            except (KeyError, TypeError):
+                # Invalid value for resname, or no accessibility computed
                 rel_acc = 'NA'
             else:
                 if rel_acc > 1.0:
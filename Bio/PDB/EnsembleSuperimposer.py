@@ -0,0 +1,352 @@
+# This file is part of the Biopython distribution and governed by your
+# choice of the "Biopython License Agreement" or the "BSD 3-Clause License".
+# Please see the LICENSE file that should have been included as part of this
+# package.
+
+"""Superimpose all models of a structural ensemble at once.
+
+Superimposer and QCPSuperimposer align one pair of coordinate sets at a
+time. For NMR ensembles or molecular dynamics trajectories with thousands
+of models this module works on an (n_models, n_atoms, 3) coordinate array
+instead, and vectorizes the calculations with NumPy:
+
+- rmsd_matrix calculates the all-vs-all RMSD matrix after optimal
+  superposition, using the Quaternion Characteristic Polynomial (QCP)
+  method of Theobald (2005) on blocks of model pairs, optionally spread
+  over a pool of processes.
+- EnsembleSuperimposer iteratively superimposes all models on their mean
+  structure, using the Kabsch (SVD) method on all models at once.
+
+The RMSD matrix can be passed directly as the distance matrix to the
+clustering functions in Bio.Cluster (e.g. treecluster or kmedoids) for
+conformational clustering:
+
+>>> from Bio.PDB import PDBParser
+>>> from Bio.PDB.EnsembleSuperimposer import get_ensemble_coords, rmsd_matrix
+>>> structure = PDBParser(QUIET=True).get_structure("1LCD", "PDB/1LCD.pdb")
+>>> coords = get_ensemble_coords(structure)
+>>> coords.shape
+(3, 51, 3)
+>>> matrix = rmsd_matrix(coords)
+>>> print("%0.2f" % matrix[0, 1])
+0.79
+
+"""
+
+from __future__ import print_function
+
+import numpy
+
+from Bio.PDB.PDBExceptions import PDBException
+
+
+# Maximum number of 3x3 inner product matrices calculated at once
+_BLOCK_PAIRS = 2 ** 20
+
+
+def get_ensemble_coords(structure, atom_names=("CA",)):
+    """Return an (n_models, n_atoms, 3) coordinate array for a structure.
+
+    The atoms are selected by name in the first model, and looked up by
+    chain, residue and atom name in every other model, so all models must
+    contain the selected atoms. If atom_names is None all atoms are used.
+    """
+    models = list(structure)
+    if not models:
+        raise PDBException("Structure has no models")
+    ids = []
+    for atom in models[0].get_atoms():
+        if atom_names is None or atom.get_id() in atom_names:
+            chain_id, res_id, atom_id = atom.get_full_id()[2:5]
+            ids.append((chain_id, res_id, atom_id[0]))
+    if not ids:
+        raise PDBException("No atoms selected")
+    coords = numpy.empty((len(models), len(ids), 3))
+    for i, model in enumerate(models):
+        try:
+            coords[i] = [model[chain_id][res_id][name].get_coord()
+                         for chain_id, res_id, name in ids]
+        except KeyError:
+            raise PDBException("Model %s lacks some of the selected atoms"
+                               % model.get_id())
+    return coords
+
+
+def _center(coords):
+    """Return coordinates moved so each model is centered on 0 (PRIVATE)."""
+    coords = numpy.asarray(coords, dtype=float)
+    if coords.ndim != 3 or coords.shape[2] != 3:
+        raise PDBException("Expected an (n_models, n_atoms, 3) array")
+    return coords - coords.mean(axis=1)[:, None, :]
+
+
+def _qcp_rmsd(A, E0, n_atoms):
+    """Vectorized QCP RMSD from stacked inner product matrices (PRIVATE).
+
+    A is an (..., 3, 3) array of correlation matrices of centered
+    coordinates, E0 the matching half sums of their squared norms. This
+    follows FastCalcRMSDAndRotation in qcprotmodule.c, without the
+    rotation.
+    """
+    Sxx, Sxy, Sxz = A[..., 0, 0], A[..., 0, 1], A[..., 0, 2]
+    Syx, Syy, Syz = A[..., 1, 0], A[..., 1, 1], A[..., 1, 2]
+    Szx, Szy, Szz = A[..., 2, 0], A[..., 2, 1], A[..., 2, 2]
+    Sxx2, Syy2, Szz2 = Sxx * Sxx, Syy * Syy, Szz * Szz
+    Sxy2, Syz2, Sxz2 = Sxy * Sxy, Syz * Syz, Sxz * Sxz
+    Syx2, Szy2, Szx2 = Syx * Syx, Szy * Szy, Szx * Szx
+
+    SyzSzymSyySzz2 = 2.0 * (Syz * Szy - Syy * Szz)
+    Sxx2Syy2Szz2Syz2Szy2 = Syy2 + Szz2 - Sxx2 + Syz2 + Szy2
+
+    C2 = -2.0 * (Sxx2 + Syy2 + Szz2 + Sxy2 + Syx2 + Sxz2 + Szx2 + Syz2 + Szy2)
+    C1 = 8.0 * (Sxx * Syz * Szy + Syy * Szx * Sxz + Szz * Sxy * Syx -
+                Sxx * Syy * Szz - Syz * Szx * Sxy - Szy * Syx * Sxz)
+
+    SxzpSzx = Sxz + Szx
+    SyzpSzy = Syz + Szy
+    SxypSyx = Sxy + Syx
+    SyzmSzy = Syz - Szy
+    SxzmSzx = Sxz - Szx
+    SxymSyx = Sxy - Syx
+    SxxpSyy = Sxx + Syy
+    SxxmSyy = Sxx - Syy
+    Sxy2Sxz2Syx2Szx2 = Sxy2 + Sxz2 - Syx2 - Szx2
+
+    C0 = (Sxy2Sxz2Syx2Szx2 * Sxy2Sxz2Syx2Szx2 +
+          (Sxx2Syy2Szz2Syz2Szy2 + SyzSzymSyySzz2) *
+          (Sxx2Syy2Szz2Syz2Szy2 - SyzSzymSyySzz2) +
+          (-SxzpSzx * SyzmSzy + SxymSyx * (SxxmSyy - Szz)) *
+          (-SxzmSzx * SyzpSzy + SxymSyx * (SxxmSyy + Szz)) +
+          (-SxzpSzx * SyzpSzy - SxypSyx * (SxxpSyy - Szz)) *
+          (-SxzmSzx * SyzmSzy - SxypSyx * (SxxpSyy + Szz)) +
+          (SxypSyx * SyzpSzy + SxzpSzx * (SxxmSyy + Szz)) *
+          (-SxymSyx * SyzmSzy + SxzpSzx * (SxxpSyy + Szz)) +
+          (SxypSyx * SyzmSzy + SxzmSzx * (SxxmSyy - Szz)) *
+          (-SxymSyx * SyzpSzy + SxzmSzx * (SxxpSyy - Szz)))
+
+    # Newton-Raphson for the largest root, starting from E0
+    eigenvalue = numpy.array(E0, dtype=float)
+    active = numpy.ones(eigenvalue.shape, dtype=bool)
+    for i in range(50):
+        x = eigenvalue[active]
+        x2 = x * x
+        b = (x2 + C2[active]) * x
+        a = b + C1[active]
+        denominator = 2.0 * x2 * x + b + a
+        with numpy.errstate(divide="ignore", invalid="ignore"):
+            delta = numpy.where(denominator != 0,
+                                (a * x + C0[active]) / denominator, 0.0)
+        eigenvalue[active] = x - delta
+        converged = numpy.abs(delta) < numpy.abs(1e-11 * (x - delta))
+        active[active] = ~converged
+        if not active.any():
+            break
+    # fabs guards against tiny negative values from rounding errors
+    return numpy.sqrt(numpy.abs(2.0 * (E0 - eigenvalue) / n_atoms))
+
+
+def _rmsd_rows(centered, start, end):
+    """RMSDs of models start to end against models start onwards (PRIVATE).
+
+    Returns an (end - start, n_models - start) array.
+    """
+    n_atoms = centered.shape[1]
+    squares = numpy.einsum("ijk,ijk->i", centered, centered)
+    others = centered[start:]
+    rows = numpy.empty((end - start, len(others)))
+    # Bound the number of 3x3 matrices held in memory at once
+    step = max(1, _BLOCK_PAIRS // max(1, len(others)))
+    for first in range(start, end, step):
+        last = min(first + step, end)
+        # (block, 3, others, 3) -> (block, others, 3, 3)
+        A = numpy.tensordot(centered[first:last], others,
+                            axes=([1], [1])).transpose(0, 2, 1, 3)
+        E0 = (squares[first:last, None] + squares[None, start:]) / 2.0
+        rows[first - start:last - start] = _qcp_rmsd(A, E0, n_atoms)
+    return rows
+
+
+_pool_coords = None
+
+
+def _init_pool(centered):
+    """Share the centered coordinates with a worker process (PRIVATE)."""
+    global _pool_coords
+    _pool_coords = centered
+
+
+def _pool_rows(bounds):
+    """Calculate a block of RMSD matrix rows in a worker process (PRIVATE)."""
+    start, end = bounds
+    return start, end, _rmsd_rows(_pool_coords, start, end)
+
+
+def rmsd_matrix(coords, processes=None, block_size=64):
+    """Return the all-vs-all RMSD matrix of an ensemble after superposition.
+
+    Arguments:
+     - coords - an (n_models, n_atoms, 3) coordinate array, see
+       get_ensemble_coords for how to obtain one from a Structure.
+     - processes - number of worker processes to spread the rows over
+       using the multiprocessing module (default None, calculate in this
+       process).
+     - block_size - number of matrix rows calculated per block (or per
+       task when using several processes).
+
+    Each element is the minimal RMSD between two models, as calculated by
+    QCPSuperimposer, but no rotation matrices are calculated. The result
+    is a symmetric (n_models, n_models) NumPy array with zeros on the
+    diagonal, suitable as distance matrix for Bio.Cluster.
+    """
+    centered = _center(coords)
+    n_models = len(centered)
+    matrix = numpy.zeros((n_models, n_models))
+    blocks = [(start, min(start + block_size, n_models))
+              for start in range(0, n_models, block_size)]
+    if processes is None or processes < 2 or len(blocks) < 2:
+        results = ((start, end, _rmsd_rows(centered, start, end))
+                   for start, end in blocks)
+        for start, end, rows in results:
+            matrix[start:end, start:] = rows
+    else:
+        import multiprocessing
+        pool = multiprocessing.Pool(processes, _init_pool, (centered,))
+        try:
+            for start, end, rows in pool.imap_unordered(_pool_rows, blocks):
+                matrix[start:end, start:] = rows
+        finally:
+            pool.close()
+            pool.join()
+    # Only the upper triangle (and the diagonal blocks) was calculated
+    upper = numpy.triu(matrix, 1)
+    return upper + upper.T
+
+
+def _kabsch(coords, reference):
+    """Best rotations of centered models onto a centered reference (PRIVATE).
+
+    Returns an (n_models, 3, 3) array of right multiplying rotation
+    matrices, using the same SVD approach as SVDSuperimposer.
+    """
+    correlation = numpy.einsum("mai,aj->mij", coords, reference)
+    u, d, vt = numpy.linalg.svd(correlation)
+    rot = numpy.matmul(u, vt)
+    # Avoid reflections
+    reflected = numpy.linalg.det(rot) < 0
+    if reflected.any():
+        vt[reflected, 2] = -vt[reflected, 2]
+        rot[reflected] = numpy.matmul(u[reflected], vt[reflected])
+    return rot
+
+
+class EnsembleSuperimposer(object):
+    """Superimpose all models of an ensemble on their mean structure.
+
+    The models are first superimposed on the first model, then repeatedly
+    on the mean of the superimposed models until the mean no longer
+    changes. Rotations use the Kabsch (SVD) method on all models at once.
+
+    >>> from Bio.PDB import PDBParser
+    >>> from Bio.PDB.EnsembleSuperimposer import EnsembleSuperimposer
+    >>> from Bio.PDB.EnsembleSuperimposer import get_ensemble_coords
+    >>> parser = PDBParser(QUIET=True)
+    >>> structure = parser.get_structure("1LCD", "PDB/1LCD.pdb")
+    >>> sup = EnsembleSuperimposer()
+    >>> sup.set(get_ensemble_coords(structure))
+    >>> sup.run()
+    >>> print(["%0.2f" % rms for rms in sup.get_rms()])
+    ['0.57', '0.42', '0.63']
+    >>> sup.apply(structure)
+
+    """
+
+    def __init__(self):
+        """Initialize the class."""
+        self._clear()
+
+    def _clear(self):
+        self.coords = None
+        self.transformed_coords = None
+        self.mean = None
+        self.rot = None
+        self.tran = None
+        self.rms = None
+
+    def set(self, coords):
+        """Set the (n_models, n_atoms, 3) coordinates to be superimposed."""
+        self._clear()
+        coords = numpy.asarray(coords, dtype=float)
+        if coords.ndim != 3 or coords.shape[2] != 3:
+            raise PDBException("Coordinate number/dimension mismatch.")
+        self.coords = coords
+
+    def run(self, max_iterations=100, tolerance=1e-5):
+        """Superimpose the models iteratively on their mean structure.
+
+        Stops when the RMSD between the mean structures of two successive
+        iterations drops below tolerance, or after max_iterations.
+        """
+        if self.coords is None:
+            raise PDBException("No coordinates set.")
+        centroids = self.coords.mean(axis=1)
+        centered = self.coords - centroids[:, None, :]
+        reference = centered[0]
+        for i in range(max_iterations):
+            rot = _kabsch(centered, reference)
+            transformed = numpy.matmul(centered, rot)
+            mean = transformed.mean(axis=0)
+            change = numpy.sqrt(((mean - reference) ** 2).sum(axis=1).mean())
+            reference = mean
+            if change < tolerance:
+                break
+        self.rot = rot
+        self.mean = mean
+        # Like the other superimposers: new = dot(old, rot) + tran
+        self.tran = -numpy.einsum("mi,mij->mj", centroids, rot)
+        self.transformed_coords = transformed
+        self.rms = numpy.sqrt(((transformed - mean) ** 2).sum(axis=2)
+                              .mean(axis=1))
+
+    def get_transformed(self):
+        """Get the superimposed (n_models, n_atoms, 3) coordinates."""
+        if self.rot is None:
+            raise PDBException("Nothing superimposed yet.")
+        return self.transformed_coords
+
+    def get_rotran(self):
+        """Right multiplying rotation matrices and translations per model."""
+        if self.rot is None:
+            raise PDBException("Nothing superimposed yet.")
+        return self.rot, self.tran
+
+    def get_mean(self):
+        """Get the mean structure of the superimposed models."""
+        if self.mean is None:
+            raise PDBException("Nothing superimposed yet.")
+        return self.mean
+
+    def get_rms(self):
+        """Root mean square deviation of each model from the mean."""
+        if self.rms is None:
+            raise PDBException("Nothing superimposed yet.")
+        return self.rms
+
+    def get_rms_matrix(self, processes=None):
+        """All-vs-all RMSD matrix of the models, see rmsd_matrix."""
+        if self.coords is None:
+            raise PDBException("No coordinates set.")
+        return rmsd_matrix(self.coords, processes)
+
+    def apply(self, structure):
+        """Rotate/translate all atoms of each model of a structure."""
+        if self.rot is None:
+            raise PDBException("No transformation has been calculated yet")
+        models = list(structure)
+        if len(models) != len(self.rot):
+            raise PDBException("Structure has %i models, expected %i"
+                               % (len(models), len(self.rot)))
+        for model, rot, tran in zip(models, self.rot, self.tran):
+            rot = rot.astype('f')
+            tran = tran.astype('f')
+            for atom in model.get_atoms():
+                atom.transform(rot, tran)
@@ -91,6 +91,101 @@ class PDBParser(object):
 
         return structure
 
+    def iter_models(self, id, file):
+        """Iterate over the models in a PDB file, one at a time.
+
+        Arguments:
+         - id - string, the id that will be used for the structure
+           containing each model
+         - file - name of the PDB file OR an open filehandle
+
+        Unlike get_structure, which builds every model before returning,
+        this reads the file one model at a time, so memory use does not
+        grow with the number of models (e.g. for molecular dynamics
+        trajectories). Each Model is returned as the only child of its own
+        Structure object, and has the same id as in get_structure. The
+        header is available from get_header once the first model has been
+        returned; the trailer is not parsed.
+
+        >>> from Bio.PDB.PDBParser import PDBParser
+        >>> parser = PDBParser(QUIET=True)
+        >>> for model in parser.iter_models("1LCD", "PDB/1LCD.pdb"):
+        ...     print("%i %i" % (model.id, model.serial_num))
+        0 1
+        1 2
+        2 3
+
+        """
+        self.header = None
+        self.trailer = None
+        with as_handle(file, mode='rU') as handle:
+            models = self._iter_model_lines(handle)
+            for model_id, (line_counter, lines) in enumerate(models):
+                with warnings.catch_warnings():
+                    if self.QUIET:
+                        warnings.filterwarnings(
+                            "ignore", category=PDBConstructionWarning)
+                    self.structure_builder.init_structure(id)
+                    self.line_counter = line_counter
+                    self._parse_coordinates(lines)
+                    self.structure_builder.set_header(self.header)
+                    structure = self.structure_builder.get_structure()
+                # Renumber the model to its position in the file
+                model = structure.child_list[0]
+                structure.detach_child(model.id)
+                model.id = model_id
+                if not any(line[0:6] == "MODEL " for line in lines):
+                    # No MODEL record, the serial number defaults to the id
+                    model.serial_num = model_id
+                structure.add(model)
+                yield model
+
+    def iter_coords(self, file):
+        """Iterate over the atomic coordinates of each model in a PDB file.
+
+        Arguments:
+         - file - name of the PDB file OR an open filehandle
+
+        Returns an (N, 3) float32 NumPy array per model, in the order of
+        the ATOM and HETATM records. This skips building the Structure
+        objects altogether, and is intended for trajectories where all
+        models share the topology of the first one, which can be parsed
+        separately (e.g. using the first model from iter_models). Alternate
+        locations are included as separate rows. A PDBConstructionException
+        is raised if a model has a different number of atoms from the
+        first model.
+
+        >>> from Bio.PDB.PDBParser import PDBParser
+        >>> for coords in PDBParser().iter_coords("PDB/1SSU_mod.pdb"):
+        ...     print(coords.shape)
+        (2, 3)
+        (2, 3)
+
+        """
+        n_atoms = None
+        with as_handle(file, mode='rU') as handle:
+            for line_counter, lines in self._iter_model_lines(handle):
+                coords = []
+                for i, line in enumerate(lines):
+                    record_type = line[0:6]
+                    if record_type == "ATOM  " or record_type == "HETATM":
+                        try:
+                            coords.append((float(line[30:38]),
+                                           float(line[38:46]),
+                                           float(line[46:54])))
+                        except Exception:
+                            raise PDBConstructionException(
+                                "Invalid or missing coordinate(s) at line %i."
+                                % (line_counter + i + 1))
+                coords = numpy.array(coords, "f").reshape(-1, 3)
+                if n_atoms is None:
+                    n_atoms = len(coords)
+                elif len(coords) != n_atoms:
+                    raise PDBConstructionException(
+                        "Model at line %i has %i atoms, expected %i."
+                        % (line_counter + 1, len(coords), n_atoms))
+                yield coords
+
     def get_header(self):
         """Return the header."""
         return self.header
@@ -108,6 +203,51 @@ class PDBParser(object):
         # Parse the atomic data; return the PDB file trailer
         self.trailer = self._parse_coordinates(coords_trailer)
 
+    def _iter_model_lines(self, handle):
+        """Split the atomic data of a PDB file into models (PRIVATE).
+
+        Reads the file handle lazily, parsing the header into self.header,
+        and yields a (line_counter, lines) tuple per model, where
+        line_counter is the number of lines before the first line of the
+        model. Reading stops at an END or CONECT record.
+        """
+        header = []
+        lines = None
+        start = 0
+        has_data = False
+        for i, line in enumerate(handle):
+            record_type = line[0:6]
+            is_data = record_type in ("ATOM  ", "HETATM", "MODEL ")
+            if lines is None:
+                if not is_data:
+                    header.append(line)
+                    continue
+                # End of the header
+                self.header = _parse_pdb_header_list(header)
+                lines = []
+                start = i
+            if record_type == "MODEL " and has_data:
+                # The previous model was not closed by an ENDMDL record
+                yield start, lines
+                lines = []
+                start = i
+                has_data = False
+            elif record_type == "END   " or record_type == "CONECT":
+                break
+            lines.append(line)
+            has_data = has_data or is_data
+            if record_type == "ENDMDL":
+                if has_data:
+                    yield start, lines
+                lines = []
+                start = i + 1
+                has_data = False
+        if lines is None:
+            # No atomic data at all
+            self.header = _parse_pdb_header_list(header)
+        elif has_data:
+            yield start, lines
+
     def _get_header(self, header_coords_trailer):
         """Get the header of the PDB file, return the rest (PRIVATE)."""
         structure_builder = self.structure_builder
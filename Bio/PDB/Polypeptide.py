@@ -53,11 +53,14 @@ from Bio._py3k import basestring
 
 import warnings
 
+import numpy
+
 from Bio.Alphabet import generic_protein
 from Bio.Data import SCOPData
 from Bio.Seq import Seq
 from Bio.PDB.PDBExceptions import PDBException
 from Bio.PDB.Vector import calc_dihedral, calc_angle
+from Bio.PDB.Vector import calc_dihedrals, calc_angles
 
 
 standard_aa_names = ["ALA", "CYS", "ASP", "GLU", "PHE", "GLY", "HIS", "ILE", "LYS",
@@ -82,6 +85,35 @@ for i in range(0, 20):
     d3_to_index[n3] = i
     dindex_to_3[i] = n3
 
+# Atoms defining the side chain dihedral angles chi1 to chi4
+_chi_atoms = {
+    "ARG": (("N", "CA", "CB", "CG"), ("CA", "CB", "CG", "CD"),
+            ("CB", "CG", "CD", "NE"), ("CG", "CD", "NE", "CZ")),
+    "ASN": (("N", "CA", "CB", "CG"), ("CA", "CB", "CG", "OD1")),
+    "ASP": (("N", "CA", "CB", "CG"), ("CA", "CB", "CG", "OD1")),
+    "CYS": (("N", "CA", "CB", "SG"),),
+    "GLN": (("N", "CA", "CB", "CG"), ("CA", "CB", "CG", "CD"),
+            ("CB", "CG", "CD", "OE1")),
+    "GLU": (("N", "CA", "CB", "CG"), ("CA", "CB", "CG", "CD"),
+            ("CB", "CG", "CD", "OE1")),
+    "HIS": (("N", "CA", "CB", "CG"), ("CA", "CB", "CG", "ND1")),
+    "ILE": (("N", "CA", "CB", "CG1"), ("CA", "CB", "CG1", "CD1")),
+    "LEU": (("N", "CA", "CB", "CG"), ("CA", "CB", "CG", "CD1")),
+    "LYS": (("N", "CA", "CB", "CG"), ("CA", "CB", "CG", "CD"),
+            ("CB", "CG", "CD", "CE"), ("CG", "CD", "CE", "NZ")),
+    "MET": (("N", "CA", "CB", "CG"), ("CA", "CB", "CG", "SD"),
+            ("CB", "CG", "SD", "CE")),
+    "MSE": (("N", "CA", "CB", "CG"), ("CA", "CB", "CG", "SE"),
+            ("CB", "CG", "SE", "CE")),
+    "PHE": (("N", "CA", "CB", "CG"), ("CA", "CB", "CG", "CD1")),
+    "PRO": (("N", "CA", "CB", "CG"), ("CA", "CB", "CG", "CD")),
+    "SER": (("N", "CA", "CB", "OG"),),
+    "THR": (("N", "CA", "CB", "OG1"),),
+    "TRP": (("N", "CA", "CB", "CG"), ("CA", "CB", "CG", "CD1")),
+    "TYR": (("N", "CA", "CB", "CG"), ("CA", "CB", "CG", "CD1")),
+    "VAL": (("N", "CA", "CB", "CG1"),),
+}
+
 
 def index_to_one(index):
     """Index to corresponding one letter amino acid name.
@@ -187,8 +219,44 @@ def is_aa(residue, standard=False):
         return residue in SCOPData.protein_letters_3to1
 
 
+def _atom_coords(residues, names):
+    """Coordinates of the named atoms of each residue (PRIVATE).
+
+    Returns an array of shape (len(residues), len(names), 3), with NaN
+    for atoms missing from a residue.
+    """
+    coords = numpy.full((len(residues), len(names), 3), numpy.nan)
+    for i, res in enumerate(residues):
+        for j, name in enumerate(names):
+            try:
+                coords[i, j] = res[name].get_coord()
+            except KeyError:
+                pass
+    return coords
+
+
 class Polypeptide(list):
-    """A polypeptide is simply a list of L{Residue} objects."""
+    """A polypeptide is simply a list of L{Residue} objects.
+
+    Besides the list based methods, which calculate one angle at a time
+    from Vector objects and store it in the xtra dictionary of each
+    residue, angles can be calculated for the whole polypeptide at once
+    as NumPy arrays (in radians) with one row per residue, using NaN
+    for angles which are undefined:
+
+    >>> from Bio.PDB.PDBParser import PDBParser
+    >>> from Bio.PDB.Polypeptide import PPBuilder
+    >>> structure = PDBParser().get_structure('1A8O', 'PDB/1A8O.pdb')
+    >>> pp = PPBuilder().build_peptides(structure)[0]
+    >>> phi_psi = pp.get_phi_psi_array()
+    >>> phi_psi.shape
+    (33, 2)
+    >>> print("%0.2f %0.2f" % tuple(phi_psi[1]))
+    -1.09 2.13
+    >>> pp.get_chi_array().shape
+    (33, 4)
+
+    """
 
     def get_ca_list(self):
         """Get list of C-alpha atoms in the polypeptide.
@@ -275,6 +343,100 @@ class Polypeptide(list):
             res.xtra["THETA"] = theta
         return theta_list
 
+    def get_backbone_coords(self):
+        """Return the coordinates of the backbone N, CA and C atoms.
+
+        :return: array of shape (number of residues, 3, 3), with NaN
+                 for missing atoms
+        :rtype: NumPy array
+        """
+        return _atom_coords(self, ("N", "CA", "C"))
+
+    def get_phi_psi_array(self):
+        """Return the phi/psi dihedral angles of all residues as an array.
+
+        Array version of get_phi_psi_list: row i holds the phi and psi
+        angles of residue i (in radians), with NaN where an angle is not
+        defined, e.g. phi of the first residue.
+
+        :rtype: NumPy array of shape (number of residues, 2)
+        """
+        coords = self.get_backbone_coords()
+        n, ca, c = coords[:, 0], coords[:, 1], coords[:, 2]
+        phi_psi = numpy.full((len(self), 2), numpy.nan)
+        if len(self) > 1:
+            phi_psi[1:, 0] = calc_dihedrals(c[:-1], n[1:], ca[1:], c[1:])
+            phi_psi[:-1, 1] = calc_dihedrals(n[:-1], ca[:-1], c[:-1], n[1:])
+        return phi_psi
+
+    def get_omega_array(self):
+        """Return the omega dihedral angles of all residues as an array.
+
+        Element i is the dihedral angle (in radians) of the peptide bond
+        preceding residue i, CA(i-1)-C(i-1)-N(i)-CA(i), and is NaN for the
+        first residue.
+
+        :rtype: NumPy array
+        """
+        coords = self.get_backbone_coords()
+        omega = numpy.full(len(self), numpy.nan)
+        if len(self) > 1:
+            omega[1:] = calc_dihedrals(coords[:-1, 1], coords[:-1, 2],
+                                       coords[1:, 0], coords[1:, 1])
+        return omega
+
+    def get_tau_array(self):
+        """Return the tau torsion angles of all residues as an array.
+
+        Array version of get_tau_list, aligned with the residues: the
+        angle of 4 consecutive C-alpha atoms is given for the third
+        residue (as in the TAU entry of its xtra dictionary), and NaN for
+        the first two and the last residue.
+
+        :rtype: NumPy array
+        """
+        ca = _atom_coords(self, ("CA",))[:, 0]
+        tau = numpy.full(len(self), numpy.nan)
+        if len(self) > 3:
+            tau[2:-1] = calc_dihedrals(ca[:-3], ca[1:-2], ca[2:-1], ca[3:])
+        return tau
+
+    def get_theta_array(self):
+        """Return the theta angles of all residues as an array.
+
+        Array version of get_theta_list, aligned with the residues: the
+        angle of 3 consecutive C-alpha atoms is given for the middle
+        residue (as in the THETA entry of its xtra dictionary), and NaN for
+        the first and the last residue.
+
+        :rtype: NumPy array
+        """
+        ca = _atom_coords(self, ("CA",))[:, 0]
+        theta = numpy.full(len(self), numpy.nan)
+        if len(self) > 2:
+            theta[1:-1] = calc_angles(ca[:-2], ca[1:-1], ca[2:])
+        return theta
+
+    def get_chi_array(self):
+        """Return the side chain dihedral angles of all residues as an array.
+
+        Row i holds the chi1 to chi4 angles of residue i (in radians), with
+        NaN for angles which are not defined for the residue type or have
+        missing atoms.
+
+        :rtype: NumPy array of shape (number of residues, 4)
+        """
+        coords = numpy.full((len(self), 4, 4, 3), numpy.nan)
+        for i, res in enumerate(self):
+            for j, names in enumerate(_chi_atoms.get(res.get_resname(), ())):
+                for k, name in enumerate(names):
+                    try:
+                        coords[i, j, k] = res[name].get_coord()
+                    except KeyError:
+                        pass
+        return calc_dihedrals(coords[:, :, 0], coords[:, :, 1],
+                              coords[:, :, 2], coords[:, :, 3])
+
     def get_sequence(self):
         """Return the AA sequence as a Seq object.
 
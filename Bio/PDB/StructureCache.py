@@ -0,0 +1,396 @@
+# This file is part of the Biopython distribution and governed by your
+# choice of the "Biopython License Agreement" or the "BSD 3-Clause License".
+# Please see the LICENSE file that should have been included as part of this
+# package.
+
+"""Compact binary storage of parsed structures, for fast reloading.
+
+Parsing the same PDB or mmCIF files in every job of a pipeline is slow.
+This module stores a parsed Structure (the full model, chain, residue and
+atom hierarchy, including alternate locations, point mutations,
+anisotropic B factors and the header dictionary) as a set of flat NumPy
+arrays in an uncompressed NumPy .npz file. Reloading such a file avoids
+all text parsing; the coordinates are read as one float32 block.
+
+>>> from Bio.PDB import PDBParser
+>>> from Bio.PDB.StructureCache import save_structure, load_structure
+>>> structure = PDBParser().get_structure("1A8O", "PDB/1A8O.pdb")
+>>> from io import BytesIO
+>>> handle = BytesIO()
+>>> save_structure(structure, handle)
+>>> _ = handle.seek(0)
+>>> reloaded = load_structure(handle)
+>>> print(reloaded)
+<Structure id=1A8O>
+>>> len(list(reloaded.get_atoms()))
+644
+
+The StructureCache class keeps such files in a directory, keyed by a hash
+of the contents of the original file, so each file is parsed only once::
+
+    from Bio.PDB.StructureCache import StructureCache
+    cache = StructureCache("/tmp/structure_cache")
+    structure = cache.get_structure("1A8O", "1A8O.pdb")
+
+"""
+
+from __future__ import print_function
+
+import hashlib
+import json
+import os
+import tempfile
+import warnings
+
+import numpy
+
+from Bio.PDB.Atom import Atom, DisorderedAtom
+from Bio.PDB.Chain import Chain
+from Bio.PDB.Model import Model
+from Bio.PDB.PDBExceptions import PDBException
+from Bio.PDB.Residue import Residue, DisorderedResidue
+from Bio.PDB.Structure import Structure
+
+
+# Increase when the layout of the arrays changes
+_FORMAT_VERSION = 1
+
+try:
+    _replace = os.replace
+except AttributeError:
+    # Python 2, where os.rename fails on Windows if the target exists
+    def _replace(src, dst):
+        """Rename src to dst, removing any existing dst first (PRIVATE)."""
+        if os.name == "nt" and os.path.exists(dst):
+            os.remove(dst)
+        os.rename(src, dst)
+
+
+def _unpacked_residues(chain):
+    """Residues of a chain, expanding point mutations (PRIVATE).
+
+    Yields (residue, disordered, selected) tuples.
+    """
+    for residue in chain:
+        if residue.is_disordered() == 2:
+            selected = residue.disordered_get()
+            for child in residue.disordered_get_list():
+                yield child, True, child is selected
+        else:
+            yield residue, False, True
+
+
+def _unpacked_atoms(residue):
+    """Atoms of a residue, expanding alternate locations (PRIVATE).
+
+    Yields (atom, disordered, selected) tuples.
+    """
+    for atom in residue:
+        if atom.is_disordered() == 2:
+            selected = atom.disordered_get()
+            for child in atom.disordered_get_list():
+                yield child, True, child is selected
+        else:
+            yield atom, False, True
+
+
+def _encode_header(value):
+    """Prepare a header value for JSON, marking tuples (PRIVATE).
+
+    JSON has no tuples, so these are stored as {"__tuple__": [...]}
+    and turned back into tuples by _decode_header.
+    """
+    if isinstance(value, tuple):
+        return {"__tuple__": [_encode_header(item) for item in value]}
+    if isinstance(value, list):
+        return [_encode_header(item) for item in value]
+    if isinstance(value, dict):
+        return dict((key, _encode_header(item))
+                    for key, item in value.items())
+    return value
+
+
+def _decode_header(value):
+    """Restore the tuples in a JSON decoded header object (PRIVATE)."""
+    if list(value) == ["__tuple__"]:
+        return tuple(value["__tuple__"])
+    return value
+
+
+def _optional_array(atoms, method, width):
+    """Stack an optional per-atom array, with the atom indices (PRIVATE)."""
+    index = []
+    values = []
+    for i, atom in enumerate(atoms):
+        value = getattr(atom, method)()
+        if value is not None:
+            index.append(i)
+            values.append(value)
+    return (numpy.array(index, dtype=numpy.int64),
+            numpy.array(values, dtype=numpy.float32).reshape(-1, width))
+
+
+def save_structure(structure, file):
+    """Write a Structure to a compact binary (.npz) file.
+
+    Arguments:
+     - structure - Structure object
+     - file - file name or open binary file handle
+
+    The header dictionary must be JSON serializable, which is the case
+    for the headers produced by PDBParser and MMCIFParser. Custom data
+    in the xtra dictionaries is not stored.
+    """
+    models = []
+    chains = []
+    residues = []
+    atoms = []
+    for model in structure:
+        models.append((model.id, model.serial_num))
+        for chain in model:
+            chains.append((chain.id, len(models) - 1))
+            for residue, disordered, selected in _unpacked_residues(chain):
+                hetflag, resseq, icode = residue.id
+                residues.append((hetflag, resseq, icode, residue.resname,
+                                 residue.segid, len(chains) - 1,
+                                 disordered, selected))
+                for atom, disordered, selected in _unpacked_atoms(residue):
+                    atoms.append((atom, len(residues) - 1,
+                                  disordered, selected))
+    atom_list = [a[0] for a in atoms]
+    serial = [atom.serial_number for atom in atom_list]
+    occupancy = [atom.occupancy for atom in atom_list]
+    anisou_index, anisou = _optional_array(atom_list, "get_anisou", 6)
+    siguij_index, siguij = _optional_array(atom_list, "get_siguij", 6)
+    sigatm_index, sigatm = _optional_array(atom_list, "get_sigatm", 5)
+    arrays = {
+        "version": numpy.array(_FORMAT_VERSION),
+        "structure_id": numpy.array(structure.id),
+        "header": numpy.array(json.dumps(_encode_header(structure.header))),
+        "model_id": numpy.array([m[0] for m in models], dtype=numpy.int64),
+        "model_serial": numpy.array([m[1] for m in models],
+                                    dtype=numpy.int64),
+        "chain_id": numpy.array([c[0] for c in chains], dtype=str),
+        "chain_model": numpy.array([c[1] for c in chains], dtype=numpy.int64),
+        "residue_hetflag": numpy.array([r[0] for r in residues], dtype=str),
+        "residue_resseq": numpy.array([r[1] for r in residues],
+                                      dtype=numpy.int64),
+        "residue_icode": numpy.array([r[2] for r in residues], dtype=str),
+        "residue_resname": numpy.array([r[3] for r in residues], dtype=str),
+        "residue_segid": numpy.array([r[4] for r in residues], dtype=str),
+        "residue_chain": numpy.array([r[5] for r in residues],
+                                     dtype=numpy.int64),
+        "residue_disordered": numpy.array([r[6] for r in residues],
+                                          dtype=bool),
+        "residue_selected": numpy.array([r[7] for r in residues], dtype=bool),
+        "atom_residue": numpy.array([a[1] for a in atoms], dtype=numpy.int64),
+        "atom_disordered": numpy.array([a[2] for a in atoms], dtype=bool),
+        "atom_selected": numpy.array([a[3] for a in atoms], dtype=bool),
+        "atom_name": numpy.array([a.id for a in atom_list], dtype=str),
+        "atom_fullname": numpy.array([a.fullname for a in atom_list],
+                                     dtype=str),
+        "atom_altloc": numpy.array([a.altloc for a in atom_list], dtype=str),
+        "atom_element": numpy.array([a.element for a in atom_list],
+                                    dtype=str),
+        # None is stored as -1 (serial) or NaN (occupancy)
+        "atom_serial": numpy.array([-1 if s is None else s for s in serial],
+                                   dtype=numpy.int64),
+        "atom_occupancy": numpy.array([numpy.nan if o is None else o
+                                       for o in occupancy], dtype=float),
+        "atom_bfactor": numpy.array([a.bfactor for a in atom_list],
+                                    dtype=float),
+        "coord": numpy.array([a.coord for a in atom_list],
+                             dtype=numpy.float32).reshape(-1, 3),
+        "anisou_index": anisou_index,
+        "anisou": anisou,
+        "siguij_index": siguij_index,
+        "siguij": siguij,
+        "sigatm_index": sigatm_index,
+        "sigatm": sigatm,
+    }
+    numpy.savez(file, **arrays)
+
+
+def load_structure(file, id=None):
+    """Load a Structure written by save_structure.
+
+    Arguments:
+     - file - file name or open binary file handle
+     - id - id for the structure (default: the id it was saved with)
+
+    """
+    with numpy.load(file) as data:
+        arrays = dict(data.items())
+    if int(arrays["version"]) != _FORMAT_VERSION:
+        raise PDBException("Unsupported structure file version %i"
+                           % arrays["version"])
+    if id is None:
+        id = str(arrays["structure_id"])
+    structure = Structure(id)
+    structure.header = json.loads(str(arrays["header"]),
+                                  object_hook=_decode_header)
+
+    models = []
+    for model_id, serial in zip(arrays["model_id"].tolist(),
+                                arrays["model_serial"].tolist()):
+        model = Model(model_id, serial)
+        structure.add(model)
+        models.append(model)
+
+    chains = []
+    for chain_id, model in zip(arrays["chain_id"].tolist(),
+                               arrays["chain_model"].tolist()):
+        chain = Chain(chain_id)
+        models[model].add(chain)
+        chains.append(chain)
+
+    residues = []
+    selected = []
+    for (hetflag, resseq, icode, resname, segid, chain,
+         disordered, is_selected) in zip(arrays["residue_hetflag"].tolist(),
+                                         arrays["residue_resseq"].tolist(),
+                                         arrays["residue_icode"].tolist(),
+                                         arrays["residue_resname"].tolist(),
+                                         arrays["residue_segid"].tolist(),
+                                         arrays["residue_chain"].tolist(),
+                                         arrays["residue_disordered"].tolist(),
+                                         arrays["residue_selected"].tolist()):
+        res_id = (hetflag, resseq, icode)
+        residue = Residue(res_id, resname, segid)
+        chain = chains[chain]
+        if disordered:
+            if chain.has_id(res_id):
+                wrapper = chain[res_id]
+            else:
+                wrapper = DisorderedResidue(res_id)
+                chain.add(wrapper)
+            wrapper.disordered_add(residue)
+            if is_selected:
+                selected.append((wrapper, resname))
+        else:
+            chain.add(residue)
+        residues.append(residue)
+    for wrapper, resname in selected:
+        wrapper.disordered_select(resname)
+
+    coords = arrays["coord"].copy()
+    serials = arrays["atom_serial"].tolist()
+    occupancies = arrays["atom_occupancy"].tolist()
+    bfactors = arrays["atom_bfactor"].tolist()
+    atoms = []
+    selected = []
+    with warnings.catch_warnings():
+        # Any element guessing was already reported at parsing time
+        warnings.simplefilter("ignore")
+        for i, (residue, name, fullname, altloc, element, disordered,
+                is_selected) in enumerate(zip(
+                    arrays["atom_residue"].tolist(),
+                    arrays["atom_name"].tolist(),
+                    arrays["atom_fullname"].tolist(),
+                    arrays["atom_altloc"].tolist(),
+                    arrays["atom_element"].tolist(),
+                    arrays["atom_disordered"].tolist(),
+                    arrays["atom_selected"].tolist())):
+            serial = serials[i]
+            occupancy = occupancies[i]
+            atom = Atom(name, coords[i], bfactors[i],
+                        None if occupancy != occupancy else occupancy,
+                        altloc, fullname, None if serial < 0 else serial,
+                        element)
+            residue = residues[residue]
+            if disordered:
+                if residue.has_id(name):
+                    wrapper = residue[name]
+                else:
+                    wrapper = DisorderedAtom(name)
+                    residue.add(wrapper)
+                    residue.flag_disordered()
+                wrapper.disordered_add(atom)
+                if is_selected:
+                    selected.append((wrapper, atom.altloc))
+            else:
+                residue.add(atom)
+            atoms.append(atom)
+    for wrapper, altloc in selected:
+        wrapper.disordered_select(altloc)
+
+    for name, setter in (("anisou", "set_anisou"), ("siguij", "set_siguij"),
+                         ("sigatm", "set_sigatm")):
+        for i, values in zip(arrays[name + "_index"].tolist(), arrays[name]):
+            getattr(atoms[i], setter)(values)
+    return structure
+
+
+class StructureCache(object):
+    """Directory of binary structure files, keyed by file content.
+
+    The first time a file is requested it is parsed and the Structure is
+    saved in the cache directory, in a file named after the SHA-1 hash of
+    the file contents and the parser used. Later requests for the same
+    file contents (under any file name) load the saved Structure instead,
+    which is much faster than parsing.
+    """
+
+    def __init__(self, directory, parser=None):
+        """Create a StructureCache object.
+
+        Arguments:
+         - directory - cache directory, created if it does not exist
+         - parser - parser object with a get_structure(id, filename)
+           method. By default a quiet PDBParser is used, or a quiet
+           MMCIFParser for files ending in .cif.
+
+        """
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        self.directory = directory
+        self.parser = parser
+
+    def _get_parser(self, filename):
+        """Return the parser to use for a file (PRIVATE)."""
+        if self.parser is not None:
+            return self.parser
+        if filename.lower().endswith(".cif"):
+            from Bio.PDB.MMCIFParser import MMCIFParser
+            return MMCIFParser(QUIET=True)
+        from Bio.PDB.PDBParser import PDBParser
+        return PDBParser(QUIET=True)
+
+    def get_cache_filename(self, filename, parser=None):
+        """Return the name of the cache file for a structure file."""
+        if parser is None:
+            parser = self._get_parser(filename)
+        digest = hashlib.sha1()
+        with open(filename, "rb") as handle:
+            for block in iter(lambda: handle.read(1 << 20), b""):
+                digest.update(block)
+        return os.path.join(self.directory, "%s_%s.npz"
+                            % (digest.hexdigest(), type(parser).__name__))
+
+    def get_structure(self, id, filename):
+        """Return the structure in a file, using the cache if possible.
+
+        Arguments:
+         - id - string, the id that will be used for the structure
+         - filename - name of the PDB or mmCIF file
+
+        """
+        parser = self._get_parser(filename)
+        cache_filename = self.get_cache_filename(filename, parser)
+        if os.path.isfile(cache_filename):
+            return load_structure(cache_filename, id)
+        structure = parser.get_structure(id, filename)
+        # Write to a temporary file first, so that concurrent jobs never
+        # see a partially written cache file
+        handle, temp_filename = tempfile.mkstemp(suffix=".npz",
+                                                 dir=self.directory)
+        try:
+            with os.fdopen(handle, "wb") as temp_handle:
+                save_structure(structure, temp_handle)
+            # Another job may have written the same cache file meanwhile
+            _replace(temp_filename, cache_filename)
+        except Exception:
+            if os.path.exists(temp_filename):
+                os.remove(temp_filename)
+            raise
+        return structure
@@ -223,6 +223,47 @@ def calc_dihedral(v1, v2, v3, v4):
     return angle
 
 
+def calc_angles(p1, p2, p3):
+    """Calculate the angles for arrays of 3 connected points.
+
+    Array version of calc_angle, taking coordinate arrays of shape (..., 3)
+    instead of Vector objects. The angles (in radians) are returned as an
+    array; points given as NaN result in NaN angles.
+
+    :param p1, p2, p3: coordinates of the points that define the angles
+    :type p1, p2, p3: NumPy arrays
+    """
+    v1 = numpy.asarray(p1, 'd') - p2
+    v3 = numpy.asarray(p3, 'd') - p2
+    c = numpy.sum(v1 * v3, axis=-1)
+    c /= numpy.sqrt(numpy.sum(v1 * v1, axis=-1) * numpy.sum(v3 * v3, axis=-1))
+    # Take care of roundoff errors
+    return numpy.arccos(numpy.clip(c, -1, 1))
+
+
+def calc_dihedrals(p1, p2, p3, p4):
+    """Calculate the dihedral angles for arrays of 4 connected points.
+
+    Array version of calc_dihedral, taking coordinate arrays of shape
+    (..., 3) instead of Vector objects. The angles (in radians, in
+    ]-pi, pi]) are returned as an array; points given as NaN result in
+    NaN angles.
+
+    :param p1, p2, p3, p4: coordinates of the points that define the angles
+    :type p1, p2, p3, p4: NumPy arrays
+    """
+    b0 = numpy.asarray(p1, 'd') - p2
+    b1 = numpy.asarray(p3, 'd') - p2
+    b2 = numpy.asarray(p4, 'd') - p3
+    b1 = b1 / numpy.sqrt(numpy.sum(b1 * b1, axis=-1))[..., None]
+    # Project the outer bonds on the plane perpendicular to the central bond
+    v = b0 - numpy.sum(b0 * b1, axis=-1)[..., None] * b1
+    w = b2 - numpy.sum(b2 * b1, axis=-1)[..., None] * b1
+    x = numpy.sum(v * w, axis=-1)
+    y = numpy.sum(numpy.cross(b1, v) * w, axis=-1)
+    return numpy.arctan2(y, x)
+
+
 class Vector(object):
     """3D vector."""
 
@@ -0,0 +1,166 @@
+# This file is part of the Biopython distribution and governed by your
+# choice of the "Biopython License Agreement" or the "BSD 3-Clause License".
+# Please see the LICENSE file that should have been included as part of this
+# package.
+
+"""Compact, array based representation of phylogenetic trees.
+
+A CompactTree stores a tree as a few flat arrays with one entry per clade,
+instead of one Clade object per clade. This uses much less memory for huge
+trees or large sets of trees, and can be read and written much faster (see
+the ``compact`` option of the Newick parser).
+
+    >>> from Bio import Phylo
+    >>> from Bio._py3k import StringIO
+    >>> handle = StringIO("((A:0.1,B:0.2)90:0.3,C:0.4);")
+    >>> tree = Phylo.read(handle, "newick", compact=True)
+    >>> len(tree)
+    5
+    >>> list(tree.parents)
+    [-1, 0, 1, 1, 0]
+    >>> tree.names
+    [None, None, 'A', 'B', 'C']
+    >>> tree.confidences
+    [None, 90, None, None, None]
+    >>> [tree.names[i] for i in tree.get_terminals()]
+    ['A', 'B', 'C']
+    >>> print(tree.to_tree())
+    Tree(rooted=False, weight=1.0)
+        Clade()
+            Clade(branch_length=0.3, confidence=90)
+                Clade(branch_length=0.1, name='A')
+                Clade(branch_length=0.2, name='B')
+            Clade(branch_length=0.4, name='C')
+
+"""
+
+from array import array
+
+from Bio.Phylo import Newick
+
+_nan = float('nan')
+
+
+class CompactTree(object):
+    """Phylogenetic tree stored as arrays with one entry per clade.
+
+    The clades are numbered in preorder, the root being clade 0, so each
+    parent comes before its children and the children of a clade are in
+    the order of their numbers.
+
+    :Parameters:
+        parents : array of int
+            Index of the parent clade of each clade, -1 for the root.
+        branch_lengths : array of float
+            Branch length of each clade, NaN if not given.
+        names : list
+            Name of each clade, or None.
+        confidences : list
+            Confidence (support) of each clade, or None.
+        comments : list
+            Comment of each clade, or None.
+        rooted : bool
+            Whether or not the tree is rooted.
+        name : str
+            The name of the tree.
+        weight : float
+            The weight of the tree (as in a Newick tree).
+
+    """
+
+    def __init__(self, parents=None, branch_lengths=None, names=None,
+                 confidences=None, comments=None, rooted=False, name=None,
+                 weight=1.0):
+        """Initialize the class."""
+        if parents is None:
+            parents = [-1]
+        self.parents = array('l', parents)
+        size = len(self.parents)
+        if branch_lengths is None:
+            self.branch_lengths = array('d', [_nan]) * size
+        else:
+            self.branch_lengths = array('d', branch_lengths)
+        self.names = list(names) if names is not None else [None] * size
+        if confidences is None:
+            self.confidences = [None] * size
+        else:
+            self.confidences = list(confidences)
+        self.comments = list(comments) if comments is not None else [None] * size
+        if not (size == len(self.branch_lengths) == len(self.names) ==
+                len(self.confidences) == len(self.comments)):
+            raise ValueError("All clade arrays should have the same length")
+        if size and self.parents[0] != -1:
+            raise ValueError("The first clade should be the root")
+        for index in range(1, size):
+            if not 0 <= self.parents[index] < index:
+                raise ValueError("Clades should be numbered in preorder")
+        self.rooted = rooted
+        self.name = name
+        self.weight = weight
+
+    def __len__(self):
+        """Return the number of clades."""
+        return len(self.parents)
+
+    def __repr__(self):
+        """Return a short description of the tree."""
+        return "%s(%i clades, rooted=%r)" % (self.__class__.__name__,
+                                             len(self), self.rooted)
+
+    def get_children(self):
+        """Return a list of the child clade indices of each clade."""
+        children = [[] for index in self.parents]
+        for index, parent in enumerate(self.parents):
+            if parent >= 0:
+                children[parent].append(index)
+        return children
+
+    def get_terminals(self):
+        """Return the indices of the terminal clades, in preorder."""
+        internal = set(self.parents)
+        return [index for index in range(len(self)) if index not in internal]
+
+    def get_branch_length(self, index):
+        """Return the branch length of a clade, or None if not given."""
+        value = self.branch_lengths[index]
+        if value != value:
+            # NaN
+            return None
+        return value
+
+    def to_tree(self):
+        """Convert to a Newick.Tree object."""
+        clades = []
+        for index, parent in enumerate(self.parents):
+            clade = Newick.Clade(branch_length=self.get_branch_length(index),
+                                 name=self.names[index],
+                                 confidence=self.confidences[index],
+                                 comment=self.comments[index])
+            clades.append(clade)
+            if parent >= 0:
+                clades[parent].clades.append(clade)
+        return Newick.Tree(root=clades[0], rooted=self.rooted,
+                           name=self.name, weight=self.weight)
+
+    @classmethod
+    def from_tree(cls, tree):
+        """Create a CompactTree from a BaseTree.Tree (or Clade) object."""
+        # Preorder, without recursion
+        clades = []
+        parents = []
+        stack = [(tree.root, -1)]
+        while stack:
+            clade, parent = stack.pop()
+            parents.append(parent)
+            index = len(clades)
+            clades.append(clade)
+            stack.extend((child, index) for child in reversed(clade.clades))
+        branch_lengths = [_nan if clade.branch_length is None
+                          else clade.branch_length for clade in clades]
+        return cls(parents, branch_lengths,
+                   [clade.name for clade in clades],
+                   [getattr(clade, 'confidence', None) for clade in clades],
+                   [getattr(clade, 'comment', None) for clade in clades],
+                   rooted=getattr(tree, 'rooted', False),
+                   name=getattr(tree, 'name', None),
+                   weight=getattr(tree, 'weight', 1.0))
@@ -5,216 +5,31 @@
 
 """Classes and methods for finding consensus trees.
 
-This module contains a ``_BitString`` class to assist the consensus tree
-searching and some common consensus algorithms such as strict, majority rule and
-adam consensus.
+This module contains some common consensus algorithms such as strict, majority
+rule and adam consensus, and functions to calculate branch support and
+Robinson-Foulds distances.
+
+Clades are represented as integers, with one bit set for each terminal in the
+clade, in the order given by ``get_terminals`` of the first tree (the first
+terminal is the highest bit). For example, for the trees::
+
+    tree1: (((A, B), C),(D, E))
+    tree2: ((A, (B, C)),(D, E))
+
+the clade ((A, B), C) in tree1 and (A, (B, C)) in tree2 are both represented
+by 0b11100, (A, B) by 0b11000, (B, C) by 0b01100 and (D, E) by 0b00011.
 """
 from __future__ import division
 
 import random
 import itertools
 
-from ast import literal_eval
+from Bio._py3k import basestring
+from Bio._utils import _pool_imap
+from Bio.Align import MultipleSeqAlignment
 from Bio.Phylo import BaseTree
-
-
-class _BitString(str):
-    """Helper class for binary string data (PRIVATE).
-
-    Assistant class of binary string data used for storing and
-    counting compatible clades in consensus tree searching. It includes
-    some binary manipulation(&|^~) methods.
-
-    _BitString is a sub-class of ``str`` object that only accepts two
-    characters('0' and '1'), with additional functions for binary-like
-    manipulation(&|^~). It is used to count and store the clades in
-    multiple trees in consensus tree searching. During counting, the
-    clades will be considered the same if their terminals(in terms of
-    ``name`` attribute) are the same.
-
-    For example, let's say two trees are provided as below to search
-    their strict consensus tree::
-
-        tree1: (((A, B), C),(D, E))
-        tree2: ((A, (B, C)),(D, E))
-
-    For both trees, a _BitString object '11111' will represent their
-    root clade. Each '1' stands for the terminal clade in the list
-    [A, B, C, D, E](the order might not be the same, it's determined
-    by the ``get_terminal`` method of the first tree provided). For
-    the clade ((A, B), C) in tree1 and (A, (B, C)) in tree2, they both
-    can be represented by '11100'. Similarly, '11000' represents clade
-    (A, B) in tree1, '01100' represents clade (B, C) in tree2, and '00011'
-    represents clade (D, E) in both trees.
-
-    So, with the ``_count_clades`` function in this module, finally we
-    can get the clade counts and their _BitString representation as follows
-    (the root and terminals are omitted)::
-
-        clade   _BitString   count
-        ABC     '11100'     2
-        DE      '00011'     2
-        AB      '11000'     1
-        BC      '01100'     1
-
-    To get the _BitString representation of a clade, we can use the following
-    code snippet::
-
-        # suppose we are provided with a tree list, the first thing to do is
-        # to get all the terminal names in the first tree
-        term_names = [term.name for term in trees[0].get_terminals()]
-        # for a specific clade in any of the tree, also get its terminal names
-        clade_term_names = [term.name for term in clade.get_terminals()]
-        # then create a boolean list
-        boolvals = [name in clade_term_names for name in term_names]
-        # create the string version and pass it to _BitString
-        bitstr = _BitString(''.join(map(str, map(int, boolvals))))
-        # or, equivalently:
-        bitstr = _BitString.from_bool(boolvals)
-
-    To convert back::
-
-        # get all the terminal clades of the first tree
-        terms = [term for term in trees[0].get_terminals()]
-        # get the index of terminal clades in bitstr
-        index_list = bitstr.index_one()
-        # get all terminal clades by index
-        clade_terms = [terms[i] for i in index_list]
-        # create a new calde and append all the terminal clades
-        new_clade = BaseTree.Clade()
-        new_clade.clades.extend(clade_terms)
-
-    Examples
-    --------
-    >>> from Bio.Phylo.Consensus import _BitString
-    >>> bitstr1 = _BitString('11111')
-    >>> bitstr2 = _BitString('11100')
-    >>> bitstr3 = _BitString('01101')
-    >>> bitstr1
-    _BitString('11111')
-    >>> bitstr2 & bitstr3
-    _BitString('01100')
-    >>> bitstr2 | bitstr3
-    _BitString('11101')
-    >>> bitstr2 ^ bitstr3
-    _BitString('10001')
-    >>> bitstr2.index_one()
-    [0, 1, 2]
-    >>> bitstr3.index_one()
-    [1, 2, 4]
-    >>> bitstr3.index_zero()
-    [0, 3]
-    >>> bitstr1.contains(bitstr2)
-    True
-    >>> bitstr2.contains(bitstr3)
-    False
-    >>> bitstr2.independent(bitstr3)
-    False
-    >>> bitstr1.iscompatible(bitstr2)
-    True
-    >>> bitstr2.iscompatible(bitstr3)
-    False
-
-    """
-
-    def __new__(cls, strdata):
-        """Init from a binary string data."""
-        if (isinstance(strdata, str) and
-                len(strdata) == strdata.count('0') + strdata.count('1')):
-            return str.__new__(cls, strdata)
-        else:
-            raise TypeError(
-                "The input should be a binary string composed of '0' and '1'")
-
-    def __and__(self, other):
-        selfint = literal_eval('0b' + self)
-        otherint = literal_eval('0b' + other)
-        resultint = selfint & otherint
-        return _BitString(bin(resultint)[2:].zfill(len(self)))
-
-    def __or__(self, other):
-        selfint = literal_eval('0b' + self)
-        otherint = literal_eval('0b' + other)
-        resultint = selfint | otherint
-        return _BitString(bin(resultint)[2:].zfill(len(self)))
-
-    def __xor__(self, other):
-        selfint = literal_eval('0b' + self)
-        otherint = literal_eval('0b' + other)
-        resultint = selfint ^ otherint
-        return _BitString(bin(resultint)[2:].zfill(len(self)))
-
-    def __rand__(self, other):
-        selfint = literal_eval('0b' + self)
-        otherint = literal_eval('0b' + other)
-        resultint = otherint & selfint
-        return _BitString(bin(resultint)[2:].zfill(len(self)))
-
-    def __ror__(self, other):
-        selfint = literal_eval('0b' + self)
-        otherint = literal_eval('0b' + other)
-        resultint = otherint | selfint
-        return _BitString(bin(resultint)[2:].zfill(len(self)))
-
-    def __rxor__(self, other):
-        selfint = literal_eval('0b' + self)
-        otherint = literal_eval('0b' + other)
-        resultint = otherint ^ selfint
-        return _BitString(bin(resultint)[2:].zfill(len(self)))
-
-    def __repr__(self):
-        return '_BitString(' + str.__repr__(self) + ')'
-
-    def index_one(self):
-        """Return a list of positions where the element is '1'."""
-        return [i for i, n in enumerate(self) if n == '1']
-
-    def index_zero(self):
-        """Return a list of positions where the element is '0'."""
-        return [i for i, n in enumerate(self) if n == '0']
-
-    def contains(self, other):
-        """Check if current bitstr1 contains another one bitstr2.
-
-        That is to say, the bitstr2.index_one() is a subset of
-        bitstr1.index_one().
-
-        Examples:
-            "011011" contains "011000", "011001", "000011"
-
-        Be careful, "011011" also contains "000000". Actually, all _BitString
-        objects contain all-zero _BitString of the same length.
-
-        """
-        xorbit = self ^ other
-        return (xorbit.count('1') == self.count('1') - other.count('1'))
-
-    def independent(self, other):
-        """Check if current bitstr1 is independent of another one bitstr2.
-
-        That is to say the bitstr1.index_one() and bitstr2.index_one() have
-        no intersection.
-
-        Be careful, all _BitString objects are independent of all-zero _BitString
-        of the same length.
-        """
-        xorbit = self ^ other
-        return (xorbit.count('1') == self.count('1') + other.count('1'))
-
-    def iscompatible(self, other):
-        """Check if current bitstr1 is compatible with another bitstr2.
-
-        Two conditions are considered as compatible:
-         1. bitstr1.contain(bitstr2) or vise versa;
-         2. bitstr1.independent(bitstr2).
-
-        """
-        return (self.contains(other) or other.contains(self) or
-                self.independent(other))
-
-    @classmethod
-    def from_bool(cls, bools):
-        return cls(''.join(map(str, map(int, bools))))
+from Bio.Seq import Seq
+from Bio.SeqRecord import SeqRecord
 
 
 def strict_consensus(trees):
@@ -235,10 +50,10 @@ def strict_consensus(trees):
     # Store bitstrs for strict clades
     strict_bitstrs = [bitstr for bitstr, t in bitstr_counts.items()
                       if t[0] == tree_count]
-    strict_bitstrs.sort(key=lambda bitstr: bitstr.count('1'), reverse=True)
+    strict_bitstrs.sort(key=_count_bits, reverse=True)
     # Create root
     root = BaseTree.Clade()
-    if strict_bitstrs[0].count('1') == len(terms):
+    if _count_bits(strict_bitstrs[0]) == len(terms):
         root.clades.extend(terms)
     else:
         raise ValueError('Taxons in provided trees should be consistent')
@@ -246,12 +61,12 @@ def strict_consensus(trees):
     bitstr_clades = {strict_bitstrs[0]: root}
     # create inner clades
     for bitstr in strict_bitstrs[1:]:
-        clade_terms = [terms[i] for i in bitstr.index_one()]
+        clade_terms = [terms[i] for i in _index_one(bitstr, len(terms))]
         clade = BaseTree.Clade()
         clade.clades.extend(clade_terms)
         for bs, c in bitstr_clades.items():
             # check if it should be the parent of current clade
-            if bs.contains(bitstr):
+            if bs & bitstr == bitstr:
                 # remove old bitstring
                 del bitstr_clades[bs]
                 # update clade childs
@@ -295,11 +110,11 @@ def majority_consensus(trees, cutoff=0):
     # Sort bitstrs by descending #occurrences, then #tips, then tip order
     bitstrs = sorted(bitstr_counts.keys(),
                      key=lambda bitstr: (bitstr_counts[bitstr][0],
-                                         bitstr.count('1'),
-                                         str(bitstr)),
+                                         _count_bits(bitstr),
+                                         bitstr),
                      reverse=True)
     root = BaseTree.Clade()
-    if bitstrs[0].count('1') == len(terms):
+    if _count_bits(bitstrs[0]) == len(terms):
         root.clades.extend(terms)
     else:
         raise ValueError('Taxons in provided trees should be consistent')
@@ -312,13 +127,12 @@ def majority_consensus(trees, cutoff=0):
         confidence = 100.0 * count_in_trees / tree_count
         if confidence < cutoff * 100.0:
             break
-        clade_terms = [terms[i] for i in bitstr.index_one()]
+        clade_terms = [terms[i] for i in _index_one(bitstr, len(terms))]
         clade = BaseTree.Clade()
         clade.clades.extend(clade_terms)
         clade.confidence = confidence
         clade.branch_length = branch_length_sum / count_in_trees
-        bsckeys = sorted(bitstr_clades, key=lambda bs: bs.count('1'),
-                         reverse=True)
+        bsckeys = sorted(bitstr_clades, key=_count_bits, reverse=True)
 
         # check if current clade is compatible with previous clades and
         # record it's possible parent and child clades.
@@ -326,17 +140,19 @@ def majority_consensus(trees, cutoff=0):
         parent_bitstr = None
         child_bitstrs = []  # multiple independent childs
         for bs in bsckeys:
-            if not bs.iscompatible(bitstr):
+            common = bs & bitstr
+            if common and common != bitstr and common != bs:
+                # neither contains the other, nor are they independent
                 compatible = False
                 break
             # assign the closest ancestor as its parent
             # as bsckeys is sorted, it should be the last one
-            if bs.contains(bitstr):
+            if common == bitstr:
                 parent_bitstr = bs
             # assign the closest descendant as its child
             # the largest and independent clades
-            if (bitstr.contains(bs) and bs != bitstr and
-                    all(c.independent(bs) for c in child_bitstrs)):
+            if (common == bs and bs != bitstr and
+                    not any(c & bs for c in child_bitstrs)):
                 child_bitstrs.append(bs)
         if not compatible:
             continue
@@ -357,7 +173,7 @@ def majority_consensus(trees, cutoff=0):
         if child_bitstrs:
             remove_list = []
             for c in child_bitstrs:
-                remove_list.extend(c.index_one())
+                remove_list.extend(_index_one(c, len(terms)))
                 child_clade = bitstr_clades[c]
                 parent_clade.clades.remove(child_clade)
                 clade.clades.append(child_clade)
@@ -375,8 +191,8 @@ def adam_consensus(trees):
     """Search Adam Consensus tree from multiple trees.
 
     :Parameters:
-        trees : list
-            list of trees to produce consensus tree.
+        trees : iterable
+            iterable of trees to produce consensus tree.
 
     """
     clades = [tree.root for tree in trees]
@@ -391,22 +207,23 @@ def _part(clades):
     if len(terms) == 1 or len(terms) == 2:
         new_clade = clades[0]
     else:
-        bitstrs = set([_BitString('1' * len(terms))])
+        term_bits = _term_bits(term_names)
+        bitstrs = set([(1 << len(terms)) - 1])
         for clade in clades:
             for child in clade.clades:
-                bitstr = _clade_to_bitstr(child, term_names)
+                bitstr = _clade_to_bits(child, term_bits)
                 to_remove = set()
                 to_add = set()
                 for bs in bitstrs:
                     if bs == bitstr:
                         continue
-                    elif bs.contains(bitstr):
+                    elif bs & bitstr == bitstr:
                         to_add.add(bitstr)
                         to_add.add(bs ^ bitstr)
                         to_remove.add(bs)
-                    elif bitstr.contains(bs):
+                    elif bs & bitstr == bs:
                         to_add.add(bs ^ bitstr)
-                    elif not bs.independent(bitstr):
+                    elif bs & bitstr:
                         to_add.add(bs & bitstr)
                         to_add.add(bs & bitstr ^ bitstr)
                         to_add.add(bs & bitstr ^ bs)
@@ -414,17 +231,17 @@ def _part(clades):
                 # bitstrs = bitstrs | to_add
                 bitstrs ^= to_remove
                 if to_add:
-                    for ta in sorted(to_add, key=lambda bs: bs.count('1')):
+                    for ta in sorted(to_add, key=_count_bits):
                         independent = True
                         for bs in bitstrs:
-                            if not ta.independent(bs):
+                            if ta & bs:
                                 independent = False
                                 break
                         if independent:
                             bitstrs.add(ta)
         new_clade = BaseTree.Clade()
         for bitstr in sorted(bitstrs):
-            indices = bitstr.index_one()
+            indices = _index_one(bitstr, len(terms))
             if len(indices) == 1:
                 new_clade.clades.append(terms[indices[0]])
             elif len(indices) == 2:
@@ -472,6 +289,7 @@ def _count_clades(trees):
 
     Return a tuple first a dict of bitstring (representing clade) and a tuple of its count of
     occurrences and sum of branch length for that clade, second the number of trees processed.
+    The bitstrings are integers, using the order of the terminals of the first tree.
 
     :Parameters:
         trees : iterable
@@ -480,9 +298,12 @@ def _count_clades(trees):
     """
     bitstrs = {}
     tree_count = 0
+    term_bits = None
     for tree in trees:
         tree_count += 1
-        clade_bitstrs = _tree_to_bitstrs(tree)
+        if term_bits is None:
+            term_bits = _term_bits(term.name for term in tree.get_terminals())
+        clade_bitstrs = _tree_to_bits(tree, term_bits)
         for clade in tree.find_clades(terminal=False):
             bitstr = clade_bitstrs[clade]
             if bitstr in bitstrs:
@@ -521,12 +342,14 @@ def get_support(target_tree, trees, len_trees=None):
                             "you must provide the number of replicates in trees "
                             "as the optional parameter len_trees.")
 
+    term_bits = _term_bits(term_names)
+    clade_bitstrs = _tree_to_bits(target_tree, term_bits)
     for clade in target_tree.find_clades(terminal=False):
-        bitstr = _clade_to_bitstr(clade, term_names)
-        bitstrs[bitstr] = (clade, 0)
+        bitstrs[clade_bitstrs[clade]] = (clade, 0)
     for tree in trees:
+        clade_bitstrs = _tree_to_bits(tree, term_bits)
         for clade in tree.find_clades(terminal=False):
-            bitstr = _clade_to_bitstr(clade, term_names)
+            bitstr = clade_bitstrs[clade]
             if bitstr in bitstrs:
                 c, t = bitstrs[bitstr]
                 c.confidence = (t + 1) * 100.0 / size
@@ -534,7 +357,7 @@ def get_support(target_tree, trees, len_trees=None):
     return target_tree
 
 
-def bootstrap(msa, times):
+def bootstrap(msa, times, seed=None):
     """Generate bootstrap replicates from a multiple sequence alignment object.
 
     :Parameters:
@@ -542,25 +365,23 @@ def bootstrap(msa, times):
             multiple sequence alignment to generate replicates.
         times : int
             number of bootstrap times.
+        seed : int
+            seed of the random number generator used to pick the columns,
+            giving the same replicates for the same seed (default None,
+            use the random module).
 
     """
-    length = len(msa[0])
-    i = 0
-    while i < times:
-        i += 1
-        item = None
-        for j in range(length):
-            col = random.randint(0, length - 1)
-            if not item:
-                item = msa[:, col:col + 1]
-            else:
-                item += msa[:, col:col + 1]
-        yield item
+    sequences = [str(record.seq) for record in msa]
+    for columns in _bootstrap_columns(len(msa[0]), times, seed):
+        yield _resample(msa, sequences, columns)
 
 
-def bootstrap_trees(msa, times, tree_constructor):
+def bootstrap_trees(msa, times, tree_constructor, seed=None, processes=None):
     """Generate bootstrap replicate trees from a multiple sequence alignment.
 
+    The trees are generated one by one in the order of the replicates, also
+    when they are built in several processes.
+
     :Parameters:
         msa : MultipleSeqAlignment
             multiple sequence alignment to generate replicates.
@@ -568,15 +389,37 @@ def bootstrap_trees(msa, times, tree_constructor):
             number of bootstrap times.
         tree_constructor : TreeConstructor
             tree constructor to be used to build trees.
+        seed : int
+            seed of the random number generator used to pick the columns,
+            giving the same trees for the same seed (default None, use the
+            random module).
+        processes : int
+            Number of worker processes to build the trees in using the
+            multiprocessing module (default None, build them in this
+            process).
 
     """
-    msas = bootstrap(msa, times)
-    for aln in msas:
-        tree = tree_constructor.build_tree(aln)
-        yield tree
-
-
-def bootstrap_consensus(msa, times, tree_constructor, consensus):
+    sequences = [str(record.seq) for record in msa]
+    replicates = _bootstrap_columns(len(msa[0]), times, seed)
+    if processes is None or processes < 2:
+        for columns in replicates:
+            yield tree_constructor.build_tree(
+                _resample(msa, sequences, columns))
+        return
+    import multiprocessing
+    pool = multiprocessing.Pool(processes, _init_pool,
+                                (msa, sequences, tree_constructor))
+    try:
+        trees = _pool_imap(pool, _pool_build_tree, replicates, processes)
+        for tree in trees:
+            yield tree
+    finally:
+        pool.terminate()
+        pool.join()
+
+
+def bootstrap_consensus(msa, times, tree_constructor, consensus, seed=None,
+                        processes=None):
     """Consensus tree of a series of bootstrap trees for a multiple sequence alignment.
 
     :Parameters:
@@ -589,40 +432,184 @@ def bootstrap_consensus(msa, times, tree_constructor, consensus):
         consensus : function
             Consensus method in this module: `strict_consensus`,
             `majority_consensus`, `adam_consensus`.
+        seed : int
+            Seed of the random number generator used to pick the columns
+            (default None, use the random module).
+        processes : int
+            Number of worker processes to build the trees in (default None,
+            build them in this process).
 
     """
-    trees = bootstrap_trees(msa, times, tree_constructor)
-    tree = consensus(list(trees))
+    trees = bootstrap_trees(msa, times, tree_constructor, seed, processes)
+    tree = consensus(trees)
     return tree
 
 
-def _clade_to_bitstr(clade, tree_term_names):
-    """Create a BitString representing a clade, given ordered tree taxon names (PRIVATE)."""
-    clade_term_names = set(term.name for term in
-                           clade.find_clades(terminal=True))
-    return _BitString.from_bool((name in clade_term_names)
-                                for name in tree_term_names)
+def _bootstrap_columns(length, times, seed):
+    """Generate the column indices of bootstrap replicates (PRIVATE)."""
+    if seed is None:
+        randint = random.randint
+    else:
+        randint = random.Random(seed).randint
+    for i in range(times):
+        yield [randint(0, length - 1) for j in range(length)]
+
+
+def _resample(msa, sequences, columns):
+    """Create an alignment from the given columns of an alignment (PRIVATE).
+
+    The sequences are the alignment sequences as strings.
+    """
+    records = []
+    for record, sequence in zip(msa, sequences):
+        new = SeqRecord(Seq("".join([sequence[i] for i in columns]),
+                            record.seq.alphabet),
+                        id=record.id, name=record.name,
+                        description=record.description)
+        for key, value in record.letter_annotations.items():
+            values = [value[i] for i in columns]
+            if isinstance(value, basestring):
+                values = "".join(values)
+            new.letter_annotations[key] = values
+        records.append(new)
+    return MultipleSeqAlignment(records, msa._alphabet)
+
+
+def _init_pool(msa, sequences, tree_constructor):
+    """Share the alignment and tree constructor with a worker process (PRIVATE)."""
+    global _pool_msa, _pool_sequences, _pool_tree_constructor
+    _pool_msa = msa
+    _pool_sequences = sequences
+    _pool_tree_constructor = tree_constructor
+
+
+def _pool_build_tree(columns):
+    """Build the tree of a bootstrap replicate in a worker process (PRIVATE)."""
+    return _pool_tree_constructor.build_tree(
+        _resample(_pool_msa, _pool_sequences, columns))
+
+
+def robinson_foulds_matrix(trees, other_trees=None, rooted=False):
+    """Calculate the Robinson-Foulds distances between two series of trees.
+
+    The distance between two trees is the number of bipartitions (or clades
+    for rooted trees) found in only one of the trees. Returns a list with a
+    list of distances to the other trees for each tree.
+
+    :Parameters:
+        trees : iterable
+            iterable of trees.
+        other_trees : iterable
+            iterable of trees to compare with (default None, compare the
+            trees with each other).
+        rooted : bool
+            compare clades instead of bipartitions (default False).
+
+    """
+    trees = list(trees)
+    if other_trees is None:
+        other_trees = trees
+    else:
+        other_trees = list(other_trees)
+    term_bits = _term_bits(sorted(term.name
+                                  for term in trees[0].get_terminals()))
+    # Number the distinct splits, as small integers are faster to hash
+    split_ids = {}
+    tree_splits = []
+    for tree in trees:
+        tree_splits.append(frozenset(
+            split_ids.setdefault(split, len(split_ids))
+            for split in _tree_splits(tree, term_bits, rooted)))
+    if other_trees is trees:
+        other_splits = tree_splits
+    else:
+        other_splits = []
+        for tree in other_trees:
+            other_splits.append(frozenset(
+                split_ids.setdefault(split, len(split_ids))
+                for split in _tree_splits(tree, term_bits, rooted)))
+    return [[len(splits ^ other) for other in other_splits]
+            for splits in tree_splits]
+
+
+def _term_bits(term_names):
+    """Map the given terminal names to their bit in a bitstring (PRIVATE).
+
+    The first name is the highest bit, matching the _BitString layout.
+    """
+    term_names = list(term_names)
+    size = len(term_names)
+    return dict((name, 1 << (size - 1 - i))
+                for i, name in enumerate(term_names))
+
+
+def _count_bits(bitstr):
+    """Count the terminals in a clade bitstring (PRIVATE)."""
+    return bin(bitstr).count('1')
+
+
+def _index_one(bitstr, size):
+    """Return a list of the terminal indices in a clade bitstring (PRIVATE)."""
+    return [i for i in range(size) if bitstr >> (size - 1 - i) & 1]
+
 
+def _clade_to_bits(clade, term_bits):
+    """Create a bitstring of a clade, given the terminal name bits (PRIVATE)."""
+    bitstr = 0
+    for term in clade.get_terminals():
+        bitstr |= term_bits.get(term.name, 0)
+    return bitstr
 
-def _tree_to_bitstrs(tree):
-    """Create a dict of a tree's clades to corresponding BitStrings (PRIVATE)."""
-    clades_bitstrs = {}
-    term_names = [term.name for term in tree.find_clades(terminal=True)]
-    for clade in tree.find_clades(terminal=False):
-        bitstr = _clade_to_bitstr(clade, term_names)
-        clades_bitstrs[clade] = bitstr
-    return clades_bitstrs
+
+def _tree_to_bits(tree, term_bits):
+    """Create a dict of all of a tree's clades to their bitstrings (PRIVATE)."""
+    clades_bits = {}
+    # Breadth first order, so each clade comes before its children
+    clades = [tree.root]
+    for clade in clades:
+        clades.extend(clade.clades)
+    for clade in reversed(clades):
+        if clade.clades:
+            bitstr = 0
+            for child in clade.clades:
+                bitstr |= clades_bits[child]
+            clades_bits[clade] = bitstr
+        else:
+            clades_bits[clade] = term_bits.get(clade.name, 0)
+    return clades_bits
+
+
+def _tree_splits(tree, term_bits, rooted):
+    """Get the set of non-trivial bipartitions or clades of a tree (PRIVATE).
+
+    A bipartition is stored as the bitstring of the side without the first
+    terminal.
+    """
+    full = (1 << len(term_bits)) - 1
+    first = 1 << (len(term_bits) - 1)
+    clades_bits = _tree_to_bits(tree, term_bits)
+    if (clades_bits[tree.root] != full or
+            sum(not clade.clades for clade in clades_bits) != len(term_bits)):
+        raise ValueError('Taxons in provided trees should be consistent')
+    splits = set()
+    for bitstr in clades_bits.values():
+        if not rooted and bitstr & first:
+            bitstr ^= full
+        if 1 < _count_bits(bitstr) < len(term_bits) - (not rooted):
+            splits.add(bitstr)
+    return splits
 
 
-def _bitstring_topology(tree):
-    """Generate a branch length dict for a tree, keyed by BitStrings (PRIVATE).
+def _bitstring_topology(tree, term_bits):
+    """Generate a branch length dict for a tree, keyed by bitstrings (PRIVATE).
 
-    Create a dict of all clades' BitStrings to the corresponding branch
+    Create a dict of all clades' bitstrings to the corresponding branch
     lengths (rounded to 5 decimal places).
     """
     bitstrs = {}
-    for clade, bitstr in _tree_to_bitstrs(tree).items():
-        bitstrs[bitstr] = round(clade.branch_length or 0.0, 5)
+    for clade, bitstr in _tree_to_bits(tree, term_bits).items():
+        if clade.clades:
+            bitstrs[bitstr] = round(clade.branch_length or 0.0, 5)
     return bitstrs
 
 
@@ -633,5 +620,7 @@ def _equal_topology(tree1, tree2):
     """
     term_names1 = set(term.name for term in tree1.find_clades(terminal=True))
     term_names2 = set(term.name for term in tree2.find_clades(terminal=True))
+    term_bits = _term_bits(sorted(term_names1))
     return ((term_names1 == term_names2) and
-            (_bitstring_topology(tree1) == _bitstring_topology(tree2)))
+            (_bitstring_topology(tree1, term_bits) ==
+             _bitstring_topology(tree2, term_bits)))
@@ -0,0 +1,271 @@
+# This file is part of the Biopython distribution and governed by your
+# choice of the "Biopython License Agreement" or the "BSD 3-Clause License".
+# Please see the LICENSE file that should have been included as part of this
+# package.
+
+"""Indexed view of a phylogenetic tree for fast ancestry and distance queries.
+
+Methods like ``common_ancestor``, ``distance`` and ``is_monophyletic`` of
+Bio.Phylo trees search the whole tree on every call. An IndexedTree numbers
+the clades of a tree once (in preorder) and stores their parents, depths and
+subtree ranges in NumPy arrays, after which the most recent common ancestor
+of two clades, the distance between them, and whether one contains the other
+can be found in constant time.
+
+    >>> from Bio import Phylo
+    >>> from Bio._py3k import StringIO
+    >>> from Bio.Phylo.IndexedTree import IndexedTree
+    >>> tree = Phylo.read(StringIO("((A:1,B:2):1,(C:3,D:4):2);"), "newick")
+    >>> index = IndexedTree(tree)
+    >>> index.common_ancestor("A", "B") is tree.common_ancestor("A", "B")
+    True
+    >>> index.distance("A", "D")
+    8.0
+    >>> index.is_ancestor(index.common_ancestor("C", "D"), "A")
+    False
+    >>> index.distance_matrix()[0].tolist()
+    [0.0, 3.0, 7.0, 8.0]
+
+The tree can also be a ``Bio.Phylo.CompactTree.CompactTree``, in which case
+the clades are referred to by their index in the CompactTree.
+"""
+
+try:
+    import numpy
+except ImportError:
+    from Bio import MissingPythonDependencyError
+    raise MissingPythonDependencyError(
+        "Install NumPy if you want to use Bio.Phylo.IndexedTree.")
+
+from Bio._py3k import basestring
+from Bio._utils import _BLOCK_ELEMENTS
+
+from Bio.Phylo.CompactTree import CompactTree
+
+
+class IndexedTree(object):
+    """Indexed view of a tree for constant time ancestry queries.
+
+    The clades are numbered in preorder, so the root is 0 and the clades in
+    the subtree of clade i are numbered from i up to (but not including)
+    ``ends[i]``. Clades can be given to the methods as Clade objects, as
+    names (the first clade in preorder with that name) or as these numbers.
+
+    The most recent common ancestor is found with a sparse table of the
+    minimum level (number of branches from the root) over the preorder,
+    the preorder variant of the Euler tour method. The index does not follow
+    changes made to the tree after it was created.
+
+    :Parameters:
+        tree : Tree, Clade or CompactTree
+            the tree to index.
+
+    :Attributes:
+        clades : list
+            The Clade objects in preorder (None for a CompactTree).
+        parents : NumPy array
+            Number of the parent of each clade, -1 for the root.
+        depths : NumPy array
+            Sum of the branch lengths from the root to each clade (not
+            including the branch length of the root itself).
+        levels : NumPy array
+            Number of branches from the root to each clade.
+        ends : NumPy array
+            One more than the number of the last clade in each subtree.
+        preorder, postorder : NumPy array
+            Clade numbers in preorder and postorder.
+        terminals : NumPy array
+            Numbers of the terminal clades, in preorder.
+
+    """
+
+    def __init__(self, tree):
+        """Initialize the class."""
+        if isinstance(tree, CompactTree):
+            self.clades = None
+            parents = list(tree.parents)
+            lengths = [0.0 if value != value else value
+                       for value in tree.branch_lengths]
+            names = tree.names
+        else:
+            # Preorder, without recursion
+            self.clades = []
+            parents = []
+            stack = [(tree.root, -1)]
+            while stack:
+                clade, parent = stack.pop()
+                parents.append(parent)
+                index = len(self.clades)
+                self.clades.append(clade)
+                stack.extend((child, index) for child in reversed(clade.clades))
+            lengths = [clade.branch_length or 0.0 for clade in self.clades]
+            names = [clade.name for clade in self.clades]
+        size = len(parents)
+        depths = [0.0] * size
+        levels = [0] * size
+        for index in range(1, size):
+            parent = parents[index]
+            depths[index] = depths[parent] + lengths[index]
+            levels[index] = levels[parent] + 1
+        ends = list(range(1, size + 1))
+        for index in range(size - 1, 0, -1):
+            parent = parents[index]
+            if ends[index] > ends[parent]:
+                ends[parent] = ends[index]
+        self.parents = numpy.array(parents, dtype=numpy.intp)
+        self.depths = numpy.array(depths)
+        self.levels = numpy.array(levels, dtype=numpy.intp)
+        self.ends = numpy.array(ends, dtype=numpy.intp)
+        self.preorder = numpy.arange(size)
+        # A clade follows the last clade of its subtree in postorder, and
+        # comes before its ancestors whose subtrees end at the same clade
+        self.postorder = numpy.lexsort((-self.levels, self.ends))
+        self.terminals = numpy.flatnonzero(self.ends == self.preorder + 1)
+        self._terminal_counts = numpy.concatenate(
+            ([0], numpy.cumsum(self.ends == self.preorder + 1)))
+        self._name_index = {}
+        for index, name in enumerate(names):
+            if name is not None and name not in self._name_index:
+                self._name_index[name] = index
+        if self.clades is not None:
+            self._clade_index = dict((id(clade), index)
+                                     for index, clade in enumerate(self.clades))
+        # Sparse table of the clade with the lowest level in each range of
+        # 2**k clades in preorder
+        table = [self.preorder]
+        width = 1
+        while 2 * width <= size:
+            previous = table[-1]
+            left = previous[:-width]
+            right = previous[width:]
+            table.append(numpy.where(self.levels[left] <= self.levels[right],
+                                     left, right))
+            width *= 2
+        self._table = table
+        self._log2 = numpy.zeros(size + 1, dtype=numpy.intp)
+        for k in range(1, len(table)):
+            self._log2[1 << k:] = k
+
+    def __len__(self):
+        """Return the number of clades."""
+        return len(self.parents)
+
+    def index(self, target):
+        """Return the number of a clade, given as a Clade, name or number."""
+        if isinstance(target, (int, numpy.integer)):
+            if not 0 <= target < len(self):
+                raise ValueError("target %r is not in this tree" % target)
+            return int(target)
+        try:
+            if isinstance(target, basestring):
+                return self._name_index[target]
+            return self._clade_index[id(target)]
+        except (KeyError, AttributeError):
+            raise ValueError("target %r is not in this tree" % target)
+
+    def _clade(self, index):
+        """Return the Clade object (or number) of a clade number (PRIVATE)."""
+        if self.clades is None:
+            return int(index)
+        return self.clades[index]
+
+    def _lca(self, first, second):
+        """Most recent common ancestor of arrays of clade numbers (PRIVATE)."""
+        low = numpy.minimum(first, second)
+        high = numpy.maximum(first, second)
+        # The lowest level clade in preorder after the first clade, up to
+        # and including the second, is a child of the common ancestor
+        start = numpy.minimum(low + 1, high)
+        k = self._log2[high - start + 1]
+        table = self._table
+        left = numpy.empty_like(low)
+        right = numpy.empty_like(low)
+        for level in numpy.unique(k):
+            rows = k == level
+            left[rows] = table[level][start[rows]]
+            right[rows] = table[level][high[rows] - (1 << level) + 1]
+        child = numpy.where(self.levels[left] <= self.levels[right],
+                            left, right)
+        return numpy.where(low == high, low, self.parents[child])
+
+    def common_ancestor(self, targets, *more_targets):
+        """Return the most recent common ancestor of all the given targets.
+
+        Like the ``common_ancestor`` method of trees, the targets can be
+        given as a list or as separate arguments.
+        """
+        if more_targets or isinstance(targets, basestring) or \
+                not hasattr(targets, '__iter__'):
+            targets = [targets] + list(more_targets)
+        numbers = [self.index(target) for target in targets]
+        if not numbers:
+            return self._clade(0)
+        # The common ancestor of the first and last clades in preorder
+        lca = self._lca(numpy.array([min(numbers)]),
+                        numpy.array([max(numbers)]))[0]
+        return self._clade(lca)
+
+    def distance(self, target1, target2=None):
+        """Return the sum of the branch lengths between two targets.
+
+        If only one target is specified, the other is the root of the tree.
+        """
+        first = self.index(target1)
+        if target2 is None:
+            return float(self.depths[first])
+        second = self.index(target2)
+        lca = self._lca(numpy.array([first]), numpy.array([second]))[0]
+        depths = self.depths
+        return float(depths[first] + depths[second] - 2 * depths[lca])
+
+    def is_ancestor(self, ancestor, target):
+        """Return True if the target is in the subtree of the ancestor.
+
+        A clade counts as being in its own subtree.
+        """
+        ancestor = self.index(ancestor)
+        return bool(ancestor <= self.index(target) < self.ends[ancestor])
+
+    def is_monophyletic(self, terminals, *more_terminals):
+        """Check if the given terminals comprise a complete subclade.
+
+        :returns: the common ancestor of the terminals if they are
+            monophyletic, otherwise False (like the tree method).
+
+        """
+        if more_terminals or isinstance(terminals, basestring) or \
+                not hasattr(terminals, '__iter__'):
+            terminals = [terminals] + list(more_terminals)
+        numbers = set(self.index(target) for target in terminals)
+        lca = self.index(self.common_ancestor(list(numbers)))
+        counts = self._terminal_counts
+        if counts[self.ends[lca]] - counts[lca] == len(numbers) and \
+                all(self.ends[number] == number + 1 for number in numbers):
+            return self._clade(lca)
+        return False
+
+    def distance_matrix(self, targets=None):
+        """Return a NumPy array of the distances between all pairs of targets.
+
+        :Parameters:
+            targets : list
+                the clades to calculate the distances between (default
+                None, all terminals in preorder).
+
+        """
+        if targets is None:
+            numbers = self.terminals
+        else:
+            numbers = numpy.array([self.index(target) for target in targets],
+                                  dtype=numpy.intp)
+        size = len(numbers)
+        depths = self.depths[numbers]
+        distances = numpy.empty((size, size))
+        block = max(1, _BLOCK_ELEMENTS // max(size, 1))
+        for start in range(0, size, block):
+            rows = numbers[start:start + block]
+            lca = self._lca(rows[:, None], numbers[None, :])
+            distances[start:start + block] = (
+                depths[start:start + block, None] + depths[None, :] -
+                2 * self.depths[lca])
+        return distances
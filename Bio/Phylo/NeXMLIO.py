@@ -88,6 +88,9 @@ class NeXMLError(Exception):
 def parse(handle, **kwargs):
     """Iterate over the trees in a NeXML file handle.
 
+    Keyword arguments (such as annotations=False) are passed on to the
+    `Parser.parse` method.
+
     :returns: generator of Bio.Phylo.NeXML.Tree objects.
 
     """
@@ -134,68 +137,93 @@ class Parser(object):
         else:
             node_dict[prop] = meta_node.text
 
-    def parse(self, values_are_confidence=False, rooted=False):
-        """Parse the text stream this object was initialized with."""
-        nexml_doc = ElementTree.iterparse(self.handle, events=('end',))
+    def parse(self, values_are_confidence=False, rooted=False,
+              annotations=True):
+        """Parse the text stream this object was initialized with.
 
-        for event, node in nexml_doc:
-            if node.tag == qUri('nex:tree'):
-                node_dict = {}
-                node_children = {}
-                root = None
-
-                child_tags = node.getchildren()
-                nodes = []
-                edges = []
-                for child in child_tags:
-                    if child.tag == qUri('nex:node'):
-                        nodes.append(child)
-                    if child.tag == qUri('nex:edge'):
-                        edges.append(child)
-
-                for node in nodes:
-                    node_id = node.attrib['id']
-                    this_node = node_dict[node_id] = {}
-                    if 'otu' in node.attrib and node.attrib['otu']:
-                        this_node['name'] = node.attrib['otu']
-                    if 'root' in node.attrib and node.attrib['root'] == 'true':
-                        root = node_id
-
-                    for child in node.getchildren():
-                        if child.tag == qUri('nex:meta'):
-                            self.add_annotation(node_dict[node_id], child)
-
-                srcs = set()
-                tars = set()
-                for edge in edges:
-                    src, tar = edge.attrib['source'], edge.attrib['target']
-                    srcs.add(src)
-                    tars.add(tar)
-                    if src not in node_children:
-                        node_children[src] = set()
-
-                    node_children[src].add(tar)
-                    if 'length' in edge.attrib:
-                        node_dict[tar]['branch_length'] = float(edge.attrib['length'])
-                    if 'property' in edge.attrib and edge.attrib['property'] in matches('cdao:has_Support_Value'):
-                        node_dict[tar]['confidence'] = float(edge.attrib['content'])
-
-                    for child in edge.getchildren():
-                        if child.tag == qUri('nex:meta'):
-                            self.add_annotation(node_dict[tar], child)
-
-                if root is None:
-                    # if no root specified, start the recursive tree creation function
-                    # with the first node that's not a child of any other nodes
-                    rooted = False
-                    possible_roots = (node.attrib['id'] for node in nodes
-                                      if node.attrib['id'] in srcs and
-                                      node.attrib['id'] not in tars)
-                    root = next(possible_roots)
-                else:
-                    rooted = True
-
-                yield NeXML.Tree(root=self._make_tree(root, node_dict, node_children), rooted=rooted)
+        The trees are read one at a time; the XML elements of each tree, and
+        of the blocks of OTUs and characters (which are not used here), are
+        discarded once they have been read. If annotations is False, the meta
+        annotations of nodes and edges other than support values are left out.
+        """
+        nexml_doc = ElementTree.iterparse(self.handle, events=('end',))
+        tree_tag = qUri('nex:tree')
+        node_tag = qUri('nex:node')
+        edge_tag = qUri('nex:edge')
+        meta_tag = qUri('nex:meta')
+        block_tags = set(qUri(tag) for tag in
+                         ('nex:otus', 'nex:characters', 'nex:trees'))
+
+        for event, tree_node in nexml_doc:
+            if tree_node.tag in block_tags:
+                # Nothing more is needed from the finished block
+                tree_node.clear()
+                continue
+            if tree_node.tag != tree_tag:
+                continue
+            node_dict = {}
+            node_children = {}
+            root = None
+
+            nodes = []
+            edges = []
+            for child in tree_node:
+                if child.tag == node_tag:
+                    nodes.append(child)
+                if child.tag == edge_tag:
+                    edges.append(child)
+
+            for node in nodes:
+                node_id = node.attrib['id']
+                this_node = node_dict[node_id] = {}
+                if 'otu' in node.attrib and node.attrib['otu']:
+                    this_node['name'] = node.attrib['otu']
+                if 'root' in node.attrib and node.attrib['root'] == 'true':
+                    root = node_id
+
+                for child in node:
+                    if child.tag == meta_tag:
+                        self._add_meta(this_node, child, annotations)
+
+            srcs = set()
+            tars = set()
+            for edge in edges:
+                src, tar = edge.attrib['source'], edge.attrib['target']
+                srcs.add(src)
+                tars.add(tar)
+                if src not in node_children:
+                    node_children[src] = set()
+
+                node_children[src].add(tar)
+                if 'length' in edge.attrib:
+                    node_dict[tar]['branch_length'] = float(edge.attrib['length'])
+                if 'property' in edge.attrib and edge.attrib['property'] in matches('cdao:has_Support_Value'):
+                    node_dict[tar]['confidence'] = float(edge.attrib['content'])
+
+                for child in edge:
+                    if child.tag == meta_tag:
+                        self._add_meta(node_dict[tar], child, annotations)
+
+            if root is None:
+                # if no root specified, start the recursive tree creation function
+                # with the first node that's not a child of any other nodes
+                rooted = False
+                possible_roots = (node.attrib['id'] for node in nodes
+                                  if node.attrib['id'] in srcs and
+                                  node.attrib['id'] not in tars)
+                root = next(possible_roots)
+            else:
+                rooted = True
+
+            del nodes, edges
+            tree_node.clear()
+            yield NeXML.Tree(root=self._make_tree(root, node_dict, node_children), rooted=rooted)
+
+    def _add_meta(self, node_dict, meta_node, annotations):
+        """Add a meta annotation, or only a support value (PRIVATE)."""
+        if annotations or meta_node.attrib.get('property') in \
+                matches('cdao:has_Support_Value'):
+            self.add_annotation(node_dict, meta_node)
 
     @classmethod
     def _make_tree(cls, node, node_dict, children):
@@ -11,9 +11,12 @@ See: http://evolution.genetics.washington.edu/phylip/newick_doc.html
 """
 
 import re
-from Bio._py3k import StringIO
+from array import array
+
+from Bio._py3k import StringIO, basestring
 
 from Bio.Phylo import Newick
+from Bio.Phylo.CompactTree import CompactTree
 
 
 class NewickError(Exception):
@@ -26,10 +29,10 @@ tokens = [
     (r"\(", 'open parens'),
     (r"\)", 'close parens'),
     (r"[^\s\(\)\[\]\'\:\;\,]+", 'unquoted node label'),
-    (r"\:[+-]?[0-9]*\.?[0-9]+([eE][+-]?[0-9]+)?", 'edge length'),
+    (r"\:[+-]?[0-9]*\.?[0-9]+(?:[eE][+-]?[0-9]+)?", 'edge length'),
     (r"\,", 'comma'),
-    (r"\[(\\.|[^\]])*\]", 'comment'),
-    (r"\'(\\.|[^\'])*\'", 'quoted node label'),
+    (r"\[(?:\\.|[^\]])*\]", 'comment'),
+    (r"\'(?:\\.|[^\'])*\'", 'quoted node label'),
     (r"\;", 'semicolon'),
     (r"\n", 'newline'),
 ]
@@ -43,7 +46,8 @@ token_dict = dict((name, re.compile(token)) for (token, name) in tokens)
 def parse(handle, **kwargs):
     """Iterate over the trees in a Newick file handle.
 
-    :returns: generator of Bio.Phylo.Newick.Tree objects.
+    :returns: generator of Bio.Phylo.Newick.Tree objects (or of
+        Bio.Phylo.CompactTree.CompactTree objects with ``compact=True``).
 
     """
     return Parser(handle).parse(**kwargs)
@@ -78,6 +82,29 @@ def _format_comment(text):
     return '[%s]' % (text.replace('[', '\\[').replace(']', '\\]'))
 
 
+def _format_label(label):
+    """Quote a clade name if needed (PRIVATE)."""
+    if label:
+        unquoted_label = re.match(token_dict['unquoted node label'], label)
+        if (not unquoted_label) or (unquoted_label.end() < len(label)):
+            label = "'%s'" % label.replace(
+                '\\', '\\\\').replace("'", "\\'")
+    return label or ''
+
+
+def _split_tokens(text):
+    """Split a Newick tree string in tokens (PRIVATE).
+
+    Returns the list of tokens up to the (first) semicolon, and the list of
+    any tokens after it.
+    """
+    tokens = tokenizer.findall(text)
+    if ';' in tokens:
+        end = tokens.index(';')
+        return tokens[:end], tokens[end + 1:]
+    return tokens, []
+
+
 def _get_comment(clade):
     if hasattr(clade, 'comment') and clade.comment:
         return _format_comment(str(clade.comment))
@@ -101,12 +128,23 @@ class Parser(object):
         handle = StringIO(treetext)
         return cls(handle)
 
-    def parse(self, values_are_confidence=False, comments_are_confidence=False, rooted=False):
-        """Parse the text stream this object was initialized with."""
+    def parse(self, values_are_confidence=False, comments_are_confidence=False,
+              rooted=False, compact=False):
+        """Parse the text stream this object was initialized with.
+
+        The trees are parsed one at a time as they are read. With
+        ``compact=True`` each tree is returned as a CompactTree object (see
+        ``Bio.Phylo.CompactTree``) rather than as a Newick.Tree, which is
+        much faster and uses much less memory for huge trees.
+        """
         self.values_are_confidence = values_are_confidence
         self.comments_are_confidence = comments_are_confidence
         self.rooted = rooted
-        buf = ''
+        if compact:
+            parse_tree = self._parse_compact
+        else:
+            parse_tree = self._parse_tree
+        buf = []
         unicodeChecked = False
         unicodeLines = ("\xef", "\xff", "\xfe", "\x00")
         for line in self.handle:
@@ -118,78 +156,85 @@ class Parser(object):
                                       "unicode byte order marks.  You must convert it to "
                                       "ASCII before it can be parsed.")
                 unicodeChecked = True
-            buf += line.rstrip()
-            if buf.endswith(';'):
-                yield self._parse_tree(buf)
-                buf = ''
-        if buf:
+            line = line.rstrip()
+            buf.append(line)
+            if line.endswith(';'):
+                yield parse_tree(''.join(buf))
+                buf = []
+        text = ''.join(buf)
+        if text:
             # Last tree is missing a terminal ';' character -- that's OK
-            yield self._parse_tree(buf)
+            yield parse_tree(text)
 
     def _parse_tree(self, text):
-        """Parses the text representation into an Tree object."""
-        tokens = re.finditer(tokenizer, text.strip())
-
+        """Parse the text representation into a Tree object (PRIVATE).
+
+        The clades are built in a single pass over the tokens, keeping the
+        open clades on a stack rather than using recursion.
+        """
+        tokens, extra_tokens = _split_tokens(text)
+        values_are_confidence = self.values_are_confidence
+        comments_are_confidence = self.comments_are_confidence
         new_clade = self.new_clade
-        root_clade = new_clade()
+        process_clade = self.process_clade
 
+        root_clade = new_clade()
         current_clade = root_clade
-        entering_branch_length = False
+        # the clades containing the current clade
+        parents = []
 
         lp_count = 0
         rp_count = 0
-        for match in tokens:
-            token = match.group()
+        for token in tokens:
+            first = token[0]
 
-            if token.startswith("'"):
+            if first == "'":
                 # quoted label; add characters to clade name
                 current_clade.name = token[1:-1]
 
-            elif token.startswith('['):
+            elif first == '[':
                 # comment
                 current_clade.comment = token[1:-1]
-                if self.comments_are_confidence:
+                if comments_are_confidence:
                     # Try to use this comment as a numeric support value
                     current_clade.confidence = _parse_confidence(current_clade.comment)
 
-            elif token == '(':
+            elif first == '(':
                 # start a new clade, which is a child of the current clade
-                current_clade = new_clade(current_clade)
-                entering_branch_length = False
+                parents.append(current_clade)
+                current_clade = new_clade()
                 lp_count += 1
 
-            elif token == ',':
+            elif first == ',':
                 # if the current clade is the root, then the external parentheses
                 # are missing and a new root should be created
-                if current_clade is root_clade:
+                if not parents:
                     root_clade = new_clade()
-                    current_clade.parent = root_clade
+                    parents.append(root_clade)
                 # start a new child clade at the same level as the current clade
-                parent = self.process_clade(current_clade)
-                current_clade = new_clade(parent)
-                entering_branch_length = False
+                process_clade(current_clade)
+                parents[-1].clades.append(current_clade)
+                current_clade = new_clade()
 
-            elif token == ')':
+            elif first == ')':
                 # done adding children for this parent clade
-                parent = self.process_clade(current_clade)
-                if not parent:
+                if not parents:
                     raise NewickError('Parenthesis mismatch.')
+                process_clade(current_clade)
+                parent = parents.pop()
+                parent.clades.append(current_clade)
                 current_clade = parent
-                entering_branch_length = False
                 rp_count += 1
 
-            elif token == ';':
-                break
-
-            elif token.startswith(':'):
+            elif first == ':':
                 # branch length or confidence
                 value = float(token[1:])
-                if self.values_are_confidence:
+                if values_are_confidence:
                     current_clade.confidence = value
                 else:
                     current_clade.branch_length = value
 
-            elif token == '\n':
+            elif first == '\n':
                 pass
 
             else:
@@ -199,18 +244,125 @@ class Parser(object):
         if not lp_count == rp_count:
             raise NewickError('Number of open/close parentheses do not match.')
 
-        # if ; token broke out of for loop, there should be no remaining tokens
-        try:
-            next_token = next(tokens)
+        # if ; token ended the tree, there should be no remaining tokens
+        if extra_tokens:
             raise NewickError('Text after semicolon in Newick tree: %s'
-                              % next_token.group())
-        except StopIteration:
-            pass
+                              % extra_tokens[0])
 
-        self.process_clade(current_clade)
-        self.process_clade(root_clade)
+        process_clade(current_clade)
+        if parents:
+            # the new root created for missing external parentheses
+            parents[-1].clades.append(current_clade)
+        process_clade(root_clade)
         return Newick.Tree(root=root_clade, rooted=self.rooted)
 
+    def _parse_compact(self, text):
+        """Parse the text representation into a CompactTree object (PRIVATE).
+
+        Like _parse_tree, but the clades are stored as array entries numbered
+        in the order they are found, which is preorder.
+        """
+        tokens, extra_tokens = _split_tokens(text)
+        values_are_confidence = self.values_are_confidence
+        comments_are_confidence = self.comments_are_confidence
+
+        # one clade per open parenthesis or comma, plus the root (and an
+        # extra root if the external parentheses are missing)
+        size = tokens.count('(') + tokens.count(',') + 2
+        parents = array('l', [-1]) * size
+        branch_lengths = array('d', [float('nan')]) * size
+        names = [None] * size
+        confidences = [None] * size
+        comments = [None] * size
+        internal = bytearray(size)
+
+        root = 0
+        current = 0
+        count = 1
+        # the clades containing the current clade
+        stack = []
+
+        lp_count = 0
+        rp_count = 0
+        for token in tokens:
+            first = token[0]
+
+            if first == "'":
+                names[current] = token[1:-1]
+
+            elif first == '[':
+                comments[current] = token[1:-1]
+                if comments_are_confidence:
+                    confidences[current] = _parse_confidence(token[1:-1])
+
+            elif first == '(':
+                internal[current] = 1
+                stack.append(current)
+                parents[count] = current
+                current = count
+                count += 1
+                lp_count += 1
+
+            elif first == ',':
+                if not stack:
+                    # missing external parentheses, create a new root
+                    root = count
+                    count += 1
+                    internal[root] = 1
+                    parents[current] = root
+                    stack.append(root)
+                parents[count] = stack[-1]
+                current = count
+                count += 1
+
+            elif first == ')':
+                if not stack:
+                    raise NewickError('Parenthesis mismatch.')
+                current = stack.pop()
+                rp_count += 1
+
+            elif first == ':':
+                value = float(token[1:])
+                if values_are_confidence:
+                    confidences[current] = value
+                else:
+                    branch_lengths[current] = value
+
+            elif first == '\n':
+                pass
+
+            else:
+                names[current] = token
+
+        if not lp_count == rp_count:
+            raise NewickError('Number of open/close parentheses do not match.')
+
+        if extra_tokens:
+            raise NewickError('Text after semicolon in Newick tree: %s'
+                              % extra_tokens[0])
+
+        del parents[count:], branch_lengths[count:], names[count:]
+        del confidences[count:], comments[count:], internal[count:]
+        if not (values_are_confidence or comments_are_confidence):
+            # numeric labels of internal clades are support values
+            for index in range(count):
+                if internal[index] and names[index] and confidences[index] is None:
+                    confidences[index] = _parse_confidence(names[index])
+                    if confidences[index] is not None:
+                        names[index] = None
+        if root:
+            # the new root comes before the old root's clades in preorder
+            order = [root] + list(range(root)) + list(range(root + 1, count))
+            new_index = dict((old, new) for new, old in enumerate(order))
+            new_index[-1] = -1
+            parents = [new_index[parents[old]] for old in order]
+            branch_lengths = [branch_lengths[old] for old in order]
+            names = [names[old] for old in order]
+            confidences = [confidences[old] for old in order]
+            comments = [comments[old] for old in order]
+        return CompactTree(parents, branch_lengths, names, confidences,
+                           comments, rooted=self.rooted)
+
     def new_clade(self, parent=None):
         """Return new Newick.Clade, optionally with temporary reference to parent."""
         clade = Newick.Clade()
@@ -238,6 +390,12 @@ class Parser(object):
 # ---------------------------------------------------------
 # Output
 
+class _CompactClade(object):
+    """The values of a CompactTree clade, as used by the Writer (PRIVATE)."""
+
+    __slots__ = ('branch_length', 'confidence', 'comment')
+
+
 class Writer(object):
     """Based on the writer in Bio.Nexus.Trees (str, to_string)."""
 
@@ -266,27 +424,68 @@ class Writer(object):
                                               format_confidence, format_branch_length)
 
         def newickize(clade):
-            """Convert a node tree to a Newick tree string, recursively."""
-            label = clade.name or ''
-            if label:
-                unquoted_label = re.match(token_dict['unquoted node label'], label)
-                if (not unquoted_label) or (unquoted_label.end() < len(label)):
-                    label = "'%s'" % label.replace(
-                        '\\', '\\\\').replace("'", "\\'")
-
-            if clade.is_terminal():    # terminal
-                return (label + make_info_string(clade, terminal=True))
-            else:
-                subtrees = (newickize(sub) for sub in clade)
-                return '(%s)%s' % (','.join(subtrees),
-                                   label + make_info_string(clade))
+            """Convert a node tree to a Newick tree string, without recursion."""
+            parts = []
+            # clades still to write, and text to write after them
+            stack = [clade]
+            while stack:
+                clade = stack.pop()
+                if isinstance(clade, basestring):
+                    parts.append(clade)
+                elif clade.is_terminal():    # terminal
+                    parts.append(_format_label(clade.name) +
+                                 make_info_string(clade, terminal=True))
+                else:
+                    parts.append('(')
+                    stack.append(')' + _format_label(clade.name) +
+                                 make_info_string(clade))
+                    subclades = clade.clades
+                    for sub in subclades[:0:-1]:
+                        stack.append(sub)
+                        stack.append(',')
+                    stack.append(subclades[0])
+            return ''.join(parts)
+
+        def compact_newickize(tree):
+            """Convert a CompactTree to a Newick tree string."""
+            parts = []
+            children = tree.get_children()
+            clade = _CompactClade()
+            stack = [0]
+            while stack:
+                index = stack.pop()
+                if isinstance(index, basestring):
+                    parts.append(index)
+                    continue
+                clade.branch_length = tree.get_branch_length(index)
+                clade.confidence = tree.confidences[index]
+                clade.comment = tree.comments[index]
+                subclades = children[index]
+                if not subclades:
+                    parts.append(_format_label(tree.names[index]) +
+                                 make_info_string(clade, terminal=True))
+                else:
+                    parts.append('(')
+                    stack.append(')' + _format_label(tree.names[index]) +
+                                 make_info_string(clade))
+                    for sub in subclades[:0:-1]:
+                        stack.append(sub)
+                        stack.append(',')
+                    stack.append(subclades[0])
+            return ''.join(parts)
 
         # Convert each tree to a string
         for tree in self.trees:
+            compact = isinstance(tree, CompactTree)
             if ladderize in ('left', 'LEFT', 'right', 'RIGHT'):
+                if compact:
+                    raise ValueError("A CompactTree cannot be ladderized.")
                 # Nexus compatibility shim, kind of
                 tree.ladderize(reverse=(ladderize in ('right', 'RIGHT')))
-            rawtree = newickize(tree.root) + ';'
+            if compact:
+                rawtree = compact_newickize(tree) + ';'
+            else:
+                rawtree = newickize(tree.root) + ';'
             if plain_newick:
                 yield rawtree
                 continue
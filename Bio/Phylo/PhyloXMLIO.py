@@ -74,28 +74,38 @@ class PhyloXMLError(Exception):
 # ---------------------------------------------------------
 # Public API
 
-def read(file):
+def read(file, skip=None):
     """Parse a phyloXML file or stream and build a tree of Biopython objects.
 
     The children of the root node are phylogenies and possibly other arbitrary
     (non-phyloXML) objects.
 
+    :Parameters:
+        file
+            either an open handle or a file name.
+        skip
+            names of phyloXML elements (such as 'sequence', 'property' or
+            'annotation') to leave out, together with everything inside them.
+
     :returns: a single `Bio.Phylo.PhyloXML.Phyloxml` object.
 
     """
-    return Parser(file).read()
+    return Parser(file, skip).read()
 
 
-def parse(file):
+def parse(file, skip=None):
     """Iterate over the phylogenetic trees in a phyloXML file.
 
     This ignores any additional data stored at the top level, but may be more
-    memory-efficient than the `read` function.
+    memory-efficient than the `read` function: only one phylogeny is kept in
+    memory at a time. The ``skip`` argument is as for the `read` function,
+    e.g. use skip=['sequence', 'property'] to read just the tree topology,
+    names, branch lengths and taxonomies of large annotated gene trees.
 
     :returns: a generator of `Bio.Phylo.PhyloXML.Phylogeny` objects.
 
     """
-    return Parser(file).parse()
+    return Parser(file, skip).parse()
 
 
 def write(obj, file, encoding=DEFAULT_ENCODING, indent=True):
@@ -196,6 +206,33 @@ def _get_children_text(parent, tag, construct=unicode):
             if child.text]
 
 
+def _skip_elements(context, root, tags):
+    """Filter XML parsing events to leave out elements with the given tags.
+
+    The skipped elements are cleared and removed from their parents as soon
+    as they have been read, so the parser never sees them.
+    """
+    # Elements which have been started but not ended yet
+    stack = [root]
+    for event, elem in context:
+        if event == 'start':
+            if elem.tag in tags:
+                for event, child in context:
+                    if event == 'end' and child is elem:
+                        break
+                elem.clear()
+                try:
+                    stack[-1].remove(elem)
+                except ValueError:
+                    # Already dropped from the parent by the parser
+                    pass
+                continue
+            stack.append(elem)
+        else:
+            stack.pop()
+        yield event, elem
+
+
 def _indent(elem, level=0):
     """Add line breaks and indentation to ElementTree in-place.
 
@@ -288,13 +325,20 @@ class Parser(object):
     current clade is finished -- this shouldn't be a problem because clade is
     the only recursive element, and non-clade nodes below this level are of
     bounded size.
+
+    Elements whose (local) tag is in ``skip`` are discarded while reading,
+    without building any objects for them or their children.
     """
 
-    def __init__(self, file):
+    def __init__(self, file, skip=None):
         """Initialize the class."""
         # Get an iterable context for XML parsing events
         context = iter(ElementTree.iterparse(file, events=('start', 'end')))
         event, root = next(context)
+        if skip:
+            tags = set(tag if tag.startswith('{') else _ns(tag)
+                       for tag in skip)
+            context = _skip_elements(context, root, tags)
         self.root = root
         self.context = context
 
@@ -327,7 +371,10 @@ class Parser(object):
         phytag = _ns('phylogeny')
         for event, elem in self.context:
             if event == 'start' and elem.tag == phytag:
-                yield self._parse_phylogeny(elem)
+                phylogeny = self._parse_phylogeny(elem)
+                # Drop the finished phylogeny element
+                self.root.clear()
+                yield phylogeny
 
     # Special parsing cases -- incremental, using self.context
 
@@ -399,12 +446,16 @@ class Parser(object):
             if event == 'start':
                 if tag == 'clade':
                     clade.clades.append(self._parse_clade(elem))
+                    # All children so far are finished; drop them
+                    del parent[:]
                     continue
                 if tag == 'taxonomy':
                     clade.taxonomies.append(self._parse_taxonomy(elem))
+                    del parent[:]
                     continue
                 if tag == 'sequence':
                     clade.sequences.append(self._parse_sequence(elem))
+                    del parent[:]
                     continue
                 if tag in self._clade_tracked_tags:
                     tag_stack.append(tag)
@@ -7,11 +7,20 @@
 
 import itertools
 import copy
+
+try:
+    import numpy
+except ImportError:
+    # Without NumPy, the pure Python implementations are used
+    numpy = None
+
+from Bio import MissingPythonDependencyError
 from Bio.Phylo import BaseTree
 from Bio.Align import MultipleSeqAlignment
 from Bio.SubsMat import MatrixInfo
 from Bio import _py3k
 from Bio._py3k import zip, range
+from Bio._utils import _BLOCK_ELEMENTS
 
 
 def _is_numeric(x):
@@ -89,14 +98,7 @@ class _Matrix(object):
         Arguments are a list of names, and optionally a list of lower
         triangular matrix data (zero matrix used by default).
         """
-        # check names
-        if isinstance(names, list) and all(isinstance(s, str) for s in names):
-            if len(set(names)) == len(names):
-                self.names = names
-            else:
-                raise ValueError("Duplicate names found")
-        else:
-            raise TypeError("'names' should be a list of strings")
+        self._set_names(names)
 
         # check matrix
         if matrix is None:
@@ -123,6 +125,16 @@ class _Matrix(object):
             else:
                 raise TypeError("'matrix' should be a list of numerical lists")
 
+    def _set_names(self, names):
+        """Check and set the list of names (PRIVATE)."""
+        if isinstance(names, list) and all(isinstance(s, str) for s in names):
+            if len(set(names)) == len(names):
+                self.names = names
+            else:
+                raise ValueError("Duplicate names found")
+        else:
+            raise TypeError("'names' should be a list of strings")
+
     def __getitem__(self, item):
         """Access value(s) by the index(s) or name(s).
 
@@ -304,10 +316,39 @@ class DistanceMatrix(_Matrix):
     """Distance matrix class that can be used for distance based tree algorithms.
 
     All diagonal elements will be zero no matter what the users provide.
+
+    Besides a lower triangular list of lists, the matrix can be given as a
+    square NumPy array, and it can be retrieved as one using the to_array
+    method:
+
+    >>> import numpy
+    >>> from Bio.Phylo.TreeConstruction import DistanceMatrix
+    >>> names = ['Alpha', 'Beta', 'Gamma']
+    >>> dm = DistanceMatrix(names, [[0], [1, 0], [2, 3, 0]])
+    >>> dm['Beta', 'Gamma']
+    3
+    >>> print(dm.to_array())
+    [[0 1 2]
+     [1 0 3]
+     [2 3 0]]
+    >>> dm = DistanceMatrix(names, numpy.array([[0, 0.5, 1.0],
+    ...                                         [0.5, 0, 1.5],
+    ...                                         [1.0, 1.5, 0]]))
+    >>> dm
+    DistanceMatrix(names=['Alpha', 'Beta', 'Gamma'], matrix=[[0], [0.5, 0], [1.0, 1.5, 0]])
+
     """
 
     def __init__(self, names, matrix=None):
         """Initialize the class."""
+        if numpy is not None and isinstance(matrix, numpy.ndarray):
+            if matrix.shape != (len(names), len(names)):
+                raise ValueError(
+                    "'names' and 'matrix' should be the same size")
+            if not (numpy.issubdtype(matrix.dtype, numpy.number) and
+                    not numpy.issubdtype(matrix.dtype, numpy.bool_)):
+                raise TypeError("'matrix' should be a numerical array")
+            matrix = [row[:i + 1] for i, row in enumerate(matrix.tolist())]
         _Matrix.__init__(self, names, matrix)
         self._set_zero_diagonal()
 
@@ -320,6 +361,21 @@ class DistanceMatrix(_Matrix):
         for i in range(0, len(self)):
             self.matrix[i][i] = 0
 
+    def to_array(self):
+        """Return the distances as a square symmetric NumPy array."""
+        if numpy is None:
+            raise MissingPythonDependencyError(
+                "Install NumPy if you want to use DistanceMatrix.to_array.")
+        size = len(self)
+        # The leading zero gives an integer array for an empty matrix
+        values = numpy.array([0] + [value for row in self.matrix
+                                    for value in row[:-1]])
+        array = numpy.zeros((size, size), dtype=values.dtype)
+        lower = numpy.tril_indices(size, -1)
+        array[lower] = values[1:]
+        array.T[lower] = values[1:]
+        return array
+
     def format_phylip(self, handle):
         """Write data in Phylip format to a given file-like object or handle.
 
@@ -352,20 +408,88 @@ class DistanceMatrix(_Matrix):
 _DistanceMatrix = DistanceMatrix
 
 
+def _encode_alignment(msa):
+    """Return the letters of an alignment as a 2D array of bytes (PRIVATE)."""
+    rows = [str(record.seq).encode("ascii") for record in msa]
+    return numpy.frombuffer(b"".join(rows), dtype=numpy.uint8).reshape(
+        len(rows), msa.get_alignment_length())
+
+
+def _pair_sums(codes, weights, start=0, end=None):
+    """Sum weights over the columns of all pairs of encoded sequences (PRIVATE).
+
+    Arguments:
+     - codes - (number of sequences, number of columns) integer array of
+       letter indices, with the number of letters k for letters to ignore.
+     - weights - (m, k, k) array of m weight matrices.
+     - start, end - the range of alignment columns to use.
+
+    Element [w, i, j] of the returned (m, n, n) array is the sum over
+    the columns of weights[w, codes[i, c], codes[j, c]], skipping columns
+    where either letter is ignored. The columns are processed in blocks
+    of one-hot encoded letters, so that the sums are calculated by matrix
+    multiplications while bounding the memory used.
+    """
+    if end is None:
+        end = codes.shape[1]
+    n = len(codes)
+    k = weights.shape[1]
+    sums = numpy.zeros((len(weights), n, n))
+    one_hot = numpy.eye(k + 1)[:, :k]
+    block = max(1, _BLOCK_ELEMENTS // (n * k))
+    for first in range(start, end, block):
+        letters = one_hot[codes[:, first:min(first + block, end)]]
+        flat = letters.reshape(n, -1)
+        for w, weight in enumerate(weights):
+            weighted = numpy.dot(letters, weight).reshape(n, -1)
+            sums[w] += numpy.dot(weighted, flat.T)
+    return sums
+
+
+def _init_pool(codes, weights):
+    """Share the encoded alignment with a worker process (PRIVATE)."""
+    global _pool_codes, _pool_weights
+    _pool_codes = codes
+    _pool_weights = weights
+
+
+def _pool_pair_sums(bounds):
+    """Calculate _pair_sums for some columns in a worker process (PRIVATE)."""
+    start, end = bounds
+    return _pair_sums(_pool_codes, _pool_weights, start, end)
+
+
 class DistanceCalculator(object):
     """Class to calculate the distance matrix from a DNA or Protein.
 
     Multiple Sequence Alignment(MSA) and the given name of the
     substitution model.
 
-    Currently only scoring matrices are used.
+    The distance is either one minus the fraction of identical letters
+    ('identity'), one minus the alignment score relative to the score of
+    identical sequences (scoring matrices), or an estimate of the number of
+    substitutions per site ('p-distance', 'jukes-cantor' and 'kimura').
+
+    If NumPy is installed, the alignment is encoded once as an array of
+    letter indices, and all pairwise distances are calculated at once, in
+    blocks of columns to bound the memory used. Otherwise the distances
+    are calculated one pair of sequences at a time, and the models for the
+    number of substitutions per site are not available.
 
     :Parameters:
         model : str
             Name of the model matrix to be used to calculate distance.
             The attribute `dna_matrices` contains the available model
             names for DNA sequences and `protein_matrices` for protein
-            sequences.
+            sequences. The attribute `evolution_models` contains the names
+            of the models for the number of substitutions per site:
+            'p-distance' (the fraction of differing letters, any alphabet),
+            'jukes-cantor' and 'kimura' (the Kimura 2-parameter model), the
+            latter two for nucleotide sequences only. These ignore letter
+            case and skip sites with a gap (or other skipped letter) in
+            either sequence, and for 'jukes-cantor' and 'kimura' also sites
+            with ambiguous nucleotides. Distances which cannot be estimated
+            because the sequences are too different are infinite.
 
     Examples
     --------
@@ -432,7 +556,9 @@ class DistanceCalculator(object):
 
     dna_models = list(dna_matrices.keys())
 
-    models = ['identity'] + dna_models + protein_models
+    evolution_models = ['p-distance', 'jukes-cantor', 'kimura']
+
+    models = ['identity'] + dna_models + protein_models + evolution_models
 
     def __init__(self, model='identity', skip_letters=None):
         """Initialize with a distance model."""
@@ -444,7 +570,8 @@ class DistanceCalculator(object):
         else:
             self.skip_letters = ('-', '*')
 
-        if model == 'identity':
+        self.model = model
+        if model == 'identity' or model in self.evolution_models:
             self.scoring_matrix = None
         elif model in self.dna_models:
             self.scoring_matrix = _Matrix(self.dna_alphabet,
@@ -493,22 +620,154 @@ class DistanceCalculator(object):
             return 1  # max possible scaled distance
         return 1 - (score * 1.0 / max_score)
 
-    def get_distance(self, msa):
+    def get_distance(self, msa, processes=None):
         """Return a DistanceMatrix for MSA object.
 
         :Parameters:
             msa : MultipleSeqAlignment
                 DNA or Protein multiple sequence alignment.
+            processes : int
+                Number of worker processes to spread the alignment columns
+                over using the multiprocessing module (default None,
+                calculate in this process). Only used with NumPy.
 
         """
         if not isinstance(msa, MultipleSeqAlignment):
             raise TypeError("Must provide a MultipleSeqAlignment object.")
 
         names = [s.id for s in msa]
-        dm = DistanceMatrix(names)
-        for seq1, seq2 in itertools.combinations(msa, 2):
-            dm[seq1.id, seq2.id] = self._pairwise(seq1, seq2)
-        return dm
+        if numpy is None:
+            if self.model in self.evolution_models:
+                raise MissingPythonDependencyError(
+                    "Install NumPy if you want to use the %r model."
+                    % self.model)
+            dm = DistanceMatrix(names)
+            for seq1, seq2 in itertools.combinations(msa, 2):
+                dm[seq1.id, seq2.id] = self._pairwise(seq1, seq2)
+            return dm
+        letters = _encode_alignment(msa)
+        if self.model in self.evolution_models:
+            distances = self._model_distances(letters, processes)
+        elif self.scoring_matrix:
+            distances = self._scoring_distances(msa, letters, processes)
+        else:
+            distances = self._identity_distances(letters, processes)
+        return DistanceMatrix(names, distances)
+
+    def _sums(self, codes, weights, processes):
+        """Sum weights over the columns of all pairs of sequences (PRIVATE).
+
+        See _pair_sums, this optionally spreads the columns over several
+        worker processes.
+        """
+        weights = numpy.asarray(weights, dtype=float)
+        length = codes.shape[1]
+        if processes is None or processes < 2 or length == 0:
+            return _pair_sums(codes, weights)
+        import multiprocessing
+        chunk = -(-length // processes)
+        bounds = [(start, min(start + chunk, length))
+                  for start in range(0, length, chunk)]
+        pool = multiprocessing.Pool(processes, _init_pool, (codes, weights))
+        try:
+            return sum(pool.imap(_pool_pair_sums, bounds))
+        finally:
+            pool.close()
+            pool.join()
+
+    def _letter_codes(self, letters, alphabet, skip=()):
+        """Map the alignment bytes to indices in an alphabet (PRIVATE).
+
+        Letters in skip become len(alphabet), other letters which are not
+        in the alphabet become -1.
+        """
+        table = numpy.full(256, -1, dtype=int)
+        for index, letter in enumerate(alphabet):
+            table[ord(letter)] = index
+        for letter in skip:
+            if len(letter) == 1:
+                table[ord(letter)] = len(alphabet)
+        return table[letters]
+
+    def _identity_distances(self, letters, processes):
+        """Distances by character identity (PRIVATE)."""
+        length = letters.shape[1]
+        alphabet = [chr(c) for c in numpy.unique(letters)]
+        alphabet = [l for l in alphabet if l not in self.skip_letters]
+        codes = self._letter_codes(letters, alphabet, self.skip_letters)
+        if length == 0:
+            return numpy.ones((len(codes), len(codes)))
+        # Score by character identity, not skipping any special letters
+        identical = self._sums(codes, [numpy.eye(len(alphabet))], processes)[0]
+        return 1 - identical / length
+
+    def _scoring_distances(self, msa, letters, processes):
+        """Distances from the scoring matrix (PRIVATE)."""
+        alphabet = self.scoring_matrix.names
+        size = len(alphabet)
+        codes = self._letter_codes(letters, alphabet, self.skip_letters)
+        bad = numpy.argwhere(codes < 0)
+        if len(bad):
+            # Only an error where compared with a letter in another sequence
+            compared = (codes != size).sum(axis=0)
+            for seq_index, column in bad:
+                if compared[column] > 1:
+                    raise ValueError("Bad alphabet '%s' in sequence '%s' at "
+                                     "position '%s'"
+                                     % (chr(letters[seq_index, column]),
+                                        msa[int(seq_index)].id, column))
+            codes[codes < 0] = size
+        scores = numpy.array([self.scoring_matrix[i] for i in range(size)],
+                             dtype=float)
+        # Self scores of the first sequence where the second is not skipped
+        self_scores = numpy.repeat(numpy.diag(scores)[:, None], size, axis=1)
+        score, max_score = self._sums(codes, [scores, self_scores], processes)
+        # Take the higher score if the matrix is asymmetrical
+        max_score = numpy.maximum(max_score, max_score.T)
+        with numpy.errstate(divide="ignore", invalid="ignore"):
+            distances = 1 - score / max_score
+        # max possible scaled distance
+        distances[max_score == 0] = 1
+        return distances
+
+    def _model_distances(self, letters, processes):
+        """Distances as substitutions per site (PRIVATE)."""
+        # Ignore case
+        letters = numpy.where((letters >= 97) & (letters <= 122),
+                              letters - 32, letters)
+        if self.model == "p-distance":
+            alphabet = [chr(c) for c in numpy.unique(letters)]
+            alphabet = [l for l in alphabet if l not in self.skip_letters]
+            codes = self._letter_codes(letters, alphabet, self.skip_letters)
+        else:
+            alphabet = "ACGT"
+            codes = self._letter_codes(letters, alphabet + "U")
+            codes[codes == 4] = alphabet.index("T")
+            codes[codes < 0] = len(alphabet)
+        size = len(alphabet)
+        # Transitions are A <-> G and C <-> T substitutions
+        transitions = numpy.zeros((size, size))
+        if self.model == "kimura":
+            for a, b in ("AG", "GA", "CT", "TC"):
+                transitions[alphabet.index(a), alphabet.index(b)] = 1
+        compared, identical, transition = self._sums(
+            codes, [numpy.ones((size, size)), numpy.eye(size), transitions],
+            processes)
+        with numpy.errstate(divide="ignore", invalid="ignore"):
+            p = (compared - identical) / compared
+            if self.model == "p-distance":
+                p[compared == 0] = 1
+                return p
+            elif self.model == "jukes-cantor":
+                distances = -0.75 * numpy.log(1 - 4 * p / 3)
+            else:
+                transition /= compared
+                transversion = p - transition
+                distances = (-0.5 * numpy.log(1 - 2 * transition - transversion) -
+                             0.25 * numpy.log(1 - 2 * transversion))
+        # Too many differences to estimate the distance
+        distances[numpy.isnan(distances)] = numpy.inf
+        return distances
 
     def _build_protein_matrix(self, subsmat):
         """Convert matrix from SubsMat format to _Matrix object (PRIVATE)."""
@@ -519,6 +778,52 @@ class DistanceCalculator(object):
         return protein_matrix
 
 
+def _last_lower_argmin(matrix):
+    """Return the position of the minimum of a symmetric array (PRIVATE).
+
+    The diagonal should be infinite. Returns the (row, column) pair in the
+    lower triangle, the last one in row-major order in case of ties.
+    """
+    hits = numpy.flatnonzero(matrix == matrix.min())
+    rows, cols = divmod(hits, len(matrix))
+    # Positions in the upper triangle are mirrored to the lower triangle
+    return max(zip(numpy.maximum(rows, cols).tolist(),
+                   numpy.minimum(rows, cols).tolist()))
+
+
+def _nj_small_pair(matrix):
+    """Find the pair of nodes to join for a small NJ matrix (PRIVATE).
+
+    Returns the node distances (row sums divided by the number of nodes
+    minus two) and the indices of the pair to join, calculated one value
+    at a time in Python.
+    """
+    rows = matrix.tolist()
+    size = len(rows)
+    node_dist = [sum(row) / (size - 2) for row in rows]
+    min_dist = rows[1][0] - node_dist[1] - node_dist[0]
+    min_i = 0
+    min_j = 1
+    for i in range(1, size):
+        for j in range(0, i):
+            temp = rows[i][j] - node_dist[i] - node_dist[j]
+            if min_dist > temp:
+                min_dist = temp
+                min_i = i
+                min_j = j
+    return node_dist, min_i, min_j
+
+
+def _delete_row(matrix, index, size):
+    """Remove a row and column from the top left part of an array (PRIVATE).
+
+    The rows and columns after index in the size by size top left part of
+    the square array are moved up and left by one, in place.
+    """
+    matrix[index:size - 1, :size] = matrix[index + 1:size, :size]
+    matrix[:size - 1, index:size - 1] = matrix[:size - 1, index + 1:size]
+
+
 class TreeConstructor(object):
     """Base class for all tree constructor."""
 
@@ -616,7 +921,151 @@ class DistanceTreeConstructor(TreeConstructor):
         """
         if not isinstance(distance_matrix, DistanceMatrix):
             raise TypeError("Must provide a DistanceMatrix object.")
+        if numpy is None:
+            return self._upgma_python(distance_matrix)
+
+        # work on an array copy of the distance matrix, with an infinite
+        # diagonal so it is not found as the minimum distance
+        dm = numpy.array(distance_matrix.to_array(), dtype=float)
+        size = len(dm)
+        dm.flat[::size + 1] = numpy.inf
+        # init terminal clades, and the height of each clade (the longest
+        # terminal branch length below it)
+        clades = [BaseTree.Clade(None, name) for name in distance_matrix.names]
+        heights = [0] * size
+        inner_count = 0
+        while size > 1:
+            # find minimum index, the last one in case of ties
+            min_i, min_j = _last_lower_argmin(dm[:size, :size])
+            min_dist = dm[min_i, min_j]
 
+            # create clade
+            clade1 = clades[min_i]
+            clade2 = clades[min_j]
+            inner_count += 1
+            inner_clade = BaseTree.Clade(None, "Inner" + str(inner_count))
+            inner_clade.clades.append(clade1)
+            inner_clade.clades.append(clade2)
+            # assign branch length
+            if clade1.is_terminal():
+                clade1.branch_length = min_dist * 1.0 / 2
+                height1 = clade1.branch_length
+            else:
+                clade1.branch_length = min_dist * 1.0 / 2 - heights[min_i]
+                height1 = heights[min_i]
+
+            if clade2.is_terminal():
+                clade2.branch_length = min_dist * 1.0 / 2
+                height2 = clade2.branch_length
+            else:
+                clade2.branch_length = min_dist * 1.0 / 2 - heights[min_j]
+                height2 = heights[min_j]
+
+            # update node list
+            clades[min_j] = inner_clade
+            heights[min_j] = max(height1, height2)
+            del clades[min_i]
+            del heights[min_i]
+
+            # set the distances of new node at the index of min_j
+            merged = (dm[min_i, :size] + dm[min_j, :size]) * 1.0 / 2
+            dm[min_j, :size] = merged
+            dm[:size, min_j] = merged
+            _delete_row(dm, min_i, size)
+            size -= 1
+        inner_clade.branch_length = 0
+        return BaseTree.Tree(inner_clade)
+
+    def nj(self, distance_matrix):
+        """Construct and return a Neighbor Joining tree.
+
+        :Parameters:
+            distance_matrix : DistanceMatrix
+                The distance matrix for tree construction.
+
+        """
+        if not isinstance(distance_matrix, DistanceMatrix):
+            raise TypeError("Must provide a DistanceMatrix object.")
+        if numpy is None:
+            return self._nj_python(distance_matrix)
+
+        # work on an array copy of the distance matrix
+        dm = numpy.array(distance_matrix.to_array(), dtype=float)
+        size = len(dm)
+        # init terminal clades
+        clades = [BaseTree.Clade(None, name) for name in distance_matrix.names]
+        # the row sums are updated as nodes are joined
+        row_sums = dm.sum(axis=1)
+        # buffer for the values to minimize, only the lower triangle is
+        # searched (the upper triangle and diagonal are masked)
+        values = numpy.empty(dm.size)
+        upper = ~numpy.tri(size, k=-1, dtype=bool)
+        inner_clade = None
+        inner_count = 0
+        while size > 2:
+            if size <= 4:
+                # With three nodes every pair ties, and with four nodes each
+                # pair ties with its complement, so which pair is picked
+                # depends on rounding; keep the arithmetic and tie breaking
+                # of the pure Python implementation of earlier versions
+                node_dist, min_i, min_j = _nj_small_pair(dm[:size, :size])
+            else:
+                # calculate nodeDist
+                node_dist = row_sums[:size] / (size - 2)
+                # find minimum distance pair, the first one in case of ties
+                temp = values[:size * size].reshape(size, size)
+                numpy.subtract(dm[:size, :size], node_dist[:, None], out=temp)
+                temp -= node_dist
+                numpy.copyto(temp, numpy.inf, where=upper[:size, :size])
+                min_i, min_j = divmod(int(numpy.argmin(temp)), size)
+                if (min_i, min_j) == (1, 0):
+                    min_i, min_j = 0, 1
+            # create clade
+            clade1 = clades[min_i]
+            clade2 = clades[min_j]
+            inner_count += 1
+            inner_clade = BaseTree.Clade(None, "Inner" + str(inner_count))
+            inner_clade.clades.append(clade1)
+            inner_clade.clades.append(clade2)
+            # assign branch length
+            clade1.branch_length = (dm[min_i, min_j] + node_dist[min_i] -
+                                    node_dist[min_j]) / 2.0
+            clade2.branch_length = dm[min_i, min_j] - clade1.branch_length
+
+            # update node list
+            clades[min_j] = inner_clade
+            del clades[min_i]
+
+            # set the distances of new node at the index of min_j
+            merged = (dm[min_i, :size] + dm[min_j, :size] -
+                      dm[min_i, min_j]) / 2.0
+            merged[min_i] = 0
+            merged[min_j] = 0
+            row_sums[:size] += merged - dm[min_i, :size] - dm[min_j, :size]
+            row_sums[min_j] = merged.sum()
+            dm[min_j, :size] = merged
+            dm[:size, min_j] = merged
+            _delete_row(dm, min_i, size)
+            row_sums[min_i:size - 1] = row_sums[min_i + 1:size]
+            size -= 1
+
+        # set the last clade as one of the child of the inner_clade
+        root = None
+        if clades[0] == inner_clade:
+            clades[0].branch_length = 0
+            clades[1].branch_length = dm[1, 0]
+            clades[0].clades.append(clades[1])
+            root = clades[0]
+        else:
+            clades[0].branch_length = dm[1, 0]
+            clades[1].branch_length = 0
+            clades[1].clades.append(clades[0])
+            root = clades[1]
+
+        return BaseTree.Tree(root, rooted=False)
+
+    def _upgma_python(self, distance_matrix):
+        """Construct an UPGMA tree without NumPy (PRIVATE)."""
         # make a copy of the distance matrix to be used
         dm = copy.deepcopy(distance_matrix)
         # init terminal clades
@@ -671,17 +1120,8 @@ class DistanceTreeConstructor(TreeConstructor):
         inner_clade.branch_length = 0
         return BaseTree.Tree(inner_clade)
 
-    def nj(self, distance_matrix):
-        """Construct and return a Neighbor Joining tree.
-
-        :Parameters:
-            distance_matrix : DistanceMatrix
-                The distance matrix for tree construction.
-
-        """
-        if not isinstance(distance_matrix, DistanceMatrix):
-            raise TypeError("Must provide a DistanceMatrix object.")
-
+    def _nj_python(self, distance_matrix):
+        """Construct a Neighbor Joining tree without NumPy (PRIVATE)."""
         # make a copy of the distance matrix to be used
         dm = copy.deepcopy(distance_matrix)
         # init terminal clades
@@ -818,6 +1258,8 @@ class NNITreeSearcher(TreeSearcher):
 
     def _nni(self, starting_tree, alignment):
         """Search for the best parsimony tree using the NNI algorithm."""
+        if numpy is not None and isinstance(self.scorer, ParsimonyScorer):
+            return self._parsimony_nni(starting_tree, alignment)
         best_tree = starting_tree
         while True:
             best_score = self.scorer.get_score(best_tree, alignment)
@@ -832,22 +1274,58 @@ class NNITreeSearcher(TreeSearcher):
                 break
         return best_tree
 
-    def _get_neighbors(self, tree):
-        """Get all neighbor trees of the given tree.
+    def _parsimony_nni(self, starting_tree, alignment):
+        """Search for the best parsimony tree using the NNI algorithm (PRIVATE).
+
+        Like _nni, but each neighbor tree is scored by rescoring only the
+        clades changed by the NNI move, and only the best neighbor tree is
+        copied.
+        """
+        scorer = self.scorer
+        best_tree = starting_tree
+        while True:
+            states, costs, weights, steps = scorer._get_clade_states(
+                best_tree, alignment)
+            best_score = scorer._get_total(best_tree.root, states, costs,
+                                           weights)
+            temp = best_score
+            parents = dict((child, clade)
+                           for clade in best_tree.find_clades()
+                           for child in clade.clades)
+            best_move = None
+            for move in self._get_nni_moves(best_tree):
+                # the swapped clades, their parent and all its ancestors
+                changed = [move[0], move[2]]
+                while changed[-1] in parents:
+                    changed.append(parents[changed[-1]])
+                self._swap(move)
+                score = scorer._rescore(changed, states, costs, weights,
+                                        steps)
+                self._swap(move)
+                if score < best_score:
+                    best_score = score
+                    best_move = move
+            # stop if no smaller score exist
+            if best_score >= temp:
+                break
+            self._swap(best_move)
+            tree = copy.deepcopy(best_tree)
+            self._swap(best_move)
+            best_tree = tree
+        return best_tree
+
+    def _get_nni_moves(self, tree):
+        """Get the NNI moves giving the neighbor trees of the given tree (PRIVATE).
 
+        Each move is a (clade1, index1, clade2, index2) tuple, meaning
+        clade1.clades[index1] and clade2.clades[index2] are swapped. The
+        moves are in the same order as the trees from _get_neighbors.
         Currently only for binary rooted trees.
         """
         # make child to parent dict
-        parents = {}
-        for clade in tree.find_clades():
-            if clade != tree.root:
-                node_path = tree.get_path(clade)
-                # cannot get the parent if the parent is root. Bug?
-                if len(node_path) == 1:
-                    parents[clade] = tree.root
-                else:
-                    parents[clade] = node_path[-2]
-        neighbors = []
+        parents = dict((child, clade) for clade in tree.find_clades()
+                       for child in clade.clades)
+        moves = []
         root_childs = []
         for clade in tree.get_nonterminals(order="level"):
             if clade == tree.root:
@@ -856,81 +1334,43 @@ class NNITreeSearcher(TreeSearcher):
                 root_childs.append(left)
                 root_childs.append(right)
                 if not left.is_terminal() and not right.is_terminal():
-                    # make changes around the left_left clade
-                    # left_left = left.clades[0]
-                    left_right = left.clades[1]
-                    right_left = right.clades[0]
-                    right_right = right.clades[1]
-                    # neightbor 1 (left_left + right_right)
-                    del left.clades[1]
-                    del right.clades[1]
-                    left.clades.append(right_right)
-                    right.clades.append(left_right)
-                    temp_tree = copy.deepcopy(tree)
-                    neighbors.append(temp_tree)
+                    # neighbor 1 (left_left + right_right)
+                    moves.append((left, 1, right, 1))
                     # neighbor 2 (left_left + right_left)
-                    del left.clades[1]
-                    del right.clades[0]
-                    left.clades.append(right_left)
-                    right.clades.append(right_right)
-                    temp_tree = copy.deepcopy(tree)
-                    neighbors.append(temp_tree)
-                    # change back (left_left + left_right)
-                    del left.clades[1]
-                    del right.clades[0]
-                    left.clades.append(left_right)
-                    right.clades.insert(0, right_left)
+                    moves.append((left, 1, right, 0))
             elif clade in root_childs:
                 # skip root child
                 continue
             else:
-                # method for other clades
                 # make changes around the parent clade
-                left = clade.clades[0]
-                right = clade.clades[1]
                 parent = parents[clade]
                 if clade == parent.clades[0]:
-                    sister = parent.clades[1]
-                    # neighbor 1 (parent + right)
-                    del parent.clades[1]
-                    del clade.clades[1]
-                    parent.clades.append(right)
-                    clade.clades.append(sister)
-                    temp_tree = copy.deepcopy(tree)
-                    neighbors.append(temp_tree)
-                    # neighbor 2 (parent + left)
-                    del parent.clades[1]
-                    del clade.clades[0]
-                    parent.clades.append(left)
-                    clade.clades.append(right)
-                    temp_tree = copy.deepcopy(tree)
-                    neighbors.append(temp_tree)
-                    # change back (parent + sister)
-                    del parent.clades[1]
-                    del clade.clades[0]
-                    parent.clades.append(sister)
-                    clade.clades.insert(0, left)
+                    sister = 1
                 else:
-                    sister = parent.clades[0]
-                    # neighbor 1 (parent + right)
-                    del parent.clades[0]
-                    del clade.clades[1]
-                    parent.clades.insert(0, right)
-                    clade.clades.append(sister)
-                    temp_tree = copy.deepcopy(tree)
-                    neighbors.append(temp_tree)
-                    # neighbor 2 (parent + left)
-                    del parent.clades[0]
-                    del clade.clades[0]
-                    parent.clades.insert(0, left)
-                    clade.clades.append(right)
-                    temp_tree = copy.deepcopy(tree)
-                    neighbors.append(temp_tree)
-                    # change back (parent + sister)
-                    del parent.clades[0]
-                    del clade.clades[0]
-                    parent.clades.insert(0, sister)
-                    clade.clades.insert(0, left)
+                    sister = 0
+                # neighbor 1 (parent + right)
+                moves.append((clade, 1, parent, sister))
+                # neighbor 2 (parent + left)
+                moves.append((clade, 0, parent, sister))
+        return moves
+
+    def _swap(self, move):
+        """Apply (or undo) an NNI move, see _get_nni_moves (PRIVATE)."""
+        clade1, index1, clade2, index2 = move
+        clade1.clades[index1], clade2.clades[index2] = \
+            clade2.clades[index2], clade1.clades[index1]
+
+    def _get_neighbors(self, tree):
+        """Get all neighbor trees of the given tree.
+
+        Currently only for binary rooted trees.
+        """
+        neighbors = []
+        for move in self._get_nni_moves(tree):
+            self._swap(move)
+            neighbors.append(copy.deepcopy(tree))
+            # change back
+            self._swap(move)
         return neighbors
 
 # ######################## Parsimony Classes ##########################
@@ -961,6 +1401,21 @@ class ParsimonyScorer(Scorer):
         Calculate and return the parsimony score given a tree and the
         MSA using either the Fitch algorithm (without a penalty matrix)
         or the Sankoff algorithm (with a matrix).
+
+        Identical alignment columns are scored only once, and the state
+        sets (Fitch) or scores (Sankoff) of all columns are calculated at
+        once for each clade using NumPy arrays.
+        """
+        if numpy is None:
+            return self._get_score_python(tree, alignment)
+        states, costs, weights, steps = self._get_clade_states(tree,
+                                                               alignment)
+        return self._get_total(tree.root, states, costs, weights)
+
+    def _get_score_python(self, tree, alignment):
+        """Calculate the parsimony score one column at a time (PRIVATE).
+
+        Used when NumPy is not available.
         """
         # make sure the tree is rooted and bifurcating
         if not tree.is_bifurcating():
@@ -1038,6 +1493,124 @@ class ParsimonyScorer(Scorer):
             score = score + score_i
         return score
 
+    def _get_clade_states(self, tree, alignment):
+        """Calculate the states of all clades of a tree (PRIVATE).
+
+        Returns dictionaries mapping the clades to their state array and
+        the score of the clade (Fitch, or zero for Sankoff) for all
+        distinct informative alignment columns, the number of times each
+        of these columns occurs in the alignment and the penalty matrix
+        as an array (None for Fitch).
+        """
+        # make sure the tree is rooted and bifurcating
+        if not tree.is_bifurcating():
+            raise ValueError("The tree provided should be bifurcating.")
+        if not tree.rooted:
+            tree.root_at_midpoint()
+        # sort tree terminals and alignment
+        terms = tree.get_terminals()
+        terms.sort(key=lambda term: term.name)
+        alignment.sort()
+        if not all(t.name == a.id for t, a in zip(terms, alignment)):
+            raise ValueError(
+                "Taxon names of the input tree should be the same with the alignment.")
+        letters = _encode_alignment(alignment)
+        # skip non-informative columns, and score each distinct column once
+        informative = (letters != letters[:1]).any(axis=0)
+        # (viewing each column as a single value, as numpy.unique only
+        # supports the axis argument from NumPy 1.13 onwards)
+        columns = numpy.ascontiguousarray(letters[:, informative].T)
+        view = columns.view(numpy.dtype((numpy.void, len(terms))))
+        index, inverse = numpy.unique(view.ravel(), return_index=True,
+                                      return_inverse=True)[1:]
+        weights = numpy.bincount(inverse.ravel(), minlength=len(index))
+        patterns = columns[index].T
+        if not self.matrix:
+            # Fitch algorithm, each state set is a bit mask (using as many
+            # 64 bit words as needed for the letters used)
+            alphabet, codes = numpy.unique(patterns, return_inverse=True)
+            codes = codes.reshape(patterns.shape)
+            bits = numpy.zeros(patterns.shape + ((len(alphabet) + 63) // 64,),
+                               dtype=numpy.uint64)
+            rows, cols = numpy.indices(patterns.shape)
+            bits[rows, cols, codes // 64] = numpy.left_shift(
+                numpy.uint64(1), (codes % 64).astype(numpy.uint64))
+            term_states = bits
+            steps = None
+        else:
+            # Sankoff algorithm with the penalty matrix
+            alphabet = self.matrix.names
+            codes = numpy.full(256, -1, dtype=int)
+            for index, letter in enumerate(alphabet):
+                codes[ord(letter)] = index
+            codes = codes[patterns]
+            if (codes < 0).any():
+                letter = chr(patterns[codes < 0][0])
+                raise ValueError("%r is not in the scoring matrix" % letter)
+            term_states = numpy.full(patterns.shape + (len(alphabet),),
+                                     numpy.inf)
+            rows, cols = numpy.indices(patterns.shape)
+            term_states[rows, cols, codes] = 0
+            steps = numpy.array([self.matrix[i]
+                                 for i in range(len(alphabet))], dtype=float)
+        states = dict(zip(terms, term_states))
+        costs = dict.fromkeys(terms, 0)
+        # bottom up calculation
+        for clade in tree.get_nonterminals(order="postorder"):
+            left, right = clade.clades
+            states[clade], costs[clade] = self._join(states[left],
+                                                     states[right],
+                                                     weights, steps)
+        return states, costs, weights, steps
+
+    def _join(self, left, right, weights, steps):
+        """Calculate the state of a clade from its children (PRIVATE).
+
+        Returns the state array and the score of the clade.
+        """
+        if steps is None:
+            state = left & right
+            empty = ~state.any(axis=1)
+            state[empty] = left[empty] | right[empty]
+            return state, int(weights[empty].sum())
+        state = numpy.empty_like(left)
+        block = max(1, _BLOCK_ELEMENTS // steps.size)
+        for start in range(0, len(left), block):
+            end = start + block
+            state[start:end] = (
+                (steps + left[start:end, None, :]).min(axis=2) +
+                (steps + right[start:end, None, :]).min(axis=2))
+        return state, 0
+
+    def _get_total(self, root, states, costs, weights):
+        """Calculate the parsimony score from the clade states (PRIVATE)."""
+        if not self.matrix:
+            return sum(costs.values())
+        # minimum from root score
+        score = numpy.dot(weights, states[root].min(axis=1)).item()
+        if all(_py3k._is_int_or_long(value)
+               for row in self.matrix.matrix for value in row):
+            return int(score)
+        return score
+
+    def _rescore(self, clades, states, costs, weights, steps):
+        """Calculate the parsimony score after changing some clades (PRIVATE).
+
+        The clades must be given children first, all other clades are
+        unchanged from the given states and scores.
+        """
+        new_states = {}
+        new_costs = {}
+        for clade in clades:
+            left, right = [new_states[c] if c in new_states else states[c]
+                           for c in clade.clades]
+            new_states[clade], new_costs[clade] = self._join(left, right,
+                                                             weights, steps)
+        if not self.matrix:
+            return sum(costs.values()) + sum(new_costs[c] - costs[c]
+                                             for c in clades)
+        return self._get_total(clades[-1], new_states, new_costs, weights)
+
 
 class ParsimonyTreeConstructor(TreeConstructor):
     """Parsimony tree constructor.
@@ -13,6 +13,7 @@ from __future__ import print_function
 from Bio import File
 from Bio.Phylo import (
     BaseTree,
+    CompactTree,
     NewickIO,
     NexusIO,
     PhyloXMLIO,
@@ -74,7 +75,8 @@ def read(file, format, **kwargs):
 
 def write(trees, file, format, **kwargs):
     """Write a sequence of trees to file in the given format."""
-    if isinstance(trees, (BaseTree.Tree, BaseTree.Clade)):
+    if isinstance(trees, (BaseTree.Tree, BaseTree.Clade,
+                          CompactTree.CompactTree)):
         # Passed a single tree instead of an iterable -- that's OK
         trees = [trees]
     with File.as_handle(file, 'w+') as fp:
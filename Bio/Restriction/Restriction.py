@@ -91,6 +91,7 @@ from Bio._py3k import filter
 from Bio._py3k import range
 
 import re
+import sys
 import itertools
 
 from Bio.Seq import Seq, MutableSeq
@@ -256,11 +257,31 @@ class RestrictionType(type):
         # 2011/11/26 - Nobody knows what this call was supposed to accomplish,
         # but all unit tests seem to pass without it.
         # super(RestrictionType, cls).__init__(cls, name, bases, dct)
+
+    @property
+    def compsite(cls):
+        """Return the regular expression of the recognition site.
+
+        The regular expression is compiled when it is first used rather than
+        when the enzyme is created, as compiling the regular expressions of
+        all enzymes took most of the time of importing the module.
+        """
+        try:
+            return vars(cls)["_compiled_site"]
+        except KeyError:
+            pass
+        try:
+            site = vars(cls)["compsite"]
+        except KeyError:
+            # e.g. the enzyme types themselves, which have no site
+            raise AttributeError("%r has no attribute 'compsite'" % cls)
         try:
-            cls.compsite = re.compile(cls.compsite)
+            compiled = re.compile(site)
         except Exception:
             raise ValueError("Problem with regular expression, re.compiled(%s)"
-                             % repr(cls.compsite))
+                             % repr(site))
+        cls._compiled_site = compiled
+        return compiled
 
     def __add__(cls, other):
         """Add restriction enzyme to a RestrictionBatch().
@@ -278,6 +299,7 @@ class RestrictionType(type):
     def __div__(cls, other):
         """Override '/' operator to use as search method.
 
+        >>> from Bio.Restriction import EcoRI
         >>> EcoRI/Seq('GAATTC')
         [2]
         Returns RE.search(other).
@@ -287,6 +309,7 @@ class RestrictionType(type):
     def __rdiv__(cls, other):
         """Override division with reversed operands to use as search method.
 
+        >>> from Bio.Restriction import EcoRI
         >>> Seq('GAATTC')/EcoRI
         [2]
         Returns RE.search(other).
@@ -310,6 +333,7 @@ class RestrictionType(type):
     def __floordiv__(cls, other):
         """Override '//' operator to use as catalyse method.
 
+        >>> from Bio.Restriction import EcoRI
         >>> EcoRI//Seq('GAATTC')
         (Seq('G', Alphabet()), Seq('AATTC', Alphabet()))
         Returns RE.catalyse(other).
@@ -319,6 +343,7 @@ class RestrictionType(type):
     def __rfloordiv__(cls, other):
         """As __floordiv__, with reversed operands.
 
+        >>> from Bio.Restriction import EcoRI
         >>> Seq('GAATTC')//EcoRI
         (Seq('G', Alphabet()), Seq('AATTC', Alphabet()))
         Returns RE.catalyse(other).
@@ -362,6 +387,7 @@ class RestrictionType(type):
         All the other-> True
 
         WARNING - This is not the inverse of the __eq__ method
+        >>> from Bio.Restriction import SacI, SstI
         >>> SacI != SstI  # true isoschizomers
         False
         >>> SacI == SstI
@@ -379,6 +405,7 @@ class RestrictionType(type):
 
         neoschizomer : same recognition site, different restriction. -> True
         all the others :                                             -> False
+        >>> from Bio.Restriction import SmaI, XmaI
         >>> SmaI >> XmaI
         True
         """
@@ -393,6 +420,7 @@ class RestrictionType(type):
         """Override '%' operator to test for compatible overhangs.
 
         True if a and b have compatible overhang.
+        >>> from Bio.Restriction import SalI, XhoI
         >>> XhoI % SalI
         True
         """
@@ -407,6 +435,7 @@ class RestrictionType(type):
         Override '>='. a is greater or equal than b if the a site is longer
         than b site. If their site have the same length sort by alphabetical
         order of their names.
+        >>> from Bio.Restriction import EcoRI, EcoRV
         >>> EcoRI.size
         6
         >>> EcoRV.size
@@ -526,6 +555,7 @@ class AbstractCut(RestrictionType):
         else False.
 
         Equischizomer: same site, same position of restriction.
+        >>> from Bio.Restriction import SacI, SmaI, SstI, XmaI
         >>> SacI.is_equischizomer(SstI)
         True
         >>> SmaI.is_equischizomer(XmaI)
@@ -550,6 +580,7 @@ class AbstractCut(RestrictionType):
         True if other has the same recognition site, else False.
 
         Isoschizomer: same site.
+        >>> from Bio.Restriction import SacI, SmaI, SstI, XmaI
         >>> SacI.is_isoschizomer(SstI)
         True
         >>> SmaI.is_isoschizomer(XmaI)
@@ -568,7 +599,7 @@ class AbstractCut(RestrictionType):
         Equischizomer: same site, same position of restriction.
         """
         if not batch:
-            batch = AllEnzymes
+            batch = _all_enzymes()
         r = [x for x in batch if not cls != x]
         i = r.index(cls)
         del r[i]
@@ -585,7 +616,7 @@ class AbstractCut(RestrictionType):
         Neoschizomer: same site, different position of restriction.
         """
         if not batch:
-            batch = AllEnzymes
+            batch = _all_enzymes()
         r = sorted(x for x in batch if cls >> x)
         return r
 
@@ -597,7 +628,7 @@ class AbstractCut(RestrictionType):
         If batch is supplied it is used instead of the default AllEnzymes.
         """
         if not batch:
-            batch = AllEnzymes
+            batch = _all_enzymes()
         r = [x for x in batch if (cls >> x) or (not cls != x)]
         i = r.index(cls)
         del r[i]
@@ -902,14 +933,17 @@ class Palindromic(AbstractCut):
     """
 
     @classmethod
-    def _search(cls):
+    def _search(cls, siteloc=None):
         """Return a list of cutting sites of the enzyme in the sequence (PRIVATE).
 
         For internal use only.
 
-        Implement the search method for palindromic enzymes.
+        Implement the search method for palindromic enzymes. The sites can
+        be given as a list like the one returned by FormattedSeq.finditer
+        (see RestrictionBatch.search).
         """
-        siteloc = cls.dna.finditer(cls.compsite, cls.size)
+        if siteloc is None:
+            siteloc = cls.dna.finditer(cls.compsite, cls.size)
         cls.results = [r for s, g in siteloc for r in cls._modify(s)]
         if cls.results:
             cls._drop()
@@ -931,21 +965,24 @@ class NonPalindromic(AbstractCut):
     """
 
     @classmethod
-    def _search(cls):
+    def _search(cls, siteloc=None):
         """Return a list of cutting sites of the enzyme in the sequence (PRIVATE).
 
         For internal use only.
 
-        Implement the search method for non palindromic enzymes.
+        Implement the search method for non palindromic enzymes. The sites
+        can be given as a list like the one returned by FormattedSeq.finditer
+        (see RestrictionBatch.search).
         """
-        iterator = cls.dna.finditer(cls.compsite, cls.size)
+        if siteloc is None:
+            siteloc = cls.dna.finditer(cls.compsite, cls.size)
         cls.results = []
         modif = cls._modify
         revmodif = cls._rev_modify
         s = str(cls)
         cls.on_minus = []
 
-        for start, group in iterator:
+        for start, group in siteloc:
             if group(s):
                 cls.results += [r for r in modif(start)]
             else:
@@ -1169,8 +1206,8 @@ class Blunt(AbstractCut):
     def compatible_end(cls, batch=None):
         """List all enzymes that produce compatible ends for the enzyme."""
         if not batch:
-            batch = AllEnzymes
-        r = sorted(x for x in iter(AllEnzymes) if x.is_blunt())
+            batch = _all_enzymes()
+        r = sorted(x for x in iter(_all_enzymes()) if x.is_blunt())
         return r
 
     @staticmethod
@@ -1297,8 +1334,8 @@ class Ov5(AbstractCut):
     def compatible_end(cls, batch=None):
         """List all enzymes that produce compatible ends for the enzyme."""
         if not batch:
-            batch = AllEnzymes
-        r = sorted(x for x in iter(AllEnzymes) if x.is_5overhang() and
+            batch = _all_enzymes()
+        r = sorted(x for x in iter(_all_enzymes()) if x.is_5overhang() and
                    x % cls)
         return r
 
@@ -1429,8 +1466,8 @@ class Ov3(AbstractCut):
     def compatible_end(cls, batch=None):
         """List all enzymes that produce compatible ends for the enzyme."""
         if not batch:
-            batch = AllEnzymes
-        r = sorted(x for x in iter(AllEnzymes) if x.is_3overhang() and
+            batch = _all_enzymes()
+        r = sorted(x for x in iter(_all_enzymes()) if x.is_3overhang() and
                    x % cls)
         return r
 
@@ -1551,6 +1588,7 @@ class Defined(AbstractCut):
         represented as '^' and the cut on the (-) strand as '_'.
         ie:
 
+        >>> from Bio.Restriction import EcoRI, EcoRV, KpnI, SnaI
         >>> EcoRI.elucidate()   # 5' overhang
         'G^AATT_C'
         >>> KpnI.elucidate()    # 3' overhang
@@ -1724,6 +1762,7 @@ class Ambiguous(AbstractCut):
         represented as '^' and the cut on the (-) strand as '_'.
         ie:
 
+        >>> from Bio.Restriction import EcoRI, EcoRV, KpnI, SnaI
         >>> EcoRI.elucidate()   # 5' overhang
         'G^AATT_C'
         >>> KpnI.elucidate()    # 3' overhang
@@ -1891,6 +1930,7 @@ class NotDefined(AbstractCut):
         represented as '^' and the cut on the (-) strand as '_'.
         ie:
 
+        >>> from Bio.Restriction import EcoRI, EcoRV, KpnI, SnaI
         >>> EcoRI.elucidate()   # 5' overhang
         'G^AATT_C'
         >>> KpnI.elucidate()    # 3' overhang
@@ -1984,6 +2024,182 @@ class Not_available(AbstractCut):
 #                                                                             #
 ###############################################################################
 
+# A strand of the recognition site in the compsite attribute of an enzyme
+_site_part = re.compile(r"\(\?=\(\?P<\w+>([^()]*)\)\)$")
+# Maximum number of words the seed of a recognition site is expanded into
+_MAX_SEED_WORDS = 64
+
+
+def _site_classes(body):
+    """Return the letters matched at each position of a site (PRIVATE).
+
+    body is the regular expression of one strand of a recognition site, made
+    of letters, character classes such as [AG] and dots. Returns a list of
+    strings, with None for a dot (any letter), or None if the regular
+    expression is not of this form.
+    """
+    tokens = re.findall(r"\[[A-Z]+\]|\.|[A-Z]", body)
+    if "".join(tokens) != body:
+        return None
+    return [None if token == "." else token.strip("[]") for token in tokens]
+
+
+def _site_seed(classes):
+    """Return the start and end of the seed of a site (PRIVATE).
+
+    The seed is the longest part of the site without any dot which expands
+    into at most _MAX_SEED_WORDS words (with the fewest words on a tie).
+    Returns None if there is no such part.
+    """
+    best = None
+    for start in range(len(classes)):
+        words = 1
+        for end in range(start, len(classes)):
+            if classes[end] is None:
+                break
+            words *= len(classes[end])
+            if words > _MAX_SEED_WORDS:
+                break
+            key = (end + 1 - start, -words)
+            if best is None or key > best[0]:
+                best = (key, start, end + 1)
+    if best is None:
+        return None
+    return best[1:]
+
+
+class _SiteMatcher(object):
+    """Find the recognition sites of many enzymes in one pass (PRIVATE).
+
+    The seeds of the recognition sites of the enzymes (on both strands for
+    non palindromic enzymes) are expanded into words, which are all looked
+    up in a single pass over the sequence with an Aho-Corasick automaton.
+    Where the seed is only part of the site, the site is then checked with a
+    regular expression at the position of each seed found. This gives the
+    same sites as the compsite regular expression of each enzyme.
+
+    Enzymes with a compsite which is not of the usual form are searched
+    with their own search method.
+    """
+
+    def __init__(self, enzymes):
+        """Build the automaton for the given enzymes."""
+        self.enzymes = frozenset(enzymes)
+        self._searched = []
+        self._others = []
+        goto = [{}]
+        outputs = [[]]
+        for enzyme in sorted(self.enzymes, key=str):
+            parts = []
+            for part in enzyme.compsite.pattern.split("|"):
+                match = _site_part.match(part)
+                classes = match and _site_classes(match.group(1))
+                seed = classes and _site_seed(classes)
+                if not seed:
+                    break
+                parts.append((match.group(1), classes, seed))
+            if len(parts) != len(enzyme.compsite.pattern.split("|")) or \
+                    len(parts) > 2:
+                self._others.append(enzyme)
+                continue
+            for strand, (body, classes, (start, end)) in enumerate(parts):
+                # The enzyme number, whether this is the forward strand, the
+                # length of the site, a regular expression to check the site
+                # (None if the seed is the whole site) and the position of
+                # the last letter of the seed in the site
+                if start == 0 and end == len(classes):
+                    check = None
+                else:
+                    check = re.compile(body)
+                pattern = (len(self._searched), strand == 0, len(classes),
+                           check, end - 1)
+                for word in itertools.product(*classes[start:end]):
+                    state = 0
+                    for letter in word:
+                        following = goto[state].get(letter)
+                        if following is None:
+                            following = len(goto)
+                            goto[state][letter] = following
+                            goto.append({})
+                            outputs.append([])
+                        state = following
+                    outputs[state].append(pattern)
+            self._searched.append(enzyme)
+        # Turn the trie into a deterministic automaton, in which any letter
+        # other than A, C, G and T (replaced by N) returns to the root
+        fail = [0] * len(goto)
+        queue = [0]
+        for state in queue:
+            for letter in "ACGTN":
+                following = goto[state].get(letter)
+                if following is None:
+                    goto[state][letter] = goto[fail[state]][letter] \
+                        if state else 0
+                else:
+                    if state:
+                        fail[following] = goto[fail[state]][letter]
+                    outputs[following] += outputs[fail[following]]
+                    queue.append(following)
+        self._goto = goto
+        self._outputs = [tuple(output) or None for output in outputs]
+        self._groups = [({str(enzyme): True}.get, {}.get)
+                        for enzyme in self._searched]
+
+    def finditer(self, dna):
+        """Return the sites of each enzyme, like FormattedSeq.finditer.
+
+        Returns a list with a list of (location, group) tuples for each
+        enzyme searched by the automaton. The group functions only tell
+        whether the site was found on the forward strand.
+        """
+        data = dna.data
+        if dna.is_linear():
+            limits = [len(data)] * len(self._searched)
+        else:
+            # As in FormattedSeq.finditer, the sequence is extended by the
+            # size of the site of each enzyme minus one
+            size = max([enzyme.size for enzyme in self._searched] or [1])
+            limits = [len(data) + max(0, min(enzyme.size, len(data)) - 1)
+                      for enzyme in self._searched]
+            data = data + data[1:size]
+        text = re.sub("[^ACGT]", "N", data)
+        goto = self._goto
+        outputs = self._outputs
+        found = []
+        state = 0
+        for end, letter in enumerate(text):
+            state = goto[state][letter]
+            if outputs[state]:
+                found.append((end, state))
+        strands = [{} for enzyme in self._searched]
+        for end, state in found:
+            for index, forward, length, check, offset in outputs[state]:
+                start = end - offset
+                limit = limits[index]
+                if start < 0 or start + length > limit:
+                    continue
+                if check is not None and not check.match(data, start, limit):
+                    continue
+                if forward:
+                    strands[index][start] = True
+                else:
+                    strands[index].setdefault(start, False)
+        sites = []
+        for (forward, reverse), starts in zip(self._groups, strands):
+            sites.append([(start, forward if starts[start] else reverse)
+                          for start in sorted(starts)])
+        return sites
+
+    def search(self, dna):
+        """Return a dictionary of the cutting sites of each enzyme."""
+        mapping = {}
+        for enzyme, siteloc in zip(self._searched, self.finditer(dna)):
+            enzyme.dna = dna
+            mapping[enzyme] = enzyme._search(siteloc)
+        for enzyme in self._others:
+            mapping[enzyme] = enzyme.search(dna)
+        return mapping
+
 
 class RestrictionBatch(set):
     """Class for operations on more than one enzyme."""
@@ -1991,7 +2207,8 @@ class RestrictionBatch(set):
     def __init__(self, first=(), suppliers=()):
         """Initialize empty RB or pre-fill with enzymes (from supplier)."""
         first = [self.format(x) for x in first]
-        first += [eval(x) for n in suppliers for x in suppliers_dict[n][1]]
+        first += [_get_enzyme(x) for n in suppliers
+                  for x in suppliers_dict[n][1]]
         set.__init__(self, first)
         self.mapping = dict.fromkeys(self)
         self.already_mapped = None
@@ -2076,7 +2293,7 @@ class RestrictionBatch(set):
         supplier = suppliers_dict[letter]
         self.suppliers.append(letter)
         for x in supplier[1]:
-            self.add_nocheck(eval(x))
+            self.add_nocheck(_get_enzyme(x))
         return
 
     def current_suppliers(self):
@@ -2138,6 +2355,8 @@ class RestrictionBatch(set):
         try:
             if isinstance(y, RestrictionType):
                 return y
+            elif str(y) in _enzyme_types:
+                return _get_enzyme(str(y))
             elif isinstance(eval(str(y)), RestrictionType):
                 return eval(y)
             else:
@@ -2151,7 +2370,7 @@ class RestrictionBatch(set):
 
         True if y or eval(y) is a RestrictionType.
         """
-        return (isinstance(y, RestrictionType) or
+        return (isinstance(y, RestrictionType) or str(y) in _enzyme_types or
                 isinstance(eval(str(y)), RestrictionType))
 
     def split(self, *classes, **bool):
@@ -2210,8 +2429,21 @@ class RestrictionBatch(set):
         print('\n'.join(supply))
         return
 
+    def _matcher(self):
+        """Return the site matcher for the enzymes of the batch (PRIVATE)."""
+        matcher = getattr(self, "_site_matcher", None)
+        if matcher is None or matcher.enzymes != self:
+            matcher = _SiteMatcher(self)
+            self._site_matcher = matcher
+        return matcher
+
     def search(self, dna, linear=True):
-        """Return a dic of cutting sites in the seq for the batch enzymes."""
+        """Return a dic of cutting sites in the seq for the batch enzymes.
+
+        The recognition sites of all the enzymes are found in a single pass
+        over the sequence, with the same results as the search method of
+        each enzyme.
+        """
         #
         #   here we replace the search method of the individual enzymes
         #   with one unique testing method.
@@ -2230,14 +2462,14 @@ class RestrictionBatch(set):
             else:
                 self.already_mapped = str(dna), linear
                 fseq = FormattedSeq(dna, linear)
-                self.mapping = dict((x, x.search(fseq)) for x in self)
+                self.mapping = self._matcher().search(fseq)
                 return self.mapping
         elif isinstance(dna, FormattedSeq):
             if (str(dna), dna.linear) == self.already_mapped:
                 return self.mapping
             else:
                 self.already_mapped = str(dna), dna.linear
-                self.mapping = dict((x, x.search(dna)) for x in self)
+                self.mapping = self._matcher().search(dna)
                 return self.mapping
         raise TypeError("Expected Seq or MutableSeq instance, got %s instead"
                         % type(dna))
@@ -2444,7 +2676,7 @@ class Analysis(RestrictionBatch, PrintFormat):
     def with_name(self, names, dct=None):
         """Return only results from enzymes which names are listed."""
         for i, enzyme in enumerate(names):
-            if enzyme not in AllEnzymes:
+            if enzyme not in _all_enzymes():
                 warnings.warn("no data for the enzyme: %s" % enzyme,
                               BiopythonWarning)
                 del names[i]
@@ -2561,9 +2793,9 @@ class Analysis(RestrictionBatch, PrintFormat):
 
 
 #
-#   The restriction enzyme classes are created dynamically when the module is
-#   imported. Here is the magic which allow the creation of the
-#   restriction-enzyme classes.
+#   The restriction enzyme classes are created dynamically from the
+#   dictionaries in Restriction_Dictionary. Here is the magic which allow the
+#   creation of the restriction-enzyme classes.
 #
 #   The reason for the two dictionaries in Restriction_Dictionary
 #   one for the types (which will be called pseudo-type as they really
@@ -2571,74 +2803,114 @@ class Analysis(RestrictionBatch, PrintFormat):
 #   and one for the enzymes is efficiency as the bases are evaluated
 #   once per pseudo-type.
 #
-#   However Restriction is still a very inefficient module at import. But
-#   remember that around 660 classes (which is more or less the size of Rebase)
-#   have to be created dynamically. However, this processing take place only
-#   once.
-#   This inefficiency is however largely compensated by the use of metaclass
-#   which provide a very efficient layout for the class themselves mostly
-#   alleviating the need of if/else loops in the class methods.
+#   Creating around 800 classes (which is more or less the size of Rebase)
+#   takes a noticeable time, so from Python 3.7 onwards (which allows modules
+#   to have a __getattr__ function) each enzyme is only created when it is
+#   first used, for example by "from Bio.Restriction import EcoRI". The
+#   batches AllEnzymes, CommOnly and NonComm create all the enzymes when they
+#   are first used. On older versions of Python all the enzymes are created
+#   when the module is imported.
+#
+#   The metaclass provides a very efficient layout for the class themselves
+#   mostly alleviating the need of if/else loops in the class methods.
 #
-#   It is essential to run Restriction with doc string optimisation (-OO
-#   switch) as the doc string of 660 classes take a lot of processing.
+#   The keys of typedict are the pseudo-types TYPE (stored as type1, type2...)
+#   The names are not important and are only present to differentiate
+#   the keys in the dict. All the pseudo-types are in fact RestrictionType.
+#   These names will not be used after and the pseudo-types are not
+#   kept in the locals() dictionary. It is therefore impossible to
+#   import them.
+#   Now, if you have look at the dictionary, you will see that not all the
+#   types are present as those without corresponding enzymes have been
+#   removed by Dictionary_Builder().
 #
-CommOnly = RestrictionBatch()    # commercial enzymes
-NonComm = RestrictionBatch()     # not available commercially
-for TYPE, (bases, enzymes) in typedict.items():
+#   The values are tuples which contain
+#   as first element a tuple of bases (as string) and
+#   as second element the names of the enzymes.
+#
+_enzyme_types = dict((name, TYPE) for TYPE, (bases, names) in typedict.items()
+                     for name in names)
+_pseudo_types = {}
+_batch_names = ('AllEnzymes', 'CommOnly', 'NonComm')
+
+
+def _get_enzyme(name):
+    """Return the enzyme with the given name, creating it if needed (PRIVATE)."""
+    try:
+        return globals()[name]
+    except KeyError:
+        pass
+    TYPE = _enzyme_types[name]
+    try:
+        T = _pseudo_types[TYPE]
+    except KeyError:
+        #
+        #   First eval the bases, then create the particular value of
+        #   RestrictionType for the enzymes of this pseudo-type.
+        #
+        bases = tuple(eval(x) for x in typedict[TYPE][0])
+        T = type.__new__(RestrictionType, 'RestrictionType', bases, {})
+        _pseudo_types[TYPE] = T
     #
-    #   The keys are the pseudo-types TYPE (stored as type1, type2...)
-    #   The names are not important and are only present to differentiate
-    #   the keys in the dict. All the pseudo-types are in fact RestrictionType.
-    #   These names will not be used after and the pseudo-types are not
-    #   kept in the locals() dictionary. It is therefore impossible to
-    #   import them.
-    #   Now, if you have look at the dictionary, you will see that not all the
-    #   types are present as those without corresponding enzymes have been
-    #   removed by Dictionary_Builder().
+    #   enzymedict[name] contains the values of the attributes for this
+    #   particular class (self.site, self.ovhg,....).
     #
-    #   The values are tuples which contain
-    #   as first element a tuple of bases (as string) and
-    #   as second element the names of the enzymes.
+    enzyme = T(name, T.__bases__, enzymedict[name])
     #
-    #   First eval the bases.
+    #   Place the enzyme in the module so it can be imported.
     #
-    bases = tuple(eval(x) for x in bases)
+    globals()[name] = enzyme
+    return enzyme
+
+
+def _load_enzymes():
+    """Create all the enzymes and the batches of enzymes (PRIVATE)."""
+    CommOnly = RestrictionBatch()    # commercial enzymes
+    NonComm = RestrictionBatch()     # not available commercially
+    for TYPE, (bases, names) in typedict.items():
+        for name in names:
+            enzyme = _get_enzyme(name)
+            #
+            #   No need to verify the enzyme is a RestrictionType
+            #   -> add_nocheck
+            #
+            if enzyme.is_comm():
+                CommOnly.add_nocheck(enzyme)
+            else:
+                NonComm.add_nocheck(enzyme)
     #
-    #   now create the particular value of RestrictionType for the classes
-    #   in enzymes.
+    #   AllEnzymes is a RestrictionBatch with all the enzymes from Rebase.
     #
-    T = type.__new__(RestrictionType, 'RestrictionType', bases, {})
-    for k in enzymes:
-        #
-        #   Now, we go through all the enzymes and assign them their type.
-        #   enzymedict[k] contains the values of the attributes for this
-        #   particular class (self.site, self.ovhg,....).
-        #
-        newenz = T(k, bases, enzymedict[k])
-        #
-        #   we add the enzymes to the corresponding batch.
-        #
-        #   No need to verify the enzyme is a RestrictionType -> add_nocheck
-        #
-        if newenz.is_comm():
-            CommOnly.add_nocheck(newenz)
-        else:
-            NonComm.add_nocheck(newenz)
-#
-#   AllEnzymes is a RestrictionBatch with all the enzymes from Rebase.
-#
-AllEnzymes = RestrictionBatch(CommOnly)
-AllEnzymes.update(NonComm)
-#
-#   Now, place the enzymes in locals so they can be imported.
-#
-names = [str(x) for x in AllEnzymes]
-try:
-    del x  # noqa
-except NameError:
-    # Scoping changed in Python 3, the variable isn't leaked
-    pass
-locals().update(dict(zip(names, AllEnzymes)))
-__all__ = ('FormattedSeq', 'Analysis', 'RestrictionBatch', 'AllEnzymes',
-           'CommOnly', 'NonComm') + tuple(names)
-del k, enzymes, TYPE, bases, names
+    AllEnzymes = RestrictionBatch(CommOnly)
+    AllEnzymes.update(NonComm)
+    globals().update(AllEnzymes=AllEnzymes, CommOnly=CommOnly,
+                     NonComm=NonComm)
+
+
+def _all_enzymes():
+    """Return the AllEnzymes batch, creating the enzymes if needed (PRIVATE)."""
+    if 'AllEnzymes' not in globals():
+        _load_enzymes()
+    return globals()['AllEnzymes']
+
+
+def __getattr__(name):
+    """Create the enzymes and batches when first used (PRIVATE)."""
+    if name in _enzyme_types:
+        return _get_enzyme(name)
+    elif name in _batch_names:
+        _load_enzymes()
+        return globals()[name]
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
+
+
+def __dir__():
+    """List the enzymes and batches too, before they are created (PRIVATE)."""
+    return sorted(set(globals()) | set(__all__))
+
+
+__all__ = ('FormattedSeq', 'Analysis', 'RestrictionBatch') + _batch_names + \
+    tuple(name for TYPE, (bases, names) in typedict.items() for name in names)
+
+if sys.version_info < (3, 7):
+    _load_enzymes()
@@ -54,7 +54,31 @@ Examples
 
 """
 
-from Bio.Restriction.Restriction import *  # noqa (legacy module arrangement)
+import sys
+
+from Bio.Restriction import Restriction
+from Bio.Restriction.Restriction import __all__  # noqa
+from Bio.Restriction.Restriction import FormattedSeq, Analysis, RestrictionBatch  # noqa
+
+if sys.version_info < (3, 7):
+    from Bio.Restriction.Restriction import *  # noqa (legacy module arrangement)
+
+
+def __getattr__(name):
+    """Return the enzymes and batches of Bio.Restriction.Restriction (PRIVATE).
+
+    From Python 3.7 onwards the enzymes are only created when first used.
+    """
+    if name in __all__:
+        value = getattr(Restriction, name)
+        globals()[name] = value
+        return value
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
+
+
+def __dir__():
+    """List the enzymes and batches too, before they are created (PRIVATE)."""
+    return sorted(set(globals()) | set(__all__))
 
 
 #
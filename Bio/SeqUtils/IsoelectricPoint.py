@@ -18,8 +18,15 @@ pK values and the methos are taken from::
 I designed the algorithm according to a note by David L. Tabb, available at:
 http://fields.scripps.edu/DTASelect/20010710-pI-Algorithm.pdf
 
+The isoelectric_points function calculates the isoelectric points of many
+polypeptides at once using NumPy arrays, with the same algorithm.
 """
 
+try:
+    import numpy
+except ImportError:
+    # Only needed for the isoelectric_points function
+    numpy = None
 
 positive_pKs = {'Nterm': 7.5, 'K': 10.0, 'R': 12.0, 'H': 5.98}
 negative_pKs = {'Cterm': 3.55, 'D': 4.05, 'E': 4.45, 'C': 9.0, 'Y': 10.0}
@@ -115,3 +122,86 @@ class IsoelectricPoint(object):
                 Charge2 = Charge
 
         return pH
+
+
+def _charges(pH, charged_content, pos_pKs, neg_pKs):
+    """Calculate the total charge of polypeptides at a pH (PRIVATE).
+
+    The pH, the contents of the charged amino acids and the pK values of the
+    termini are arrays with a value for each polypeptide. The charges are
+    added up in the same order as in the IsoelectricPoint class.
+    """
+    positive_charge = 0.0
+    for aa, pK in pos_pKs.items():
+        CR = 10 ** (pK - pH)
+        positive_charge = positive_charge + \
+            charged_content[aa] * (CR / (CR + 1.0))
+    negative_charge = 0.0
+    for aa, pK in neg_pKs.items():
+        CR = 10 ** (pH - pK)
+        negative_charge = negative_charge + \
+            charged_content[aa] * (CR / (CR + 1.0))
+    return positive_charge - negative_charge
+
+
+def isoelectric_points(charged_content, nterm_pKs, cterm_pKs):
+    """Calculate the isoelectric points of many polypeptides at once.
+
+    Arguments:
+     - charged_content - a dictionary with a NumPy array of the number of
+       each charged amino acid (K, R, H, D, E, C and Y) in each polypeptide.
+     - nterm_pKs - array of the pK value of the N-terminus of each
+       polypeptide (see pKnterminal).
+     - cterm_pKs - array of the pK value of the C-terminus of each
+       polypeptide (see pKcterminal).
+
+    Returns an array of the isoelectric points. The pH range containing the
+    isoelectric point of each polypeptide is found and then narrowed down
+    by bisection as in the pi method of the IsoelectricPoint class, but for
+    all polypeptides at once.
+    """
+    if numpy is None:
+        from Bio import MissingPythonDependencyError
+        raise MissingPythonDependencyError(
+            "Install NumPy if you want to use isoelectric_points.")
+    content = dict((aa, numpy.asarray(charged_content[aa], float))
+                   for aa in charged_aas)
+    content['Nterm'] = content['Cterm'] = 1.0
+    pos_pKs = dict(positive_pKs)
+    neg_pKs = dict(negative_pKs)
+    pos_pKs['Nterm'] = numpy.asarray(nterm_pKs, float)
+    neg_pKs['Cterm'] = numpy.asarray(cterm_pKs, float)
+
+    # Bracket between pH1 and pH2, going up or down from pH 7 in steps of
+    # one until the charge changes sign
+    pH = numpy.zeros(len(pos_pKs['Nterm'])) + 7.0
+    charge = _charges(pH, content, pos_pKs, neg_pKs)
+    pH1 = pH.copy()
+    pH2 = pH.copy()
+    for active, step in ((charge > 0.0, 1.0), (charge < 0.0, -1.0)):
+        while active.any():
+            trial = numpy.where(step > 0, pH1, pH2) + step
+            trial_charge = _charges(trial, content, pos_pKs, neg_pKs)
+            pH = numpy.where(active, trial, pH)
+            charge = numpy.where(active, trial_charge, charge)
+            if step > 0:
+                pH1 = numpy.where(active & (trial_charge > 0.0), trial, pH1)
+                pH2 = numpy.where(active & (trial_charge <= 0.0), trial, pH2)
+                active &= trial_charge > 0.0
+            else:
+                pH2 = numpy.where(active & (trial_charge < 0.0), trial, pH2)
+                pH1 = numpy.where(active & (trial_charge >= 0.0), trial, pH1)
+                active &= trial_charge < 0.0
+
+    # Bisection
+    active = (pH2 - pH1 > 0.0001) & (charge != 0.0)
+    while active.any():
+        middle = (pH1 + pH2) / 2.0
+        middle_charge = _charges(middle, content, pos_pKs, neg_pKs)
+        pH = numpy.where(active, middle, pH)
+        charge = numpy.where(active, middle_charge, charge)
+        pH1 = numpy.where(active & (middle_charge > 0.0), middle, pH1)
+        pH2 = numpy.where(active & (middle_charge <= 0.0), middle, pH2)
+        active &= (pH2 - pH1 > 0.0001) & (charge != 0.0)
+
+    return pH
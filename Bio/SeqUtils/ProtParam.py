@@ -17,14 +17,33 @@ Example::
     print(X.protein_scale(ProtParamData.kd, 9, 0.4))
     print(X.molar_extinction_coefficient())
 
+To analyse many proteins, such as a whole proteome, use the analyze_proteins
+function instead. It counts the amino acids of all the proteins at once and
+calculates the properties from the counts with NumPy arrays, returning a
+table with a column for each property::
+
+    from Bio import SeqIO
+    table = analyze_proteins(SeqIO.parse("proteome.fasta", "fasta"))
+    print(table["id"][0], table["isoelectric_point"][0])
+
 """
 
 from __future__ import print_function
 
 import sys
+from collections import OrderedDict
+
+try:
+    import numpy
+except ImportError:
+    # Only needed for the analyze_proteins function
+    numpy = None
+
+from Bio._py3k import _as_bytes, basestring
 from Bio.SeqUtils import ProtParamData  # Local
 from Bio.SeqUtils import IsoelectricPoint  # Local
 from Bio.Seq import Seq
+from Bio.SeqRecord import SeqRecord
 from Bio.Alphabet import IUPAC
 from Bio.Data import IUPACData
 from Bio.SeqUtils import molecular_weight
@@ -291,3 +310,187 @@ class ProteinAnalysis(object):
         mec_reduced = num_aa['W'] * 5500 + num_aa['Y'] * 1490
         mec_cystines = mec_reduced + (num_aa['C'] // 2) * 125
         return(mec_reduced, mec_cystines)
+
+
+# Approximate number of amino acids to analyse at once in analyze_proteins
+_BATCH_SIZE = 1 << 20
+
+# The whitespace removed by the molecular_weight function
+_whitespace = " \t\n\r\x0b\x0c"
+
+
+def _byte_table(values, default=None):
+    """Return an array of the values of letters by their byte value (PRIVATE).
+
+    Other byte values get the default value, or NaN if this is None.
+    """
+    if default is None:
+        default = numpy.nan
+    table = numpy.zeros(256) + default
+    for letter, value in values.items():
+        table[ord(letter)] = value
+    return table
+
+
+def _analyze_batch(texts, monoisotopic):
+    """Calculate the columns of analyze_proteins for a batch (PRIVATE)."""
+    lengths = numpy.array([len(text) for text in texts], numpy.intp)
+    data = numpy.frombuffer(_as_bytes("".join(texts)), numpy.uint8)
+    owner = numpy.repeat(numpy.arange(len(texts)), lengths)
+    # Count the standard amino acids, with a column for each
+    letters = IUPACData.protein_letters
+    codes = numpy.zeros(256, numpy.intp) + len(letters)
+    for i, letter in enumerate(letters):
+        codes[ord(letter)] = i
+    counts = numpy.bincount(owner * (len(letters) + 1) + codes[data],
+                            minlength=len(texts) * (len(letters) + 1))
+    counts = counts.reshape(len(texts), len(letters) + 1)[:, :-1]
+    content = dict((letter, counts[:, i]) for i, letter in enumerate(letters))
+
+    columns = OrderedDict()
+    columns["length"] = lengths
+    with numpy.errstate(divide="ignore", invalid="ignore"):
+        percent = dict((letter, content[letter] / lengths.astype(float))
+                       for letter in letters)
+
+        # The weight is NaN for sequences with letters not in the table,
+        # whitespace is ignored as in the molecular_weight function
+        if monoisotopic:
+            weights = IUPACData.monoisotopic_protein_weights
+            water = 18.010565
+        else:
+            weights = IUPACData.protein_weights
+            water = 18.0153
+        weights = dict(weights)
+        weights.update((letter.lower(), weight)
+                       for letter, weight in list(weights.items()))
+        weights.update((letter, 0.0) for letter in _whitespace)
+        weight = numpy.bincount(owner, _byte_table(weights)[data],
+                                len(texts))
+        letters_counted = lengths - numpy.bincount(
+            owner, _byte_table(dict.fromkeys(_whitespace, 1), 0)[data],
+            len(texts)).astype(numpy.intp)
+        columns["molecular_weight"] = weight - (letters_counted - 1) * water
+
+        columns["aromaticity"] = percent["Y"] + percent["W"] + percent["F"]
+
+        # Dipeptides spanning two sequences are left out
+        table = numpy.zeros((256, 256)) + numpy.nan
+        for this, values in ProtParamData.DIWV.items():
+            for next, value in values.items():
+                table[ord(this), ord(next)] = value
+        inside = owner[:-1] == owner[1:]
+        score = numpy.bincount(owner[:-1][inside],
+                               table[data[:-1], data[1:]][inside],
+                               len(texts))
+        columns["instability_index"] = (10.0 / lengths) * score
+
+        columns["gravy"] = numpy.bincount(
+            owner, _byte_table(ProtParamData.kd)[data], len(texts)) / lengths
+
+        # The pK values of the termini depend on the first and last letters
+        ends = numpy.cumsum(lengths)
+        first = data[(ends - lengths)[lengths > 0]]
+        last = data[ends[lengths > 0] - 1]
+        nterm_pKs = numpy.zeros(len(texts)) + numpy.nan
+        cterm_pKs = numpy.zeros(len(texts)) + numpy.nan
+        nterm_pKs[lengths > 0] = _byte_table(
+            IsoelectricPoint.pKnterminal,
+            IsoelectricPoint.positive_pKs["Nterm"])[first]
+        cterm_pKs[lengths > 0] = _byte_table(
+            IsoelectricPoint.pKcterminal,
+            IsoelectricPoint.negative_pKs["Cterm"])[last]
+        columns["isoelectric_point"] = numpy.zeros(len(texts)) + numpy.nan
+        columns["isoelectric_point"][lengths > 0] = \
+            IsoelectricPoint.isoelectric_points(
+                dict((aa, content[aa][lengths > 0])
+                     for aa in IsoelectricPoint.charged_aas),
+                nterm_pKs[lengths > 0], cterm_pKs[lengths > 0])
+
+        for name, residues in (("helix", "VIYFWL"), ("turn", "NPGS"),
+                               ("sheet", "EMAL")):
+            fraction = 0
+            for residue in residues:
+                fraction = fraction + percent[residue]
+            columns[name] = fraction
+
+    columns["extinction_reduced"] = content["W"] * 5500 + content["Y"] * 1490
+    columns["extinction_cystines"] = \
+        columns["extinction_reduced"] + (content["C"] // 2) * 125
+    for letter in letters:
+        columns[letter] = content[letter]
+    return columns
+
+
+def analyze_proteins(sequences, monoisotopic=False):
+    """Calculate the properties of many proteins at once.
+
+    Arguments:
+     - sequences - an iterable of protein sequences as strings, Seq or
+       SeqRecord objects (for example from Bio.SeqIO.parse), or a single
+       sequence.
+     - monoisotopic - use the monoisotopic mass for the molecular weight, as
+       in the ProteinAnalysis class.
+
+    Returns an OrderedDict of columns, each with a value per protein:
+    "id" (a list of the record identifiers, or the index of each sequence
+    which is not a SeqRecord), "length", "molecular_weight", "aromaticity",
+    "instability_index", "gravy", "isoelectric_point", "helix", "turn",
+    "sheet", "extinction_reduced", "extinction_cystines", and the count of
+    each of the twenty standard amino acids under its letter. Apart from the
+    identifiers these are NumPy arrays, so the table can be given directly to
+    a pandas DataFrame, for example.
+
+    The values are those which the ProteinAnalysis class gives for each
+    protein, but the amino acids are counted only once and the properties
+    are calculated for many proteins together (in batches, so the sequences
+    need not all be in memory). Where ProteinAnalysis would raise an
+    exception, for example for the molecular weight of a sequence with
+    ambiguous letters or for the isoelectric point of an empty sequence,
+    the value is NaN instead.
+
+    >>> from Bio.SeqUtils.ProtParam import analyze_proteins
+    >>> table = analyze_proteins(["MAEGEITTFTALTEKFNLPPGNYKKPKLLYCS",
+    ...                           "PDGTVDGTRDRSDQHIQLQLSAESVGEVYIKST"])
+    >>> print(table["length"].tolist())
+    [32, 33]
+    >>> print(["%0.2f" % value for value in table["isoelectric_point"]])
+    ['7.88', '4.52']
+    >>> print(["%0.2f" % value for value in table["molecular_weight"]])
+    ['3606.17', '3602.83']
+
+    Flexibility and the profiles of protein_scale are per residue rather
+    than per protein, so for these use the ProteinAnalysis class.
+    """
+    if numpy is None:
+        from Bio import MissingPythonDependencyError
+        raise MissingPythonDependencyError(
+            "Install NumPy if you want to use analyze_proteins.")
+    if isinstance(sequences, (basestring, Seq, SeqRecord)):
+        sequences = [sequences]
+    ids = []
+    batches = []
+    texts = []
+    size = 0
+    for index, sequence in enumerate(sequences):
+        if isinstance(sequence, SeqRecord):
+            ids.append(sequence.id)
+            sequence = sequence.seq
+        else:
+            ids.append(index)
+        text = str(sequence)
+        if text.islower():
+            text = text.upper()
+        texts.append(text)
+        size += len(text) + 1
+        if size >= _BATCH_SIZE:
+            batches.append(_analyze_batch(texts, monoisotopic))
+            texts = []
+            size = 0
+    if texts or not batches:
+        batches.append(_analyze_batch(texts, monoisotopic))
+    table = OrderedDict()
+    table["id"] = ids
+    for name in batches[0]:
+        table[name] = numpy.concatenate([batch[name] for batch in batches])
+    return table
@@ -0,0 +1,359 @@
+# This file is part of the Biopython distribution and governed by your
+# choice of the "Biopython License Agreement" or the "BSD 3-Clause License".
+# Please see the LICENSE file that should have been included as part of this
+# package.
+
+"""Count the k-mers of DNA sequences, and compare sequences by their k-mers.
+
+Each k-mer (of up to 31 nucleotides) is encoded as an integer with two bits
+per nucleotide, and the k-mers of many sequences at once are counted by
+sorting these integers with NumPy. By default the k-mers are counted together
+with their reverse complements, under the smaller of the two (the canonical
+k-mer). K-mers with letters other than A, C, G and T (in upper or lower case)
+are skipped.
+
+    >>> from Bio.SeqUtils.kmers import count_kmers
+    >>> counts = count_kmers(["GATTACA", "TGTAATC"], 3)
+    >>> for kmer, count in counts.items():
+    ...     print("%s %i" % (kmer, count))
+    AAT 2
+    ACA 2
+    ATC 2
+    GTA 2
+    TAA 2
+    >>> counts["TGT"]
+    2
+
+The sequences can be given as an iterator of SeqRecord objects, such as
+returned by Bio.SeqIO.parse, which are then read a batch at a time. To count
+the k-mers of a large set of sequences in parallel, use the processes argument
+of count_kmers, or count the k-mers of each part of the sequences separately
+(for example on separate machines) and combine the counts with merge_counts.
+
+The MinHash class estimates the similarity of the k-mers of two sequences (or
+sets of sequences) from a small sample of the hashes of their k-mers:
+
+    >>> from Bio.SeqUtils.kmers import MinHash
+    >>> first = MinHash(["ACGTTGCATGCCATGACTGATCGTAGCTAGTCA"], k=5)
+    >>> second = MinHash(["ACGTTGCATGCCATGACTGATCGTAGCTAGTCC"], k=5)
+    >>> print("%0.2f" % first.jaccard(second))
+    0.96
+
+"""
+
+try:
+    import numpy
+except ImportError:
+    from Bio import MissingPythonDependencyError
+    raise MissingPythonDependencyError(
+        "Install NumPy if you want to use Bio.SeqUtils.kmers.")
+
+from Bio._py3k import basestring, _as_bytes
+from Bio._utils import _pool_imap
+
+from Bio.Seq import Seq
+from Bio.SeqRecord import SeqRecord
+from Bio.SeqUtils.windows import _nucleotide_codes
+
+# Approximate number of letters to count at once
+_BATCH_SIZE = 1 << 22
+
+
+def _encode(text, k, canonical=True):
+    """Return the k-mers in the text (bytes) as integers (PRIVATE).
+
+    The k-mers with letters other than A, C, G and T are left out.
+    """
+    codes = _nucleotide_codes[numpy.frombuffer(text, numpy.uint8)]
+    n = len(codes) - k + 1
+    if n < 1:
+        return numpy.zeros(0, numpy.uint64)
+    values = (codes & 3).astype(numpy.uint64)
+    kmers = numpy.zeros(n, numpy.uint64)
+    for i in range(k):
+        kmers <<= numpy.uint64(2)
+        kmers |= values[i:i + n]
+    if canonical:
+        # the reverse complement has the complement of the letter at each
+        # position i at position k - 1 - i
+        values ^= numpy.uint64(3)
+        reverse = numpy.zeros(n, numpy.uint64)
+        for i in range(k):
+            reverse |= values[i:i + n] << numpy.uint64(2 * i)
+        numpy.minimum(kmers, reverse, out=kmers)
+    # the number of other letters before each position
+    others = numpy.concatenate(([0], numpy.cumsum(codes > 3)))
+    return kmers[others[k:] == others[:n]]
+
+
+def _decode(kmer, k):
+    """Return the k-mer with the given number as a string (PRIVATE)."""
+    kmer = int(kmer)
+    return "".join("ACGT"[(kmer >> (2 * (k - 1 - i))) & 3] for i in range(k))
+
+
+def _batches(sequences, k):
+    """Join the sequences into batches of text for counting (PRIVATE).
+
+    The sequences in a batch are separated by an N, so that there are no
+    k-mers spanning two sequences. Sequences longer than the batch size are
+    split into pieces overlapping by k - 1 letters, so that each k-mer is in
+    exactly one piece.
+    """
+    if isinstance(sequences, (basestring, Seq, SeqRecord)):
+        sequences = [sequences]
+    step = max(_BATCH_SIZE - k + 1, 1)
+    batch = []
+    size = 0
+    for sequence in sequences:
+        if isinstance(sequence, SeqRecord):
+            sequence = sequence.seq
+        text = str(sequence)
+        for start in range(0, max(len(text) - k, 0) + 1, step):
+            piece = text[start:start + step + k - 1]
+            batch.append(piece)
+            size += len(piece) + 1
+            if size >= _BATCH_SIZE:
+                yield _as_bytes("N".join(batch))
+                batch = []
+                size = 0
+    if batch:
+        yield _as_bytes("N".join(batch))
+
+
+def _count_batch(task):
+    """Count the k-mers of a batch of sequences (PRIVATE)."""
+    text, k, canonical = task
+    kmers, counts = numpy.unique(_encode(text, k, canonical),
+                                 return_counts=True)
+    return KmerCounts(k, kmers, counts, canonical)
+
+
+def _hash(kmers, seed):
+    """Return a 64 bit hash of each k-mer (PRIVATE).
+
+    This is the finalizer of the MurmurHash3 hash function, applied to the
+    k-mers mixed with the seed.
+    """
+    values = kmers ^ numpy.uint64((seed * 0x9E3779B97F4A7C15) % (1 << 64))
+    for multiplier in (0xFF51AFD7ED558CCD, 0xC4CEB9FE1A85EC53):
+        values ^= values >> numpy.uint64(33)
+        values *= numpy.uint64(multiplier)
+    values ^= values >> numpy.uint64(33)
+    return values
+
+
+class KmerCounts(object):
+    """The number of times each k-mer occurs in a set of sequences.
+
+    The k-mers are kept as a sorted array of their numbers (with two bits per
+    nucleotide) in the kmers attribute, and their counts in the counts
+    attribute. Looking up a k-mer string gives its count (zero for k-mers
+    which were not seen), and the items method gives the k-mer strings with
+    their counts in alphabetical order.
+
+    Use the count_kmers function to count the k-mers of sequences.
+    """
+
+    def __init__(self, k, kmers, counts, canonical=True):
+        """Initialize the class."""
+        self.k = k
+        self.kmers = kmers
+        self.counts = counts
+        self.canonical = canonical
+
+    def __len__(self):
+        """Return the number of different k-mers."""
+        return len(self.kmers)
+
+    def __getitem__(self, kmer):
+        """Return the count of a k-mer (as a string)."""
+        if len(kmer) != self.k:
+            raise ValueError("Expected a k-mer of length %i" % self.k)
+        codes = _encode(_as_bytes(str(kmer)), self.k, self.canonical)
+        if not len(codes):
+            raise ValueError("Only k-mers of A, C, G and T are counted")
+        index = numpy.searchsorted(self.kmers, codes[0])
+        if index < len(self.kmers) and self.kmers[index] == codes[0]:
+            return int(self.counts[index])
+        return 0
+
+    def __contains__(self, kmer):
+        """Return True if the k-mer (as a string) was seen."""
+        return self[kmer] > 0
+
+    def items(self):
+        """Iterate over the k-mers (as strings) and their counts."""
+        for kmer, count in zip(self.kmers, self.counts.tolist()):
+            yield _decode(kmer, self.k), count
+
+    def filter(self, min_count):
+        """Return the counts of the k-mers seen at least min_count times."""
+        keep = self.counts >= min_count
+        return KmerCounts(self.k, self.kmers[keep], self.counts[keep],
+                          self.canonical)
+
+    def spectrum(self):
+        """Return the k-mer spectrum as an array.
+
+        This is the histogram of the k-mer counts, with the number of
+        different k-mers seen once at index one, twice at index two, and so
+        on.
+        """
+        return numpy.bincount(self.counts, minlength=1)
+
+    def jaccard(self, other):
+        """Return the Jaccard similarity of the k-mers of two sets of counts.
+
+        This is the number of k-mers seen in both sets of sequences, divided
+        by the number of k-mers seen in either of them.
+        """
+        _check_compatible(self, other)
+        shared = len(numpy.intersect1d(self.kmers, other.kmers,
+                                       assume_unique=True))
+        total = len(self.kmers) + len(other.kmers) - shared
+        return shared / float(total) if total else 0.0
+
+
+def _check_compatible(first, second):
+    """Check that k-mer counts or sketches can be compared (PRIVATE)."""
+    if first.k != second.k:
+        raise ValueError("Different k-mer lengths %i and %i"
+                         % (first.k, second.k))
+    if getattr(first, "canonical", None) != getattr(second, "canonical",
+                                                    None):
+        raise ValueError("Cannot combine canonical and non-canonical "
+                         "k-mer counts")
+
+
+def merge_counts(kmer_counts):
+    """Combine the counts of the k-mers of several sets of sequences.
+
+    Takes a list of KmerCounts objects, for example from counting the k-mers
+    of parts of a set of sequences in different processes, and returns a
+    KmerCounts object with the total count of each k-mer.
+    """
+    kmer_counts = list(kmer_counts)
+    if not kmer_counts:
+        raise ValueError("No k-mer counts to merge")
+    first = kmer_counts[0]
+    for other in kmer_counts[1:]:
+        _check_compatible(first, other)
+    kmers = numpy.concatenate([other.kmers for other in kmer_counts])
+    counts = numpy.concatenate([other.counts for other in kmer_counts])
+    order = numpy.argsort(kmers, kind="mergesort")
+    kmers = kmers[order]
+    if len(kmers):
+        # add up the counts of each run of the same k-mer
+        starts = numpy.flatnonzero(numpy.concatenate(
+            ([True], kmers[1:] != kmers[:-1])))
+        kmers = kmers[starts]
+        counts = numpy.add.reduceat(counts[order], starts)
+    return KmerCounts(first.k, kmers, counts.astype(numpy.int64),
+                      first.canonical)
+
+
+def count_kmers(sequences, k, canonical=True, min_count=1, processes=None):
+    """Count the k-mers of a set of DNA sequences.
+
+    Arguments:
+     - sequences - a list or iterator of SeqRecord objects, Seq objects or
+       strings (such as from Bio.SeqIO.parse). A single sequence can also
+       be given.
+     - k - the length of the k-mers, from 1 to 31.
+     - canonical - whether to count each k-mer together with its reverse
+       complement, under the alphabetically first of the two (default True).
+     - min_count - leave out the k-mers seen less often than this.
+     - processes - number of worker processes to spread batches of the
+       sequences over using the multiprocessing module (default None, count
+       in this process).
+
+    Returns a KmerCounts object.
+    """
+    if not 1 <= k <= 31:
+        raise ValueError("k should be between 1 and 31")
+    tasks = ((text, k, canonical) for text in _batches(sequences, k))
+    total = KmerCounts(k, numpy.zeros(0, numpy.uint64),
+                       numpy.zeros(0, numpy.int64), canonical)
+    pool = None
+    if processes is None or processes < 2:
+        partial_counts = (_count_batch(task) for task in tasks)
+    else:
+        import multiprocessing
+        pool = multiprocessing.Pool(processes)
+        partial_counts = _pool_imap(pool, _count_batch, tasks, processes)
+    try:
+        pending = []
+        pending_size = 0
+        for counts in partial_counts:
+            pending.append(counts)
+            pending_size += len(counts)
+            # merge once the pending counts are about as large as the total,
+            # so that each k-mer is merged a few times only
+            if pending_size > len(total):
+                total = merge_counts([total] + pending)
+                pending = []
+                pending_size = 0
+    finally:
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+    total = merge_counts([total] + pending)
+    if min_count > 1:
+        total = total.filter(min_count)
+    return total
+
+
+class MinHash(object):
+    """A MinHash sketch of the k-mers of a set of DNA sequences.
+
+    The sketch keeps the smallest hash values (up to the given size) of the
+    distinct canonical k-mers of the sequences. The Jaccard similarity of the
+    k-mers of two sets of sequences is then estimated from their sketches,
+    as the fraction of the smallest hash values of either sketch which are in
+    both (as in the Mash software, Ondov et al. 2016).
+
+    :Parameters:
+        sequences : list
+            SeqRecord objects, Seq objects or strings (or a single sequence).
+        k : int
+            length of the k-mers (default 21).
+        size : int
+            maximum number of hash values to keep (default 1000).
+        seed : int
+            seed of the hash function; only sketches with the same seed
+            can be compared.
+
+    """
+
+    def __init__(self, sequences, k=21, size=1000, seed=0):
+        """Initialize the class."""
+        if not 1 <= k <= 31:
+            raise ValueError("k should be between 1 and 31")
+        self.k = k
+        self.size = size
+        self.seed = seed
+        hashes = numpy.zeros(0, numpy.uint64)
+        for text in _batches(sequences, k):
+            values = numpy.unique(_hash(_encode(text, k), seed))
+            hashes = numpy.union1d(hashes, values[:size])[:size]
+        self.hashes = hashes
+
+    def jaccard(self, other):
+        """Estimate the Jaccard similarity of the k-mers of two sketches."""
+        _check_compatible(self, other)
+        if self.seed != other.seed:
+            raise ValueError("Cannot compare sketches with different seeds")
+        size = min(self.size, other.size)
+        union = numpy.union1d(self.hashes, other.hashes)[:size]
+        if not len(union):
+            return 0.0
+        shared = numpy.intersect1d(self.hashes, other.hashes,
+                                   assume_unique=True)
+        return len(numpy.intersect1d(union, shared,
+                                     assume_unique=True)) / float(len(union))
+
+
+if __name__ == "__main__":
+    from Bio._utils import run_doctest
+    run_doctest()
@@ -0,0 +1,264 @@
+# This file is part of the Biopython distribution and governed by your
+# choice of the "Biopython License Agreement" or the "BSD 3-Clause License".
+# Please see the LICENSE file that should have been included as part of this
+# package.
+
+"""Sequence statistics over windows along a (long) nucleotide sequence.
+
+The functions ``GC_skew`` and ``lcc.lcc_mult`` in Bio.SeqUtils count the
+letters of each window of a sequence separately. The functions in this module
+instead use cumulative sums of the letter counts along the sequence (or, for
+k-mer entropy, the changes in the k-mer counts from one window to the next),
+so their running time does not depend on the window size. They return NumPy
+arrays with the value of each window, where the window number i starts at
+position i times the step along the sequence:
+
+    >>> from Bio.SeqUtils.windows import gc_content, gc_skew
+    >>> print(gc_content("GGGCATATATCCCCGG", window=4).tolist())
+    [100.0, 0.0, 50.0, 100.0]
+    >>> print(["%0.2f" % value for value in
+    ...        gc_skew("GGGCATATATCCCCGG", window=8, step=4)])
+    ['0.50', '-1.00', '-0.33']
+
+Only whole windows are used, so a sequence shorter than the window has no
+values. The step is the window size by default (which gives non-overlapping
+windows, as in ``GC_skew``), use a step of one for a sliding window (as in
+``lcc_mult``).
+
+The sequence can be a Seq object, a string, bytes, or a NumPy array of the
+byte values of the letters (for example a numpy.memmap of a file holding the
+sequence without line breaks, which is then read one chunk at a time). The
+letters can be in upper or lower case.
+"""
+
+import mmap
+
+try:
+    import numpy
+except ImportError:
+    from Bio import MissingPythonDependencyError
+    raise MissingPythonDependencyError(
+        "Install NumPy if you want to use Bio.SeqUtils.windows.")
+
+from Bio._py3k import _as_bytes
+
+# Approximate number of letters to process at once
+_CHUNK_SIZE = 1 << 22
+
+
+def _letter_table(*letter_groups):
+    """Return a table of which byte values belong to each group (PRIVATE).
+
+    The table has a row for each group of letters (given as a string, in
+    upper case), and a column for each byte value.
+    """
+    table = numpy.zeros((len(letter_groups), 256), numpy.uint8)
+    for row, letters in enumerate(letter_groups):
+        for letter in letters:
+            table[row, ord(letter)] = 1
+            table[row, ord(letter.lower())] = 1
+    return table
+
+
+_gc_table = _letter_table("GCS")
+_gc_skew_table = _letter_table("G", "C")
+_at_skew_table = _letter_table("A", "T")
+_nucleotide_table = _letter_table("A", "C", "G", "T")
+
+# The number 0 to 3 of each of A, C, G and T (in upper or lower case), and 4
+# for other letters (also used by Bio.SeqUtils.kmers)
+_nucleotide_codes = (4 - numpy.dot(numpy.arange(4, 0, -1),
+                                   _nucleotide_table)).astype(numpy.uint8)
+
+
+def _as_array(seq):
+    """Return the byte values of the letters of a sequence as an array (PRIVATE).
+
+    NumPy arrays (such as memory-mapped files), bytes and mmap objects are
+    used without copying the sequence.
+    """
+    if isinstance(seq, numpy.ndarray):
+        if seq.dtype != numpy.uint8:
+            seq = seq.view(numpy.uint8)
+        return seq.ravel()
+    if not isinstance(seq, (bytes, bytearray, mmap.mmap)):
+        seq = _as_bytes(str(seq))
+    return numpy.frombuffer(seq, numpy.uint8)
+
+
+def _chunks(data, window, step):
+    """Split the windows along a sequence into chunks (PRIVATE).
+
+    Yields the letters of each chunk of the sequence (as an array of byte
+    values) and the starts of the windows in the chunk.
+    """
+    if window < 1 or step < 1:
+        raise ValueError("The window size and step must be positive")
+    if len(data) < window:
+        return
+    count = (len(data) - window) // step + 1
+    per_chunk = max(1, _CHUNK_SIZE // step)
+    for first in range(0, count, per_chunk):
+        starts = numpy.arange(min(per_chunk, count - first)) * step
+        offset = first * step
+        yield data[offset:offset + starts[-1] + window], starts
+
+
+def _window_counts(seq, table, window, step):
+    """Count the letters of each group of the table in each window (PRIVATE).
+
+    Returns an array with a row for each window and a column for each group.
+    """
+    results = [numpy.zeros((0, len(table)), numpy.int64)]
+    for letters, starts in _chunks(_as_array(seq), window, step):
+        # the cumulative counts before each position in the chunk
+        totals = numpy.zeros((len(table), len(letters) + 1), numpy.int64)
+        numpy.cumsum(table[:, letters], axis=1, out=totals[:, 1:])
+        results.append((totals[:, starts + window] - totals[:, starts]).T)
+    return numpy.concatenate(results)
+
+
+def _skew(first, second):
+    """Return (first - second) / (first + second), or zero (PRIVATE)."""
+    total = first + second
+    return (first - second) / numpy.where(total, total, 1).astype(float)
+
+
+def gc_content(seq, window=100, step=None):
+    """Calculate the G+C percentage of each window along the sequence.
+
+    As in the GC function, the ambiguous nucleotide S (G or C) is counted as
+    G or C, and the percentage is calculated against the window size. Returns
+    an array of floats between 0 and 100.
+
+    >>> from Bio.SeqUtils.windows import gc_content
+    >>> print(["%0.2f" % value for value in
+    ...        gc_content("ACTGNCGCGSAT", window=6, step=3)])
+    ['50.00', '83.33', '66.67']
+
+    """
+    counts = _window_counts(seq, _gc_table, window, step or window)
+    return counts[:, 0] * 100.0 / window
+
+
+def gc_skew(seq, window=100, step=None):
+    """Calculate the GC skew (G-C)/(G+C) of each window along the sequence.
+
+    Returns an array of floats, with zero for windows without any G or C. For
+    non-overlapping windows (the default) these are the same values as those
+    from the GC_skew function, except for the last partial window. Ambiguous
+    nucleotides are not counted.
+    """
+    counts = _window_counts(seq, _gc_skew_table, window, step or window)
+    return _skew(counts[:, 0], counts[:, 1])
+
+
+def at_skew(seq, window=100, step=None):
+    """Calculate the AT skew (A-T)/(A+T) of each window along the sequence.
+
+    Returns an array of floats, with zero for windows without any A or T.
+    Ambiguous nucleotides are not counted.
+    """
+    counts = _window_counts(seq, _at_skew_table, window, step or window)
+    return _skew(counts[:, 0], counts[:, 1])
+
+
+def lcc(seq, window=100, step=None):
+    """Calculate the Local Composition Complexity (LCC) of each window.
+
+    This is the Shannon entropy (in bits) of the frequencies of A, C, G and T
+    in the window, counting lower case letters as upper case. Other letters
+    are not counted, but do count towards the window size. For upper case
+    sequences, this is the same value as given by the lcc_simp function for
+    each window, and with a step of one the values are those of lcc_mult
+    (without its leading zero). Those functions give other values for lower
+    case letters.
+
+    >>> from Bio.SeqUtils.windows import lcc
+    >>> print(["%0.3f" % value for value in lcc("ACGTacgtAAAAaaaa", 8)])
+    ['2.000', '0.000']
+
+    """
+    counts = _window_counts(seq, _nucleotide_table, window, step or window)
+    frequencies = counts / float(window)
+    terms = frequencies * numpy.log2(numpy.where(counts, frequencies, 1))
+    return 0.0 - terms.sum(axis=1)
+
+
+def kmer_entropy(seq, k, window=100, step=None):
+    """Calculate the Shannon entropy of the k-mers in each window.
+
+    The entropy (in bits) is calculated from the frequencies of the
+    overlapping k-mers in each window, ignoring the k-mers with letters other
+    than A, C, G and T (in upper or lower case). The k-mer counts are updated
+    from one window to the next rather than recounted, so this takes about as
+    long for large windows as for small ones. Returns an array of floats,
+    with zero for windows without any k-mers.
+
+    >>> from Bio.SeqUtils.windows import kmer_entropy
+    >>> print(["%0.3f" % value for value in
+    ...        kmer_entropy("AAAAAAACGTACGTNNNN", 2, window=6)])
+    ['0.000', '1.922', '0.000']
+
+    """
+    if not 1 <= k <= 31:
+        raise ValueError("k should be between 1 and 31")
+    size = window - k + 1
+    if size < 1:
+        raise ValueError("The window must be at least k letters long")
+    # c log2(c) for the counts c which a k-mer can have in a window
+    counts = numpy.arange(size + 2, dtype=float)
+    entropy_terms = counts * numpy.log2(numpy.where(counts, counts, 1))
+    results = [numpy.zeros(0)]
+    for letters, starts in _chunks(_as_array(seq), window, step or window):
+        codes = _nucleotide_codes[letters]
+        # the k-mer starting at each position as a number, or -1 if it has
+        # any other letters
+        kmers = numpy.zeros(len(letters) - k + 1, numpy.int64)
+        invalid = numpy.zeros(len(kmers), bool)
+        for i in range(k):
+            part = codes[i:i + len(kmers)]
+            kmers = kmers * 4 + (part & 3)
+            invalid |= part > 3
+        kmers[invalid] = -1
+        # number the k-mers in the chunk from zero, and sort their positions
+        # by this number (positions of the same k-mer in order)
+        kmers = numpy.unique(kmers, return_inverse=True)[1].ravel()
+        order = numpy.argsort(kmers, kind="mergesort")
+        keys = kmers[order] * (len(kmers) + 1) + order
+        # the number of times the k-mer at each position occurs from there
+        # up to the end of a window starting there (ahead), and from the start
+        # of a window ending there up to the position itself (behind)
+        ahead = numpy.empty(len(kmers), numpy.intp)
+        ahead[order] = numpy.searchsorted(keys, keys + size) - \
+            numpy.arange(len(kmers))
+        behind = numpy.empty(len(kmers), numpy.intp)
+        behind[order] = numpy.arange(len(kmers)) - \
+            numpy.searchsorted(keys, keys + 1 - size)
+
+        valid = numpy.concatenate(([0], numpy.cumsum(~invalid)))
+        removed = ahead[:len(kmers) - size]
+        added = behind[size:]
+        # the changes in the sum of c log2(c) over the k-mer counts c when
+        # moving the window one letter along
+        changes = numpy.where(invalid[:len(kmers) - size], 0.0,
+                              entropy_terms[removed - 1] -
+                              entropy_terms[removed])
+        changes += numpy.where(invalid[size:], 0.0,
+                               entropy_terms[added + 1] -
+                               entropy_terms[added])
+        changes[kmers[:len(kmers) - size] == kmers[size:]] = 0.0
+        first_counts = numpy.bincount(kmers[:size][~invalid[:size]])
+        totals = numpy.concatenate(([entropy_terms[first_counts].sum()],
+                                    changes))
+        totals = numpy.cumsum(totals)[starts]
+        number = (valid[starts + size] - valid[starts]).astype(float)
+        with numpy.errstate(divide="ignore", invalid="ignore"):
+            entropy = numpy.log2(number) - totals / number
+        results.append(numpy.where(number > 0, entropy, 0.0))
+    return numpy.concatenate(results)
+
+
+if __name__ == "__main__":
+    from Bio._utils import run_doctest
+    run_doctest()
@@ -9,6 +9,12 @@
 from __future__ import print_function
 
 import os
+from collections import deque
+
+
+# Maximum number of array elements to process at once in NumPy code working
+# on large arrays a block at a time
+_BLOCK_ELEMENTS = 1 << 22
 
 
 def iterlen(items):
@@ -64,6 +70,58 @@ def getattr_str(obj, attr, fmt=None, fallback='?'):
     return fallback
 
 
+def _count_columns(codes, size, lookup=None, weights=None):
+    """Count the codes in each column of a 2D NumPy array (PRIVATE).
+
+    Arguments:
+     - codes - 2D NumPy array of integer codes.
+     - size - Number of different codes, from 0 to size - 1.
+     - lookup - Optional NumPy array used to translate the codes first.
+     - weights - Optional weight of each row of the array.
+
+    The columns are counted a block at a time, yielding for each block a
+    NumPy array with a row for each column and a column for each code,
+    holding the number of rows with that code in that column (or the sum
+    of their weights, added in the order of the rows).
+    """
+    import numpy
+
+    rows, columns = codes.shape
+    block = max(1, _BLOCK_ELEMENTS // max(rows, 1))
+    for start in range(0, columns, block):
+        part = codes[:, start:start + block]
+        if lookup is None:
+            part = part.astype(numpy.intp)
+        else:
+            part = lookup[part]
+        width = part.shape[1]
+        # Give each column of the block its own range of codes
+        part += size * numpy.arange(width)
+        if weights is None:
+            counts = numpy.bincount(part.ravel(), minlength=width * size)
+        else:
+            counts = numpy.bincount(part.ravel(),
+                                    numpy.repeat(weights, width),
+                                    minlength=width * size)
+        yield counts.reshape(width, size)
+
+
+def _pool_imap(pool, function, tasks, processes):
+    """Apply a function to each task in a multiprocessing pool (PRIVATE).
+
+    The results are yielded in the order of the tasks, as with pool.imap,
+    but only a few tasks per worker process are taken from the tasks
+    iterable and queued at a time, rather than all of them.
+    """
+    pending = deque()
+    for task in tasks:
+        pending.append(pool.apply_async(function, (task,)))
+        if len(pending) >= 4 * processes:
+            yield pending.popleft().get()
+    while pending:
+        yield pending.popleft().get()
+
+
 def find_test_dir(start_dir=None):
     """Finds the absolute path of Biopython's Tests directory.
 
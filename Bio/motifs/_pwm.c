@@ -1,3 +1,4 @@
+#define PY_SSIZE_T_CLEAN
 #include <Python.h>
 #define NPY_NO_DEPRECATED_API NPY_1_7_API_VERSION
 #include "numpy/arrayobject.h"
@@ -5,7 +6,7 @@
 
 
 static PyObject*
-calculate(const char sequence[], int s, PyObject* matrix, npy_intp m)
+calculate(const char sequence[], Py_ssize_t s, PyObject* matrix, npy_intp m)
 {
     npy_intp n = s - m + 1;
     npy_intp i, j;
@@ -81,7 +82,7 @@ py_calculate(PyObject* self, PyObject* args, PyObject* keywords)
     PyObject* matrix = NULL;
     static char* kwlist[] = {"sequence", "matrix", NULL};
     npy_intp m;
-    int s;
+    Py_ssize_t s;
     PyObject* result;
     PyArrayObject* array;
     if(!PyArg_ParseTupleAndKeywords(args, keywords, "s#O&", kwlist,
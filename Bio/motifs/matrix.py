@@ -12,49 +12,86 @@ import math
 import platform
 
 from Bio._py3k import range
+from Bio._py3k import _as_bytes
 
 from Bio.Seq import Seq
 from Bio.Alphabet import IUPAC
 from Bio import Alphabet
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+if numpy is not None:
+    # Index of each (upper or lower case) letter in "ACGT", with 4 for any
+    # other letter (also used by Bio.motifs.scanner)
+    _letter_index = numpy.empty(256, numpy.intp)
+    _letter_index[:] = 4
+    for _index, _letter in enumerate("ACGT"):
+        _letter_index[ord(_letter)] = _index
+        _letter_index[ord(_letter.lower())] = _index
+
 
 # Make sure that we use C-accelerated PWM calculations if running under CPython.
-# Fall back to the slower Python implementation if Jython or IronPython.
+# Fall back to NumPy, or to the slower Python implementation if Jython or
+# IronPython.
 try:
     from . import _pwm
 
     def _calculate(score_dict, sequence, m, n):
         """Calculate scores using C code (PRIVATE)."""
+        if n < m:
+            return numpy.zeros(0, numpy.float32)
         logodds = [[score_dict[letter][i] for letter in "ACGT"] for i in range(m)]
         return _pwm.calculate(sequence, logodds)
 
 except ImportError:
-    if platform.python_implementation() == 'CPython':
-        import warnings
-        from Bio import BiopythonWarning
-        warnings.warn("Using pure-Python as missing Biopython's C code for PWM. "
-                      "This can happen if Biopython was installed without NumPy. "
-                      "Try re-installing NumPy and then Biopython.",
-                      BiopythonWarning)
-
-    def _calculate(score_dict, sequence, m, n):
-        """Calculate scores using Python code (PRIVATE).
-
-        The C code handles mixed case so Python version must too.
-        """
-        sequence = sequence.upper()
-        scores = []
-        for i in range(n - m + 1):
-            score = 0.0
+    if numpy is not None:
+        def _calculate(score_dict, sequence, m, n):
+            """Calculate scores using NumPy (PRIVATE).
+
+            Like the C code, the scores of all windows are calculated at
+            once, adding up the scores of the windows one position at a time.
+            """
+            if n < m:
+                return numpy.zeros(0)
+            logodds = numpy.array([[score_dict[letter][i] for letter in "ACGT"] +
+                                   [float("nan")] for i in range(m)])
+            codes = _letter_index[numpy.frombuffer(_as_bytes(sequence),
+                                                   numpy.uint8)]
+            scores = numpy.zeros(n - m + 1)
             for position in range(m):
-                letter = sequence[i + position]
-                try:
-                    score += score_dict[letter][position]
-                except KeyError:
-                    score = float("nan")
-                    break
-            scores.append(score)
-        return scores
+                scores += logodds[position, codes[position:n - m + 1 + position]]
+            return scores
+
+    else:
+        if platform.python_implementation() == 'CPython':
+            import warnings
+            from Bio import BiopythonWarning
+            warnings.warn("Using pure-Python as missing Biopython's C code for PWM. "
+                          "This can happen if Biopython was installed without NumPy. "
+                          "Try re-installing NumPy and then Biopython.",
+                          BiopythonWarning)
+
+        def _calculate(score_dict, sequence, m, n):
+            """Calculate scores using Python code (PRIVATE).
+
+            The C code handles mixed case so Python version must too.
+            """
+            sequence = sequence.upper()
+            scores = []
+            for i in range(n - m + 1):
+                score = 0.0
+                for position in range(m):
+                    letter = sequence[i + position]
+                    try:
+                        score += score_dict[letter][position]
+                    except KeyError:
+                        score = float("nan")
+                        break
+                scores.append(score)
+            return scores
 
 
 class GenericPositionMatrix(dict):
@@ -381,6 +418,15 @@ class PositionSpecificScoringMatrix(GenericPositionMatrix):
          - otherwise, the result is a one-dimensional list or numpy array
 
         """
+        scores = self._calculate(sequence)
+
+        if len(scores) == 1:
+            return scores[0]
+        else:
+            return scores
+
+    def _calculate(self, sequence):
+        """Return the PWM scores of all positions as a list or array (PRIVATE)."""
         # TODO - Code itself tolerates ambiguous bases (as NaN).
         if not isinstance(self.alphabet, IUPAC.IUPACUnambiguousDNA):
             raise ValueError("PSSM has wrong alphabet: %s - Use only with DNA motifs"
@@ -396,33 +442,92 @@ class PositionSpecificScoringMatrix(GenericPositionMatrix):
         m = self.length
         n = len(sequence)
 
-        scores = _calculate(self, sequence, m, n)
+        return _calculate(self, sequence, m, n)
 
-        if len(scores) == 1:
-            return scores[0]
-        else:
-            return scores
+    def _search_chunks(self, sequence, threshold, both, chunksize):
+        """Find hits in each chunk of the sequence, using NumPy (PRIVATE).
 
-    def search(self, sequence, threshold=0.0, both=True):
+        A generator function, returning arrays of the positions and scores
+        of the hits in each chunk, in the same order as the search method.
+        """
+        n = len(sequence)
+        m = self.length
+        if both:
+            rc = self.reverse_complement()
+        for start in range(0, n - m + 1, chunksize):
+            subseq = sequence[start:start + chunksize + m - 1]
+            scores = numpy.asarray(self._calculate(subseq))
+            positions = numpy.flatnonzero(scores > threshold)
+            scores = scores[positions]
+            positions += start
+            if both:
+                rc_scores = numpy.asarray(rc._calculate(subseq))
+                rc_positions = numpy.flatnonzero(rc_scores > threshold)
+                rc_scores = rc_scores[rc_positions]
+                rc_positions += start
+                # At each position a hit on the forward strand comes first
+                order = numpy.argsort(numpy.concatenate((2 * positions,
+                                                         2 * rc_positions + 1)),
+                                      kind="mergesort")
+                positions = numpy.concatenate((positions,
+                                               rc_positions - n))[order]
+                scores = numpy.concatenate((scores, rc_scores))[order]
+            yield positions, scores
+
+    def search(self, sequence, threshold=0.0, both=True, chunksize=10 ** 6):
         """Find hits with PWM score above given threshold.
 
         A generator function, returning found hits in the given sequence
-        with the pwm score higher than the threshold.
+        with the pwm score higher than the threshold. Hits on the reverse
+        strand (if both is True) are given negative positions.
+
+        The scores of all positions are calculated in one go, in chunks of
+        chunksize positions at a time to limit the memory used for long
+        sequences (e.g. chromosomes).
         """
-        sequence = sequence.upper()
+        if numpy is not None:
+            for positions, scores in self._search_chunks(sequence, threshold,
+                                                         both, chunksize):
+                for position, score in zip(positions.tolist(), scores):
+                    yield (position, score)
+            return
         n = len(sequence)
         m = self.length
         if both:
             rc = self.reverse_complement()
-        for position in range(0, n - m + 1):
-            s = sequence[position:position + m]
-            score = self.calculate(s)
-            if score > threshold:
-                yield (position, score)
+        for start in range(0, n - m + 1, chunksize):
+            subseq = sequence[start:start + chunksize + m - 1]
+            scores = self._calculate(subseq)
             if both:
-                score = rc.calculate(s)
+                rc_scores = rc._calculate(subseq)
+            for i, score in enumerate(scores):
                 if score > threshold:
-                    yield (position - n, score)
+                    yield (start + i, score)
+                if both:
+                    score = rc_scores[i]
+                    if score > threshold:
+                        yield (start + i - n, score)
+
+    def scan(self, sequence, threshold=0.0, both=True, chunksize=10 ** 6):
+        """Find all hits with PWM score above given threshold at once.
+
+        Returns a NumPy array of the positions of the hits and a NumPy array
+        of their scores, in the same order as the search method (which is
+        more convenient for sequences with many hits, such as a genome).
+        """
+        if numpy is None:
+            from Bio import MissingPythonDependencyError
+            raise MissingPythonDependencyError(
+                "Install NumPy if you want to use scan.")
+        positions = []
+        scores = []
+        for chunk_positions, chunk_scores in self._search_chunks(
+                sequence, threshold, both, chunksize):
+            positions.append(chunk_positions)
+            scores.append(chunk_scores)
+        if not positions:
+            return numpy.zeros(0, numpy.intp), numpy.zeros(0)
+        return numpy.concatenate(positions), numpy.concatenate(scores)
 
     @property
     def max(self):
@@ -547,7 +652,12 @@ class PositionSpecificScoringMatrix(GenericPositionMatrix):
         return numerator / denominator
 
     def distribution(self, background=None, precision=10 ** 3):
-        """Calculate the distribution of the scores at the given precision."""
+        """Calculate the distribution of the scores at the given precision.
+
+        Distributions are cached (see Bio.motifs.thresholds), so calling this
+        again for the same scores, background and precision returns a copy of
+        the same ScoreDistribution without recalculating it.
+        """
         from .thresholds import ScoreDistribution
         if background is None:
             background = dict.fromkeys(self._letters, 1.0)
@@ -556,4 +666,4 @@ class PositionSpecificScoringMatrix(GenericPositionMatrix):
         total = sum(background.values())
         for letter in self._letters:
             background[letter] /= total
-        return ScoreDistribution(precision=precision, pssm=self, background=background)
+        return ScoreDistribution.from_pssm(self, background, precision)
@@ -0,0 +1,257 @@
+# This file is part of the Biopython distribution and governed by your
+# choice of the "Biopython License Agreement" or the "BSD 3-Clause License".
+# Please see the LICENSE file that should have been included as part of this
+# package.
+
+"""Scan DNA sequences for many motifs at once.
+
+Searching a sequence with each motif of a library (such as JASPAR or
+TRANSFAC) separately means reading and encoding the sequence once per motif.
+A MotifScanner stacks the position specific scoring matrices of all motifs
+(and of their reverse complements) into one array, and scores all of them in
+a single pass over each chunk of the encoded sequence.
+
+    >>> from Bio import motifs
+    >>> from Bio.Seq import Seq
+    >>> from Bio.motifs.scanner import MotifScanner
+    >>> tata = motifs.create([Seq("TATAAA"), Seq("TATAAT"), Seq("TATATA")])
+    >>> tata.name = "TATA"
+    >>> ebox = motifs.create([Seq("CACGTG"), Seq("CACATG")])
+    >>> ebox.name = "E-box"
+    >>> scanner = MotifScanner([tata, ebox], threshold=3.0)
+    >>> for motif, seq_id, position, strand, score in scanner.scan(
+    ...         [Seq("GGTATAAAGGCACGTGGG")]):
+    ...     print("%s %s %i %s %.2f" % (motif.name, seq_id, position,
+    ...                                 strand, score))
+    TATA 0 2 + 10.83
+    E-box 0 10 + 11.00
+    E-box 0 10 - 11.00
+
+Thresholds can also be given as p-values, which are converted into score
+thresholds using the score distribution of each motif (see the
+``distribution`` method of position specific scoring matrices).
+"""
+
+try:
+    import numpy
+except ImportError:
+    from Bio import MissingPythonDependencyError
+    raise MissingPythonDependencyError(
+        "Install NumPy if you want to use Bio.motifs.scanner.")
+
+from Bio._py3k import basestring, _as_bytes
+from Bio._utils import _BLOCK_ELEMENTS, _pool_imap
+
+from Bio.motifs.matrix import _letter_index
+from Bio.Seq import Seq
+from Bio.SeqRecord import SeqRecord
+
+
+def _score_chunk(scoring, thresholds, text, width):
+    """Find the hits in a chunk of a sequence (PRIVATE).
+
+    The text of the chunk should include the letters after its last window
+    position. Returns arrays of the window positions, the rows of the scoring
+    matrix and the scores of the hits, ordered by position and then by row.
+    """
+    weights, lengths, specials = scoring
+    length = len(weights) // 4
+    # One-hot encoding of the sequence, padded with zeros after its end
+    codes = _letter_index[numpy.frombuffer(_as_bytes(text), numpy.uint8)]
+    letters = numpy.zeros((width + length - 1, 4))
+    known = numpy.flatnonzero(codes < 4)
+    letters[known, codes[known]] = 1.0
+    # Each window is a row of 4 * length values in the same memory
+    windows = numpy.lib.stride_tricks.as_strided(
+        letters, (width, 4 * length), (letters.strides[0], letters.strides[1]))
+    scores = numpy.dot(windows, weights)
+    for value, rows, indicators in specials:
+        found = numpy.dot(windows, indicators) > 0
+        scores[:, rows] += numpy.where(found, value, 0.0)
+    # A window can only be a hit if it has no other letters (and does not
+    # run past the end of the sequence) up to the length of the motif
+    unknown = numpy.append(numpy.flatnonzero(codes >= 4), len(codes))
+    starts = numpy.arange(width)
+    room = unknown[numpy.searchsorted(unknown, starts)] - starts
+    hits = (scores > thresholds) & (room[:, None] >= lengths)
+    positions, hit_rows = numpy.nonzero(hits)
+    return positions, hit_rows, scores[positions, hit_rows]
+
+
+_pool_scoring = None
+_pool_thresholds = None
+
+
+def _init_pool(scoring, thresholds):
+    """Share the stacked scoring matrices with a worker process (PRIVATE)."""
+    global _pool_scoring, _pool_thresholds
+    _pool_scoring = scoring
+    _pool_thresholds = thresholds
+
+
+def _pool_score_chunk(task):
+    """Find the hits in a chunk of a sequence in a worker process (PRIVATE)."""
+    index, seq_id, start, text, width = task
+    return (index, seq_id, start) + _score_chunk(_pool_scoring,
+                                                 _pool_thresholds, text, width)
+
+
+class MotifScanner(object):
+    """Scan sequences for hits of a set of DNA motifs in a single pass.
+
+    The scanner keeps the scoring matrices of all motifs in one array, with
+    one column per motif and strand and the positions of shorter motifs
+    padded to the length of the longest motif. The scores of all motifs are
+    then calculated as a single matrix product of the one-hot encoded windows
+    of each chunk of the sequence with this array.
+
+    Like the ``search`` method of position specific scoring matrices, a hit
+    is a window of the sequence with a score higher than the threshold, and
+    windows with letters other than A, C, G and T (in upper or lower case)
+    are skipped.
+
+    :Parameters:
+        motifs : list
+            Motif objects (whose pssm attribute is used) or position
+            specific scoring matrices.
+        threshold : float or list
+            score threshold for all motifs, or for each motif (default 0.0).
+        pvalue : float or list
+            p-value (false positive rate) threshold for all motifs or for
+            each motif, used instead of the score threshold.
+        both : bool
+            whether to scan the reverse strand as well (default True).
+        precision : int
+            precision of the score distributions used to find the score
+            thresholds for p-values.
+
+    """
+
+    def __init__(self, motifs, threshold=0.0, pvalue=None, both=True,
+                 precision=10 ** 3):
+        """Initialize the class."""
+        self.motifs = list(motifs)
+        self.both = both
+        pssms = [getattr(motif, "pssm", motif) for motif in self.motifs]
+        count = len(pssms)
+        if pvalue is not None:
+            if not isinstance(pvalue, (list, tuple)):
+                pvalue = [pvalue] * count
+            if len(pvalue) != count:
+                raise ValueError("Need one p-value per motif")
+            threshold = []
+            for motif, pssm, value in zip(self.motifs, pssms, pvalue):
+                distribution = pssm.distribution(
+                    getattr(motif, "background", None), precision)
+                threshold.append(distribution.threshold_fpr(value))
+        elif not isinstance(threshold, (list, tuple)):
+            threshold = [threshold] * count
+        if len(threshold) != count:
+            raise ValueError("Need one threshold per motif")
+        self.thresholds = [float(value) for value in threshold]
+        strands = [pssms]
+        if both:
+            strands.append([pssm.reverse_complement() for pssm in pssms])
+        length = max([pssm.length for pssm in pssms] or [1])
+        # The scores of each letter at each position, in the order of the
+        # one-hot encoded windows, with one column per motif and strand
+        # (shorter motifs are padded with zeros)
+        table = numpy.zeros((length, 4, count * len(strands)))
+        for index, pssm in enumerate(pssms):
+            for strand, matrices in enumerate(strands):
+                row = index * len(strands) + strand
+                try:
+                    values = [matrices[index][letter] for letter in "ACGT"]
+                except KeyError:
+                    raise ValueError("Only DNA motifs can be scanned")
+                table[:pssm.length, :, row] = numpy.transpose(values)
+        table = table.reshape(4 * length, -1)
+        # Infinite (and NaN) scores are added separately, as multiplying them
+        # by zero for the letters not in a window would give NaN
+        specials = []
+        for value in (-numpy.inf, numpy.inf, numpy.nan):
+            if value != value:
+                indicators = numpy.isnan(table)
+            else:
+                indicators = table == value
+            rows = numpy.flatnonzero(indicators.any(axis=0))
+            if len(rows):
+                specials.append((value, rows, indicators[:, rows] * 1.0))
+        table[~numpy.isfinite(table)] = 0.0
+        lengths = numpy.repeat([pssm.length for pssm in pssms], len(strands))
+        self._scoring = (table, lengths, specials)
+        self._thresholds = numpy.repeat(self.thresholds, len(strands))
+
+    def _tasks(self, sequences, chunksize):
+        """Split the sequences into chunks of window positions (PRIVATE)."""
+        if isinstance(sequences, (basestring, Seq, SeqRecord)):
+            sequences = [sequences]
+        length = len(self._scoring[0]) // 4
+        for index, sequence in enumerate(sequences):
+            if isinstance(sequence, SeqRecord):
+                seq_id = sequence.id
+                sequence = sequence.seq
+            else:
+                seq_id = index
+            text = str(sequence)
+            for start in range(0, len(text), chunksize):
+                width = min(chunksize, len(text) - start)
+                yield (index, seq_id, start,
+                       text[start:start + width + length - 1], width)
+
+    def scan(self, sequences, processes=None, chunksize=None):
+        """Find the hits of all motifs in the given sequences.
+
+        A generator function, returning a (motif, seq_id, position, strand,
+        score) tuple for each hit, ordered by sequence, position and motif,
+        and with the forward strand first. The position is the start of the
+        hit on the forward strand, so the hit is the sequence from position
+        to position plus the length of the motif (reverse complemented for
+        a hit on the "-" strand).
+
+        Arguments:
+         - sequences - a list or iterator of SeqRecord objects (whose id is
+           used as seq_id), or of Seq objects or strings (whose number in the
+           list is used as seq_id). A single sequence can also be given.
+         - processes - number of worker processes to spread the chunks of the
+           sequences over using the multiprocessing module (default None,
+           scan in this process).
+         - chunksize - number of window positions scored at once (by default
+           enough for about four million scores).
+
+        """
+        weights = self._scoring[0]
+        if chunksize is None:
+            chunksize = max(1, _BLOCK_ELEMENTS // max(weights.shape))
+        tasks = self._tasks(sequences, chunksize)
+        if processes is None or processes < 2:
+            results = ((index, seq_id, start) +
+                       _score_chunk(self._scoring, self._thresholds, text,
+                                    width)
+                       for index, seq_id, start, text, width in tasks)
+            for hit in self._hits(results):
+                yield hit
+        else:
+            import multiprocessing
+            pool = multiprocessing.Pool(processes, _init_pool,
+                                        (self._scoring, self._thresholds))
+            try:
+                results = _pool_imap(pool, _pool_score_chunk, tasks,
+                                     processes)
+                for hit in self._hits(results):
+                    yield hit
+            finally:
+                # Stop scoring the queued chunks if the caller stopped early
+                pool.terminate()
+                pool.join()
+
+    def _hits(self, results):
+        """Turn the hits found in each chunk into tuples (PRIVATE)."""
+        strands = 2 if self.both else 1
+        for index, seq_id, start, positions, hit_rows, scores in results:
+            positions = (positions + start).tolist()
+            for position, row, score in zip(positions, hit_rows.tolist(),
+                                            scores.tolist()):
+                strand = "-" if row % strands else "+"
+                yield (self.motifs[row // strands], seq_id, position, strand,
+                       score)
@@ -3,7 +3,28 @@
 # This code is part of the Biopython distribution and governed by its
 # license.  Please see the LICENSE file that should have been included
 # as part of this package.
-"""Approximate calculation of appropriate thresholds for motif finding."""
+"""Approximate calculation of appropriate thresholds for motif finding.
+
+The score distributions of position specific scoring matrices are kept in a
+cache (keyed by the scores, background and precision), so that thresholds
+for the same motif are found without recalculating its distribution. For a
+motif database, the cache can be saved to a file with ``save_cache`` once,
+and loaded again in later sessions with ``load_cache``.
+"""
+
+import copy
+import json
+from collections import OrderedDict
+
+try:
+    import numpy
+except ImportError:
+    # The distributions are calculated in pure Python instead
+    numpy = None
+
+# Maximum number of score distributions kept in the cache
+_CACHE_SIZE = 256
+_cache = OrderedDict()
 
 
 class ScoreDistribution(object):
@@ -27,27 +48,58 @@ class ScoreDistribution(object):
             self.n_points = precision * pssm.length
             self.ic = pssm.mean(background)
         self.step = self.interval / (self.n_points - 1)
-        self.mo_density = [0.0] * self.n_points
+        if numpy is None:
+            self.mo_density = [0.0] * self.n_points
+            self.bg_density = [0.0] * self.n_points
+        else:
+            self.mo_density = numpy.zeros(self.n_points)
+            self.bg_density = numpy.zeros(self.n_points)
         self.mo_density[-self._index_diff(self.min_score)] = 1.0
-        self.bg_density = [0.0] * self.n_points
         self.bg_density[-self._index_diff(self.min_score)] = 1.0
         if pssm is None:
             for lo, mo in zip(motif.log_odds(), motif.pwm()):
                 self.modify(lo, mo, motif.background)
         else:
             for position in range(pssm.length):
-                mo_new = [0.0] * self.n_points
-                bg_new = [0.0] * self.n_points
                 lo = pssm[:, position]
-                for letter, score in lo.items():
-                    bg = background[letter]
-                    mo = pow(2, pssm[letter, position]) * bg
-                    d = self._index_diff(score)
-                    for i in range(self.n_points):
-                        mo_new[self._add(i, d)] += self.mo_density[i] * mo
-                        bg_new[self._add(i, d)] += self.bg_density[i] * bg
-                self.mo_density = mo_new
-                self.bg_density = bg_new
+                mo = dict((letter, pow(2, score) * background[letter])
+                          for letter, score in lo.items())
+                self.modify(lo, mo, background)
+
+    @classmethod
+    def from_pssm(cls, pssm, background, precision=10 ** 3):
+        """Return the score distribution of a PSSM, using the cache.
+
+        The background should be a dictionary of the (normalized) background
+        frequency of each letter. The distribution is only calculated if it
+        is not in the cache yet, and each call returns a new object (sharing
+        the read-only densities of the cached distribution).
+        """
+        key = _cache_key(pssm, background, precision)
+        try:
+            distribution = _cache.pop(key)
+        except KeyError:
+            distribution = cls(precision=precision, pssm=pssm,
+                               background=background)
+            distribution._freeze()
+        # Most recently used last
+        _cache[key] = distribution
+        while len(_cache) > _CACHE_SIZE:
+            _cache.popitem(last=False)
+        return copy.copy(distribution)
+
+    def _freeze(self):
+        """Make the densities read-only, before caching them (PRIVATE).
+
+        The modify method replaces the densities rather than changing them,
+        so copies of a cached distribution can still be modified.
+        """
+        if numpy is None:
+            self.mo_density = tuple(self.mo_density)
+            self.bg_density = tuple(self.bg_density)
+        else:
+            self.mo_density.flags.writeable = False
+            self.bg_density.flags.writeable = False
 
     def _index_diff(self, x, y=0.0):
         return int((x - y + 0.5 * self.step) // self.step)
@@ -55,46 +107,92 @@ class ScoreDistribution(object):
     def _add(self, i, j):
         return max(0, min(self.n_points - 1, i + j))
 
+    def _shift(self, new, density, d, factor):
+        """Add the density shifted by d points and multiplied by factor (PRIVATE).
+
+        As in the _add method, points shifted past either end of the range
+        are added to the first or last point.
+        """
+        n = self.n_points
+        if d >= 0:
+            keep = max(n - 1 - d, 0)
+            new[d:d + keep] += density[:keep] * factor
+            new[n - 1] += density[keep:].sum() * factor
+        else:
+            keep = max(n - 1 + d, 0)
+            new[1:1 + keep] += density[n - keep:] * factor
+            new[0] += density[:n - keep].sum() * factor
+
     def modify(self, scores, mo_probs, bg_probs):
-        mo_new = [0.0] * self.n_points
-        bg_new = [0.0] * self.n_points
+        if numpy is None:
+            mo_new = [0.0] * self.n_points
+            bg_new = [0.0] * self.n_points
+            for k, v in scores.items():
+                d = self._index_diff(v)
+                for i in range(self.n_points):
+                    mo_new[self._add(i, d)] += self.mo_density[i] * mo_probs[k]
+                    bg_new[self._add(i, d)] += self.bg_density[i] * bg_probs[k]
+            self.mo_density = mo_new
+            self.bg_density = bg_new
+            return
+        mo_new = numpy.zeros(self.n_points)
+        bg_new = numpy.zeros(self.n_points)
         for k, v in scores.items():
             d = self._index_diff(v)
-            for i in range(self.n_points):
-                mo_new[self._add(i, d)] += self.mo_density[i] * mo_probs[k]
-                bg_new[self._add(i, d)] += self.bg_density[i] * bg_probs[k]
+            self._shift(mo_new, self.mo_density, d, mo_probs[k])
+            self._shift(bg_new, self.bg_density, d, bg_probs[k])
         self.mo_density = mo_new
         self.bg_density = bg_new
 
     def threshold_fpr(self, fpr):
         """Approximate the log-odds threshold which makes the type I error (false positive rate)."""
-        i = self.n_points
-        prob = 0.0
-        while prob < fpr:
-            i -= 1
-            prob += self.bg_density[i]
-        return self.min_score + i * self.step
+        if numpy is None:
+            i = self.n_points
+            prob = 0.0
+            while prob < fpr:
+                i -= 1
+                prob += self.bg_density[i]
+            return self.min_score + i * self.step
+        # The false positive rate of each threshold, from the highest down
+        rates = numpy.concatenate(([0.0], numpy.cumsum(self.bg_density[::-1])))
+        i = self.n_points - int(numpy.searchsorted(rates, fpr))
+        return self.min_score + max(i, 0) * self.step
 
     def threshold_fnr(self, fnr):
         """Approximate the log-odds threshold which makes the type II error (false negative rate)."""
-        i = -1
-        prob = 0.0
-        while prob < fnr:
-            i += 1
-            prob += self.mo_density[i]
-        return self.min_score + i * self.step
+        if numpy is None:
+            i = -1
+            prob = 0.0
+            while prob < fnr:
+                i += 1
+                prob += self.mo_density[i]
+            return self.min_score + i * self.step
+        # The false negative rate of each threshold, from the lowest up
+        rates = numpy.concatenate(([0.0], numpy.cumsum(self.mo_density)))
+        i = int(numpy.searchsorted(rates, fnr)) - 1
+        return self.min_score + min(i, self.n_points - 1) * self.step
 
     def threshold_balanced(self, rate_proportion=1.0, return_rate=False):
         """Approximate log-odds threshold making FNR equal to FPR times rate_proportion."""
-        i = self.n_points
-        fpr = 0.0
-        fnr = 1.0
-        while fpr * rate_proportion < fnr:
-            i -= 1
-            fpr += self.bg_density[i]
-            fnr -= self.mo_density[i]
+        if numpy is None:
+            i = self.n_points
+            fpr = 0.0
+            fnr = 1.0
+            while fpr * rate_proportion < fnr:
+                i -= 1
+                fpr += self.bg_density[i]
+                fnr -= self.mo_density[i]
+            if return_rate:
+                return self.min_score + i * self.step, fpr
+            else:
+                return self.min_score + i * self.step
+        fprs = numpy.concatenate(([0.0], numpy.cumsum(self.bg_density[::-1])))
+        fnrs = numpy.cumsum(numpy.concatenate(([1.0], -self.mo_density[::-1])))
+        reached = fprs * rate_proportion >= fnrs
+        j = int(reached.argmax()) if reached.any() else self.n_points
+        i = self.n_points - j
         if return_rate:
-            return self.min_score + i * self.step, fpr
+            return self.min_score + i * self.step, float(fprs[j])
         else:
             return self.min_score + i * self.step
 
@@ -106,3 +204,60 @@ class ScoreDistribution(object):
         are not directly comparable.
         """
         return self.threshold_fpr(fpr=2 ** -self.ic)
+
+
+def _cache_key(pssm, background, precision):
+    """Return the key of a score distribution in the cache (PRIVATE)."""
+    scores = tuple((letter, tuple(pssm[letter])) for letter in sorted(pssm))
+    return scores, tuple(sorted(background.items())), precision
+
+
+def clear_cache():
+    """Remove all score distributions from the cache."""
+    _cache.clear()
+
+
+def save_cache(filename):
+    """Save the cached score distributions to a NumPy .npz file."""
+    if numpy is None:
+        from Bio import MissingPythonDependencyError
+        raise MissingPythonDependencyError(
+            "Install NumPy if you want to save the cache.")
+    index = []
+    arrays = {}
+    for number, (key, distribution) in enumerate(_cache.items()):
+        scores, background, precision = key
+        index.append([scores, background, precision, distribution.min_score,
+                      distribution.interval, distribution.n_points,
+                      distribution.ic, distribution.step])
+        arrays["mo_%i" % number] = distribution.mo_density
+        arrays["bg_%i" % number] = distribution.bg_density
+    numpy.savez(filename, index=numpy.array(json.dumps(index)), **arrays)
+
+
+def load_cache(filename):
+    """Add the score distributions saved with save_cache to the cache."""
+    if numpy is None:
+        from Bio import MissingPythonDependencyError
+        raise MissingPythonDependencyError(
+            "Install NumPy if you want to load the cache.")
+    data = numpy.load(filename, allow_pickle=False)
+    try:
+        index = json.loads(str(data["index"]))
+        for number, values in enumerate(index):
+            scores, background, precision = values[:3]
+            key = (tuple((letter, tuple(column)) for letter, column in scores),
+                   tuple((letter, value) for letter, value in background),
+                   precision)
+            distribution = ScoreDistribution.__new__(ScoreDistribution)
+            (distribution.min_score, distribution.interval,
+             distribution.n_points, distribution.ic,
+             distribution.step) = values[3:]
+            distribution.mo_density = data["mo_%i" % number]
+            distribution.bg_density = data["bg_%i" % number]
+            distribution._freeze()
+            _cache[key] = distribution
+    finally:
+        data.close()
+    while len(_cache) > _CACHE_SIZE:
+        _cache.popitem(last=False)
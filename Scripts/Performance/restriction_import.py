@@ -0,0 +1,32 @@
+#!/usr/bin/env python
+"""Test timing of importing Bio.Restriction and creating its enzymes."""
+from __future__ import print_function
+
+import subprocess
+import sys
+
+repeats = 5
+statements = [
+    ("import Bio.Seq", "import Bio.Seq"),
+    ("import Bio.Restriction", "import Bio.Restriction"),
+    ("from Bio.Restriction import EcoRI", "from Bio.Restriction import EcoRI"),
+    ("from Bio.Restriction import AllEnzymes",
+     "from Bio.Restriction import AllEnzymes"),
+]
+
+# Each statement is timed in a new Python process, so that nothing has been
+# imported already
+code = """
+import time
+start_time = time.time()
+%s
+print(time.time() - start_time)
+"""
+
+for name, statement in statements:
+    times = []
+    for i in range(repeats):
+        output = subprocess.check_output([sys.executable, "-c",
+                                          code % statement])
+        times.append(float(output))
+    print("%s\n\tbest of %i: %f seconds" % (name, repeats, min(times)))
@@ -110,8 +110,8 @@ DOCTEST_MODULES = [
     "Bio.motifs.applications._xxmotif",
     "Bio.pairwise2",
     "Bio.Phylo.Applications._Raxml",
-    "Bio.Phylo.Consensus",
     "Bio.Phylo.BaseTree",
+    "Bio.Phylo.CompactTree",
     "Bio.SearchIO",
     "Bio.SearchIO._model",
     "Bio.SearchIO._model.query",
@@ -150,10 +150,19 @@ DOCTEST_MODULES = [
 if is_numpy():
     DOCTEST_MODULES.extend([
         "Bio.Affy.CelFile",
+        "Bio.Align.ArrayAlignment",
         "Bio.MaxEntropy",
+        "Bio.motifs.scanner",
+        "Bio.PDB.EnsembleSuperimposer",
+        "Bio.PDB.PDBParser",
         "Bio.PDB.Polypeptide",
         "Bio.PDB.Selection",
+        "Bio.PDB.StructureCache",
+        "Bio.Phylo.IndexedTree",
         "Bio.SeqIO.PdbIO",
+        "Bio.SeqUtils.kmers",
+        "Bio.SeqUtils.ProtParam",
+        "Bio.SeqUtils.windows",
         "Bio.Statistics.lowess",
         "Bio.SVDSuperimposer",
     ])
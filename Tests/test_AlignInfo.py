@@ -6,6 +6,13 @@
 """Bio.Align.AlignInfo related tests."""
 import unittest
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from Bio import MissingPythonDependencyError
+
 from Bio.Alphabet import DNAAlphabet, generic_protein
 from Bio.Alphabet import HasStopCodon, Gapped
 from Bio.Alphabet.IUPAC import unambiguous_dna
@@ -14,6 +21,7 @@ from Bio.Seq import Seq
 from Bio.SeqRecord import SeqRecord
 from Bio import AlignIO
 from Bio.SubsMat.FreqTable import FreqTable, FREQ
+from Bio.Align import AlignInfo
 from Bio.Align.AlignInfo import SummaryInfo
 import math
 
@@ -143,6 +151,131 @@ X  0.0 0.0 0.0 0.0 0.0 0.0 0.0 0.0 0.0 0.0 0.0 0.0 0.0 0.0 0.0 0.0 0.0
                                                1.290, 1.290, 0.80, 0.610, 0.390, 0.470, 0.040], places=2)
         self.assertAlmostEqual(ic, 7.546, places=3)
 
+    def test_weights(self):
+        # example from the replacement_dictionary docstring
+        alpha = Gapped(unambiguous_dna)
+        records = []
+        for seq, weight in (("GTATC", 0.5), ("AT--C", 0.8), ("CTGTC", 1.0)):
+            record = SeqRecord(Seq(seq, alpha))
+            record.annotations["weight"] = weight
+            records.append(record)
+        alignment = MultipleSeqAlignment(records, alpha)
+        summary = SummaryInfo(alignment)
+
+        rep_dict = summary.replacement_dictionary()
+        self.assertEqual(len(rep_dict), 16)
+        self.assertAlmostEqual(rep_dict[("G", "A")], 0.4)
+        self.assertAlmostEqual(rep_dict[("G", "C")], 0.5)
+        self.assertAlmostEqual(rep_dict[("A", "C")], 0.8)
+        self.assertAlmostEqual(rep_dict[("A", "G")], 0.5)
+        self.assertAlmostEqual(rep_dict[("C", "C")], 1.7)
+        self.assertAlmostEqual(rep_dict[("T", "T")], 2.2)
+        self.assertEqual(rep_dict[("C", "A")], 0)
+
+        pssm = summary.pos_specific_score_matrix()
+        self.assertEqual(str(pssm), """\
+    A   C   G   T
+X  0.8 1.0 0.5 0.0
+T  0.0 0.0 0.0 2.3
+X  0.5 0.0 1.0 0.0
+T  0.0 0.0 0.0 1.5
+C  0.0 2.3 0.0 0.0
+""")
+        ic = summary.information_content()
+        self.assertAlmostEqualList(summary.ic_vector,
+                                   [0.469, 2.0, 0.303, 0.902, 2.0], places=3)
+        self.assertAlmostEqual(ic, 5.674, places=3)
+
+        try:
+            # The same results are calculated without NumPy
+            AlignInfo.numpy = None
+            summary = SummaryInfo(alignment)
+            self.assertEqual(summary.replacement_dictionary(), rep_dict)
+            self.assertEqual(str(summary.pos_specific_score_matrix()),
+                             str(pssm))
+            self.assertEqual(summary.information_content(), ic)
+        finally:
+            AlignInfo.numpy = numpy
+
+        try:
+            from Bio.Align.ArrayAlignment import ArrayAlignment
+        except MissingPythonDependencyError:
+            return
+        # The weights of an ArrayAlignment are used instead
+        array = ArrayAlignment.from_alignment(alignment, [0.5, 0.8, 1.0])
+        summary = SummaryInfo(array)
+        self.assertEqual(str(summary.pos_specific_score_matrix()), str(pssm))
+        self.assertAlmostEqual(summary.information_content(), ic)
+        self.assertEqual(summary.replacement_dictionary(), rep_dict)
+
+    def test_weights_exact(self):
+        # Fractional weights, giving the same sums as summing the
+        # replacements of each pair of sequences in turn
+        alpha = Gapped(unambiguous_dna)
+        records = []
+        for seq, weight in (("ACGTTGCAAC", 0.1), ("ACGTTGCAAC", 0.2),
+                            ("ACGATGCTAC", 0.3), ("ACCTTG-AAC", 0.7),
+                            ("ACGTAGCAAC", 0.1), ("TCGTTGCAGC", 0.3),
+                            ("ACGTTGCAAC", 0.7)):
+            record = SeqRecord(Seq(seq, alpha))
+            record.annotations["weight"] = weight
+            records.append(record)
+        alignment = MultipleSeqAlignment(records, alpha)
+        expected = {("G", "G"): 3.349999999999999,
+                    ("G", "A"): 0.21,
+                    ("G", "C"): 0.41999999999999993,
+                    ("A", "G"): 0.42000000000000004,
+                    ("A", "A"): 4.919999999999999,
+                    ("A", "T"): 1.1500000000000001,
+                    ("T", "A"): 0.9699999999999999,
+                    ("T", "T"): 3.6799999999999993,
+                    ("C", "G"): 0.7699999999999999,
+                    ("C", "C"): 5.62}
+        ic_vector = [1.456435556800403, 2.0, 1.1291355307646351,
+                     1.456435556800403, 1.750117707166814, 2.0,
+                     1.0642710745415045, 1.456435556800403,
+                     1.456435556800403, 2.0]
+        try:
+            # With NumPy if available, and without NumPy
+            for module_numpy in (numpy, None):
+                AlignInfo.numpy = module_numpy
+                summary = SummaryInfo(alignment)
+                rep_dict = summary.replacement_dictionary()
+                self.assertEqual(len(rep_dict), 16)
+                self.assertEqual(dict((key, value) for key, value
+                                      in rep_dict.items() if value),
+                                 expected)
+                self.assertEqual(summary.information_content(),
+                                 15.769266539674568)
+                self.assertEqual(summary.ic_vector, ic_vector)
+        finally:
+            AlignInfo.numpy = numpy
+
+    def test_unknown_residues(self):
+        alpha = Gapped(unambiguous_dna)
+        for weight in (1.0, 0.3):
+            records = []
+            for seq in ("ACGA", "A-GT", "ANGT"):
+                record = SeqRecord(Seq(seq, alpha))
+                record.annotations["weight"] = weight
+                records.append(record)
+            alignment = MultipleSeqAlignment(records, alpha)
+            try:
+                for module_numpy in (numpy, None):
+                    AlignInfo.numpy = module_numpy
+                    summary = SummaryInfo(alignment)
+                    try:
+                        summary.replacement_dictionary()
+                    except ValueError as err:
+                        # The first pair of sequences using N is the first
+                        # and the third sequence
+                        self.assertTrue(str(err).startswith(
+                            "Residues C, N not found in alphabet"))
+                    else:
+                        self.fail("ValueError not raised")
+            finally:
+                AlignInfo.numpy = numpy
+
 
 if __name__ == "__main__":
     runner = unittest.TextTestRunner(verbosity=2)
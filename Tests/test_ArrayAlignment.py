@@ -0,0 +1,141 @@
+# This file is part of the Biopython distribution and governed by your
+# choice of the "Biopython License Agreement" or the "BSD 3-Clause License".
+# Please see the LICENSE file that should have been included as part of this
+# package.
+
+"""Tests for the Bio.Align.ArrayAlignment module."""
+
+import unittest
+
+try:
+    import numpy
+except ImportError:
+    from Bio import MissingPythonDependencyError
+    raise MissingPythonDependencyError(
+        "Install NumPy if you want to use Bio.Align.ArrayAlignment.")
+
+from Bio._py3k import StringIO
+from Bio import _utils
+from Bio import AlignIO
+from Bio.Alphabet import generic_dna
+from Bio.Align import MultipleSeqAlignment
+from Bio.Align.ArrayAlignment import ArrayAlignment
+from Bio.Seq import Seq
+from Bio.SeqRecord import SeqRecord
+
+
+class ArrayAlignmentTests(unittest.TestCase):
+    """Compare ArrayAlignment with MultipleSeqAlignment."""
+
+    def setUp(self):
+        self.msa = MultipleSeqAlignment(
+            [SeqRecord(Seq("AAAACGT", generic_dna), id="Alpha"),
+             SeqRecord(Seq("AAA-CGT", generic_dna), id="Beta"),
+             SeqRecord(Seq("AAAAGGT", generic_dna), id="Gamma"),
+             SeqRecord(Seq("AAAACGT", generic_dna), id="Delta"),
+             SeqRecord(Seq("AAA-GGT", generic_dna), id="Epsilon")],
+            column_annotations={"stats": "CCCXCCC"})
+        self.align = ArrayAlignment.from_alignment(self.msa)
+
+    def assertSameAlignment(self, msa, align):
+        self.assertEqual(str(msa), str(align))
+        self.assertEqual([(r.id, r.name, r.description, str(r.seq))
+                          for r in msa],
+                         [(r.id, r.name, r.description, str(r.seq))
+                          for r in align])
+        self.assertEqual(dict(msa.column_annotations),
+                         dict(align.column_annotations))
+
+    def test_conversion(self):
+        self.assertEqual(self.align.array.shape, (5, 7))
+        self.assertEqual(self.align.array.dtype, numpy.uint8)
+        self.assertSameAlignment(self.msa, self.align)
+        msa = self.align.to_alignment()
+        self.assertTrue(isinstance(msa, MultipleSeqAlignment))
+        self.assertSameAlignment(self.msa, msa)
+        self.assertEqual(self.align.format("fasta"), self.msa.format("fasta"))
+
+    def test_indexing(self):
+        msa = self.msa
+        align = self.align
+        self.assertEqual(align[3, 4], msa[3, 4])
+        self.assertEqual(align[:, 4], msa[:, 4])
+        self.assertEqual(align[1:3, 4], msa[1:3, 4])
+        self.assertEqual(align[-1].id, msa[-1].id)
+        self.assertEqual(str(align[2, 1:5].seq), str(msa[2, 1:5].seq))
+        for index in (slice(2, 5), slice(None, None, -1),
+                      (slice(1, 5), slice(3, 6)),
+                      (slice(None), slice(None, None, 2))):
+            self.assertSameAlignment(msa[index], align[index])
+        # A column is a view of the array
+        column = align.array[:, 4]
+        self.assertEqual(column.tolist(), [ord(c) for c in "CCGCG"])
+        sub = align[:, 2:5]
+        self.assertTrue(numpy.may_share_memory(sub.array, align.array))
+        # Lists of indices and masks, as for NumPy arrays
+        sub = align[[0, 2], [1, 4, 6]]
+        self.assertEqual([str(r.seq) for r in sub], ["ACT", "AGT"])
+        sub = align[:, [0, 3]]
+        self.assertEqual(sub.column_annotations["stats"], "CX")
+        sub = align[numpy.array([True, False, True, False, False])]
+        self.assertEqual(sub.ids, ["Alpha", "Gamma"])
+
+    def test_column_counts(self):
+        align = self.align
+        self.assertEqual(align.letters, "-ACGT")
+        counts = align.column_counts()
+        for index in range(7):
+            column = self.msa[:, index]
+            self.assertEqual(counts[index].tolist(),
+                             [column.count(letter) for letter in "-ACGT"])
+        self.assertEqual(align.column_counts("GA")[3].tolist(), [0, 3])
+        align.weights = numpy.array([1.0, 0.5, 0.25, 1.0, 2.0])
+        counts = align.column_counts("ACGT")
+        self.assertEqual(counts[3].tolist(), [2.25, 0, 0, 0])
+        self.assertEqual(counts[4].tolist(), [0, 2.5, 2.25, 0])
+        sub = align[1:3]
+        self.assertEqual(sub.weights.tolist(), [0.5, 0.25])
+
+    def test_column_count_blocks(self):
+        align = self.align
+        weights = [None, numpy.array([1.0, 0.5, 0.25, 1.0, 2.0])]
+        expected = []
+        for weight in weights:
+            align.weights = weight
+            expected.append(align.column_counts("ACG").tolist())
+        try:
+            # Count the columns two at a time
+            _utils._BLOCK_ELEMENTS = 2 * len(align)
+            for weight, counts in zip(weights, expected):
+                align.weights = weight
+                self.assertEqual(align.column_counts("ACG").tolist(), counts)
+        finally:
+            _utils._BLOCK_ELEMENTS = 1 << 22
+
+    def test_errors(self):
+        self.assertRaises(ValueError, ArrayAlignment, ["ACGT", "ACG"])
+        self.assertRaises(ValueError, ArrayAlignment, ["ACGT", "ACGA"],
+                          ["a"])
+        self.assertRaises(ValueError, ArrayAlignment, ["ACGT"],
+                          weights=[1, 2])
+
+    def test_alignio(self):
+        for filename, format in (("Clustalw/opuntia.aln", "clustal"),
+                                 ("Stockholm/simple.sth", "stockholm"),
+                                 ("GFF/multi.fna", "fasta")):
+            msa = AlignIO.read(filename, format)
+            align = AlignIO.read(filename, format, array=True)
+            self.assertTrue(isinstance(align, ArrayAlignment))
+            self.assertSameAlignment(msa, align)
+        alignments = list(AlignIO.parse("GFF/multi.fna", "fasta",
+                                        seq_count=1, array=True))
+        self.assertEqual(len(alignments), 3)
+        self.assertEqual([len(a) for a in alignments], [1, 1, 1])
+        handle = StringIO(">a\nACGT\n>b\nACG\n")
+        self.assertRaises(ValueError, AlignIO.read, handle, "fasta",
+                          array=True)
+
+
+if __name__ == "__main__":
+    runner = unittest.TextTestRunner(verbosity=2)
+    unittest.main(testRunner=runner)
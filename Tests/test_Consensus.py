@@ -9,45 +9,18 @@ import os
 import unittest
 import tempfile
 
-# from Bio._py3k import StringIO
+from Bio._py3k import StringIO
 from Bio import AlignIO
 from Bio import Phylo
 from Bio.Phylo import BaseTree
 from Bio.Phylo.TreeConstruction import DistanceCalculator
 from Bio.Phylo.TreeConstruction import DistanceTreeConstructor
 from Bio.Phylo import Consensus
-from Bio.Phylo.Consensus import _BitString
 
 
 temp_dir = tempfile.mkdtemp()
 
 
-class BitStringTest(unittest.TestCase):
-    """Test for _BitString class"""
-    def test_bitstring(self):
-        bitstr1 = _BitString('0011')
-        bitstr2 = _BitString('0101')
-        bitstr3 = _BitString('0001')
-        bitstr4 = _BitString('0010')
-        self.assertRaises(TypeError, _BitString, '10O1')
-        self.assertEqual(bitstr1 & bitstr2, _BitString('0001'))
-        self.assertEqual(bitstr1 | bitstr2, _BitString('0111'))
-        self.assertEqual(bitstr1 ^ bitstr2, _BitString('0110'))
-        self.assertFalse(bitstr1.contains(bitstr2))
-        self.assertTrue(bitstr1.contains(bitstr1))
-        self.assertTrue(bitstr1.contains(bitstr3))
-        self.assertTrue(bitstr1.contains(bitstr4))
-        self.assertFalse(bitstr1.independent(bitstr2))
-        self.assertFalse(bitstr1.independent(bitstr4))
-        self.assertTrue(bitstr2.independent(bitstr4))
-        self.assertTrue(bitstr3.independent(bitstr4))
-        self.assertFalse(bitstr1.iscompatible(bitstr2))
-        self.assertTrue(bitstr1.iscompatible(bitstr3))
-        self.assertTrue(bitstr1.iscompatible(bitstr4))
-        self.assertTrue(bitstr2.iscompatible(bitstr4))
-        self.assertTrue(bitstr3.iscompatible(bitstr4))
-
-
 class ConsensusTest(unittest.TestCase):
     """Test for consensus methods"""
 
@@ -58,12 +31,12 @@ class ConsensusTest(unittest.TestCase):
         bitstr_counts, len_trees = Consensus._count_clades(self.trees)
         self.assertEqual(len_trees, len(self.trees))
         self.assertEqual(len(bitstr_counts), 6)
-        self.assertEqual(bitstr_counts[_BitString('11111')][0], 3)
-        self.assertEqual(bitstr_counts[_BitString('11000')][0], 2)
-        self.assertEqual(bitstr_counts[_BitString('00111')][0], 3)
-        self.assertEqual(bitstr_counts[_BitString('00110')][0], 2)
-        self.assertEqual(bitstr_counts[_BitString('00011')][0], 1)
-        self.assertEqual(bitstr_counts[_BitString('01111')][0], 1)
+        self.assertEqual(bitstr_counts[int('11111', 2)][0], 3)
+        self.assertEqual(bitstr_counts[int('11000', 2)][0], 2)
+        self.assertEqual(bitstr_counts[int('00111', 2)][0], 3)
+        self.assertEqual(bitstr_counts[int('00110', 2)][0], 2)
+        self.assertEqual(bitstr_counts[int('00011', 2)][0], 1)
+        self.assertEqual(bitstr_counts[int('01111', 2)][0], 1)
 
     def test_strict_consensus(self):
         ref_trees = list(Phylo.parse('./TreeConstruction/strict_refs.tre', 'newick'))
@@ -113,6 +86,30 @@ class ConsensusTest(unittest.TestCase):
         self.assertTrue(Consensus._equal_topology(consensus_tree, ref_trees[2]))
         # tree_file.close()
 
+    def test_terminal_order(self):
+        # Clades are matched by terminal names, not by terminal order
+        tree = Phylo.read(StringIO('((Delta,Epsilon),(Alpha,(Beta,Gamma)));'),
+                          'newick')
+        bitstr_counts, len_trees = Consensus._count_clades(self.trees[:1] +
+                                                           [tree])
+        self.assertEqual(bitstr_counts[int('00110', 2)][0], 2)
+        self.assertEqual(bitstr_counts[int('11000', 2)][0], 2)
+        consensus_tree = Consensus.strict_consensus([self.trees[0], tree])
+        self.assertTrue(Consensus._equal_topology(consensus_tree, self.trees[0]))
+
+    def test_robinson_foulds_matrix(self):
+        self.assertEqual(Consensus.robinson_foulds_matrix(self.trees),
+                         [[0, 2, 0], [2, 0, 2], [0, 2, 0]])
+        self.assertEqual(Consensus.robinson_foulds_matrix(self.trees,
+                                                          rooted=True),
+                         [[0, 2, 2], [2, 0, 4], [2, 4, 0]])
+        self.assertEqual(Consensus.robinson_foulds_matrix(self.trees[:1],
+                                                          self.trees[1:]),
+                         [[2, 0]])
+        tree = Phylo.read(StringIO('((Alpha,Beta),(Gamma,Delta));'), 'newick')
+        self.assertRaises(ValueError, Consensus.robinson_foulds_matrix,
+                          self.trees, [tree])
+
     def test_get_support(self):
         support_tree = Consensus.get_support(self.trees[0], self.trees)
         clade = support_tree.common_ancestor([support_tree.find_any(name="Beta"), support_tree.find_any(name="Gamma")])
@@ -149,6 +146,52 @@ class BootstrapTest(unittest.TestCase):
         self.assertTrue(isinstance(tree, BaseTree.Tree))
         Phylo.write(tree, os.path.join(temp_dir, 'bootstrap_consensus.tre'), 'newick')
 
+    def test_bootstrap_seed(self):
+        msa_list = list(Consensus.bootstrap(self.msa, 10, seed=1))
+        for msa in msa_list:
+            self.assertEqual([record.id for record in msa],
+                             [record.id for record in self.msa])
+            # Each column of a replicate is a column of the alignment
+            columns = set(self.msa[:, i] for i in range(len(self.msa[0])))
+            for i in range(len(msa[0])):
+                self.assertTrue(msa[:, i] in columns)
+        other_list = list(Consensus.bootstrap(self.msa, 10, seed=1))
+        self.assertEqual([[str(record.seq) for record in msa]
+                          for msa in msa_list],
+                         [[str(record.seq) for record in msa]
+                          for msa in other_list])
+
+    def test_bootstrap_trees_processes(self):
+        calculator = DistanceCalculator('identity')
+        constructor = DistanceTreeConstructor(calculator, 'nj')
+        trees = Consensus.bootstrap_trees(self.msa, 10, constructor, seed=2)
+        pool_trees = Consensus.bootstrap_trees(self.msa, 10, constructor,
+                                               seed=2, processes=2)
+        for tree, pool_tree in zip(trees, pool_trees):
+            self.assertTrue(Consensus._equal_topology(tree, pool_tree))
+
+    def test_bootstrap_trees_read_ahead(self):
+        calculator = DistanceCalculator('identity')
+        constructor = DistanceTreeConstructor(calculator, 'nj')
+        bootstrap_columns = Consensus._bootstrap_columns
+        taken = []
+
+        def counted_columns(*args):
+            for columns in bootstrap_columns(*args):
+                taken.append(columns)
+                yield columns
+
+        Consensus._bootstrap_columns = counted_columns
+        try:
+            trees = Consensus.bootstrap_trees(self.msa, 100, constructor,
+                                              seed=2, processes=2)
+            next(trees)
+            # Only a few replicates per process are queued at once
+            self.assertTrue(len(taken) <= 8)
+            trees.close()
+        finally:
+            Consensus._bootstrap_columns = bootstrap_columns
+
 
 if __name__ == '__main__':
     runner = unittest.TextTestRunner(verbosity=2)
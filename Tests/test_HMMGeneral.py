@@ -9,8 +9,14 @@ from __future__ import print_function
 import unittest
 import math
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
 # biopython
 from Bio import Alphabet
+from Bio import MissingPythonDependencyError
 from Bio.Seq import Seq
 
 
@@ -266,6 +272,71 @@ class HiddenMarkovModelTest(unittest.TestCase):
                 self._checkSimpleHmm(prob_initial, prob_transition,
                                  prob_emission, viterbi, observed_emissions)
 
+    def _buildSimpleHmm(self):
+        self.mm_builder.set_initial_probabilities({'1': 0.4, '2': 0.6})
+        self.mm_builder.allow_transition('1', '1', 0.35)
+        self.mm_builder.allow_transition('1', '2', 0.65)
+        self.mm_builder.allow_transition('2', '1', 0.45)
+        self.mm_builder.allow_transition('2', '2', 0.55)
+        self.mm_builder.set_emission_score('1', 'A', 0.45)
+        self.mm_builder.set_emission_score('1', 'B', 0.55)
+        self.mm_builder.set_emission_score('2', 'A', 0.75)
+        self.mm_builder.set_emission_score('2', 'B', 0.25)
+        return self.mm_builder.get_markov_model()
+
+    def test_viterbi_batch(self):
+        """Decode sequences of different lengths at once."""
+        model = self._buildSimpleHmm()
+        sequences = ["AB", "BBBAAB", "A", "ABABBBBA", "BA"]
+        results = model.viterbi_batch(sequences, NumberAlphabet)
+        self.assertEqual(len(results), len(sequences))
+        for sequence, (seq, prob) in zip(sequences, results):
+            expected_seq, expected_prob = model.viterbi(sequence,
+                                                        NumberAlphabet)
+            self.assertEqual(str(seq), str(expected_seq))
+            self.assertEqual(len(seq), len(sequence))
+            self.assertAlmostEqual(prob, expected_prob, places=11)
+        self.assertEqual(model.viterbi_batch([], NumberAlphabet), [])
+        self.assertRaises(ValueError, model.viterbi_batch, ["AB", ""],
+                          NumberAlphabet)
+
+    def test_posterior_decoding(self):
+        """Posterior decoding of all two letter sequences."""
+        model = self._buildSimpleHmm()
+        if numpy is None:
+            self.assertRaises(MissingPythonDependencyError,
+                              model.posterior_decoding, "AB", NumberAlphabet)
+            return
+        for first_letter in LetterAlphabet.letters:
+            for second_letter in LetterAlphabet.letters:
+                observed_emissions = [first_letter, second_letter]
+                seq, posterior, prob = model.posterior_decoding(
+                    observed_emissions, NumberAlphabet)
+                # brute force calculation of the probability of each path
+                paths = {}
+                for first_state in NumberAlphabet.letters:
+                    for second_state in NumberAlphabet.letters:
+                        paths[first_state + second_state] = \
+                            model.initial_prob[first_state] * \
+                            model.emission_prob[(first_state,
+                                                 first_letter)] * \
+                            model.transition_prob[(first_state,
+                                                   second_state)] * \
+                            model.emission_prob[(second_state,
+                                                 second_letter)]
+                total = sum(paths.values())
+                self.assertAlmostEqual(prob, math.log(total), places=11)
+                expected_seq = ""
+                for i in range(2):
+                    for j, state in enumerate(NumberAlphabet.letters):
+                        expected = sum(value for path, value in paths.items()
+                                       if path[i] == state) / total
+                        self.assertAlmostEqual(posterior[i, j], expected,
+                                               places=11)
+                    expected_seq += NumberAlphabet.letters[
+                        int(posterior[i].argmax())]
+                self.assertEqual(str(seq), expected_seq)
+
     def _checkSimpleHmm(self, prob_initial, prob_transition, prob_emission,
                          viterbi, observed_emissions):
         max_prob = 0
@@ -380,6 +451,28 @@ class ScaledDPAlgorithmsTest(unittest.TestCase):
 
         # print(s_value)
 
+    def test_forward_backward(self):
+        """Forward and backward variables match the recursion methods."""
+        forward_var, seq_prob = self.dp.forward_algorithm()
+        backward_var = self.dp.backward_algorithm()
+        # the recursion methods, one state and position at a time
+        dp = DynamicProgramming.ScaledDPAlgorithms(self.dp._mm, self.dp._seq)
+        expected_forward_var, expected_seq_prob = \
+            DynamicProgramming.AbstractDPAlgorithms.forward_algorithm(dp)
+        expected_backward_var = \
+            DynamicProgramming.AbstractDPAlgorithms.backward_algorithm(dp)
+        self.assertAlmostEqual(seq_prob, expected_seq_prob, places=12)
+        for variables, expected in ((forward_var, expected_forward_var),
+                                    (backward_var, expected_backward_var)):
+            self.assertEqual(sorted(variables), sorted(expected))
+            for key in expected:
+                self.assertAlmostEqual(variables[key], expected[key],
+                                       places=12)
+        # the scaled forward variables sum to one at each position
+        for i in range(3):
+            self.assertAlmostEqual(forward_var[('1', i)] +
+                                   forward_var[('2', i)], 1.0, places=12)
+
 
 class AbstractTrainerTest(unittest.TestCase):
     def setUp(self):
@@ -426,6 +519,85 @@ class AbstractTrainerTest(unittest.TestCase):
           "Bad probability calculated: %s" % log_prob
 
 
+class BaumWelchTrainerTest(unittest.TestCase):
+    def setUp(self):
+        mm_builder = MarkovModel.MarkovModelBuilder(NumberAlphabet(),
+                                                    LetterAlphabet())
+        mm_builder.allow_all_transitions()
+        mm_builder.set_initial_probabilities({'1': 0.4, '2': 0.6})
+        mm_builder.set_transition_score('1', '1', 0.35)
+        mm_builder.set_transition_score('1', '2', 0.65)
+        mm_builder.set_transition_score('2', '1', 0.45)
+        mm_builder.set_transition_score('2', '2', 0.55)
+        mm_builder.set_emission_score('1', 'A', 0.45)
+        mm_builder.set_emission_score('1', 'B', 0.55)
+        mm_builder.set_emission_score('2', 'A', 0.75)
+        mm_builder.set_emission_score('2', 'B', 0.25)
+        self.mm_builder = mm_builder
+        self.training_seqs = []
+        for emissions in ["ABBA", "AAAB", "BBABBA", "A", "BABABBBAAB"]:
+            self.training_seqs.append(Trainer.TrainingSequence(
+                Seq(emissions, LetterAlphabet()), Seq("", NumberAlphabet())))
+
+    def _train(self, processes):
+        iterations = []
+
+        def stop_training(log_likelihood_change, num_iterations):
+            iterations.append(num_iterations)
+            return num_iterations >= 3
+
+        trainer = Trainer.BaumWelchTrainer(self.mm_builder.get_markov_model())
+        model = trainer.train(self.training_seqs, stop_training,
+                              processes=processes)
+        self.assertEqual(iterations, [2, 3])
+        self.assertEqual(len(trainer.log_likelihoods), 3)
+        self.assertEqual(len(trainer.iteration_times), 3)
+        return model, trainer.log_likelihoods
+
+    def test_train(self):
+        """Train with the expected counts calculated in worker processes."""
+        model, log_likelihoods = self._train(None)
+        # the same training, with the dictionaries of forward and backward
+        # variables, one training sequence at a time
+        trainer = Trainer.BaumWelchTrainer(self.mm_builder.get_markov_model())
+        for iteration in range(3):
+            transition_count = trainer._markov_model.get_blank_transitions()
+            emission_count = trainer._markov_model.get_blank_emissions()
+            probabilities = []
+            for training_seq in self.training_seqs:
+                DP = DynamicProgramming.ScaledDPAlgorithms(
+                    trainer._markov_model, training_seq)
+                forward_var, seq_prob = DP.forward_algorithm()
+                backward_var = DP.backward_algorithm()
+                probabilities.append(seq_prob)
+                trainer.update_transitions(transition_count, training_seq,
+                                           forward_var, backward_var,
+                                           seq_prob)
+                trainer.update_emissions(emission_count, training_seq,
+                                         forward_var, backward_var, seq_prob)
+            self.assertAlmostEqual(trainer.log_likelihood(probabilities),
+                                   log_likelihoods[iteration], places=10)
+            (trainer._markov_model.transition_prob,
+             trainer._markov_model.emission_prob) = \
+                trainer.estimate_params(transition_count, emission_count)
+        for key, prob in trainer._markov_model.transition_prob.items():
+            self.assertAlmostEqual(model.transition_prob[key], prob,
+                                   places=10)
+        for key, prob in trainer._markov_model.emission_prob.items():
+            self.assertAlmostEqual(model.emission_prob[key], prob,
+                                   places=10)
+        parallel_model, parallel_log_likelihoods = self._train(2)
+        for iteration in range(3):
+            self.assertAlmostEqual(parallel_log_likelihoods[iteration],
+                                   log_likelihoods[iteration], places=10)
+        for key, prob in model.transition_prob.items():
+            self.assertAlmostEqual(parallel_model.transition_prob[key], prob,
+                                   places=10)
+        for key, prob in model.emission_prob.items():
+            self.assertAlmostEqual(parallel_model.emission_prob[key], prob,
+                                   places=10)
+
+
 # run the tests
 if __name__ == "__main__":
     runner = unittest.TextTestRunner(verbosity=2)
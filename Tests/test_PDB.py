@@ -39,8 +39,12 @@ from Bio.PDB.MMCIF2Dict import MMCIF2Dict
 from Bio.PDB import HSExposureCA, HSExposureCB, ExposureCN
 from Bio.PDB.PDBExceptions import PDBConstructionException, PDBConstructionWarning
 from Bio.PDB import rotmat, Vector, refmat, calc_angle, calc_dihedral, rotaxis, m2rotaxis
+from Bio.PDB import calc_angles, calc_dihedrals
 from Bio.PDB import Residue, Atom
+from Bio.PDB.Chain import Chain
+from Bio.PDB.Model import Model
 from Bio.PDB import make_dssp_dict
+from Bio.PDB.DSSP import dssp_dict_from_model
 from Bio.PDB import DSSP
 from Bio.PDB.NACCESS import process_asa_data, process_rsa_data
 from Bio.PDB.ResidueDepth import _get_atom_radius
@@ -673,6 +677,45 @@ class ParseReal(unittest.TestCase):
             self.assertEqual(s.alphabet, generic_protein)
             self.assertEqual("TACQG", str(s))
 
+    def test_angle_arrays(self):
+        """Compare angle arrays of polypeptides with the angle lists."""
+        parser = PDBParser(PERMISSIVE=False)
+        structure = parser.get_structure("example", "PDB/1A8O.pdb")
+        for pp in PPBuilder().build_peptides(structure[0], False):
+            phi_psi = pp.get_phi_psi_array()
+            self.assertEqual(phi_psi.shape, (len(pp), 2))
+            self.assertTrue(numpy.isnan(phi_psi[0, 0]))
+            self.assertTrue(numpy.isnan(phi_psi[-1, 1]))
+            for angles, (phi, psi) in zip(phi_psi, pp.get_phi_psi_list()):
+                if phi is not None:
+                    self.assertAlmostEqual(angles[0], phi)
+                if psi is not None:
+                    self.assertAlmostEqual(angles[1], psi)
+            tau = pp.get_tau_array()
+            self.assertTrue(numpy.isnan(tau[[0, 1, -1]]).all())
+            self.assertTrue(numpy.allclose(tau[2:-1], pp.get_tau_list()))
+            theta = pp.get_theta_array()
+            self.assertTrue(numpy.isnan(theta[[0, -1]]).all())
+            self.assertTrue(numpy.allclose(theta[1:-1], pp.get_theta_list()))
+            # Trans peptide bonds
+            omega = pp.get_omega_array()
+            self.assertTrue(numpy.isnan(omega[0]))
+            self.assertTrue((numpy.abs(omega[1:]) > 2.5).all())
+            chi = pp.get_chi_array()
+            for res, res_chi in zip(pp, chi):
+                if res.get_resname() == "LYS":
+                    self.assertFalse(numpy.isnan(res_chi).any())
+                    chi4 = calc_dihedral(res["CG"].get_vector(),
+                                         res["CD"].get_vector(),
+                                         res["CE"].get_vector(),
+                                         res["NZ"].get_vector())
+                    self.assertAlmostEqual(res_chi[3], chi4)
+                elif res.get_resname() in ("GLY", "ALA"):
+                    self.assertTrue(numpy.isnan(res_chi).all())
+                elif res.get_resname() == "SER":
+                    self.assertFalse(numpy.isnan(res_chi[0]))
+                    self.assertTrue(numpy.isnan(res_chi[1:]).all())
+
     def test_strict(self):
         """Parse 1A8O.pdb file in strict mode."""
         parser = PDBParser(PERMISSIVE=False)
@@ -1413,6 +1456,20 @@ class TransformTests(unittest.TestCase):
         self.assertTrue(numpy.allclose(axis.get_array(), [1, 0, 0]))
         self.assertTrue(abs(angle) < 1e-5)
 
+    def test_angle_arrays(self):
+        """Compare calc_angles and calc_dihedrals with the Vector versions."""
+        points = random((10, 4, 3))
+        points[0, 2] = numpy.nan
+        angles = calc_angles(points[:, 0], points[:, 1], points[:, 2])
+        dihedrals = calc_dihedrals(points[:, 0], points[:, 1],
+                                   points[:, 2], points[:, 3])
+        self.assertTrue(numpy.isnan(angles[0]))
+        self.assertTrue(numpy.isnan(dihedrals[0]))
+        for p, angle, dihedral in zip(points[1:], angles[1:], dihedrals[1:]):
+            v1, v2, v3, v4 = [Vector(x) for x in p]
+            self.assertAlmostEqual(angle, calc_angle(v1, v2, v3))
+            self.assertAlmostEqual(dihedral, calc_dihedral(v1, v2, v3, v4))
+
     def test_Vector_angles(self):
         angle = random() * numpy.pi
         axis = Vector(random(3) - random(3))
@@ -1445,6 +1502,54 @@ class PDBParserTests(unittest.TestCase):
                         p = a.get_parent()
                         self.assertEqual(r.get_resname(), p.get_resname())
 
+    def test_iter_models(self):
+        """Stream models one at a time, matching get_structure."""
+        for filename in ("PDB/1LCD.pdb", "PDB/a_structure.pdb"):
+            p = PDBParser(QUIET=True)
+            s = p.get_structure("example", filename)
+            models = list(p.iter_models("example", filename))
+            self.assertEqual(p.get_header(), s.header)
+            self.assertEqual(len(models), len(s))
+            for model, streamed in zip(s, models):
+                self.assertEqual(model.id, streamed.id)
+                self.assertEqual(model.serial_num, streamed.serial_num)
+                self.assertEqual(streamed.get_parent().id, "example")
+                atoms = list(model.get_atoms())
+                streamed_atoms = list(streamed.get_atoms())
+                self.assertEqual([a.get_full_id() for a in atoms],
+                                 [a.get_full_id() for a in streamed_atoms])
+                for a, b in zip(atoms, streamed_atoms):
+                    self.assertTrue(numpy.array_equal(a.coord, b.coord))
+
+    def test_iter_coords(self):
+        """Stream the coordinates of each model of a trajectory."""
+        data = ("MODEL        1\n"
+                "ATOM      1  N   ALA A   1       1.000   2.000   3.000"
+                "  1.00  0.00           N\n"
+                "ATOM      2  CA  ALA A   1       2.000   3.000   4.000"
+                "  1.00  0.00           C\n"
+                "ENDMDL\n"
+                "MODEL        2\n"
+                "ATOM      1  N   ALA A   1      -1.000  -2.000  -3.000"
+                "  1.00  0.00           N\n"
+                "ATOM      2  CA  ALA A   1    -102.000-103.000-104.000"
+                "  1.00  0.00           C\n"
+                "ENDMDL\n"
+                "END\n")
+        p = PDBParser()
+        frames = list(p.iter_coords(StringIO(data)))
+        self.assertEqual(len(frames), 2)
+        self.assertEqual(frames[0].dtype, numpy.float32)
+        self.assertTrue(numpy.allclose(frames[0], [[1, 2, 3], [2, 3, 4]]))
+        self.assertTrue(numpy.allclose(frames[1], [[-1, -2, -3],
+                                                   [-102, -103, -104]]))
+        # The number of atoms must not change
+        data = data.replace("ENDMDL\nEND", "ATOM      3  C   ALA A   1"
+                            "       1.000   1.000   1.000  1.00  0.00"
+                            "           C\nENDMDL\nEND")
+        self.assertRaises(PDBConstructionException, list,
+                          p.iter_coords(StringIO(data)))
+
 
 class CopyTests(unittest.TestCase):
 
@@ -1524,6 +1629,81 @@ class DsspTests(unittest.TestCase):
         # Check if all h-bond partner indices were successfully parsed.
         self.assertEqual((dssp_indices & hb_indices), hb_indices)
 
+    def test_DSSP_native(self):
+        """Test in-process DSSP against the pregenerated DSSP output."""
+        p = PDBParser()
+        m = p.get_structure("example", "PDB/2BEG.pdb")[0]
+        dssp, keys = dssp_dict_from_model(m)
+        ref_dssp, ref_keys = make_dssp_dict("PDB/2BEG.dssp")
+        self.assertEqual(keys, ref_keys)
+        for key in keys:
+            # Everything but the accessibility should agree
+            self.assertEqual(dssp[key][:2], ref_dssp[key][:2])
+            self.assertEqual(dssp[key][3:], ref_dssp[key][3:])
+            self.assertIsNone(dssp[key][2])
+
+    def test_DSSP_native_in_model_obj(self):
+        """Test in-process DSSP through the DSSP class."""
+        p = PDBParser()
+        m = p.get_structure("example", "PDB/2BEG.pdb")[0]
+        dssp = DSSP(m)
+        self.assertEqual(len(dssp), 130)
+        self.assertEqual(dssp[("A", 20)],
+                         (4, 'F', 'E', 'NA', -108.4, 77.2,
+                          26, -3.7, 28, -3.0, -2, -0.5, 2, -0.5))
+        self.assertEqual(m["A"][20].xtra["SS_DSSP"], "E")
+        self.assertEqual(m["A"][20].xtra["EXP_DSSP_RASA"], "NA")
+
+    def _ideal_helix(self, phi, psi, count):
+        """Build a poly-alanine backbone with the same phi and psi throughout."""
+
+        def place(a, b, c, bond, angle, torsion):
+            # Position of the atom bonded to c, from the bond length and the
+            # angle and torsion with the atoms a, b and c
+            angle = numpy.radians(angle)
+            torsion = numpy.radians(torsion)
+            bc = (c - b) / numpy.linalg.norm(c - b)
+            normal = numpy.cross(b - a, bc)
+            normal /= numpy.linalg.norm(normal)
+            frame = numpy.array([bc, numpy.cross(normal, bc), normal]).T
+            return c + bond * frame.dot([-numpy.cos(angle),
+                                         numpy.sin(angle) * numpy.cos(torsion),
+                                         numpy.sin(angle) * numpy.sin(torsion)])
+
+        model = Model(0)
+        chain = Chain("A")
+        model.add(chain)
+        n = numpy.array([0.0, 1.458, 0.0])
+        ca = numpy.zeros(3)
+        c = place(n + [1.0, 0.0, 0.0], n, ca, 1.525, 111.2, -60.0)
+        for i in range(count):
+            if i:
+                # The next residue, from psi, omega (trans) and phi
+                n = place(n, ca, c, 1.329, 116.2, psi)
+                ca = place(ca, c, n, 1.458, 121.7, 180.0)
+                c = place(c, n, ca, 1.525, 111.2, phi)
+            o = place(n, ca, c, 1.231, 120.5, psi + 180.0)
+            res = Residue.Residue((" ", i + 1, " "), "ALA", "    ")
+            for name, coord in (("N", n), ("CA", ca), ("C", c), ("O", o)):
+                res.add(Atom.Atom(name, coord, 0.0, 1.0, " ", " %-3s" % name,
+                                  None, name[0]))
+            chain.add(res)
+        return model
+
+    def test_DSSP_native_helices(self):
+        """Test in-process DSSP assignment of alpha, 3-10 and pi helices."""
+        for phi, psi, code, offset in ((-57.8, -47.0, "H", -4),
+                                       (-49.0, -26.0, "G", -3),
+                                       (-57.1, -69.7, "I", -5)):
+            dssp, keys = dssp_dict_from_model(self._ideal_helix(phi, psi, 14))
+            self.assertEqual("".join(dssp[key][1] for key in keys),
+                             "-" + code * 12 + "-")
+            # The amide of each residue after the first turn is bonded to
+            # the carbonyl of residue i + offset
+            for key in keys[-offset:]:
+                self.assertEqual(dssp[key][6], offset)
+                self.assertTrue(dssp[key][7] <= -0.5)
+
     def test_DSSP_in_model_obj(self):
         """All elements correctly added to xtra attribute of input model object."""
         p = PDBParser()
@@ -0,0 +1,116 @@
+# This file is part of the Biopython distribution and governed by your
+# choice of the "Biopython License Agreement" or the "BSD 3-Clause License".
+# Please see the LICENSE file that should have been included as part of this
+# package.
+"""Unit tests for the Bio.PDB.EnsembleSuperimposer module."""
+
+import unittest
+
+try:
+    import numpy
+except ImportError:
+    from Bio import MissingPythonDependencyError
+    raise MissingPythonDependencyError(
+        "Install NumPy if you want to use Bio.PDB.")
+
+from Bio.PDB import PDBParser
+from Bio.PDB.EnsembleSuperimposer import EnsembleSuperimposer
+from Bio.PDB.EnsembleSuperimposer import get_ensemble_coords, rmsd_matrix
+from Bio.SVDSuperimposer import SVDSuperimposer
+
+
+def random_ensemble(n_models, n_atoms, seed=0):
+    """Randomly rotated and translated noisy copies of a random model."""
+    rng = numpy.random.RandomState(seed)
+    model = rng.uniform(-10, 10, (n_atoms, 3))
+    coords = numpy.empty((n_models, n_atoms, 3))
+    for i in range(n_models):
+        q, r = numpy.linalg.qr(rng.normal(size=(3, 3)))
+        if numpy.linalg.det(q) < 0:
+            q[:, 0] = -q[:, 0]
+        noisy = model + rng.normal(scale=0.5, size=(n_atoms, 3))
+        coords[i] = numpy.dot(noisy, q) + rng.uniform(-20, 20, 3)
+    return coords
+
+
+class EnsembleSuperimposerTests(unittest.TestCase):
+    """Test EnsembleSuperimposer module."""
+
+    def setUp(self):
+        p = PDBParser(QUIET=True)
+        self.structure = p.get_structure("1LCD", "PDB/1LCD.pdb")
+
+    def svd_rms(self, fixed, moving):
+        sup = SVDSuperimposer()
+        sup.set(fixed, moving)
+        sup.run()
+        return sup.get_rms()
+
+    def test_get_ensemble_coords(self):
+        """Test extraction of coordinates from a multi-model structure."""
+        coords = get_ensemble_coords(self.structure)
+        self.assertEqual(coords.shape, (3, 51, 3))
+        ca = self.structure[1]["A"][3]["CA"]
+        self.assertTrue(numpy.allclose(coords[1, 2], ca.get_coord()))
+        coords = get_ensemble_coords(self.structure, ("N", "CA", "C"))
+        self.assertEqual(coords.shape, (3, 153, 3))
+
+    def test_rmsd_matrix(self):
+        """Test the RMSD matrix against pairwise SVD superposition."""
+        coords = get_ensemble_coords(self.structure)
+        matrix = rmsd_matrix(coords)
+        self.assertEqual(matrix.shape, (3, 3))
+        self.assertTrue(numpy.allclose(matrix, matrix.T))
+        for i in range(3):
+            self.assertEqual(matrix[i, i], 0.0)
+            for j in range(3):
+                self.assertAlmostEqual(matrix[i, j],
+                                       self.svd_rms(coords[i], coords[j]),
+                                       places=5)
+
+    def test_rmsd_matrix_blocks(self):
+        """Test blocked and multi-process RMSD matrices agree."""
+        coords = random_ensemble(40, 25)
+        matrix = rmsd_matrix(coords)
+        self.assertAlmostEqual(matrix[3, 31],
+                               self.svd_rms(coords[3], coords[31]), places=5)
+        self.assertTrue(numpy.allclose(matrix,
+                                       rmsd_matrix(coords, block_size=7)))
+        self.assertTrue(numpy.allclose(matrix,
+                                       rmsd_matrix(coords, processes=2,
+                                                   block_size=7)))
+
+    def test_superimpose(self):
+        """Test iterative superposition on the mean structure."""
+        coords = random_ensemble(10, 30)
+        sup = EnsembleSuperimposer()
+        sup.set(coords)
+        sup.run()
+        rot, tran = sup.get_rotran()
+        self.assertEqual(rot.shape, (10, 3, 3))
+        self.assertEqual(tran.shape, (10, 3))
+        transformed = sup.get_transformed()
+        for i in range(10):
+            self.assertAlmostEqual(numpy.linalg.det(rot[i]), 1.0)
+            self.assertTrue(numpy.allclose(numpy.dot(coords[i], rot[i]) +
+                                           tran[i], transformed[i]))
+            # The mean is a fixed point of the superposition
+            self.assertAlmostEqual(sup.get_rms()[i],
+                                   self.svd_rms(sup.get_mean(), coords[i]),
+                                   places=4)
+
+    def test_apply(self):
+        """Test superimposing the models of a structure in place."""
+        coords = get_ensemble_coords(self.structure)
+        sup = EnsembleSuperimposer()
+        sup.set(coords)
+        sup.run()
+        sup.apply(self.structure)
+        moved = get_ensemble_coords(self.structure)
+        self.assertTrue(numpy.allclose(moved, sup.get_transformed(),
+                                       atol=1e-3))
+
+
+if __name__ == '__main__':
+    runner = unittest.TextTestRunner(verbosity=2)
+    unittest.main(testRunner=runner)
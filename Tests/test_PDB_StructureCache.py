@@ -0,0 +1,136 @@
+# This file is part of the Biopython distribution and governed by your
+# choice of the "Biopython License Agreement" or the "BSD 3-Clause License".
+# Please see the LICENSE file that should have been included as part of this
+# package.
+"""Unit tests for the Bio.PDB.StructureCache module."""
+
+import os
+import shutil
+import tempfile
+import unittest
+import warnings
+
+try:
+    import numpy
+except ImportError:
+    from Bio import MissingPythonDependencyError
+    raise MissingPythonDependencyError(
+        "Install NumPy if you want to use Bio.PDB.")
+
+from Bio._py3k import StringIO
+
+from Bio.PDB import PDBParser, MMCIFParser, PDBIO, MMCIFIO
+from Bio.PDB.PDBExceptions import PDBConstructionWarning
+from Bio.PDB.StructureCache import StructureCache
+from Bio.PDB.StructureCache import save_structure, load_structure
+from Bio.PDB.StructureCache import _replace
+
+
+def write_structure(io_class, structure):
+    """Return the structure written in PDB or mmCIF format."""
+    io = io_class()
+    io.set_structure(structure)
+    handle = StringIO()
+    io.save(handle)
+    return handle.getvalue()
+
+
+class StructureCacheTests(unittest.TestCase):
+    """Test saving, loading and caching structures."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def round_trip(self, structure):
+        filename = os.path.join(self.directory, "structure.npz")
+        save_structure(structure, filename)
+        return load_structure(filename)
+
+    def test_round_trip_disordered(self):
+        """Disordered atoms and residues survive a round trip."""
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", PDBConstructionWarning)
+            structure = PDBParser().get_structure("example",
+                                                  "PDB/a_structure.pdb")
+        reloaded = self.round_trip(structure)
+        self.assertEqual(write_structure(PDBIO, structure),
+                         write_structure(PDBIO, reloaded))
+        residues = list(structure.get_residues())
+        reloaded_residues = list(reloaded.get_residues())
+        self.assertEqual([r.get_full_id() for r in residues],
+                         [r.get_full_id() for r in reloaded_residues])
+        self.assertEqual([r.is_disordered() for r in residues],
+                         [r.is_disordered() for r in reloaded_residues])
+        for atom, reloaded_atom in zip(structure.get_atoms(),
+                                       reloaded.get_atoms()):
+            self.assertEqual(atom.is_disordered(),
+                             reloaded_atom.is_disordered())
+            self.assertEqual(atom.get_altloc(), reloaded_atom.get_altloc())
+            self.assertEqual(atom.get_bfactor(), reloaded_atom.get_bfactor())
+            self.assertEqual(atom.element, reloaded_atom.element)
+            self.assertTrue(numpy.allclose(atom.get_coord(),
+                                           reloaded_atom.get_coord()))
+        self.assertEqual(structure.header, reloaded.header)
+
+    def test_round_trip_anisou(self):
+        """Anisotropic B factors survive a round trip."""
+        structure = PDBParser(QUIET=True).get_structure("1A8O",
+                                                        "PDB/1A8O.pdb")
+        reloaded = self.round_trip(structure)
+        self.assertEqual(write_structure(PDBIO, structure),
+                         write_structure(PDBIO, reloaded))
+
+    def test_round_trip_mmcif(self):
+        """Structures from mmCIF files are written identically."""
+        structure = MMCIFParser(QUIET=True).get_structure("1A8O",
+                                                          "PDB/1A8O.cif")
+        reloaded = self.round_trip(structure)
+        self.assertEqual(write_structure(MMCIFIO, structure),
+                         write_structure(MMCIFIO, reloaded))
+
+    def test_round_trip_header(self):
+        """Tuples in the header come back as tuples."""
+        structure = PDBParser(QUIET=True).get_structure("1A8O",
+                                                        "PDB/1A8O.pdb")
+        structure.header["custom"] = {"cell": (52.0, 52.0, 62.6),
+                                      "pairs": [("A", 1), ("B", [2, 3])]}
+        reloaded = self.round_trip(structure)
+        self.assertEqual(structure.header, reloaded.header)
+        self.assertEqual(reloaded.header["custom"]["pairs"][1],
+                         ("B", [2, 3]))
+
+    def test_cache(self):
+        """Files are parsed once and then loaded from the cache."""
+        cache = StructureCache(os.path.join(self.directory, "cache"))
+        cache_filename = cache.get_cache_filename("PDB/1A8O.pdb")
+        self.assertFalse(os.path.exists(cache_filename))
+        first = cache.get_structure("first", "PDB/1A8O.pdb")
+        self.assertTrue(os.path.exists(cache_filename))
+        second = cache.get_structure("second", "PDB/1A8O.pdb")
+        self.assertEqual(second.get_id(), "second")
+        self.assertEqual(write_structure(PDBIO, first),
+                         write_structure(PDBIO, second))
+        # mmCIF files use a different parser, so a separate cache file
+        self.assertNotEqual(cache_filename,
+                            cache.get_cache_filename("PDB/1A8O.cif"))
+        self.assertEqual(len(os.listdir(cache.directory)), 1)
+
+    def test_replace(self):
+        """A cache file written meanwhile by another job is replaced."""
+        old = os.path.join(self.directory, "old.npz")
+        new = os.path.join(self.directory, "new.npz")
+        for filename in (old, new):
+            with open(filename, "w") as handle:
+                handle.write(filename)
+        _replace(new, old)
+        self.assertEqual(os.listdir(self.directory), ["old.npz"])
+        with open(old) as handle:
+            self.assertEqual(handle.read(), new)
+
+
+if __name__ == "__main__":
+    runner = unittest.TextTestRunner(verbosity=2)
+    unittest.main(testRunner=runner)
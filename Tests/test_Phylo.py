@@ -14,6 +14,7 @@ from Bio._py3k import StringIO
 
 from Bio import Phylo
 from Bio.Phylo import PhyloXML, NewickIO
+from Bio.Phylo import CompactTree
 
 
 # Example Newick and Nexus files
@@ -178,6 +179,42 @@ class IOTests(unittest.TestCase):
         self.assertEqual(set(leaf.name for leaf in tree.get_terminals()),
                          set(['0', '1', '2']))
 
+    def test_newick_compact(self):
+        """Read and write Newick trees as CompactTree objects."""
+        tree = Phylo.read(EX_NEWICK2, 'newick')
+        compact = Phylo.read(EX_NEWICK2, 'newick', compact=True)
+        self.assertEqual(len(compact.get_terminals()), 33)
+        self.assertEqual(len(compact), len(list(tree.find_clades())))
+        self.assertEqual(compact.confidences[0], 80)
+        self.assertEqual(str(compact.to_tree()), str(tree))
+        self.assertEqual(str(CompactTree.CompactTree.from_tree(tree).to_tree()), str(tree))
+        mem_file = StringIO()
+        Phylo.write(tree, mem_file, 'newick')
+        compact_file = StringIO()
+        Phylo.write(compact, compact_file, 'newick')
+        self.assertEqual(compact_file.getvalue(), mem_file.getvalue())
+        # Missing external parentheses
+        compact = Phylo.read(StringIO('(A:1,B:2)90:3,C;'), 'newick',
+                             compact=True)
+        self.assertEqual(list(compact.parents), [-1, 0, 1, 1, 0])
+        self.assertEqual(compact.names, [None, None, 'A', 'B', 'C'])
+        self.assertEqual(compact.confidences, [None, 90, None, None, None])
+        self.assertEqual(compact.get_branch_length(1), 3)
+        self.assertEqual(compact.get_branch_length(4), None)
+        self.assertRaises(ValueError, CompactTree.CompactTree, [-1, 2, 0])
+
+    def test_newick_deep(self):
+        """Read and write a very deep (caterpillar) Newick tree."""
+        depth = sys.getrecursionlimit() + 100
+        text = '(' * depth + 'A' + ''.join(',%i)' % i for i in range(depth)) + ';'
+        compact = Phylo.read(StringIO(text), 'newick', compact=True)
+        self.assertEqual(len(compact.get_terminals()), depth + 1)
+        for compact in (False, True):
+            mem_file = StringIO()
+            Phylo.write(Phylo.read(StringIO(text), 'newick', compact=compact),
+                        mem_file, 'newick', plain=True)
+            self.assertEqual(mem_file.getvalue(), text + '\n')
+
 
 class TreeTests(unittest.TestCase):
     """Tests for methods on BaseTree.Tree objects."""
@@ -87,6 +87,12 @@ def _test_shape_factory(source, shapes):
     return test_shape
 
 
+def _annotations(trees):
+    """Return the annotations of all sequences in the trees, in order."""
+    return [annot for tree in trees for clade in tree.find_clades()
+            for seq in clade.sequences for annot in seq.annotations]
+
+
 class ParseTests(unittest.TestCase):
     """Tests for proper parsing of example phyloXML files."""
 
@@ -161,6 +167,54 @@ class ParseTests(unittest.TestCase):
                                            (((2, (2, 2)),
                                              (2, (2, 2)),),),)
 
+    def test_parse_skip(self):
+        """Parse made_up.xml, leaving out sequences and properties."""
+        full = list(PhyloXMLIO.parse(EX_MADE))
+        trees = list(PhyloXMLIO.parse(EX_MADE,
+                                      skip=['sequence', 'property']))
+        self.assertEqual(len(trees), len(full))
+        for tree, full_tree in zip(trees, full):
+            self.assertEqual(tree.name, full_tree.name)
+            self.assertEqual(tree.properties, [])
+            clades = list(tree.find_clades())
+            full_clades = list(full_tree.find_clades())
+            self.assertEqual(len(clades), len(full_clades))
+            for clade, full_clade in zip(clades, full_clades):
+                self.assertEqual(clade.name, full_clade.name)
+                self.assertEqual(clade.branch_length,
+                                 full_clade.branch_length)
+                self.assertEqual(len(clade.taxonomies),
+                                 len(full_clade.taxonomies))
+                self.assertEqual(clade.sequences, [])
+                self.assertEqual(clade.properties, [])
+
+    def test_parse_skip_nested(self):
+        """Parse made_up.xml, leaving out properties nested in annotations."""
+        full = _annotations(PhyloXMLIO.parse(EX_MADE))
+        self.assertTrue(full[0].properties)
+        annotations = _annotations(PhyloXMLIO.parse(EX_MADE,
+                                                    skip=['property']))
+        self.assertEqual(len(annotations), len(full))
+        self.assertEqual(annotations[0].properties, [])
+
+    def test_parse_skip_apaf(self):
+        """Parse apaf.xml, leaving out molecular sequences and domains."""
+        tree = next(PhyloXMLIO.parse(EX_APAF, skip=['mol_seq', 'domain']))
+        for clade in tree.find_clades():
+            for seq in clade.sequences:
+                self.assertEqual(seq.mol_seq, None)
+                if seq.domain_architecture:
+                    self.assertEqual(seq.domain_architecture.domains, [])
+
+    def test_read_skip(self):
+        """Read phyloxml_examples.xml, leaving out taxonomies."""
+        phx = PhyloXMLIO.read(EX_PHYLO, skip=['taxonomy'])
+        self.assertEqual(len(phx), 13)
+        self.assertEqual(len(phx.other), 1)
+        for tree in phx:
+            for clade in tree.find_clades():
+                self.assertEqual(clade.taxonomies, [])
+
 
 class TreeTests(unittest.TestCase):
     """Tests for instantiation and attributes of each complex type."""
@@ -0,0 +1,123 @@
+# This file is part of the Biopython distribution and governed by your
+# choice of the "Biopython License Agreement" or the "BSD 3-Clause License".
+# Please see the LICENSE file that should have been included as part of this
+# package.
+
+"""Unit tests for the Bio.Phylo.IndexedTree module."""
+
+import unittest
+
+try:
+    import numpy
+except ImportError:
+    from Bio import MissingPythonDependencyError
+    raise MissingPythonDependencyError(
+        "Install NumPy if you want to use Bio.Phylo.IndexedTree.")
+
+from Bio._py3k import StringIO
+from Bio import Phylo
+from Bio.Phylo.CompactTree import CompactTree
+from Bio.Phylo.IndexedTree import IndexedTree
+
+
+NEWICK = "(((A:1,B:2)0.9:1,(C:3,D:4,E):2):0.5,(F:1,(G:2,H:1):3):1,I:6);"
+
+
+class IndexedTreeTest(unittest.TestCase):
+    """Compare the IndexedTree queries with the tree methods."""
+
+    def setUp(self):
+        self.tree = Phylo.read(StringIO(NEWICK), "newick")
+        self.index = IndexedTree(self.tree)
+        self.clades = list(self.tree.find_clades())
+
+    def test_orders(self):
+        index = self.index
+        self.assertEqual(len(index), len(self.clades))
+        self.assertEqual(index.clades, self.clades)
+        self.assertEqual([index.clades[i] for i in index.postorder],
+                         list(self.tree.find_clades(order="postorder")))
+        self.assertEqual([index.clades[i] for i in index.terminals],
+                         self.tree.get_terminals())
+        self.assertEqual(index.parents[0], -1)
+        self.assertEqual(index.levels[index.index("G")], 3)
+        self.assertEqual(index.depths[index.index("G")], 6)
+
+    def test_common_ancestor(self):
+        for first in self.clades:
+            for second in self.clades:
+                self.assertTrue(
+                    self.index.common_ancestor(first, second) is
+                    self.tree.common_ancestor(first, second))
+        for names in (["A"], ["A", "C"], ["C", "D", "E"], ["A", "G", "I"]):
+            self.assertTrue(self.index.common_ancestor(names) is
+                            self.tree.common_ancestor(names))
+            self.assertTrue(self.index.common_ancestor(*names) is
+                            self.tree.common_ancestor(*names))
+        self.assertRaises(ValueError, self.index.common_ancestor, "A", "Z")
+
+    def test_distance(self):
+        for first in self.clades:
+            self.assertAlmostEqual(self.index.distance(first),
+                                   self.tree.distance(first))
+            for second in self.clades:
+                self.assertAlmostEqual(self.index.distance(first, second),
+                                       self.tree.distance(first, second))
+
+    def test_is_ancestor(self):
+        for ancestor in self.clades:
+            subtree = list(ancestor.find_clades())
+            for clade in self.clades:
+                self.assertEqual(self.index.is_ancestor(ancestor, clade),
+                                 clade in subtree)
+
+    def test_is_monophyletic(self):
+        for names in (["A", "B"], ["C", "D", "E"], ["A", "C"], ["G", "H"],
+                      ["F", "G", "H"], ["F", "G"], ["I"]):
+            clades = [self.tree.find_any(name) for name in names]
+            self.assertTrue(self.index.is_monophyletic(names) is
+                            self.tree.is_monophyletic(clades))
+            self.assertTrue(self.index.is_monophyletic(clades) is
+                            self.tree.is_monophyletic(clades))
+
+    def test_distance_matrix(self):
+        terminals = self.tree.get_terminals()
+        matrix = self.index.distance_matrix()
+        self.assertEqual(matrix.shape, (len(terminals), len(terminals)))
+        for i, first in enumerate(terminals):
+            for j, second in enumerate(terminals):
+                self.assertAlmostEqual(matrix[i, j],
+                                       self.tree.distance(first, second))
+        matrix = self.index.distance_matrix(["G", "A", self.tree.root])
+        self.assertTrue(numpy.allclose(matrix, [[0, 8.5, 6],
+                                                [8.5, 0, 2.5],
+                                                [6, 2.5, 0]]))
+
+    def test_compact(self):
+        compact = CompactTree.from_tree(self.tree)
+        index = IndexedTree(compact)
+        self.assertEqual(index.clades, None)
+        self.assertEqual(index.common_ancestor("A", "B"), 2)
+        self.assertEqual(index.common_ancestor(3, 4), 2)
+        self.assertEqual(index.distance("A", "H"), 7.5)
+        self.assertTrue(numpy.allclose(index.distance_matrix(),
+                                       self.index.distance_matrix()))
+
+    def test_deep(self):
+        # A caterpillar tree too deep for the recursive tree methods
+        size = 5000
+        parents = [-1]
+        for i in range(1, size):
+            parents.append(i - 1 if i % 2 else i - 2)
+        index = IndexedTree(CompactTree(parents, [1.0] * size))
+        self.assertEqual(index.common_ancestor(size - 1, size - 3),
+                         size - 4)
+        self.assertEqual(index.distance(1, size - 2), size // 2)
+        self.assertEqual(index.levels[size - 1], size // 2)
+        self.assertTrue(index.is_ancestor(2, size - 1))
+        self.assertFalse(index.is_ancestor(1, size - 1))
+
+
+if __name__ == '__main__':
+    runner = unittest.TextTestRunner(verbosity=2)
+    unittest.main(testRunner=runner)
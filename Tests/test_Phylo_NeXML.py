@@ -100,6 +100,18 @@ def _test_write_factory(source):
 class ParseTests(unittest.TestCase):
     """Tests for proper parsing of example NeXML files."""
 
+    def test_parse_annotations(self):
+        """Parse tolweb.xml without the meta annotations."""
+        filename = os.path.join('NeXML/', 'tolweb.xml')
+        tree = next(bp._io.parse(filename, 'nexml'))
+        plain = next(bp._io.parse(filename, 'nexml', annotations=False))
+        keys = set(key for clade in tree.find_clades() for key in vars(clade))
+        self.assertTrue('tba:ID' in keys)
+        keys = set(key for clade in plain.find_clades() for key in vars(clade))
+        self.assertFalse('tba:ID' in keys)
+        self.assertEqual(len(plain.get_terminals()),
+                         len(tree.get_terminals()))
+
 
 for n, ex in enumerate(nexml_files):
     parse_test = _test_parse_factory(ex)
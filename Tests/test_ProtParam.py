@@ -6,7 +6,16 @@
 # license.  Please see the LICENSE file that should have been included
 # as part of this package.
 
+import math
 import unittest
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from Bio import MissingPythonDependencyError
+from Bio import SeqIO
 from Bio.Seq import Seq
 from Bio.Alphabet import IUPAC
 from Bio.SeqUtils import ProtParam, ProtParamData
@@ -168,6 +177,72 @@ class ProtParamTest(unittest.TestCase):
         self.assertAlmostEqual(self.analysis.molar_extinction_coefficient()[1], 17545, places=5)
 
 
+class AnalyzeProteinsTest(unittest.TestCase):
+    def setUp(self):
+        self.seq_texts = ["MAEGEITTFTALTEKFNLPPGNYKKPKLLYCSNGGHFLRILPDGTVDG",
+                          "trdrsdqhiqlqlsaesvgevyikstetgqylamdtsgllygsqtpse",
+                          "ECLFLERLEENHYNTYTSKKHAEKNWFVGLKKNGSCKRGPRTHYGQKA",
+                          "K", "MAXB", ""]
+
+    def check_analysis(self, table, index, seq_text, monoisotopic=False):
+        analysis = ProtParam.ProteinAnalysis(seq_text, monoisotopic)
+        self.assertEqual(table["length"][index], len(seq_text))
+        for aa, count in analysis.count_amino_acids().items():
+            self.assertEqual(table[aa][index], count)
+        self.assertEqual(table["molecular_weight"][index],
+                         analysis.molecular_weight())
+        self.assertEqual(table["aromaticity"][index], analysis.aromaticity())
+        self.assertEqual(table["instability_index"][index],
+                         analysis.instability_index())
+        self.assertEqual(table["gravy"][index], analysis.gravy())
+        self.assertEqual(table["isoelectric_point"][index],
+                         analysis.isoelectric_point())
+        self.assertEqual((table["helix"][index], table["turn"][index],
+                          table["sheet"][index]),
+                         analysis.secondary_structure_fraction())
+        self.assertEqual((table["extinction_reduced"][index],
+                          table["extinction_cystines"][index]),
+                         analysis.molar_extinction_coefficient())
+
+    def test_analyze_proteins(self):
+        "Test analyzing proteins together gives the same values as one by one"
+        if numpy is None:
+            self.assertRaises(MissingPythonDependencyError,
+                              ProtParam.analyze_proteins, self.seq_texts)
+            return
+        for monoisotopic in (False, True):
+            table = ProtParam.analyze_proteins(self.seq_texts, monoisotopic)
+            self.assertEqual(table["id"], list(range(len(self.seq_texts))))
+            for index, seq_text in enumerate(self.seq_texts[:4]):
+                self.check_analysis(table, index, seq_text, monoisotopic)
+        # ambiguous letters and empty sequences
+        self.assertTrue(math.isnan(table["molecular_weight"][4]))
+        self.assertTrue(math.isnan(table["gravy"][4]))
+        self.assertEqual(table["isoelectric_point"][4],
+                         ProtParam.ProteinAnalysis("MAXB").isoelectric_point())
+        self.assertEqual(table["length"][5], 0)
+        self.assertTrue(math.isnan(table["isoelectric_point"][5]))
+
+    def test_analyze_records(self):
+        "Test analyzing the proteins of a FASTA file in batches"
+        if numpy is None:
+            return
+        batch_size = ProtParam._BATCH_SIZE
+        try:
+            ProtParam._BATCH_SIZE = 100
+            table = ProtParam.analyze_proteins(
+                SeqIO.parse("GenBank/NC_005816.faa", "fasta"))
+        finally:
+            ProtParam._BATCH_SIZE = batch_size
+        records = list(SeqIO.parse("GenBank/NC_005816.faa", "fasta"))
+        self.assertEqual(table["id"], [record.id for record in records])
+        for index, record in enumerate(records):
+            self.check_analysis(table, index, str(record.seq))
+        table = ProtParam.analyze_proteins(Seq(self.seq_texts[0]))
+        self.assertEqual(len(table["length"]), 1)
+        self.check_analysis(table, 0, self.seq_texts[0])
+
+
 if __name__ == "__main__":
     runner = unittest.TextTestRunner(verbosity=2)
     unittest.main(testRunner=runner)
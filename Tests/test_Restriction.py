@@ -472,6 +472,37 @@ class RestrictionBatches(unittest.TestCase):
         self.assertTrue(len(AllEnzymes) == len(CommOnly) + len(NonComm))
         self.assertTrue(len(AllEnzymes) > len(CommOnly) > len(NonComm))
 
+    def test_enzymes_in_module(self):
+        """Test the enzymes of the module and of the premade batches agree."""
+        names = [name for name in Restriction.__all__
+                 if name not in ("FormattedSeq", "Analysis",
+                                 "RestrictionBatch", "AllEnzymes",
+                                 "CommOnly", "NonComm")]
+        self.assertEqual(sorted(names), sorted(str(x) for x in AllEnzymes))
+        for name in names:
+            enzyme = getattr(Restriction, name)
+            self.assertIs(enzyme, AllEnzymes.get(name))
+            self.assertEqual(enzyme.__name__, name)
+        self.assertIs(Restriction.EcoRI, EcoRI)
+        self.assertIs(RestrictionBatch(["EcoRI"]).get("EcoRI"), EcoRI)
+        self.assertRaises(AttributeError, getattr, Restriction, "NotAnEnzyme")
+
+    def test_enzymes_in_dir(self):
+        """Test the enzymes are listed before they are created."""
+        import Bio.Restriction
+        for module in (Bio.Restriction, Restriction):
+            names = dir(module)
+            self.assertIn("EcoRI", names)
+            self.assertIn("AllEnzymes", names)
+            self.assertIn("FormattedSeq", names)
+
+    def test_pseudo_type_compsite(self):
+        """Test the enzyme types have no compsite attribute."""
+        pseudo_type = type(EcoRI)
+        self.assertFalse(hasattr(pseudo_type, "compsite"))
+        self.assertIsNone(getattr(pseudo_type, "compsite", None))
+        self.assertEqual(EcoRI.compsite.pattern, "(?=(?P<EcoRI>GAATTC))")
+
     def test_search_premade_batches(self):
         """Test search with pre-made batches CommOnly, NoComm, AllEnzymes."""
         seq = Seq('ACCCGAATTCAAAACTGACTGATCGATCGTCGACTG', IUPACAmbiguousDNA())
@@ -484,6 +515,28 @@ class RestrictionBatches(unittest.TestCase):
         search = seq / NonComm
         self.assertEqual(search[McrI], [28])
 
+    def test_search_batch_like_enzymes(self):
+        """Test a batch search finds the same sites as each enzyme."""
+        seq = Seq("GTCGACNNGAATTCAGCAGCTGCAGGTCTCRCCACCTGCAGGAAGCTT"
+                  "GACNNNNNNGTCACTGGGATCCGGTACCCCGGGGGCCCACGTGTCG",
+                  IUPACAmbiguousDNA())
+        for linear in (True, False):
+            # Start with a new batch, as the search results are cached
+            batch = RestrictionBatch(AllEnzymes)
+            hits = batch.search(seq, linear)
+            self.assertEqual(set(hits), set(AllEnzymes))
+            for enzyme in AllEnzymes:
+                self.assertEqual(hits[enzyme], enzyme.search(seq, linear),
+                                 "%s, linear=%s" % (enzyme, linear))
+        # The sites spanning the ends of a circular sequence
+        seq = Seq("CCGAGCTCTTCAAAAAGCTTGGATCCAAAAAAAAGAATT", IUPACAmbiguousDNA())
+        batch = RestrictionBatch([EcoRI, BamHI, EarI])
+        self.assertEqual(batch.search(seq, linear=False),
+                         {EcoRI: [36], BamHI: [22], EarI: [13]})
+        batch.add(KpnI)
+        self.assertEqual(batch.search(seq, linear=True),
+                         {EcoRI: [], BamHI: [22], EarI: [13], KpnI: []})
+
     def test_analysis_restrictions(self):
         """Test Fancier restriction analysis."""
         new_seq = Seq('TTCAAAAAAAAAAAAAAAAAAAAAAAAAAAAGAA',
@@ -0,0 +1,183 @@
+# This file is part of the Biopython distribution and governed by your
+# choice of the "Biopython License Agreement" or the "BSD 3-Clause License".
+# Please see the LICENSE file that should have been included as part of this
+# package.
+
+"""Tests for the Bio.SeqUtils.kmers module."""
+
+import random
+import unittest
+
+try:
+    import numpy
+    del numpy
+except ImportError:
+    from Bio import MissingPythonDependencyError
+    raise MissingPythonDependencyError(
+        "Install NumPy if you want to use Bio.SeqUtils.kmers.")
+
+from Bio import SeqIO
+from Bio.Seq import Seq
+from Bio.SeqUtils import kmers
+from Bio.SeqUtils.kmers import count_kmers, merge_counts, MinHash
+
+
+def count_by_hand(sequences, k, canonical):
+    """Count the k-mers of the sequences one at a time."""
+    counts = {}
+    for sequence in sequences:
+        sequence = str(sequence).upper()
+        for i in range(len(sequence) - k + 1):
+            kmer = sequence[i:i + k]
+            if kmer.strip("ACGT"):
+                continue
+            if canonical:
+                kmer = min(kmer, str(Seq(kmer).reverse_complement()))
+            counts[kmer] = counts.get(kmer, 0) + 1
+    return counts
+
+
+class KmerCountsTest(unittest.TestCase):
+    """Compare the k-mer counts with counts by hand."""
+
+    def setUp(self):
+        random.seed(0)
+        self.sequences = ["".join(random.choice("ACGTACGTacgtN")
+                                  for i in range(random.randint(0, 60)))
+                          for j in range(20)]
+        self.batch_size = kmers._BATCH_SIZE
+
+    def tearDown(self):
+        kmers._BATCH_SIZE = self.batch_size
+
+    def test_count(self):
+        """Count k-mers, with and without their reverse complements."""
+        for k in (1, 2, 5, 31):
+            for canonical in (True, False):
+                expected = count_by_hand(self.sequences, k, canonical)
+                counts = count_kmers(self.sequences, k, canonical)
+                self.assertEqual(len(counts), len(expected))
+                self.assertEqual(list(counts.items()),
+                                 sorted(expected.items()))
+                for kmer, count in expected.items():
+                    self.assertEqual(counts[kmer], count)
+                    self.assertEqual(counts[kmer.lower()], count)
+        counts = count_kmers(self.sequences, 5)
+        self.assertEqual(counts["ACGTA"], counts["TACGT"])
+        self.assertEqual(counts["AAAAA"], 0)
+        self.assertNotIn("AAAAA", counts)
+        self.assertRaises(ValueError, counts.__getitem__, "ACGT")
+        self.assertRaises(ValueError, counts.__getitem__, "ACGTN")
+        self.assertRaises(ValueError, count_kmers, self.sequences, 32)
+
+    def test_batches(self):
+        """Count k-mers in several batches of sequences."""
+        expected = list(count_kmers(self.sequences, 3).items())
+        for batch_size in (1, 50):
+            kmers._BATCH_SIZE = batch_size
+            self.assertEqual(list(count_kmers(self.sequences, 3).items()),
+                             expected)
+
+    def test_long_sequence(self):
+        """Count k-mers of a sequence longer than a batch."""
+        sequence = "".join(self.sequences)
+        for k in (1, 3, 31):
+            expected = list(count_kmers(sequence, k).items())
+            kmers._BATCH_SIZE = 40
+            self.assertEqual(list(count_kmers(sequence, k).items()),
+                             expected)
+            # The sequence is split into overlapping pieces
+            texts = list(kmers._batches(sequence, k))
+            self.assertTrue(len(texts) > 1)
+            self.assertTrue(max(len(text) for text in texts) <
+                            2 * max(40, k))
+            kmers._BATCH_SIZE = self.batch_size
+
+    def test_seqio(self):
+        """Count k-mers of the records of a FASTA file."""
+        records = list(SeqIO.parse("Fasta/f002", "fasta"))
+        expected = count_by_hand([record.seq for record in records], 7, True)
+        counts = count_kmers(SeqIO.parse("Fasta/f002", "fasta"), 7)
+        self.assertEqual(dict(counts.items()), expected)
+
+    def test_filter_and_spectrum(self):
+        """Leave out rare k-mers, and make a k-mer spectrum."""
+        expected = count_by_hand(self.sequences, 2, True)
+        counts = count_kmers(self.sequences, 2, min_count=40)
+        self.assertEqual(dict(counts.items()),
+                         dict((kmer, count) for kmer, count in expected.items()
+                              if count >= 40))
+        spectrum = count_kmers(self.sequences, 2).spectrum()
+        self.assertEqual(len(spectrum), max(expected.values()) + 1)
+        for count in range(len(spectrum)):
+            self.assertEqual(spectrum[count],
+                             list(expected.values()).count(count))
+
+    def test_merge(self):
+        """Merge the counts of parts of the sequences."""
+        expected = list(count_kmers(self.sequences, 4).items())
+        parts = [count_kmers(self.sequences[i:i + 7], 4)
+                 for i in range(0, len(self.sequences), 7)]
+        self.assertEqual(list(merge_counts(parts).items()), expected)
+        self.assertRaises(ValueError, merge_counts,
+                          [parts[0], count_kmers(self.sequences, 5)])
+        self.assertRaises(ValueError, merge_counts,
+                          [parts[0], count_kmers(self.sequences, 4, False)])
+
+    def test_processes(self):
+        """Count k-mers in worker processes."""
+        kmers._BATCH_SIZE = 100
+        counts = count_kmers(self.sequences, 6, processes=2)
+        self.assertEqual(list(counts.items()),
+                         list(count_kmers(self.sequences, 6).items()))
+
+    def test_processes_error(self):
+        """Stop the worker processes when reading the sequences fails."""
+        kmers._BATCH_SIZE = 100
+
+        def sequences():
+            for sequence in self.sequences:
+                yield sequence
+            raise ValueError("broken record")
+
+        self.assertRaises(ValueError, count_kmers, sequences(), 6,
+                          processes=2)
+
+
+class JaccardTest(unittest.TestCase):
+    """Test the k-mer similarity of sequences."""
+
+    def setUp(self):
+        random.seed(0)
+        self.first = "".join(random.choice("ACGT") for i in range(3000))
+        self.second = self.first[:2000] + "".join(random.choice("ACGT")
+                                                  for i in range(1000))
+
+    def test_jaccard(self):
+        """Exact Jaccard similarity of k-mers."""
+        first = set(count_by_hand([self.first], 11, True))
+        second = set(count_by_hand([self.second], 11, True))
+        expected = len(first & second) / float(len(first | second))
+        self.assertAlmostEqual(count_kmers(self.first, 11).jaccard(
+            count_kmers(self.second, 11)), expected)
+
+    def test_minhash(self):
+        """Jaccard similarity of k-mers estimated with MinHash."""
+        expected = count_kmers(self.first, 11).jaccard(
+            count_kmers(self.second, 11))
+        # a sketch with all k-mers gives the exact value
+        first = MinHash(self.first, k=11, size=10000)
+        second = MinHash(self.second, k=11, size=10000)
+        self.assertAlmostEqual(first.jaccard(second), expected)
+        first = MinHash(self.first, k=11, size=500)
+        second = MinHash(self.second, k=11, size=500)
+        self.assertEqual(len(first.hashes), 500)
+        self.assertTrue(abs(first.jaccard(second) - expected) < 0.1)
+        self.assertEqual(first.jaccard(first), 1.0)
+        self.assertRaises(ValueError, first.jaccard,
+                          MinHash(self.second, k=11, size=500, seed=1))
+
+
+if __name__ == "__main__":
+    runner = unittest.TextTestRunner(verbosity=2)
+    unittest.main(testRunner=runner)
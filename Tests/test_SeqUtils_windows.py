@@ -0,0 +1,128 @@
+# This file is part of the Biopython distribution and governed by your
+# choice of the "Biopython License Agreement" or the "BSD 3-Clause License".
+# Please see the LICENSE file that should have been included as part of this
+# package.
+
+"""Tests for the Bio.SeqUtils.windows module."""
+
+import math
+import os
+import random
+import tempfile
+import unittest
+
+try:
+    import numpy
+except ImportError:
+    from Bio import MissingPythonDependencyError
+    raise MissingPythonDependencyError(
+        "Install NumPy if you want to use Bio.SeqUtils.windows.")
+
+from Bio.Seq import Seq
+from Bio.SeqUtils import GC, GC_skew
+from Bio.SeqUtils.lcc import lcc_simp, lcc_mult
+from Bio.SeqUtils import windows
+
+
+def kmer_entropy(seq, k):
+    """Calculate the entropy of the k-mers of a sequence by counting them."""
+    counts = {}
+    for i in range(len(seq) - k + 1):
+        kmer = seq[i:i + k].upper()
+        if not kmer.strip("ACGT"):
+            counts[kmer] = counts.get(kmer, 0) + 1
+    total = float(sum(counts.values()))
+    return -sum(count / total * math.log(count / total, 2)
+                for count in counts.values())
+
+
+class WindowsTest(unittest.TestCase):
+    """Compare the window statistics with those of each window separately."""
+
+    def setUp(self):
+        random.seed(0)
+        self.sequences = ["".join(random.choice("ACGTacgtNSAAAA")
+                                  for i in range(random.randint(0, 150)))
+                          for j in range(30)]
+        self.chunk_size = windows._CHUNK_SIZE
+
+    def tearDown(self):
+        windows._CHUNK_SIZE = self.chunk_size
+
+    def check(self, function, expected_function, window, step, *args):
+        for seq in self.sequences:
+            values = function(Seq(seq), *args, window=window, step=step)
+            starts = range(0, len(seq) - window + 1, step or window)
+            expected = [expected_function(seq[start:start + window])
+                        for start in starts]
+            self.assertEqual(len(values), len(expected))
+            for value, expected_value in zip(values, expected):
+                self.assertAlmostEqual(value, expected_value, places=10)
+
+    def test_gc_content(self):
+        """Test the G+C content of windows."""
+        self.check(windows.gc_content, GC, 10, None)
+        self.check(windows.gc_content, GC, 7, 3)
+
+    def test_skew(self):
+        """Test the GC and AT skews of windows."""
+
+        def at_skew(seq):
+            a = seq.count("A") + seq.count("a")
+            t = seq.count("T") + seq.count("t")
+            return (a - t) / float(a + t) if a + t else 0.0
+
+        self.check(windows.gc_skew, lambda seq: GC_skew(seq, len(seq))[0],
+                   20, 5)
+        self.check(windows.at_skew, at_skew, 20, None)
+
+    def test_lcc(self):
+        """Test the local composition complexity of windows."""
+        self.check(windows.lcc, lambda seq: lcc_simp(seq.upper()), 15, 1)
+        seq = "".join(random.choice("ACGT") for i in range(500))
+        for value, expected in zip(windows.lcc(seq, 30, 1),
+                                   lcc_mult(seq, 30)[1:]):
+            self.assertAlmostEqual(value, expected, places=10)
+        # Lower case letters are counted as upper case (unlike lcc_simp)
+        self.assertEqual(windows.lcc("acgtAAAA", 8).tolist(),
+                         windows.lcc("ACGTAAAA", 8).tolist())
+        self.assertAlmostEqual(windows.lcc("acgtAAAA", 8)[0],
+                               lcc_simp("ACGTAAAA"), places=10)
+
+    def test_kmer_entropy(self):
+        """Test the k-mer entropy of windows."""
+        for k in (1, 2, 3):
+            self.check(windows.kmer_entropy, lambda seq: kmer_entropy(seq, k),
+                       12, 1, k)
+            self.check(windows.kmer_entropy, lambda seq: kmer_entropy(seq, k),
+                       25, None, k)
+        self.assertRaises(ValueError, windows.kmer_entropy, "ACGT", 5, 4)
+
+    def test_chunks(self):
+        """Test windows spanning several chunks of a sequence."""
+        for chunk_size in (1, 13):
+            windows._CHUNK_SIZE = chunk_size
+            self.test_gc_content()
+            self.test_kmer_entropy()
+
+    def test_memmap(self):
+        """Test a memory-mapped sequence file."""
+        seq = "".join(random.choice("ACGT") for i in range(2000))
+        handle, filename = tempfile.mkstemp()
+        try:
+            os.write(handle, seq.encode("ascii"))
+            os.close(handle)
+            data = numpy.memmap(filename, numpy.uint8, "r")
+            self.assertTrue(numpy.allclose(windows.gc_skew(data, 100, 10),
+                                           windows.gc_skew(seq, 100, 10)))
+            self.assertTrue(numpy.allclose(
+                windows.kmer_entropy(data, 4, 100, 10),
+                windows.kmer_entropy(seq, 4, 100, 10)))
+            del data
+        finally:
+            os.remove(filename)
+
+
+if __name__ == "__main__":
+    runner = unittest.TextTestRunner(verbosity=2)
+    unittest.main(testRunner=runner)
@@ -5,11 +5,18 @@
 
 """Unit tests for the Bio.Phylo.TreeConstruction module."""
 
+import math
 import os
 import unittest
 import tempfile
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
 from Bio._py3k import StringIO
+from Bio import MissingPythonDependencyError
 from Bio import AlignIO
 from Bio import Phylo
 from Bio.Phylo import BaseTree
@@ -109,6 +116,37 @@ class DistanceMatrixTest(unittest.TestCase):
         self.assertRaises(TypeError, dm.__setitem__, ('Alpha', 'Beta'), 'a')
         self.assertRaises(TypeError, dm.__setitem__, 'Alpha', ['a', 'b', 'c'])
 
+    def test_array_construction(self):
+        if numpy is None:
+            return
+        array = numpy.array([[0, 1, 2, 4],
+                             [1, 0, 3, 5],
+                             [2, 3, 0, 6],
+                             [4, 5, 6, 0]])
+        dm = DistanceMatrix(self.names, array)
+        self.assertEqual(dm.matrix, self.matrix)
+        self.assertEqual(dm['Beta', 'Delta'], 5)
+        self.assertTrue((dm.to_array() == array).all())
+        # The diagonal is always zero
+        array[2, 2] = 7
+        dm = DistanceMatrix(self.names, array)
+        self.assertEqual(dm['Gamma', 'Gamma'], 0)
+        self.assertEqual(dm['Gamma'], [2, 3, 0, 6])
+        self.assertRaises(ValueError, DistanceMatrix, self.names, array[:3])
+        self.assertRaises(TypeError, DistanceMatrix, self.names,
+                          array.astype(str))
+        # Integer matrices become floating point when needed
+        dm['Alpha', 'Beta'] = 0.5
+        self.assertEqual(dm[0, 1], 0.5)
+        self.assertEqual(dm[2, 3], 6)
+
+    def test_matrix_attribute(self):
+        # Changes to the matrix attribute change the distances
+        dm = DistanceMatrix(self.names, self.matrix)
+        dm.matrix[2][1] = 7
+        self.assertEqual(dm['Beta', 'Gamma'], 7)
+        self.assertEqual(dm['Gamma'], [2, 7, 0, 6])
+
     def test_format_phylip(self):
         dm = DistanceMatrix(self.names, self.matrix)
         handle = StringIO()
@@ -153,6 +191,73 @@ class DistanceCalculatorTest(unittest.TestCase):
         self.assertEqual(dmat['Alpha', 'Alpha'], 0.)
         self.assertAlmostEqual(dmat['Alpha', 'Gamma'], 4. / 5.)
 
+    def test_bad_alphabet(self):
+        aln = AlignIO.read(StringIO(">Alpha\nACGT\n>Beta\nACJT"), "fasta")
+        calculator = DistanceCalculator('blosum62')
+        self.assertRaises(ValueError, calculator.get_distance, aln)
+        # Not an error if only compared with skipped letters
+        aln = AlignIO.read(StringIO(">Alpha\nACT-\n>Beta\nACTJ"), "fasta")
+        dmat = calculator.get_distance(aln)
+        self.assertEqual(dmat['Alpha', 'Beta'], 0)
+
+    def test_evolution_models(self):
+        if numpy is None:
+            return
+        aln = AlignIO.read('TreeConstruction/msa.phy', 'phylip')
+        # Alpha and Beta differ by 1 transition and 2 transversions
+        # Alpha and Gamma differ by 5 transversions
+        dm = DistanceCalculator('p-distance').get_distance(aln)
+        self.assertAlmostEqual(dm['Alpha', 'Beta'], 3. / 13)
+        dm = DistanceCalculator('jukes-cantor').get_distance(aln)
+        self.assertAlmostEqual(dm['Alpha', 'Beta'],
+                               -0.75 * math.log(1 - 4. / 3 * 3 / 13))
+        dm = DistanceCalculator('kimura').get_distance(aln)
+        self.assertAlmostEqual(dm['Alpha', 'Beta'],
+                               -0.5 * math.log(1 - 2. / 13 - 2. / 13) -
+                               0.25 * math.log(1 - 4. / 13))
+        self.assertAlmostEqual(dm['Alpha', 'Gamma'],
+                               -0.5 * math.log(1 - 5. / 13) -
+                               0.25 * math.log(1 - 10. / 13))
+        # Gaps and ambiguous nucleotides are skipped, case is ignored
+        aln = AlignIO.read(StringIO(">Alpha\nACGTNA-\n>Beta\nacgaAAT\n"
+                                    ">Gamma\nTTTA---"), "fasta")
+        dm = DistanceCalculator('p-distance').get_distance(aln)
+        self.assertAlmostEqual(dm['Alpha', 'Beta'], 2. / 6)
+        dm = DistanceCalculator('jukes-cantor').get_distance(aln)
+        self.assertAlmostEqual(dm['Alpha', 'Beta'],
+                               -0.75 * math.log(1 - 4. / 3 * 1 / 5))
+        # Too different to estimate
+        self.assertEqual(dm['Alpha', 'Gamma'], float("inf"))
+
+    def test_without_numpy(self):
+        aln = AlignIO.read('TreeConstruction/msa.phy', 'phylip')
+        expected = dict((model, DistanceCalculator(model).get_distance(aln))
+                        for model in ('identity', 'blastn', 'blosum62'))
+        try:
+            TreeConstruction.numpy = None
+            # The distances are calculated one pair at a time
+            for model, dm in expected.items():
+                pairwise = DistanceCalculator(model).get_distance(aln)
+                for i, row in enumerate(pairwise.matrix):
+                    for value, expected_value in zip(row, dm.matrix[i]):
+                        self.assertAlmostEqual(value, expected_value)
+            self.assertRaises(MissingPythonDependencyError,
+                              DistanceCalculator('kimura').get_distance, aln)
+        finally:
+            TreeConstruction.numpy = numpy
+
+    def test_processes(self):
+        if numpy is None:
+            return
+        aln = AlignIO.read('TreeConstruction/msa.phy', 'phylip')
+        for model in ('identity', 'blastn', 'kimura'):
+            calculator = DistanceCalculator(model)
+            dm = calculator.get_distance(aln)
+            for processes in (0, 1, 2):
+                self.assertEqual(
+                    calculator.get_distance(aln, processes=processes).matrix,
+                    dm.matrix)
+
 
 class DistanceTreeConstructorTest(unittest.TestCase):
     """Test DistanceTreeConstructor"""
@@ -181,6 +286,54 @@ class DistanceTreeConstructorTest(unittest.TestCase):
         self.assertTrue(Consensus._equal_topology(tree, ref_tree))
         # ref_tree.close()
 
+    def test_known_trees(self):
+        # Regression test against the trees of the original pure Python
+        # implementation, including a matrix with many ties
+        names = ['t%i' % i for i in range(12)]
+        matrix = [[0], [1, 0], [2, 3, 0], [3, 2, 1, 0], [0, 4, 4, 1, 0],
+                  [1, 2, 4, 2, 3, 0], [2, 1, 0, 3, 2, 1, 0],
+                  [3, 3, 3, 0, 4, 4, 1, 0], [0, 5, 3, 1, 2, 4, 2, 3, 0],
+                  [1, 0, 3, 2, 1, 0, 3, 2, 1, 0],
+                  [2, 2, 2, 3, 3, 3, 0, 4, 4, 1, 0],
+                  [3, 4, 2, 0, 5, 3, 1, 2, 4, 2, 3, 0]]
+        ties = DistanceMatrix(names, matrix)
+        identity = DistanceCalculator('identity').get_distance(self.aln)
+        expected = [
+            (ties, 'nj',
+             "(((t8:0.75000,(t4:0.55000,t0:-0.55000)Inner1:0.25000)"
+             "Inner2:1.09375,((t9:-0.50000,t5:0.50000)Inner5:0.40000,"
+             "t1:0.60000)Inner6:0.78125)Inner9:0.31250,((t10:0.68750,"
+             "t6:-0.68750)Inner7:0.25000,t2:0.75000)Inner8:0.40625,"
+             "(t11:0.61607,(t7:0.48438,t3:-0.48438)Inner3:0.38393)"
+             "Inner4:0.78125)Inner10:0.00000;"),
+            (ties, 'upgma',
+             "((((t7:0.50000,(t11:0.00000,t3:0.00000)Inner1:0.50000)"
+             "Inner5:0.68750,((t10:0.00000,t6:0.00000)Inner2:0.50000,"
+             "t2:0.50000)Inner6:0.68750)Inner9:0.82812,((t9:0.00000,"
+             "t5:0.00000)Inner3:0.50000,t1:0.50000)Inner7:0.82812)"
+             "Inner10:0.92969,(t4:0.50000,(t8:0.00000,t0:0.00000)"
+             "Inner4:0.50000)Inner8:0.92969)Inner11:0.00000;"),
+            (identity, 'nj',
+             "(Alpha:0.18269,Beta:0.04808,((Epsilon:0.05128,"
+             "Delta:0.10256)Inner1:0.27885,Gamma:0.14423)Inner2:0.04808)"
+             "Inner3:0.00000;"),
+            (identity, 'upgma',
+             "((Epsilon:0.07692,Delta:0.07692)Inner1:0.18750,"
+             "((Gamma:0.11538,Beta:0.11538)Inner2:0.03846,Alpha:0.15385)"
+             "Inner3:0.11058)Inner4:0.00000;"),
+        ]
+        try:
+            # With NumPy if available, and with the pure Python fallback
+            for module_numpy in (numpy, None):
+                TreeConstruction.numpy = module_numpy
+                for dm, method, newick in expected:
+                    tree = getattr(self.constructor, method)(dm)
+                    handle = StringIO()
+                    Phylo.write(tree, handle, 'newick')
+                    self.assertEqual(handle.getvalue().strip(), newick)
+        finally:
+            TreeConstruction.numpy = numpy
+
     def test_built_tree(self):
         tree = self.constructor.build_tree(self.aln)
         self.assertTrue(isinstance(tree, BaseTree.Tree))
@@ -242,6 +395,46 @@ class ParsimonyScorerTest(unittest.TestCase):
         score = scorer.get_score(tree, aln)
         self.assertEqual(score, 3 + 1 + 3 + 3 + 2 + 1 + 2 + 5)
 
+    def test_repeated_columns(self):
+        aln = AlignIO.read('TreeConstruction/msa.phy', 'phylip')
+        tree = Phylo.read('./TreeConstruction/upgma.tre', 'newick')
+        step_matrix = [[0],
+                       [2.5, 0],
+                       [2.5, 1, 0],
+                       [1, 2.5, 2.5, 0]]
+        for matrix in (None, _Matrix(['A', 'T', 'C', 'G'], step_matrix)):
+            scorer = ParsimonyScorer(matrix)
+            score = scorer.get_score(tree, aln)
+            self.assertEqual(scorer.get_score(tree, aln + aln[:, ::-1]),
+                             2 * score)
+
+    def test_uninformative(self):
+        aln = AlignIO.read('TreeConstruction/msa.phy', 'phylip')
+        tree = Phylo.read('./TreeConstruction/upgma.tre', 'newick')
+        # only columns which are the same in all sequences
+        self.assertEqual(ParsimonyScorer().get_score(tree, aln[:, 7:9]), 0)
+
+    def test_without_numpy(self):
+        aln = AlignIO.read('TreeConstruction/msa.phy', 'phylip')
+        tree = Phylo.read('./TreeConstruction/upgma.tre', 'newick')
+        matrix = _Matrix(['A', 'T', 'C', 'G'],
+                         [[0], [2.5, 0], [2.5, 1, 0], [1, 2.5, 2.5, 0]])
+        for scorer in (ParsimonyScorer(), ParsimonyScorer(matrix)):
+            score = scorer.get_score(tree, aln)
+            try:
+                TreeConstruction.numpy = None
+                # The columns are scored one at a time
+                self.assertEqual(scorer.get_score(tree, aln), score)
+            finally:
+                TreeConstruction.numpy = numpy
+
+    def test_bad_letter(self):
+        aln = AlignIO.read('TreeConstruction/msa.phy', 'phylip')
+        tree = Phylo.read('./TreeConstruction/upgma.tre', 'newick')
+        matrix = _Matrix(['A', 'T', 'C'], [[0], [1, 0], [1, 1, 0]])
+        scorer = ParsimonyScorer(matrix)
+        self.assertRaises(ValueError, scorer.get_score, tree, aln)
+
 
 class NNITreeSearcherTest(unittest.TestCase):
     """Test NNITreeSearcher"""
@@ -260,6 +453,29 @@ class NNITreeSearcherTest(unittest.TestCase):
         self.assertEqual(len(trees), 2 * (5 - 3))
         Phylo.write(trees, os.path.join(temp_dir, 'neighbor_trees.tre'), 'newick')
 
+    def test_neighbor_scores(self):
+        if numpy is None:
+            return
+        aln = AlignIO.read('TreeConstruction/msa.phy', 'phylip')
+        tree = Phylo.read('./TreeConstruction/upgma.tre', 'newick')
+        scorer = ParsimonyScorer()
+        searcher = NNITreeSearcher(scorer)
+        states, costs, weights, steps = scorer._get_clade_states(tree, aln)
+        scores = [scorer.get_score(t, aln)
+                  for t in searcher._get_neighbors(tree)]
+        moves = searcher._get_nni_moves(tree)
+        self.assertEqual(len(moves), len(scores))
+        parents = dict((child, clade) for clade in tree.find_clades()
+                       for child in clade.clades)
+        for move, score in zip(moves, scores):
+            changed = [move[0], move[2]]
+            while changed[-1] in parents:
+                changed.append(parents[changed[-1]])
+            searcher._swap(move)
+            self.assertEqual(scorer._rescore(changed, states, costs, weights,
+                                             steps), score)
+            searcher._swap(move)
+
 
 class ParsimonyTreeConstructorTest(unittest.TestCase):
     """Test ParsimonyTreeConstructor"""
@@ -1911,6 +1911,128 @@ class MotifTestPWM(unittest.TestCase):
         self.assertAlmostEqual(result[5], -25.18009186, places=5)
         self.assertTrue(math.isnan(result[6]), "Expected nan, not %r" % result[6])
 
+    def test_search(self):
+        """Test if Bio.motifs PWM search agrees with the scores."""
+        counts = self.m.counts
+        pwm = counts.normalize(pseudocounts=0.25)
+        pssm = pwm.log_odds()
+        sequence = Seq("ACGTGTGCGTAGTGCGTNCCATATAAGGATAA", self.m.alphabet)
+        scores = pssm.calculate(sequence)
+        rc_scores = pssm.reverse_complement().calculate(sequence)
+        expected = []
+        for position, (score, rc_score) in enumerate(zip(scores, rc_scores)):
+            if score > -30:
+                expected.append((position, score))
+            if rc_score > -30:
+                expected.append((position - len(sequence), rc_score))
+        self.assertEqual(len(expected), 13)
+        for chunksize in (10 ** 6, 1, 4):
+            hits = list(pssm.search(sequence, threshold=-30,
+                                    chunksize=chunksize))
+            self.assertEqual([position for position, score in hits],
+                             [position for position, score in expected])
+            for (position, score), (position, expected_score) in zip(hits, expected):
+                self.assertAlmostEqual(score, expected_score, places=5)
+        hits = list(pssm.search(sequence, threshold=-30, both=False))
+        self.assertEqual([position for position, score in hits],
+                         [position for position, score in expected
+                          if position >= 0])
+        self.assertEqual(list(pssm.search(sequence[:10], threshold=-30)), [])
+
+    def test_scan(self):
+        """Test if Bio.motifs PWM scan agrees with search."""
+        try:
+            import numpy
+        except ImportError:
+            return
+        counts = self.m.counts
+        pwm = counts.normalize(pseudocounts=0.25)
+        pssm = pwm.log_odds()
+        sequence = Seq("ACGTGTGCGTAGTGCGTNCCATATAAGGATAA", self.m.alphabet)
+        hits = list(pssm.search(sequence, threshold=-30))
+        positions, scores = pssm.scan(sequence, threshold=-30, chunksize=3)
+        self.assertEqual(positions.tolist(),
+                         [position for position, score in hits])
+        self.assertTrue(numpy.allclose(scores,
+                                       [score for position, score in hits]))
+        positions, scores = pssm.scan(sequence, threshold=100)
+        self.assertEqual(len(positions), 0)
+        self.assertEqual(len(scores), 0)
+
+    def test_distribution(self):
+        """Test Bio.motifs score distribution thresholds and their cache."""
+        from Bio.motifs import thresholds
+        if thresholds.numpy is None:
+            return
+        import tempfile
+        counts = self.m.counts
+        pwm = counts.normalize(pseudocounts=0.25)
+        pssm = pwm.log_odds()
+        thresholds.clear_cache()
+        distribution = pssm.distribution(precision=100)
+        self.assertAlmostEqual(distribution.threshold_fpr(0.01), -5.597459559)
+        self.assertAlmostEqual(distribution.threshold_fnr(0.1), 11.203090464)
+        threshold, rate = distribution.threshold_balanced(1000, True)
+        self.assertAlmostEqual(threshold, 9.344013207)
+        self.assertAlmostEqual(rate, 5.990266799e-05)
+        self.assertAlmostEqual(distribution.threshold_patser(), 13.268731861)
+        # The same distribution is found in the cache, but each caller gets
+        # its own copy
+        cached = pssm.distribution(precision=100)
+        self.assertIsNot(cached, distribution)
+        self.assertIs(cached.mo_density, distribution.mo_density)
+        cached.modify({"A": 1.0, "C": 1.0, "G": 1.0, "T": 1.0},
+                      dict.fromkeys("ACGT", 0.25), dict.fromkeys("ACGT", 0.25))
+        self.assertNotEqual(cached.threshold_fpr(0.01),
+                            distribution.threshold_fpr(0.01))
+        self.assertAlmostEqual(pssm.distribution(precision=100)
+                               .threshold_fpr(0.01), -5.597459559)
+        self.assertIsNot(pssm.distribution(precision=10), distribution)
+        self.assertIsNot(pssm.distribution({"A": 0.3, "C": 0.2, "G": 0.2,
+                                            "T": 0.3}, precision=100),
+                         distribution)
+        # Save the cache to a file and load it again
+        handle, filename = tempfile.mkstemp(suffix=".npz")
+        os.close(handle)
+        try:
+            thresholds.save_cache(filename)
+            thresholds.clear_cache()
+            thresholds.load_cache(filename)
+        finally:
+            os.remove(filename)
+        loaded = pssm.distribution(precision=100)
+        self.assertIsNot(loaded, distribution)
+        self.assertEqual(loaded.threshold_fpr(0.01),
+                         distribution.threshold_fpr(0.01))
+        self.assertEqual(loaded.threshold_patser(),
+                         distribution.threshold_patser())
+        self.assertEqual(loaded.n_points, distribution.n_points)
+        thresholds.clear_cache()
+
+    def test_distribution_without_numpy(self):
+        """Test Bio.motifs score distribution thresholds without NumPy."""
+        from Bio.motifs import thresholds
+        counts = self.m.counts
+        pwm = counts.normalize(pseudocounts=0.25)
+        pssm = pwm.log_odds()
+        numpy = thresholds.numpy
+        try:
+            thresholds.numpy = None
+            thresholds.clear_cache()
+            distribution = pssm.distribution(precision=100)
+            self.assertAlmostEqual(distribution.threshold_fpr(0.01),
+                                   -5.597459559)
+            self.assertAlmostEqual(distribution.threshold_fnr(0.1),
+                                   11.203090464)
+            threshold, rate = distribution.threshold_balanced(1000, True)
+            self.assertAlmostEqual(threshold, 9.344013207)
+            self.assertAlmostEqual(rate, 5.990266799e-05)
+            self.assertAlmostEqual(distribution.threshold_patser(),
+                                   13.268731861)
+        finally:
+            thresholds.numpy = numpy
+            thresholds.clear_cache()
+
     def test_mixed_alphabets(self):
         """Test creating motif with mixed alphabets."""
         # TODO - Can we support this?
@@ -0,0 +1,126 @@
+# This file is part of the Biopython distribution and governed by your
+# choice of the "Biopython License Agreement" or the "BSD 3-Clause License".
+# Please see the LICENSE file that should have been included as part of this
+# package.
+
+"""Tests for the Bio.motifs.scanner module."""
+
+import random
+import unittest
+
+try:
+    import numpy
+except ImportError:
+    from Bio import MissingPythonDependencyError
+    raise MissingPythonDependencyError(
+        "Install NumPy if you want to use Bio.motifs.scanner.")
+
+from Bio import motifs
+from Bio.Alphabet import IUPAC
+from Bio.Seq import Seq
+from Bio.SeqRecord import SeqRecord
+from Bio.motifs.scanner import MotifScanner
+
+
+class MotifScannerTest(unittest.TestCase):
+    """Compare the MotifScanner with the PSSM search method."""
+
+    def setUp(self):
+        self.motifs = []
+        for filename in ("motifs/SRF.pfm", "motifs/REB1.pfm"):
+            with open(filename) as handle:
+                motif = motifs.read(handle, "pfm")
+            motif.pseudocounts = 0.25
+            self.motifs.append(motif)
+        with open("motifs/Arnt.sites") as handle:
+            motif = motifs.read(handle, "sites")
+        motif.pseudocounts = 0.5
+        self.motifs.append(motif)
+        # Without pseudocounts, some scores are minus infinity
+        with open("motifs/Arnt.sites") as handle:
+            self.motifs.append(motifs.read(handle, "sites"))
+        rng = random.Random(12)
+        self.records = []
+        for name, size in (("one", 500), ("two", 3), ("three", 1200)):
+            seq = "".join(rng.choice("ACGTacgtN") for i in range(size))
+            self.records.append(SeqRecord(Seq(seq, IUPAC.unambiguous_dna),
+                                          id=name))
+
+    def expected_hits(self, thresholds, both=True):
+        hits = []
+        for record in self.records:
+            n = len(record)
+            for motif, threshold in zip(self.motifs, thresholds):
+                for position, score in motif.pssm.search(record.seq, threshold,
+                                                         both=both):
+                    strand = "+"
+                    if position < 0:
+                        position += n
+                        strand = "-"
+                    hits.append((record.id, position,
+                                 self.motifs.index(motif), strand, score))
+        hits.sort(key=lambda hit: hit[:4])
+        return [(self.motifs[index], seq_id, position, strand, score)
+                for seq_id, position, index, strand, score in hits]
+
+    def assertSameHits(self, hits, expected):
+        self.assertEqual([hit[:4] for hit in hits],
+                         [hit[:4] for hit in expected])
+        for hit, expected_hit in zip(hits, expected):
+            self.assertAlmostEqual(hit[4], expected_hit[4], places=5)
+
+    def test_scan(self):
+        thresholds = [-5.0, -10.0, 2.0, 2.0]
+        expected = self.expected_hits(thresholds)
+        self.assertTrue(len(expected) > 20)
+        scanner = MotifScanner(self.motifs, thresholds)
+        self.assertSameHits(list(scanner.scan(self.records)), expected)
+        # Chunks smaller than the motifs
+        self.assertSameHits(list(scanner.scan(self.records, chunksize=7)),
+                            expected)
+        self.assertSameHits(list(scanner.scan(iter(self.records),
+                                              processes=2, chunksize=100)),
+                            expected)
+        # Only the forward strand
+        expected = self.expected_hits(thresholds, both=False)
+        scanner = MotifScanner(self.motifs, thresholds, both=False)
+        self.assertSameHits(list(scanner.scan(self.records)), expected)
+
+    def test_scan_stop(self):
+        thresholds = [-5.0, -10.0, 2.0, 2.0]
+        scanner = MotifScanner(self.motifs, thresholds)
+        taken = []
+
+        def records():
+            for i in range(100):
+                for record in self.records:
+                    taken.append(record)
+                    yield record
+
+        hits = scanner.scan(records(), processes=2, chunksize=100)
+        self.assertSameHits([next(hits)], self.expected_hits(thresholds)[:1])
+        # Only a few chunks per process are queued at once
+        self.assertTrue(len(taken) <= 8)
+        hits.close()
+
+    def test_sequences(self):
+        scanner = MotifScanner(self.motifs, -5.0)
+        record = self.records[0]
+        hits = list(scanner.scan(record))
+        self.assertEqual(hits, list(scanner.scan([record])))
+        self.assertEqual([hit[1:] for hit in scanner.scan(str(record.seq))],
+                         [(0,) + hit[2:] for hit in hits])
+        self.assertEqual(list(scanner.scan([])), [])
+
+    def test_pvalue(self):
+        scanner = MotifScanner(self.motifs[:1], pvalue=0.001)
+        threshold = self.motifs[0].pssm.distribution(
+            self.motifs[0].background).threshold_fpr(0.001)
+        self.assertAlmostEqual(scanner.thresholds[0], threshold)
+        self.assertRaises(ValueError, MotifScanner, self.motifs, [1.0, 2.0])
+        self.assertRaises(ValueError, MotifScanner, self.motifs, pvalue=[0.1])
+
+
+if __name__ == "__main__":
+    runner = unittest.TextTestRunner(verbosity=2)
+    unittest.main(testRunner=runner)